@@ -0,0 +1,47 @@
+"""
+Bulk import of many paths: one touch() per path versus a single apply_batch().
+
+Usage: python -m file_management.benchmarks.batch_import_benchmark [--paths 1000000]
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from file_management.file_system import FileSystem
+
+
+def _generate_paths(count: int):
+    # A bank-statement-like layout: /imports/<year>/<month>/<account>/<n>.txt, shuffled.
+    paths = [f"/imports/{2000 + i % 20}/{i % 12:02d}/acct{i % 97}/{i}.txt" for i in range(count)]
+    random.Random(42).shuffle(paths)
+    return paths
+
+
+def run(count: int):
+    paths = _generate_paths(count)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        fs = FileSystem()
+        start = time.perf_counter()
+        for path in paths:
+            fs.touch(path, "row")
+        per_call_seconds = time.perf_counter() - start
+
+        fs = FileSystem()
+        start = time.perf_counter()
+        fs.apply_batch(("touch", path, "row") for path in paths)
+        batch_seconds = time.perf_counter() - start
+
+    print(f"Paths imported     : {count:,}")
+    print(f"touch() per path   : {per_call_seconds:.2f}s ({count / per_call_seconds:,.0f} paths/s)")
+    print(f"apply_batch()      : {batch_seconds:.2f}s ({count / batch_seconds:,.0f} paths/s)")
+    print(f"Speed-up           : {per_call_seconds / batch_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--paths", type=int, default=1_000_000)
+    arguments = parser.parse_args()
+    run(arguments.paths)
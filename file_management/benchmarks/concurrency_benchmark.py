@@ -0,0 +1,60 @@
+"""
+Multi-threaded throughput of FileSystem with hierarchical path locking.
+
+Each worker owns a subtree (/w<N>) and mixes touch, cat and cross-directory mv inside it, while
+one shared directory (/shared) receives touches from every worker to show root-level contention.
+
+Usage: python -m file_management.benchmarks.concurrency_benchmark [--ops 20000] [--threads 1 2 4 8]
+"""
+import argparse
+import contextlib
+import os
+import threading
+import time
+
+from file_management.file_system import FileSystem
+
+
+def _worker(fs: FileSystem, index: int, ops: int):
+    base = f"/w{index}"
+    for i in range(ops):
+        step = i % 4
+        if step == 0:
+            fs.touch(f"{base}/in/f{i}.txt", "payload")
+        elif step == 1:
+            fs.cat(f"{base}/in/f{i - 1}.txt")
+        elif step == 2:
+            fs.mv(f"{base}/in/f{i - 2}.txt", f"{base}/out/f{i - 2}.txt")
+        else:
+            fs.touch(f"/shared/w{index}_{i}.txt", "x")
+
+
+def run(total_ops: int, thread_counts):
+    print(f"{'threads':>8} {'ops':>10} {'seconds':>9} {'ops/s':>12}")
+    for threads in thread_counts:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            fs = FileSystem()
+            for index in range(threads):
+                fs.mkdir(f"/w{index}/in")
+                fs.mkdir(f"/w{index}/out")
+            fs.mkdir("/shared")
+
+            per_thread = total_ops // threads
+            workers = [threading.Thread(target=_worker, args=(fs, index, per_thread)) for index in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+
+        ops = per_thread * threads
+        print(f"{threads:>8} {ops:>10,} {elapsed:>9.2f} {ops / elapsed:>12,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=20_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    arguments = parser.parse_args()
+    run(arguments.ops, arguments.threads)
@@ -0,0 +1,65 @@
+"""
+Measures PersistentFileSystem startup (snapshot load + log replay) for a large tree.
+
+Usage: python -m file_management.benchmarks.startup_benchmark [--entries 1000000] [--tail 10000]
+"""
+import argparse
+import contextlib
+import os
+import tempfile
+import time
+
+from file_management.persistent_file_system import PersistentFileSystem
+
+_FILES_PER_DIRECTORY = 1000
+
+
+def _populate(fs: PersistentFileSystem, entries: int):
+    created = 0
+    directory_index = 0
+    while created < entries:
+        directory = f"/data/d{directory_index}"
+        fs.mkdir(directory)
+        created += 1
+        for file_index in range(min(_FILES_PER_DIRECTORY, entries - created)):
+            fs.touch(f"{directory}/f{file_index}.txt", f"content {directory_index}-{file_index}")
+            created += 1
+        directory_index += 1
+
+
+def run(entries: int, tail: int):
+    with tempfile.TemporaryDirectory() as data_dir:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            fs = PersistentFileSystem(data_dir, checkpoint_every=entries + tail + 1, fsync=False)
+            start = time.perf_counter()
+            _populate(fs, entries)
+            build_seconds = time.perf_counter() - start
+
+            start = time.perf_counter()
+            fs.checkpoint()
+            checkpoint_seconds = time.perf_counter() - start
+
+            for i in range(tail):
+                fs.touch(f"/tail/f{i}.txt", "tail")
+            fs.close()
+
+            start = time.perf_counter()
+            restored = PersistentFileSystem(data_dir, checkpoint_every=entries + tail + 1, fsync=False)
+            startup_seconds = time.perf_counter() - start
+            restored.close()
+
+        snapshot_bytes = os.path.getsize(os.path.join(data_dir, PersistentFileSystem.SNAPSHOT_FILE_NAME))
+
+    print(f"Entries in snapshot : {entries:,}")
+    print(f"Log tail replayed   : {tail:,}")
+    print(f"Build time          : {build_seconds:.2f}s")
+    print(f"Checkpoint time     : {checkpoint_seconds:.2f}s ({snapshot_bytes / 1e6:.1f} MB)")
+    print(f"Startup time        : {startup_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--entries", type=int, default=1_000_000)
+    parser.add_argument("--tail", type=int, default=10_000)
+    arguments = parser.parse_args()
+    run(arguments.entries, arguments.tail)
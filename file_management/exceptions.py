@@ -28,4 +28,16 @@ class IsFileError(FileSystemError):
 
 class PermissionDeniedError(FileSystemError):
     """Could be used for future permission features."""
+    pass
+
+class InvalidQueryError(FileSystemError):
+    """Raised when a content search query is malformed."""
+    pass
+
+class PersistenceError(FileSystemError):
+    """Raised when the on-disk snapshot or write-ahead log cannot be read."""
+    pass
+
+class InvalidOperationError(FileSystemError):
+    """Raised when a batch operation is malformed (unknown kind, wrong arity or argument types)."""
     pass
\ No newline at end of file
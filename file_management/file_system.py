@@ -1,10 +1,14 @@
-from typing import List, Tuple, Optional
+import fnmatch
+from contextlib import contextmanager
+from typing import Any, Dict, List, Tuple, Optional, Iterator, Iterable, Sequence
 
 from file_management.exceptions import InvalidPathError, PathNotFoundError, IsDirectoryError, IsFileError, \
-    FileSystemError, DirectoryNotEmptyError
+    FileSystemError, DirectoryNotEmptyError, FileExistsError, InvalidOperationError
+from file_management.locking import HeldPathLocks, PathKey
 from file_management.models.directory import Directory
 from file_management.models.file import File
 from file_management.models.fs_entry import FSEntry
+from file_management.search.content_index import ContentIndex
 
 
 class FileSystem:
@@ -13,6 +17,7 @@ class FileSystem:
         # The root directory has an empty string name and no parent.
         # Its actual path is "/".
         self.root = Directory("", parent=None)
+        self._content_index = ContentIndex()
         print("File System Initialized with root '/'.")
 
     def _split_path(self, path: str) -> List[str]:
@@ -100,22 +105,101 @@ class FileSystem:
         # Fallback for root path handled at the beginning
         raise ValueError("Unexpected path resolution state.")
 
+    def _join_path(self, parent_path: str, name: str) -> str:
+        """Joins an absolute directory path and a child name."""
+        return f"{parent_path.rstrip('/')}/{name}"
+
+    def _walk(self, path: str, entry: FSEntry) -> Iterator[Tuple[str, FSEntry]]:
+        """
+        Yields (absolute_path, entry) for `entry` and everything below it in pre-order.
+        Uses an explicit stack instead of recursion so arbitrarily deep trees are safe.
+        """
+        stack: List[Tuple[str, FSEntry]] = [(path, entry)]
+        while stack:
+            current_path, current = stack.pop()
+            yield current_path, current
+            if current.is_directory():
+                # Push in reverse so children are visited in alphabetical order.
+                for child in reversed(current.get_children()):  # type: ignore
+                    stack.append((self._join_path(current_path, child.get_name()), child))
+
+    def _iter_subtree(self, entry: FSEntry) -> Iterator[FSEntry]:
+        """Yields `entry` and everything below it, without building paths (explicit stack)."""
+        stack: List[FSEntry] = [entry]
+        while stack:
+            current = stack.pop()
+            yield current
+            if current.is_directory():
+                stack.extend(current.get_children())  # type: ignore
+
+    def _index_subtree(self, entry: FSEntry):
+        """Adds every file under `entry` (inclusive) to the content index."""
+        for current in self._iter_subtree(entry):
+            if not current.is_directory():
+                self._content_index.index_file(current)  # type: ignore
+
+    def _path_key(self, path: str) -> PathKey:
+        """Returns the path components as a tuple, the key used for path locking."""
+        return tuple(self._split_path(path))
+
+    @contextmanager
+    def _locked(self, exclusive: Iterable[PathKey] = (), shared: Iterable[PathKey] = (),
+                shared_subtrees: Iterable[PathKey] = ()):
+        """
+        Holds the directory locks an operation needs for its whole duration: `exclusive` directories
+        in write mode, `shared` ones in read mode, and every directory under `shared_subtrees` in read
+        mode. Ancestors of all of them are held in read mode (see HeldPathLocks for the ordering rules).
+        """
+        held = HeldPathLocks(self.root, exclusive=exclusive, shared=shared, shared_subtrees=shared_subtrees)
+        try:
+            yield held
+        finally:
+            held.release()
+
+    def _on_mutation(self, operation: str, args: List[Any]):
+        """
+        Called after every successful mutation while the operation's locks are still held, so
+        overrides observe mutations in the order they were applied. No-op by default.
+        """
+        pass
+
+    @contextmanager
+    def _locked_for_create(self, directory: PathKey):
+        """
+        Locks `directory` (where new entries will be added) exclusively. If it does not exist yet, the
+        deepest existing ancestor is locked exclusively instead, which covers the whole subtree being created.
+        """
+        target = directory
+        while True:
+            held = HeldPathLocks(self.root, exclusive=[target])
+            if held.holds_exclusive(target):
+                break
+            # The target is missing: retry one level up from what currently exists.
+            target = held.deepest_held_prefix(target)
+            held.release()
+        try:
+            yield held
+        finally:
+            held.release()
+
     def mkdir(self, path: str):
         """Creates a new directory at the specified path."""
         try:
-            parent_dir, new_dir_name, existing_entry = self._resolve_path(
-                path,
-                create_intermediates=True,
-                ensure_parent_is_directory=True,
-                final_component_can_exist=False  # Ensure the directory doesn't already exist
-            )
-
-            if existing_entry is not None:  # Should be caught by final_component_can_exist=False
-                raise FileExistsError(f"Directory '{path}' already exists.")
-
-            new_dir = Directory(new_dir_name, parent=parent_dir)
-            parent_dir.add_child(new_dir)
-            print(f"Directory '{path}' created.")
+            with self._locked_for_create(self._path_key(path)[:-1]):
+                parent_dir, new_dir_name, existing_entry = self._resolve_path(
+                    path,
+                    create_intermediates=True,
+                    ensure_parent_is_directory=True,
+                    final_component_can_exist=False  # Ensure the directory doesn't already exist
+                )
+
+                if existing_entry is not None:  # Should be caught by final_component_can_exist=False
+                    raise FileExistsError(f"Directory '{path}' already exists.")
+
+                new_dir = Directory(new_dir_name, parent=parent_dir)
+                parent_dir.add_child(new_dir)
+                print(f"Directory '{path}' created.")
+                self._on_mutation("mkdir", [path])
         except FileSystemError as e:
             print(f"Error creating directory '{path}': {e}")
             raise
@@ -123,23 +207,27 @@ class FileSystem:
     def touch(self, path: str, content: str = ""):
         """Creates a new file or updates content of an existing file at the specified path."""
         try:
-            parent_dir, file_name, existing_entry = self._resolve_path(
-                path,
-                create_intermediates=True,
-                ensure_parent_is_directory=True,
-                final_component_can_exist=True  # File can exist for update
-            )
-
-            if existing_entry is None:
-                new_file = File(file_name, parent=parent_dir, content=content)
-                parent_dir.add_child(new_file)
-                print(f"File '{path}' created with content.")
-            elif existing_entry.is_directory():
-                raise IsDirectoryError(
-                    f"Cannot create/update file '{path}': a directory with that name already exists.")
-            else:  # File exists, update content
-                existing_entry.set_content(content)
-                print(f"File '{path}' content updated.")
+            with self._locked_for_create(self._path_key(path)[:-1]):
+                parent_dir, file_name, existing_entry = self._resolve_path(
+                    path,
+                    create_intermediates=True,
+                    ensure_parent_is_directory=True,
+                    final_component_can_exist=True  # File can exist for update
+                )
+
+                if existing_entry is None:
+                    new_file = File(file_name, parent=parent_dir, content=content)
+                    parent_dir.add_child(new_file)
+                    self._content_index.index_file(new_file)
+                    print(f"File '{path}' created with content.")
+                elif existing_entry.is_directory():
+                    raise IsDirectoryError(
+                        f"Cannot create/update file '{path}': a directory with that name already exists.")
+                else:  # File exists, update content
+                    existing_entry.set_content(content)
+                    self._content_index.index_file(existing_entry)  # type: ignore
+                    print(f"File '{path}' content updated.")
+                self._on_mutation("touch", [path, content])
         except FileSystemError as e:
             print(f"Error touching file '{path}': {e}")
             raise
@@ -147,19 +235,20 @@ class FileSystem:
     def ls(self, path: str) -> List[str]:
         """Lists the names of all direct children within the specified path."""
         try:
-            parent_dir, target_name, target_entry = self._resolve_path(
-                path,
-                target_must_exist=True,
-                target_must_be_directory=True  # Ensure it's a directory for ls
-            )
-
-            # Special case for root path being '/'
-            if path == "/":
-                dir_to_list = self.root
-            else:
-                dir_to_list = target_entry  # type: #ignore (_resolve_path ensures it's a Directory)
+            with self._locked(shared=[self._path_key(path)]):
+                parent_dir, target_name, target_entry = self._resolve_path(
+                    path,
+                    target_must_exist=True,
+                    target_must_be_directory=True  # Ensure it's a directory for ls
+                )
+
+                # Special case for root path being '/'
+                if path == "/":
+                    dir_to_list = self.root
+                else:
+                    dir_to_list = target_entry  # type: #ignore (_resolve_path ensures it's a Directory)
 
-            return dir_to_list.get_children_names()
+                return dir_to_list.get_children_names()
         except FileSystemError as e:
             print(f"Error listing path '{path}': {e}")
             raise
@@ -167,173 +256,434 @@ class FileSystem:
     def cat(self, path: str) -> str:
         """Reads and returns the content of the file at the specified path."""
         try:
-            parent_dir, file_name, target_entry = self._resolve_path(
-                path,
-                target_must_exist=True,
-                target_must_be_directory=False  # Ensure it's a file for cat
-            )
+            with self._locked(shared=[self._path_key(path)[:-1]]):
+                parent_dir, file_name, target_entry = self._resolve_path(
+                    path,
+                    target_must_exist=True,
+                    target_must_be_directory=False  # Ensure it's a file for cat
+                )
 
-            return target_entry.get_content()  # type: #ignore (resolve_path ensures it's a File)
+                return target_entry.get_content()  # type: #ignore (resolve_path ensures it's a File)
         except FileSystemError as e:
             print(f"Error reading file '{path}': {e}")
             raise
 
-    def rm(self, path: str):
-        """Deletes a file or an empty directory at the specified path."""
+    def rm(self, path: str, recursive: bool = False):
+        """
+        Deletes a file or an empty directory at the specified path.
+        With recursive=True, a non-empty directory is deleted together with its whole subtree.
+        """
         try:
-            if path == "/":
-                raise InvalidPathError("Cannot delete the root directory.")
-
-            parent_dir, target_name, target_entry = self._resolve_path(
-                path,
-                target_must_exist=True,
-                final_component_can_exist=True  # We need it to exist to delete
-            )
-
-            if target_entry.is_directory():  # type: ignore
-                if not target_entry.is_empty():  # type: ignore
-                    raise DirectoryNotEmptyError(f"Cannot delete non-empty directory: '{path}'")
-
-            parent_dir.remove_child(target_name)
-            # Remove parent reference from deleted entry (optional, helps with garbage collection)
-            target_entry.set_parent(None)  # type: ignore
-            print(f"'{path}' deleted successfully.")
+            with self._locked(exclusive=[self._path_key(path)[:-1]]):
+                if path == "/":
+                    raise InvalidPathError("Cannot delete the root directory.")
+
+                parent_dir, target_name, target_entry = self._resolve_path(
+                    path,
+                    target_must_exist=True,
+                    final_component_can_exist=True  # We need it to exist to delete
+                )
+
+                if target_entry.is_directory():  # type: ignore
+                    if not recursive and not target_entry.is_empty():  # type: ignore
+                        raise DirectoryNotEmptyError(f"Cannot delete non-empty directory: '{path}'")
+
+                # Detaching the subtree root updates the cached sizes of all ancestors in one pass.
+                parent_dir.remove_child(target_name)
+                # Remove parent references from deleted entries (optional, helps with garbage collection)
+                for entry in self._iter_subtree(target_entry):  # type: ignore
+                    if not entry.is_directory():
+                        self._content_index.remove_file(entry)  # type: ignore
+                    entry.set_parent(None)
+                print(f"'{path}' deleted successfully.")
+                self._on_mutation("rm", [path, recursive])
         except FileSystemError as e:
             print(f"Error deleting '{path}': {e}")
             raise
 
-    def cp(self, source_path: str, destination_path: str):
-        """Copies a file from source_path to destination_path."""
+    def cp(self, source_path: str, destination_path: str, recursive: bool = False):
+        """
+        Copies a file from source_path to destination_path.
+        With recursive=True, a directory is copied together with its whole subtree.
+        """
         try:
-            # 1. Resolve source path
-            src_parent_dir, src_name, src_entry = self._resolve_path(
-                source_path,
-                target_must_exist=True
-            )
-            if src_entry.is_directory():  # type: ignore
-                raise IsDirectoryError(f"Cannot copy directory '{source_path}'. Only files can be copied.")
-
-            source_file: File = src_entry  # type: ignore
-
-            # 2. Resolve destination path logic
-            dest_components = self._split_path(destination_path)
-            dest_parent_path_components = dest_components[:-1]
-            dest_target_name = dest_components[-1]
-
-            dest_parent_dir: Directory = self.root
-            temp_path_for_parent = "/" + "/".join(dest_parent_path_components) if dest_parent_path_components else "/"
-
-            # Find the parent of the destination. This parent MUST exist.
-            try:
-                # _resolve_path will ensure parent exists and is a directory
-                resolved_parent, _, _ = self._resolve_path(
-                    temp_path_for_parent,
-                    target_must_exist=True,
-                    target_must_be_directory=True
+            source_key, destination_key = self._path_key(source_path), self._path_key(destination_path)
+            with self._locked(shared=[source_key[:-1]],
+                              shared_subtrees=[source_key] if recursive else [],
+                              exclusive=[destination_key[:-1], destination_key]):
+                # 1. Resolve source path
+                if source_path == "/" and recursive:
+                    raise InvalidPathError("Cannot recursively copy the root directory.")
+
+                src_parent_dir, src_name, src_entry = self._resolve_path(
+                    source_path,
+                    target_must_exist=True
                 )
-                dest_parent_dir = resolved_parent  # type: ignore
-            except PathNotFoundError:
-                raise PathNotFoundError(f"Destination parent directory '{temp_path_for_parent}' does not exist.")
-            except IsFileError:
-                raise InvalidPathError(f"Destination parent '{temp_path_for_parent}' is a file, not a directory.")
-
-            # Check if destination_path itself is an existing directory (copying file *into* it)
-            dest_entry_at_full_path: Optional[FSEntry] = dest_parent_dir.get_child(dest_target_name)
-            if dest_entry_at_full_path and dest_entry_at_full_path.is_directory():
-                # Destination is an existing directory, copy file into it with original name
-                final_dest_parent_dir = dest_entry_at_full_path
-                final_dest_name = src_name
-                if final_dest_parent_dir.get_child(final_dest_name):
-                    raise FileExistsError(f"File '{final_dest_name}' already exists in '{destination_path}'.")
-            else:
-                # Destination is a non-existent path ending in a file name OR existing file (which is error)
-                final_dest_parent_dir = dest_parent_dir
-                final_dest_name = dest_target_name
-                if dest_entry_at_full_path and not dest_entry_at_full_path.is_directory():
-                    raise FileExistsError(
-                        f"Destination path '{destination_path}' is an existing file. Cannot overwrite.")
-
-            # 3. Perform copy
-            new_file = File(final_dest_name, parent=final_dest_parent_dir, content=source_file.get_content())
-            final_dest_parent_dir.add_child(new_file)
-            print(f"Copied '{source_path}' to '{final_dest_parent_dir.get_name()}/{final_dest_name}'.")
+                if src_entry.is_directory() and not recursive:  # type: ignore
+                    raise IsDirectoryError(f"Cannot copy directory '{source_path}'. Only files can be copied.")
+
+                # 2. Resolve destination path logic
+                dest_components = self._split_path(destination_path)
+                dest_parent_path_components = dest_components[:-1]
+                dest_target_name = dest_components[-1]
+
+                dest_parent_dir: Directory = self.root
+                temp_path_for_parent = "/" + "/".join(dest_parent_path_components) if dest_parent_path_components else "/"
+
+                # Find the parent of the destination. This parent MUST exist.
+                try:
+                    # _resolve_path will ensure parent exists and is a directory
+                    _, _, resolved_parent = self._resolve_path(
+                        temp_path_for_parent,
+                        target_must_exist=True,
+                        target_must_be_directory=True
+                    )
+                    dest_parent_dir = resolved_parent  # type: ignore
+                except PathNotFoundError:
+                    raise PathNotFoundError(f"Destination parent directory '{temp_path_for_parent}' does not exist.")
+                except IsFileError:
+                    raise InvalidPathError(f"Destination parent '{temp_path_for_parent}' is a file, not a directory.")
+
+                # Check if destination_path itself is an existing directory (copying file *into* it)
+                dest_entry_at_full_path: Optional[FSEntry] = dest_parent_dir.get_child(dest_target_name)
+                if dest_entry_at_full_path and dest_entry_at_full_path.is_directory():
+                    # Destination is an existing directory, copy file into it with original name
+                    final_dest_parent_dir = dest_entry_at_full_path
+                    final_dest_name = src_name
+                    if final_dest_parent_dir.get_child(final_dest_name):
+                        raise FileExistsError(f"File '{final_dest_name}' already exists in '{destination_path}'.")
+                else:
+                    # Destination is a non-existent path ending in a file name OR existing file (which is error)
+                    final_dest_parent_dir = dest_parent_dir
+                    final_dest_name = dest_target_name
+                    if dest_entry_at_full_path and not dest_entry_at_full_path.is_directory():
+                        raise FileExistsError(
+                            f"Destination path '{destination_path}' is an existing file. Cannot overwrite.")
+
+                # 3. Refuse to copy a directory into its own subtree (the copy would never terminate)
+                if src_entry.is_directory():  # type: ignore
+                    current_check_dir: Optional[Directory] = final_dest_parent_dir
+                    while current_check_dir:
+                        if current_check_dir == src_entry:
+                            raise InvalidPathError(
+                                f"Cannot copy directory '{source_path}' into its own subdirectory '{destination_path}'.")
+                        current_check_dir = current_check_dir.get_parent()
+
+                # 4. Perform copy
+                copied_entry = self._copy_tree(src_entry, final_dest_name)  # type: ignore
+                final_dest_parent_dir.add_child(copied_entry)
+                self._index_subtree(copied_entry)
+                print(f"Copied '{source_path}' to '{final_dest_parent_dir.get_name()}/{final_dest_name}'.")
+                self._on_mutation("cp", [source_path, destination_path, recursive])
 
         except FileSystemError as e:
             print(f"Error copying '{source_path}' to '{destination_path}': {e}")
             raise
 
-    def mv(self, source_path: str, destination_path: str):
-        """Moves (renames) a file or directory from source_path to destination_path."""
+    def _copy_tree(self, source: FSEntry, new_name: str) -> FSEntry:
+        """
+        Builds a detached deep copy of `source` named `new_name`.
+        The copy is assembled with an explicit stack and attached by the caller in a single add_child,
+        so ancestor sizes are updated once rather than once per copied file.
+        """
+        if not source.is_directory():
+            return File(new_name, parent=None, content=source.get_content())  # type: ignore
+
+        copy_root = Directory(new_name, parent=None)
+        stack: List[Tuple[Directory, Directory]] = [(source, copy_root)]  # type: ignore
+        while stack:
+            src_dir, dest_dir = stack.pop()
+            for child in src_dir.get_children():
+                if child.is_directory():
+                    child_copy = Directory(child.get_name(), parent=dest_dir)
+                    stack.append((child, child_copy))  # type: ignore
+                else:
+                    child_copy = File(child.get_name(), parent=dest_dir, content=child.get_content())  # type: ignore
+                dest_dir.add_child(child_copy)
+        return copy_root
+
+    def find(self, path: str, pattern: str = "*") -> List[str]:
+        """
+        Returns the sorted absolute paths of all entries under `path` (inclusive) whose name
+        matches the shell-style glob `pattern` (e.g. "*.txt", "report_?.pdf").
+        """
+        try:
+            with self._locked(shared_subtrees=[self._path_key(path)]):
+                _, _, target_entry = self._resolve_path(
+                    path,
+                    target_must_exist=True
+                )
+                start_path = "/" if path == "/" else "/" + "/".join(self._split_path(path))
+                matches = [entry_path for entry_path, entry in self._walk(start_path, target_entry)  # type: ignore
+                           if entry is not self.root and fnmatch.fnmatchcase(entry.get_name(), pattern)]
+                return sorted(matches)
+        except FileSystemError as e:
+            print(f"Error finding in '{path}': {e}")
+            raise
+
+    def du(self, path: str) -> int:
+        """Returns the total size in bytes of the file or directory subtree at `path` (O(depth))."""
+        try:
+            with self._locked(shared=[self._path_key(path)[:-1]]):
+                _, _, target_entry = self._resolve_path(
+                    path,
+                    target_must_exist=True
+                )
+                return target_entry.get_size()  # type: ignore
+        except FileSystemError as e:
+            print(f"Error computing disk usage for '{path}': {e}")
+            raise
+
+    def apply_batch(self, operations: Iterable[Sequence[str]]) -> int:
+        """
+        Applies many creations atomically: either every operation succeeds or none is kept.
+
+        Each operation is ("mkdir", path) or ("touch", path[, content]) with the same semantics as the
+        single-path methods. Operations are applied in path order (stable for equal paths), so consecutive
+        operations share the resolution of their common directory prefix, and nothing is printed per
+        operation. The deepest common existing ancestor is locked exclusively for the whole batch.
+        Every operation is validated before anything is changed, and a failure of any kind while
+        applying rolls back what was already applied. Returns the number of operations applied.
+        """
+        try:
+            batch: List[Tuple[PathKey, str, str, str]] = []
+            for operation in operations:
+                self._validate_batch_operation(operation)
+                kind, path = operation[0], operation[1]
+                key = self._path_key(path)
+                if not key:
+                    if kind == "mkdir":
+                        raise FileExistsError("Directory '/' already exists.")
+                    raise IsDirectoryError("Path '/' refers to a directory, not a file.")
+                content = operation[2] if kind == "touch" and len(operation) > 2 else ""
+                batch.append((key, kind, path, content))
+            # Joining with NUL (which sorts below every other character) gives component-wise order,
+            # keeping each subtree contiguous, at a fraction of the cost of comparing tuples.
+            batch.sort(key=lambda operation: "\0".join(operation[0]))
+            if not batch:
+                return 0
+
+            # Lock the longest directory prefix shared by every operation's parent. The batch is sorted,
+            # so that is the common prefix of the first and last parents.
+            first_parent, last_parent = batch[0][0][:-1], batch[-1][0][:-1]
+            depth = 0
+            while depth < min(len(first_parent), len(last_parent)) and first_parent[depth] == last_parent[depth]:
+                depth += 1
+            common = first_parent[:depth]
+
+            with self._locked_for_create(common):
+                undo: List[Tuple[str, FSEntry, str]] = []
+                try:
+                    self._apply_sorted_batch(batch, undo)
+                except BaseException:
+                    self._rollback_batch(undo)
+                    raise
+                self._on_mutation("batch", [[[kind, path, content] for _, kind, path, content in batch]])
+            print(f"Batch of {len(batch)} operations applied.")
+            return len(batch)
+        except FileSystemError as e:
+            print(f"Error applying batch, no changes were kept: {e}")
+            raise
+
+    @staticmethod
+    def _validate_batch_operation(operation: Sequence[str]):
+        """Checks an operation's kind, arity and argument types, raising InvalidOperationError."""
+        if isinstance(operation, str) or not isinstance(operation, Sequence) or not operation:
+            raise InvalidOperationError(f"Batch operation {operation!r} is not a (kind, path, ...) sequence.")
+        kind = operation[0]
+        if kind not in ("mkdir", "touch"):
+            raise InvalidOperationError(f"Unsupported batch operation {kind!r} in {operation!r}.")
+        if len(operation) not in (2, 3):
+            raise InvalidOperationError(f"Batch operation {operation!r} has the wrong number of arguments.")
+        if not isinstance(operation[1], str):
+            raise InvalidOperationError(f"Batch operation {operation!r} needs a string path.")
+        if len(operation) == 3:
+            # The write-ahead log records mkdir with empty content, so that form is accepted too
+            if not isinstance(operation[2], str) or (kind == "mkdir" and operation[2]):
+                raise InvalidOperationError(f"Batch operation {operation!r} has invalid content.")
+
+    def _apply_sorted_batch(self, batch: List[Tuple[PathKey, str, str, str]],
+                            undo: List[Tuple[str, FSEntry, str]]):
+        """
+        Applies path-sorted operations, recording ("created", parent, name) and
+        ("updated", file, old_content) undo records as it goes.
+        """
+        chain: List[Directory] = [self.root]  # chain[i] is the directory for chain_key[:i]
+        chain_key: PathKey = ()
+        for key, kind, path, content in batch:
+            parent_key, name = key[:-1], key[-1]
+
+            if parent_key != chain_key:
+                # Keep the part of the previous operation's parent chain that this one shares.
+                shared = 0
+                limit = min(len(chain_key), len(parent_key))
+                while shared < limit and chain_key[shared] == parent_key[shared]:
+                    shared += 1
+                del chain[shared + 1:]
+                for component in parent_key[shared:]:
+                    current = chain[-1]
+                    child = current.get_child(component)
+                    if child is None:
+                        child = Directory(component, parent=current)
+                        current.add_child(child)
+                        undo.append(("created", current, component))
+                    elif not child.is_directory():
+                        raise InvalidPathError(
+                            f"Intermediate component '{component}' in path '{path}' is a file, not a directory.")
+                    chain.append(child)  # type: ignore
+                chain_key = parent_key
+
+            parent_dir = chain[-1]
+            existing_entry = parent_dir.get_child(name)
+            if kind == "mkdir":
+                if existing_entry is not None:
+                    raise FileExistsError(f"Entry '{name}' already exists at '{path}'")
+                parent_dir.add_child(Directory(name, parent=parent_dir))
+                undo.append(("created", parent_dir, name))
+            elif existing_entry is None:
+                new_file = File(name, parent=parent_dir, content=content)
+                parent_dir.add_child(new_file)
+                undo.append(("created", parent_dir, name))
+                self._content_index.index_file(new_file)
+            elif existing_entry.is_directory():
+                raise IsDirectoryError(
+                    f"Cannot create/update file '{path}': a directory with that name already exists.")
+            else:
+                undo.append(("updated", existing_entry, existing_entry.get_content()))  # type: ignore
+                existing_entry.set_content(content)  # type: ignore
+                self._content_index.index_file(existing_entry)  # type: ignore
+
+    def _rollback_batch(self, undo: List[Tuple[str, FSEntry, str]]):
+        """Reverts a partially applied batch, newest change first."""
+        for action, entry, value in reversed(undo):
+            if action == "created":
+                created = entry.get_child(value)  # type: ignore
+                entry.remove_child(value)  # type: ignore
+                if not created.is_directory():
+                    self._content_index.remove_file(created)
+                created.set_parent(None)
+            else:
+                entry.set_content(value)  # type: ignore
+                self._content_index.index_file(entry)  # type: ignore
+
+    def search(self, query: str, under_path: str = "/") -> List[str]:
+        """
+        Returns the sorted paths of files under `under_path` whose content matches `query`.
+        Terms are ANDed, "OR" separates alternatives and a trailing "*" is a prefix match
+        (see ContentIndex.search). Answered from the index without reading any file content.
+        Only `under_path` is locked while the index is queried; a match's path is rebuilt without
+        locks, so each one is then re-checked with its parent directory held shared, and matches
+        moved or deleted in the meantime are dropped.
+        """
         try:
-            if source_path == "/":
-                raise InvalidPathError("Cannot move the root directory.")
-
-            # 1. Resolve source path
-            src_parent_dir, src_name, src_entry = self._resolve_path(
-                source_path,
-                target_must_exist=True
-            )
-            # 2. Determine destination parent and target name logic (similar to cp)
-            dest_components = self._split_path(destination_path)
-            dest_parent_path_components = dest_components[:-1]
-            dest_target_name = dest_components[-1]
-
-            dest_parent_dir: Directory = self.root
-            temp_path_for_parent = "/" + "/".join(dest_parent_path_components) if dest_parent_path_components else "/"
-
-            try:
-                resolved_parent, _, _ = self._resolve_path(
-                    temp_path_for_parent,
+            with self._locked(shared=[self._path_key(under_path)]):
+                _, _, base_dir = self._resolve_path(
+                    under_path,
                     target_must_exist=True,
                     target_must_be_directory=True
                 )
-                dest_parent_dir = resolved_parent  # type: ignore
-            except PathNotFoundError:
-                raise PathNotFoundError(f"Destination parent directory '{temp_path_for_parent}' does not exist.")
-            except IsFileError:
-                raise InvalidPathError(f"Destination parent '{temp_path_for_parent}' is a file, not a directory.")
-
-            # Check if destination_path itself is an existing directory (move *into* it)
-            dest_entry_at_full_path: Optional[FSEntry] = dest_parent_dir.get_child(dest_target_name)
-
-            final_dest_parent_dir: Directory
-            final_dest_name: str
-
-            if dest_entry_at_full_path and dest_entry_at_full_path.is_directory():
-                # Destination is an existing directory, move source *into* it with original name
-                final_dest_parent_dir = dest_entry_at_full_path
-                final_dest_name = src_name
-                if final_dest_parent_dir.get_child(final_dest_name):
-                    raise FileExistsError(f"Entry '{final_dest_name}' already exists in '{destination_path}'.")
-            else:
-                # Destination is a non-existent path ending in a file/dir name OR existing file (error for dir move)
-                final_dest_parent_dir = dest_parent_dir
-                final_dest_name = dest_target_name
-                if dest_entry_at_full_path:  # If it exists and is not a directory
-                    raise FileExistsError(
-                        f"Destination path '{destination_path}' is an existing file/entry. Cannot overwrite.")
-
-            # 3. Handle moving directory into itself or a subdirectory
-            if src_entry.is_directory():  # type: ignore
-                current_check_dir: Optional[Directory] = final_dest_parent_dir
-                while current_check_dir:
-                    if current_check_dir == src_entry:
-                        raise InvalidPathError(
-                            f"Cannot move directory '{source_path}' into its own subdirectory '{destination_path}'.")
-                    current_check_dir = current_check_dir.get_parent()
+                base_path = "/" + "/".join(self._split_path(under_path))
+
+                candidates: Dict[str, File] = {}
+                for file in self._content_index.search(query):
+                    # Walk up from the match; only files whose ancestor chain reaches base_dir qualify.
+                    names: List[str] = []
+                    current: Optional[FSEntry] = file
+                    while current is not None and current is not base_dir:
+                        names.append(current.get_name())
+                        current = current.get_parent()
+                    if current is base_dir:
+                        candidates[self._join_path(base_path, "/".join(reversed(names)))] = file
+
+            results = []
+            with self._locked(shared=[self._path_key(path)[:-1] for path in candidates]):
+                for path, file in candidates.items():
+                    try:
+                        _, _, entry = self._resolve_path(path, target_must_exist=True)
+                    except FileSystemError:
+                        continue
+                    if entry is file:
+                        results.append(path)
+            return sorted(results)
+        except FileSystemError as e:
+            print(f"Error searching '{under_path}' for '{query}': {e}")
+            raise
 
-            # Handle moving to the exact same location (effectively no-op, but often treated as error)
-            if src_parent_dir == final_dest_parent_dir and src_name == final_dest_name:
-                raise InvalidPathError(
-                    f"Source and destination paths are identical: '{source_path}'. No operation performed.")
+    def mv(self, source_path: str, destination_path: str):
+        """Moves (renames) a file or directory from source_path to destination_path."""
+        try:
+            source_key, destination_key = self._path_key(source_path), self._path_key(destination_path)
+            with self._locked(exclusive=[source_key[:-1], destination_key[:-1], destination_key]):
+                if source_path == "/":
+                    raise InvalidPathError("Cannot move the root directory.")
+
+                # 1. Resolve source path
+                src_parent_dir, src_name, src_entry = self._resolve_path(
+                    source_path,
+                    target_must_exist=True
+                )
+                # 2. Determine destination parent and target name logic (similar to cp)
+                dest_components = self._split_path(destination_path)
+                dest_parent_path_components = dest_components[:-1]
+                dest_target_name = dest_components[-1]
+
+                dest_parent_dir: Directory = self.root
+                temp_path_for_parent = "/" + "/".join(dest_parent_path_components) if dest_parent_path_components else "/"
+
+                try:
+                    _, _, resolved_parent = self._resolve_path(
+                        temp_path_for_parent,
+                        target_must_exist=True,
+                        target_must_be_directory=True
+                    )
+                    dest_parent_dir = resolved_parent  # type: ignore
+                except PathNotFoundError:
+                    raise PathNotFoundError(f"Destination parent directory '{temp_path_for_parent}' does not exist.")
+                except IsFileError:
+                    raise InvalidPathError(f"Destination parent '{temp_path_for_parent}' is a file, not a directory.")
+
+                # Check if destination_path itself is an existing directory (move *into* it)
+                dest_entry_at_full_path: Optional[FSEntry] = dest_parent_dir.get_child(dest_target_name)
+
+                final_dest_parent_dir: Directory
+                final_dest_name: str
+
+                if dest_entry_at_full_path and dest_entry_at_full_path.is_directory():
+                    # Destination is an existing directory, move source *into* it with original name
+                    final_dest_parent_dir = dest_entry_at_full_path
+                    final_dest_name = src_name
+                    if final_dest_parent_dir.get_child(final_dest_name):
+                        raise FileExistsError(f"Entry '{final_dest_name}' already exists in '{destination_path}'.")
+                else:
+                    # Destination is a non-existent path ending in a file/dir name OR existing file (error for dir move)
+                    final_dest_parent_dir = dest_parent_dir
+                    final_dest_name = dest_target_name
+                    if dest_entry_at_full_path:  # If it exists and is not a directory
+                        raise FileExistsError(
+                            f"Destination path '{destination_path}' is an existing file/entry. Cannot overwrite.")
+
+                # 3. Handle moving directory into itself or a subdirectory
+                if src_entry.is_directory():  # type: ignore
+                    current_check_dir: Optional[Directory] = final_dest_parent_dir
+                    while current_check_dir:
+                        if current_check_dir == src_entry:
+                            raise InvalidPathError(
+                                f"Cannot move directory '{source_path}' into its own subdirectory '{destination_path}'.")
+                        current_check_dir = current_check_dir.get_parent()
+
+                # Handle moving to the exact same location (effectively no-op, but often treated as error)
+                if src_parent_dir == final_dest_parent_dir and src_name == final_dest_name:
+                    raise InvalidPathError(
+                        f"Source and destination paths are identical: '{source_path}'. No operation performed.")
 
-            # 4. Perform move
-            src_parent_dir.remove_child(src_name)  # Remove from old parent
-            src_entry.set_parent(final_dest_parent_dir)  # type: ignore
-            src_entry.name = final_dest_name  # type: ignore
-            final_dest_parent_dir.add_child(src_entry)  # Add to new parent
+                # 4. Perform move
+                src_parent_dir.remove_child(src_name)  # Remove from old parent
+                src_entry.set_parent(final_dest_parent_dir)  # type: ignore
+                src_entry.set_name(final_dest_name)  # type: ignore
+                final_dest_parent_dir.add_child(src_entry)  # Add to new parent
 
-            print(f"Moved '{source_path}' to '{destination_path}'.")
+                print(f"Moved '{source_path}' to '{destination_path}'.")
+                self._on_mutation("mv", [source_path, destination_path])
 
         except FileSystemError as e:
             print(f"Error moving '{source_path}' to '{destination_path}': {e}")
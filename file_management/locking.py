@@ -0,0 +1,139 @@
+import threading
+from typing import Dict, Iterable, List, Set, Tuple
+
+PathKey = Tuple[str, ...]
+
+
+class ReadWriteLock:
+    """
+    A writer-preferring reader/writer lock: any number of readers or a single writer.
+    Waiting writers block new readers so a steady stream of reads cannot starve a mutation.
+    Not reentrant.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition(threading.Lock())
+        self._readers = 0
+        self._writer_active = False
+        self._writers_waiting = 0
+
+    def acquire_read(self):
+        with self._condition:
+            while self._writer_active or self._writers_waiting:
+                self._condition.wait()
+            self._readers += 1
+
+    def release_read(self):
+        with self._condition:
+            self._readers -= 1
+            if self._readers == 0:
+                self._condition.notify_all()
+
+    def acquire_write(self):
+        with self._condition:
+            self._writers_waiting += 1
+            while self._writer_active or self._readers:
+                self._condition.wait()
+            self._writers_waiting -= 1
+            self._writer_active = True
+
+    def release_write(self):
+        with self._condition:
+            self._writer_active = False
+            self._condition.notify_all()
+
+
+class HeldPathLocks:
+    """
+    The set of directory locks taken for one FileSystem operation.
+
+    Locks are acquired level by level from the root, and within a level in path order, so every
+    thread follows the same global (depth, path) order and no lock cycle can form. Each directory
+    is found through its parent, which is already held, so its path cannot change underneath us.
+    Every ancestor of a requested directory is held in shared mode for the whole operation,
+    which stops concurrent moves or deletions of those ancestors.
+    """
+
+    def __init__(self, root, exclusive: Iterable[PathKey] = (), shared: Iterable[PathKey] = (),
+                 shared_subtrees: Iterable[PathKey] = ()):
+        # path -> True for exclusive, False for shared
+        self._requested: Dict[PathKey, bool] = {}
+        for path in shared:
+            self._request(tuple(path), False)
+        for path in exclusive:
+            self._request(tuple(path), True)
+        self._subtrees: Set[PathKey] = {tuple(path) for path in shared_subtrees}
+        for path in self._subtrees:
+            self._request(path, False)
+
+        self._held: Dict[PathKey, Tuple[object, bool]] = {}
+        self._order: List[Tuple[ReadWriteLock, bool]] = []
+        self._acquire(root)
+
+    def _request(self, path: PathKey, exclusive: bool):
+        for depth in range(len(path)):
+            self._requested.setdefault(path[:depth], False)
+        self._requested[path] = self._requested.get(path, False) or exclusive
+
+    def _in_subtree(self, path: PathKey) -> bool:
+        return any(path[:len(subtree)] == subtree for subtree in self._subtrees)
+
+    def _acquire(self, root):
+        requested_by_level: Dict[int, Dict[PathKey, bool]] = {}
+        for path, exclusive in self._requested.items():
+            requested_by_level.setdefault(len(path), {})[path] = exclusive
+        max_requested_depth = max(requested_by_level) if requested_by_level else 0
+
+        level = 0
+        expanding: List[PathKey] = []  # Held directories whose children must be locked as part of a subtree
+        while level <= max_requested_depth or expanding:
+            candidates: Dict[PathKey, bool] = requested_by_level.get(level, {})
+            for parent_path in expanding:
+                parent = self._held[parent_path][0]
+                for child in parent.get_children():  # type: ignore
+                    if child.is_directory():
+                        candidates.setdefault(parent_path + (child.get_name(),), False)
+
+            expanding = []
+            for path in sorted(candidates):
+                if level == 0:
+                    directory = root
+                else:
+                    parent_entry = self._held.get(path[:-1])
+                    if parent_entry is None:
+                        continue  # An ancestor is missing or is a file; resolution will report it
+                    directory = parent_entry[0].get_child(path[-1])  # type: ignore
+                    if directory is None or not directory.is_directory():
+                        continue
+
+                exclusive = candidates[path]
+                lock = directory.get_lock()
+                if exclusive:
+                    lock.acquire_write()
+                else:
+                    lock.acquire_read()
+                self._held[path] = (directory, exclusive)
+                self._order.append((lock, exclusive))
+                if self._subtrees and self._in_subtree(path):
+                    expanding.append(path)
+            level += 1
+
+    def holds_exclusive(self, path: PathKey) -> bool:
+        entry = self._held.get(tuple(path))
+        return entry is not None and entry[1]
+
+    def deepest_held_prefix(self, path: PathKey) -> PathKey:
+        path = tuple(path)
+        for depth in range(len(path), -1, -1):
+            if path[:depth] in self._held:
+                return path[:depth]
+        return ()
+
+    def release(self):
+        for lock, exclusive in reversed(self._order):
+            if exclusive:
+                lock.release_write()
+            else:
+                lock.release_read()
+        self._order.clear()
+        self._held.clear()
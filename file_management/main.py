@@ -11,9 +11,12 @@ def run_cli():
     print("  touch <path> [content]")
     print("  ls <path>")
     print("  cat <path>")
-    print("  rm <path>")
-    print("  cp <source_path> <destination_path>")
+    print("  rm [-r] <path>")
+    print("  cp [-r] <source_path> <destination_path>")
     print("  mv <source_path> <destination_path>")
+    print("  find <path> [pattern]")
+    print("  du <path>")
+    print("  search <query>")
     print("  exit")
     print("\nExample: mkdir /users/john/docs")
     print("Example: touch /users/john/docs/report.txt 'This is my report.'")
@@ -55,20 +58,44 @@ def run_cli():
                 else:
                     print("Usage: cat <path>")
             elif cmd == "rm":
-                if len(parts) == 2:
-                    fs.rm(parts[1])
+                args = command_line.split()[1:]
+                recursive = "-r" in args
+                args = [arg for arg in args if arg != "-r"]
+                if len(args) == 1:
+                    fs.rm(args[0], recursive=recursive)
                 else:
-                    print("Usage: rm <path>")
+                    print("Usage: rm [-r] <path>")
             elif cmd == "cp":
-                if len(parts) == 3:
-                    fs.cp(parts[1], parts[2])
+                args = command_line.split()[1:]
+                recursive = "-r" in args
+                args = [arg for arg in args if arg != "-r"]
+                if len(args) == 2:
+                    fs.cp(args[0], args[1], recursive=recursive)
                 else:
-                    print("Usage: cp <source_path> <destination_path>")
+                    print("Usage: cp [-r] <source_path> <destination_path>")
             elif cmd == "mv":
                 if len(parts) == 3:
                     fs.mv(parts[1], parts[2])
                 else:
                     print("Usage: mv <source_path> <destination_path>")
+            elif cmd == "find":
+                if len(parts) >= 2:
+                    pattern = parts[2] if len(parts) == 3 else "*"
+                    for match in fs.find(parts[1], pattern):
+                        print(match)
+                else:
+                    print("Usage: find <path> [pattern]")
+            elif cmd == "du":
+                if len(parts) == 2:
+                    print(f"{fs.du(parts[1])}\t{parts[1]}")
+                else:
+                    print("Usage: du <path>")
+            elif cmd == "search":
+                if len(parts) >= 2:
+                    for match in fs.search(command_line.split(maxsplit=1)[1]):
+                        print(match)
+                else:
+                    print("Usage: search <query>")
             elif cmd == "exit":
                 print("Exiting file system. Goodbye!")
                 break
@@ -1,13 +1,23 @@
+import threading
 from typing import Optional, Dict, List
 
+from file_management.exceptions import FileExistsError
+from file_management.locking import ReadWriteLock
 from file_management.models.fs_entry import FSEntry
 
+# Sibling subtrees share ancestors, so cached-size updates from concurrent writers are serialized here.
+_SIZE_LOCK = threading.Lock()
+
 
 class Directory(FSEntry):
 
     def __init__(self, name: str, parent: Optional['Directory']):
        super().__init__(name, parent)
        self._children : Dict[str, FSEntry] = {}
+       # Cached total size of every file in this subtree, kept up to date by update_size().
+       self._size = 0
+       # Guards _children; acquired through FileSystem's hierarchical path locking.
+       self._lock = ReadWriteLock()
 
     def is_directory(self) -> bool:
         return True
@@ -18,16 +28,38 @@ class Directory(FSEntry):
 
         self._children[entry.get_name()] = entry
         entry.set_parent(self)
+        self.update_size(entry.get_size())
 
     def remove_child(self, name: str):
         if name not in self._children:
             raise FileNotFoundError("File not found")
 
-        del self._children[name]
+        entry = self._children.pop(name)
+        self.update_size(-entry.get_size())
+
+    def update_size(self, delta: int):
+        """Applies a size change to this directory and every ancestor up to the root."""
+        if not delta:
+            return  # Empty files and directories don't change any size, skip the walk and the lock
+        with _SIZE_LOCK:
+            current: Optional[Directory] = self
+            while current is not None:
+                current._size += delta
+                current = current.get_parent()
+
+    def get_size(self) -> int:
+        return self._size
+
+    def get_lock(self) -> ReadWriteLock:
+        return self._lock
 
     def get_child(self, name):
         return self._children.get(name)
 
+    def get_children(self) -> List[FSEntry]:
+        """Returns all direct children, sorted by name."""
+        return [self._children[name] for name in sorted(self._children)]
+
     def get_children_names(self) -> List[str]:
         """Returns a sorted list of names of all direct children."""
         return sorted(list(self._children.keys()))
@@ -16,7 +16,13 @@ class File(FSEntry):
         return self._content
 
     def set_content(self, new_content: str):
+        delta = len(new_content) - len(self._content)
         self._content = new_content
+        if delta and self.get_parent() is not None:
+            self.get_parent().update_size(delta)
+
+    def get_size(self) -> int:
+        return len(self._content)
 
     def __repr__(self):
         return f"File(name='{self.get_name()}', size={len(self._content)} bytes"
\ No newline at end of file
@@ -1,12 +1,17 @@
+import itertools
 from abc import ABC, abstractmethod
 from typing import Optional
 
+# Source of process-wide unique entry ids; they survive renames and moves, unlike paths.
+_entry_ids = itertools.count(1)
+
 
 class FSEntry(ABC):
 
     def __init__(self, name: str, parent: Optional["Directory"]):
 
-        if not isinstance(name, str) or name.strip():
+        # The root directory is the only entry allowed an empty name.
+        if not isinstance(name, str) or (not name.strip() and parent is not None):
             raise ValueError("File name should be a non empty string")
 
         if '/' in name:
@@ -14,10 +19,17 @@ class FSEntry(ABC):
 
         self._name = name
         self._parent = parent
+        self._entry_id = next(_entry_ids)
+
+    def get_entry_id(self) -> int:
+        return self._entry_id
 
     def get_name(self) -> str:
         return self._name
 
+    def set_name(self, new_name: str):
+        self._name = new_name
+
     def get_parent(self) -> Optional['Directory']:
         return self._parent
 
@@ -29,6 +41,11 @@ class FSEntry(ABC):
         """Returns True if the entry is a directory, False if a file."""
         pass
 
+    @abstractmethod
+    def get_size(self) -> int:
+        """Returns the size in bytes of the entry (the whole subtree for a directory)."""
+        pass
+
     @abstractmethod
     def __repr__(self):
         pass
@@ -0,0 +1,130 @@
+import contextlib
+import os
+import threading
+from typing import Any, List, Tuple
+
+from file_management.exceptions import FileSystemError, PersistenceError
+from file_management.file_system import FileSystem
+from file_management.storage.snapshot import SnapshotManager
+from file_management.storage.write_ahead_log import WriteAheadLog
+
+
+class PersistentFileSystem(FileSystem):
+    """
+    A FileSystem whose tree survives restarts.
+
+    Every successful mutation is appended to a write-ahead log (group committed). Every
+    `checkpoint_every` mutations the whole tree is written to a binary snapshot and the log is
+    truncated. On startup the latest snapshot is loaded and only log records newer than it are replayed.
+    """
+
+    WAL_FILE_NAME = "fs.wal"
+    SNAPSHOT_FILE_NAME = "fs.snapshot"
+
+    # Replay goes through the plain FileSystem methods so recovered operations are not logged again.
+    _REPLAY_OPERATIONS = {
+        "mkdir": FileSystem.mkdir,
+        "touch": FileSystem.touch,
+        "rm": FileSystem.rm,
+        "cp": FileSystem.cp,
+        "mv": FileSystem.mv,
+        "batch": FileSystem.apply_batch,
+    }
+
+    def __init__(self, data_dir: str, checkpoint_every: int = 10_000, group_commit_size: int = 128,
+                 group_commit_interval: float = 0.05, fsync: bool = True):
+        if checkpoint_every < 1:
+            raise ValueError("checkpoint_every must be at least 1.")
+
+        super().__init__()
+        os.makedirs(data_dir, exist_ok=True)
+        wal_path = os.path.join(data_dir, self.WAL_FILE_NAME)
+        self._snapshots = SnapshotManager(os.path.join(data_dir, self.SNAPSHOT_FILE_NAME))
+        self._checkpoint_every = checkpoint_every
+        self._checkpoint_lock = threading.Lock()
+        self._wal = None  # Mutations replayed during recovery are not logged again
+
+        last_lsn, replayed = self._recover(wal_path)
+        self._checkpoint_lsn = last_lsn - replayed
+        self._wal = WriteAheadLog(wal_path, last_lsn=last_lsn, group_commit_size=group_commit_size,
+                                  group_commit_interval=group_commit_interval, fsync=fsync)
+        print(f"Recovered file system from '{data_dir}' (LSN {last_lsn}, {replayed} log records replayed).")
+
+    def _recover(self, wal_path: str) -> Tuple[int, int]:
+        """Loads the latest snapshot and replays the log tail. Returns (last_lsn, records_replayed)."""
+        last_lsn = 0
+        loaded = self._snapshots.load()
+        if loaded is not None:
+            self.root, last_lsn = loaded
+            self._index_subtree(self.root)
+
+        replayed = 0
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            for lsn, operation, args in WriteAheadLog.read_records(wal_path):
+                if lsn <= last_lsn:
+                    continue  # Already contained in the snapshot
+                replay = self._REPLAY_OPERATIONS.get(operation)
+                if replay is None:
+                    raise PersistenceError(f"Unknown operation '{operation}' in write-ahead log at LSN {lsn}.")
+                try:
+                    replay(self, *args)
+                except FileSystemError as e:
+                    raise PersistenceError(f"Failed to replay '{operation}' at LSN {lsn}: {e}")
+                last_lsn = lsn
+                replayed += 1
+        return last_lsn, replayed
+
+    def _on_mutation(self, operation: str, args: List[Any]):
+        # Appended while the mutation's locks are held, so log order matches the order of application.
+        if self._wal is not None:
+            self._wal.append(operation, args)
+
+    def _maybe_checkpoint(self):
+        # Checkpoints run after the mutation released its locks, since they lock the whole tree.
+        if self._wal.last_lsn - self._checkpoint_lsn >= self._checkpoint_every:
+            self.checkpoint()
+
+    def mkdir(self, path: str):
+        super().mkdir(path)
+        self._maybe_checkpoint()
+
+    def touch(self, path: str, content: str = ""):
+        super().touch(path, content)
+        self._maybe_checkpoint()
+
+    def rm(self, path: str, recursive: bool = False):
+        super().rm(path, recursive)
+        self._maybe_checkpoint()
+
+    def cp(self, source_path: str, destination_path: str, recursive: bool = False):
+        super().cp(source_path, destination_path, recursive)
+        self._maybe_checkpoint()
+
+    def mv(self, source_path: str, destination_path: str):
+        super().mv(source_path, destination_path)
+        self._maybe_checkpoint()
+
+    def apply_batch(self, operations) -> int:
+        # The whole batch is a single log record, so it is also replayed all-or-nothing.
+        applied = super().apply_batch(operations)
+        self._maybe_checkpoint()
+        return applied
+
+    def checkpoint(self):
+        """Writes a snapshot of the current tree and truncates the log records it covers."""
+        with self._checkpoint_lock, self._locked(shared_subtrees=[()]):
+            # Every mutation holds a write lock somewhere in the tree, so none is in flight here.
+            lsn = self._wal.last_lsn
+            if lsn == self._checkpoint_lsn:
+                return
+            self._wal.flush()
+            self._snapshots.save(self.root, lsn)
+            self._wal.truncate()
+            self._checkpoint_lsn = lsn
+
+    def flush(self):
+        """Forces every logged mutation to disk without waiting for the group commit."""
+        self._wal.flush()
+
+    def close(self):
+        self._wal.close()
@@ -0,0 +1,105 @@
+import bisect
+import re
+import threading
+from typing import Dict, FrozenSet, List, Set
+
+from file_management.exceptions import InvalidQueryError
+from file_management.models.file import File
+
+_TOKEN_PATTERN = re.compile(r"\w+")
+
+
+def tokenize(text: str) -> FrozenSet[str]:
+    """Splits text into its distinct lower-cased word tokens."""
+    return frozenset(token.lower() for token in _TOKEN_PATTERN.findall(text))
+
+
+class ContentIndex:
+    """
+    Inverted index from content tokens to the entry ids of the files containing them.
+
+    Files are keyed by entry id rather than path, so mv and renames need no index update.
+    Each file's token set is kept so a file can be re-indexed or removed without its old content,
+    and the vocabulary is kept sorted so prefix terms ("rep*") are a range scan.
+    """
+
+    def __init__(self):
+        self._postings: Dict[str, Set[int]] = {}  # token -> entry ids
+        self._file_tokens: Dict[int, FrozenSet[str]] = {}  # entry id -> tokens
+        self._files: Dict[int, File] = {}  # entry id -> File
+        self._vocabulary: List[str] = []  # sorted tokens, for prefix lookups
+        self._lock = threading.Lock()
+
+    def index_file(self, file: File):
+        """Adds a file, or re-indexes it after its content changed."""
+        entry_id = file.get_entry_id()
+        tokens = tokenize(file.get_content())
+        with self._lock:
+            old_tokens = self._file_tokens.get(entry_id, frozenset())
+            for token in old_tokens - tokens:
+                self._remove_posting(token, entry_id)
+            for token in tokens - old_tokens:
+                postings = self._postings.get(token)
+                if postings is None:
+                    postings = self._postings[token] = set()
+                    bisect.insort(self._vocabulary, token)
+                postings.add(entry_id)
+            self._file_tokens[entry_id] = tokens
+            self._files[entry_id] = file
+
+    def remove_file(self, file: File):
+        entry_id = file.get_entry_id()
+        with self._lock:
+            for token in self._file_tokens.pop(entry_id, frozenset()):
+                self._remove_posting(token, entry_id)
+            self._files.pop(entry_id, None)
+
+    def _remove_posting(self, token: str, entry_id: int):
+        postings = self._postings[token]
+        postings.discard(entry_id)
+        if not postings:
+            del self._postings[token]
+            del self._vocabulary[bisect.bisect_left(self._vocabulary, token)]
+
+    def _match_term(self, term: str) -> Set[int]:
+        if term.endswith("*"):
+            prefix = term[:-1]
+            matches: Set[int] = set()
+            position = bisect.bisect_left(self._vocabulary, prefix)
+            while position < len(self._vocabulary) and self._vocabulary[position].startswith(prefix):
+                matches |= self._postings[self._vocabulary[position]]
+                position += 1
+            return matches
+        return set(self._postings.get(term, ()))
+
+    def search(self, query: str) -> List[File]:
+        """
+        Returns the files matching `query`. Terms are ANDed by default, "OR" separates alternatives
+        (AND binds tighter than OR), and a trailing "*" matches any token with that prefix.
+        e.g. "quarterly report*" or "invoice AND paid OR receipt".
+        """
+        clauses: List[List[str]] = [[]]
+        for word in query.split():
+            if word == "OR":
+                clauses.append([])
+            elif word != "AND":
+                tokens = [token.lower() for token in _TOKEN_PATTERN.findall(word)]
+                if tokens and word.endswith("*"):
+                    tokens[-1] += "*"
+                clauses[-1].extend(tokens)
+        clauses = [clause for clause in clauses if clause]
+        if not clauses:
+            raise InvalidQueryError(f"Search query '{query}' contains no terms.")
+
+        with self._lock:
+            matched: Set[int] = set()
+            for clause in clauses:
+                # Intersect the rarest terms first so the working set stays small.
+                term_matches = sorted((self._match_term(term) for term in clause), key=len)
+                clause_matches = term_matches[0]
+                for other in term_matches[1:]:
+                    if not clause_matches:
+                        break
+                    clause_matches &= other
+                matched |= clause_matches
+            return [self._files[entry_id] for entry_id in matched]
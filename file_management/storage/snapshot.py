@@ -0,0 +1,100 @@
+import os
+import struct
+from typing import List, Optional, Tuple
+
+from file_management.exceptions import PersistenceError
+from file_management.models.directory import Directory
+from file_management.models.file import File
+
+
+class SnapshotManager:
+    """
+    Reads and writes compact binary snapshots of the whole directory tree.
+
+    Layout: a header <magic, version, lsn> followed by every entry in pre-order.
+    A directory is encoded as <kind, name_length, name, child_count>, a file as
+    <kind, name_length, name, content_length, content>. The child counts are enough to
+    rebuild the tree with an explicit stack, so no paths are stored.
+    """
+
+    _MAGIC = b"FSNP"
+    _VERSION = 1
+    _HEADER = struct.Struct("<4sHQ")
+    _ENTRY = struct.Struct("<BI")
+    _COUNT = struct.Struct("<I")
+    _KIND_DIRECTORY = 0
+    _KIND_FILE = 1
+
+    def __init__(self, path: str):
+        self._path = path
+
+    def save(self, root: Directory, lsn: int):
+        """Atomically replaces the snapshot with the current tree, tagged with the last applied LSN."""
+        temp_path = self._path + ".tmp"
+        with open(temp_path, "wb") as snapshot_file:
+            snapshot_file.write(self._HEADER.pack(self._MAGIC, self._VERSION, lsn))
+            stack = [root]
+            while stack:
+                entry = stack.pop()
+                name = entry.get_name().encode("utf-8")
+                if entry.is_directory():
+                    children = entry.get_children()  # type: ignore
+                    snapshot_file.write(self._ENTRY.pack(self._KIND_DIRECTORY, len(name)) + name +
+                                        self._COUNT.pack(len(children)))
+                    stack.extend(reversed(children))
+                else:
+                    content = entry.get_content().encode("utf-8")  # type: ignore
+                    snapshot_file.write(self._ENTRY.pack(self._KIND_FILE, len(name)) + name +
+                                        self._COUNT.pack(len(content)) + content)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temp_path, self._path)
+
+    def load(self) -> Optional[Tuple[Directory, int]]:
+        """Returns (root_directory, lsn) from the snapshot, or None if no snapshot exists yet."""
+        if not os.path.exists(self._path):
+            return None
+
+        with open(self._path, "rb") as snapshot_file:
+            data = snapshot_file.read()
+
+        try:
+            magic, version, lsn = self._HEADER.unpack_from(data, 0)
+            if magic != self._MAGIC or version != self._VERSION:
+                raise PersistenceError(f"'{self._path}' is not a version {self._VERSION} file system snapshot.")
+            offset = self._HEADER.size
+
+            root: Optional[Directory] = None
+            # Each stack item is [directory, number_of_children_still_to_read].
+            stack: List[list] = []
+            while offset < len(data):
+                kind, name_length = self._ENTRY.unpack_from(data, offset)
+                offset += self._ENTRY.size
+                name = data[offset:offset + name_length].decode("utf-8")
+                offset += name_length
+                (count,) = self._COUNT.unpack_from(data, offset)
+                offset += self._COUNT.size
+
+                parent = stack[-1][0] if stack else None
+                if kind == self._KIND_DIRECTORY:
+                    entry = Directory(name, parent=parent)
+                else:
+                    entry = File(name, parent=parent, content=data[offset:offset + count].decode("utf-8"))
+                    offset += count
+
+                if parent is None:
+                    root = entry  # type: ignore
+                else:
+                    parent.add_child(entry)
+                    stack[-1][1] -= 1
+                    while stack and stack[-1][1] == 0:
+                        stack.pop()
+
+                if kind == self._KIND_DIRECTORY and count:
+                    stack.append([entry, count])
+        except (struct.error, UnicodeDecodeError, ValueError) as e:
+            raise PersistenceError(f"Corrupt file system snapshot '{self._path}': {e}")
+
+        if root is None or stack:
+            raise PersistenceError(f"Truncated file system snapshot '{self._path}'.")
+        return root, lsn
@@ -0,0 +1,134 @@
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Iterator, List, Optional, Tuple
+
+from file_management.exceptions import PersistenceError
+
+
+class WriteAheadLog:
+    """
+    Append-only log of FileSystem mutations.
+
+    Each record is framed as <payload_length, lsn, crc32> followed by a JSON payload of
+    [operation, args]. Records are buffered in memory and written out together (group commit)
+    once `group_commit_size` records are pending or `group_commit_interval` seconds have passed
+    since the oldest pending record, so many mutations share a single write + fsync. A timer
+    armed with the first pending record enforces the interval even if no further record arrives.
+    Records still pending when the process dies are lost; call flush() for a hard durability point.
+    """
+
+    _HEADER = struct.Struct("<IQI")
+
+    def __init__(self, path: str, last_lsn: int = 0, group_commit_size: int = 128,
+                 group_commit_interval: float = 0.05, fsync: bool = True):
+        if group_commit_size < 1:
+            raise ValueError("group_commit_size must be at least 1.")
+        if group_commit_interval < 0:
+            raise ValueError("group_commit_interval must be non-negative.")
+
+        self._path = path
+        self._last_lsn = last_lsn
+        self._group_commit_size = group_commit_size
+        self._group_commit_interval = group_commit_interval
+        self._fsync = fsync
+
+        self._pending: List[bytes] = []
+        self._oldest_pending_at: Optional[float] = None
+        self._flush_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+
+    @property
+    def last_lsn(self) -> int:
+        return self._last_lsn
+
+    def append(self, operation: str, args: List[Any]) -> int:
+        """Queues a mutation record and returns its log sequence number (LSN)."""
+        payload = json.dumps([operation, args], separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._last_lsn += 1
+            self._pending.append(self._HEADER.pack(len(payload), self._last_lsn, zlib.crc32(payload)) + payload)
+            if self._oldest_pending_at is None:
+                self._oldest_pending_at = time.monotonic()
+
+            if (len(self._pending) >= self._group_commit_size or
+                    time.monotonic() - self._oldest_pending_at >= self._group_commit_interval):
+                self._flush_locked()
+            elif self._flush_timer is None:
+                # A timer left over from an earlier flush only fires early, never late
+                self._flush_timer = threading.Timer(self._group_commit_interval, self._flush_on_timer)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+            return self._last_lsn
+
+    def _flush_on_timer(self):
+        with self._lock:
+            self._flush_timer = None
+            if not self._file.closed:
+                self._flush_locked()
+
+    def flush(self):
+        """Writes and fsyncs every pending record."""
+        with self._lock:
+            self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        self._file.write(b"".join(self._pending))
+        self._file.flush()
+        if self._fsync:
+            os.fsync(self._file.fileno())
+        self._pending.clear()
+        self._oldest_pending_at = None
+
+    def truncate(self):
+        """Discards the whole log; used once a checkpoint covers every record in it."""
+        with self._lock:
+            self._flush_locked()
+            self._file.truncate(0)
+            self._file.seek(0)
+            if self._fsync:
+                os.fsync(self._file.fileno())
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._file.close()
+
+    @classmethod
+    def read_records(cls, path: str) -> Iterator[Tuple[int, str, List[Any]]]:
+        """
+        Yields (lsn, operation, args) for every intact record in the log at `path`.
+        A torn or corrupt tail (e.g. from a crash mid-write) ends the replay and is cut off the file.
+        """
+        if not os.path.exists(path):
+            return
+
+        valid_length = 0
+        with open(path, "rb") as log_file:
+            while True:
+                header = log_file.read(cls._HEADER.size)
+                if len(header) < cls._HEADER.size:
+                    break
+                length, lsn, checksum = cls._HEADER.unpack(header)
+                payload = log_file.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                try:
+                    operation, args = json.loads(payload.decode("utf-8"))
+                except ValueError as e:
+                    raise PersistenceError(f"Unreadable write-ahead log record at LSN {lsn}: {e}")
+                valid_length += cls._HEADER.size + length
+                yield lsn, operation, args
+
+        if valid_length < os.path.getsize(path):
+            with open(path, "r+b") as log_file:
+                log_file.truncate(valid_length)
@@ -2,17 +2,25 @@
 import unittest
 import sys
 import os
+import io
+import tempfile
+import threading
+import time
+from unittest import mock
 
 # Add parent directory to path to allow importing modules from root
 # This is a common pattern for running tests in a flat structure
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
 
 from file_management.file_system import FileSystem
+from file_management.persistent_file_system import PersistentFileSystem
+from file_management.storage.snapshot import SnapshotManager
+from file_management.storage.write_ahead_log import WriteAheadLog
 from file_management.models.directory import Directory
 from file_management.models.file import File
 from file_management.exceptions import (
     FileSystemError, PathNotFoundError, InvalidPathError, FileExistsError,
-    DirectoryNotEmptyError, IsDirectoryError, IsFileError
+    DirectoryNotEmptyError, IsDirectoryError, IsFileError, InvalidQueryError, InvalidOperationError
 )
 
 
@@ -342,6 +350,325 @@ class TestFileSystem(unittest.TestCase):
         with self.assertRaises(InvalidPathError):
             self.fs.mv("/", "/anywhere")
 
+    # --- Recursive operation Tests ---
+    def test_find_by_pattern(self):
+        self.fs.touch("/docs/a.txt", "a")
+        self.fs.touch("/docs/sub/b.txt", "b")
+        self.fs.touch("/docs/sub/c.log", "c")
+        self.assertEqual(self.fs.find("/", "*.txt"), ["/docs/a.txt", "/docs/sub/b.txt"])
+        self.assertEqual(self.fs.find("/docs/sub"), ["/docs/sub", "/docs/sub/b.txt", "/docs/sub/c.log"])
+        with self.assertRaises(PathNotFoundError):
+            self.fs.find("/missing", "*")
+
+    def test_du_tracks_subtree_sizes(self):
+        self.fs.touch("/a/b/one.txt", "12345")
+        self.fs.touch("/a/two.txt", "123")
+        self.assertEqual(self.fs.du("/"), 8)
+        self.assertEqual(self.fs.du("/a/b"), 5)
+
+        self.fs.touch("/a/b/one.txt", "1")  # Shrinking a file propagates up the parent chain
+        self.assertEqual(self.fs.du("/a"), 4)
+
+        self.fs.mkdir("/c")
+        self.fs.mv("/a/b", "/c")
+        self.assertEqual(self.fs.du("/a"), 3)
+        self.assertEqual(self.fs.du("/c"), 1)
+
+        self.fs.rm("/a/two.txt")
+        self.assertEqual(self.fs.du("/"), 1)
+
+    def test_rm_recursive(self):
+        self.fs.touch("/full/x/y/z.txt", "data")
+        self.fs.rm("/full", recursive=True)
+        self.assertEqual(self.fs.ls("/"), [])
+        self.assertEqual(self.fs.du("/"), 0)
+
+    def test_cp_recursive(self):
+        self.fs.touch("/src/a.txt", "aa")
+        self.fs.touch("/src/nested/b.txt", "bbb")
+        self.fs.mkdir("/dest")
+        self.fs.cp("/src", "/dest", recursive=True)
+        self.assertEqual(self.fs.cat("/dest/src/nested/b.txt"), "bbb")
+        self.assertEqual(self.fs.du("/dest"), 5)
+
+        # The copy is independent of the original
+        self.fs.touch("/src/a.txt", "changed")
+        self.assertEqual(self.fs.cat("/dest/src/a.txt"), "aa")
+
+        with self.assertRaises(InvalidPathError):
+            self.fs.cp("/src", "/src/nested", recursive=True)
+
+    def test_recursive_ops_on_deep_tree(self):
+        depth = 3000  # Deeper than the default recursion limit
+        deep_path = "/" + "/".join(f"d{i}" for i in range(depth))
+        self.fs.touch(deep_path + "/leaf.txt", "x")
+        self.assertEqual(self.fs.find("/", "leaf.txt"), [deep_path + "/leaf.txt"])
+        self.fs.cp("/d0", "/copy", recursive=True)
+        self.assertEqual(self.fs.du("/"), 2)
+        self.fs.rm("/d0", recursive=True)
+        self.assertEqual(self.fs.ls("/"), ["copy"])
+
+    # --- Content search Tests ---
+    def test_search_boolean_and_prefix(self):
+        self.fs.touch("/docs/q1.txt", "Quarterly report: revenue up")
+        self.fs.touch("/docs/q2.txt", "Quarterly forecast")
+        self.fs.touch("/notes/todo.txt", "write the report")
+        self.assertEqual(self.fs.search("quarterly report"), ["/docs/q1.txt"])
+        self.assertEqual(self.fs.search("forecast OR revenue"), ["/docs/q1.txt", "/docs/q2.txt"])
+        self.assertEqual(self.fs.search("rep*"), ["/docs/q1.txt", "/notes/todo.txt"])
+        self.assertEqual(self.fs.search("report", under_path="/notes"), ["/notes/todo.txt"])
+        with self.assertRaises(InvalidQueryError):
+            self.fs.search("  ")
+
+    def test_search_follows_mutations(self):
+        self.fs.touch("/a/file.txt", "alpha beta")
+        self.fs.touch("/a/file.txt", "gamma")  # Update re-indexes
+        self.assertEqual(self.fs.search("alpha"), [])
+        self.fs.cp("/a", "/b", recursive=True)
+        self.fs.mv("/a/file.txt", "/a/renamed.txt")
+        self.assertEqual(self.fs.search("gamma"), ["/a/renamed.txt", "/b/file.txt"])
+        self.fs.rm("/a", recursive=True)
+        self.assertEqual(self.fs.search("gamma"), ["/b/file.txt"])
+    # --- Batch Tests ---
+    def test_apply_batch(self):
+        self.fs.touch("/data/existing.txt", "old")
+        applied = self.fs.apply_batch([
+            ("touch", "/data/b/two.txt", "22"),
+            ("mkdir", "/data/a"),
+            ("touch", "/data/a/one.txt", "1"),
+            ("touch", "/data/existing.txt", "new"),
+            ("mkdir", "/other/x/y"),
+        ])
+        self.assertEqual(applied, 5)
+        self.assertEqual(self.fs.ls("/data"), ["a", "b", "existing.txt"])
+        self.assertEqual(self.fs.cat("/data/a/one.txt"), "1")
+        self.assertEqual(self.fs.cat("/data/existing.txt"), "new")
+        self.assertEqual(self.fs.ls("/other/x"), ["y"])
+        self.assertEqual(self.fs.du("/"), 6)
+
+    def test_apply_batch_rolls_back_on_failure(self):
+        self.fs.touch("/data/existing.txt", "old")
+        self.fs.mkdir("/data/dir")
+        with self.assertRaises(IsDirectoryError):
+            self.fs.apply_batch([
+                ("touch", "/data/existing.txt", "new"),
+                ("touch", "/data/new/file.txt", "content"),
+                ("touch", "/data/dir", "a directory, not a file"),
+            ])
+        self.assertEqual(self.fs.ls("/data"), ["dir", "existing.txt"])
+        self.assertEqual(self.fs.cat("/data/existing.txt"), "old")
+        self.assertEqual(self.fs.du("/"), 3)
+        self.assertEqual(self.fs.search("content OR new"), [])
+
+    def test_apply_batch_rejects_malformed_operations_before_applying(self):
+        for malformed in [("touch", "/data/b.txt", None), ("touch",), ("mkdir", "/data/c", "x"), ("mkdir", "/data/c", "", ""),
+                          ("rename", "/data/a.txt"), ("touch", 42)]:
+            with self.assertRaises(InvalidOperationError):
+                self.fs.apply_batch([("touch", "/data/a.txt", "ok"), malformed])
+        with self.assertRaises(PathNotFoundError):
+            self.fs.ls("/data")
+        self.assertEqual(self.fs.du("/"), 0)
+
+    def test_apply_batch_rolls_back_on_unexpected_error(self):
+        self.fs.touch("/data/existing.txt", "old")
+        index_file = self.fs._content_index.index_file
+
+        def fail_on_b(file):
+            if file.get_name() == "b.txt":
+                raise RuntimeError("index unavailable")
+            index_file(file)
+
+        with mock.patch.object(self.fs._content_index, "index_file", side_effect=fail_on_b):
+            with self.assertRaises(RuntimeError):
+                self.fs.apply_batch([
+                    ("touch", "/data/a.txt", "ok"),
+                    ("touch", "/data/existing.txt", "new"),
+                    ("touch", "/data/b.txt", "fails"),
+                ])
+        self.assertEqual(self.fs.ls("/data"), ["existing.txt"])
+        self.assertEqual(self.fs.cat("/data/existing.txt"), "old")
+        self.assertEqual(self.fs.du("/"), 3)
+        self.assertEqual(self.fs.search("ok OR new"), [])
+
+class TestPersistentFileSystem(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = self.temp_dir.name
+
+    def tearDown(self):
+        self.temp_dir.cleanup()
+
+    def _open(self, **kwargs) -> PersistentFileSystem:
+        return PersistentFileSystem(self.data_dir, fsync=False, **kwargs)
+
+    def test_state_survives_restart_via_log_replay(self):
+        fs = self._open()
+        fs.mkdir("/a/b")
+        fs.touch("/a/b/file.txt", "hello")
+        fs.cp("/a", "/a_copy", recursive=True)
+        fs.mv("/a_copy/b/file.txt", "/moved.txt")
+        fs.rm("/a_copy", recursive=True)
+        fs.close()
+
+        restored = self._open()
+        self.assertEqual(restored.ls("/"), ["a", "moved.txt"])
+        self.assertEqual(restored.cat("/a/b/file.txt"), "hello")
+        self.assertEqual(restored.cat("/moved.txt"), "hello")
+        self.assertEqual(restored.du("/"), 10)
+        self.assertEqual(restored.search("hello"), ["/a/b/file.txt", "/moved.txt"])
+        restored.close()
+
+    def test_checkpoint_then_log_tail(self):
+        fs = self._open(checkpoint_every=3)
+        for i in range(5):  # Checkpoint after the third mutation, two records remain in the log
+            fs.touch(f"/dir/f{i}.txt", str(i))
+        fs.close()
+
+        snapshot = SnapshotManager(os.path.join(self.data_dir, PersistentFileSystem.SNAPSHOT_FILE_NAME)).load()
+        self.assertIsNotNone(snapshot)
+        self.assertEqual(snapshot[1], 3)
+
+        restored = self._open(checkpoint_every=3)
+        self.assertEqual(restored.ls("/dir"), [f"f{i}.txt" for i in range(5)])
+        restored.touch("/dir/f5.txt", "5")
+        restored.close()
+        self.assertEqual(len(self._open().ls("/dir")), 6)
+
+    def test_batch_is_logged_as_one_record(self):
+        fs = self._open()
+        fs.apply_batch([("mkdir", "/a"), ("touch", "/a/f.txt", "x")])
+        fs.close()
+
+        restored = self._open()
+        self.assertEqual(restored.cat("/a/f.txt"), "x")
+        restored.close()
+
+    def test_failed_mutation_is_not_logged(self):
+        fs = self._open()
+        fs.mkdir("/a")
+        with self.assertRaises(FileExistsError):
+            fs.mkdir("/a")
+        fs.close()
+        wal_path = os.path.join(self.data_dir, PersistentFileSystem.WAL_FILE_NAME)
+        self.assertEqual([op for _, op, _ in WriteAheadLog.read_records(wal_path)], ["mkdir"])
+
+    def test_torn_log_tail_is_ignored(self):
+        fs = self._open()
+        fs.touch("/keep.txt", "kept")
+        fs.touch("/lost.txt", "lost")
+        fs.close()
+        wal_path = os.path.join(self.data_dir, PersistentFileSystem.WAL_FILE_NAME)
+        with open(wal_path, "r+b") as wal_file:
+            wal_file.truncate(os.path.getsize(wal_path) - 3)
+
+        restored = self._open()
+        self.assertEqual(restored.ls("/"), ["keep.txt"])
+        restored.close()
+
+    def test_lone_record_is_flushed_after_the_group_commit_interval(self):
+        wal_path = os.path.join(self.data_dir, "timer.wal")
+        wal = WriteAheadLog(wal_path, group_commit_interval=0.2, fsync=False)
+        wal.append("mkdir", ["/a", ""])
+        self.assertEqual(os.path.getsize(wal_path), 0)
+
+        deadline = time.monotonic() + 5
+        while os.path.getsize(wal_path) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual([op for _, op, _ in WriteAheadLog.read_records(wal_path)], ["mkdir"])
+        wal.close()
+
+class TestConcurrentFileSystem(unittest.TestCase):
+
+    def setUp(self):
+        self.fs = FileSystem()
+        self._stdout = sys.stdout
+        sys.stdout = io.StringIO()  # The per-operation prints would dominate the run
+
+    def tearDown(self):
+        sys.stdout = self._stdout
+
+    def _run_threads(self, workers):
+        errors = []
+
+        def wrap(worker):
+            def run():
+                try:
+                    worker()
+                except Exception as e:  # Surface failures from worker threads in the test thread
+                    errors.append(e)
+            return run
+
+        threads = [threading.Thread(target=wrap(worker)) for worker in workers]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join(timeout=30)
+            self.assertFalse(thread.is_alive(), "Worker thread deadlocked")
+        self.assertEqual(errors, [])
+
+    def test_parallel_writes_to_disjoint_subtrees(self):
+        def writer(index):
+            def run():
+                for i in range(200):
+                    self.fs.touch(f"/users/u{index}/docs/f{i}.txt", "x" * (index + 1))
+            return run
+
+        self._run_threads([writer(index) for index in range(8)])
+        self.assertEqual(len(self.fs.ls("/users")), 8)
+        for index in range(8):
+            self.assertEqual(len(self.fs.ls(f"/users/u{index}/docs")), 200)
+        self.assertEqual(self.fs.du("/"), sum(200 * (index + 1) for index in range(8)))
+
+    def test_concurrent_cross_directory_moves_and_touches(self):
+        self.fs.mkdir("/left")
+        self.fs.mkdir("/right")
+        for i in range(50):
+            self.fs.touch(f"/left/f{i}.txt", "abc")
+
+        def mover(source, destination):
+            def run():
+                for _ in range(5):
+                    for i in range(50):
+                        try:
+                            self.fs.mv(f"/{source}/f{i}.txt", f"/{destination}/f{i}.txt")
+                        except PathNotFoundError:
+                            pass  # Another mover got there first
+            return run
+
+        def toucher(directory):
+            def run():
+                for i in range(100):
+                    self.fs.touch(f"/{directory}/new/n{i}.txt", "z")
+            return run
+
+        # Opposite-direction moves are the classic deadlock case for per-directory locks
+        self._run_threads([mover("left", "right"), mover("right", "left"),
+                           mover("left", "right"), toucher("left"), toucher("right")])
+
+        moved_files = [name for name in self.fs.ls("/left") + self.fs.ls("/right") if name.endswith(".txt")]
+        self.assertEqual(sorted(moved_files), sorted(f"f{i}.txt" for i in range(50)))
+        self.assertEqual(self.fs.du("/"), 50 * 3 + 200)
+
+    def test_search_during_moves_inside_the_subtree(self):
+        self.fs.touch("/work/left/deep/match.txt", "needle")
+        valid = {"/work/left/deep/match.txt", "/work/right/deep/match.txt"}
+        results = []
+
+        def mover():
+            for _ in range(300):
+                self.fs.mv("/work/left", "/work/right")
+                self.fs.mv("/work/right", "/work/left")
+
+        def searcher():
+            for _ in range(300):
+                results.extend(self.fs.search("needle", under_path="/work"))
+
+        self._run_threads([mover, searcher])
+        # A match moved between the index lookup and its re-check is dropped, never reported stale
+        self.assertLessEqual(len(results), 300)
+        self.assertTrue(set(results) <= valid, set(results) - valid)
+        self.assertEqual(self.fs.search("needle", under_path="/work"), ["/work/left/deep/match.txt"])
 
 if __name__ == '__main__':
     # Use argv=[] to prevent unittest from trying to parse command-line args for itself
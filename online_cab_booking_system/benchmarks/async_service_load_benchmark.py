@@ -0,0 +1,137 @@
+"""
+Load generator for AsyncBookingService. It simulates a city of drivers that send location pings
+on a fixed interval, while riders arrive at random (Poisson) and each one requests a ride and
+then goes through arrive, start and end. Everything runs as concurrent coroutines on one event
+loop.
+
+Reports the latency of each operation as seen by its caller, including time spent waiting under
+backpressure, and how many pings were applied per second.
+
+Usage: python -m online_cab_booking_system.benchmarks.async_service_load_benchmark [--drivers 50000] [--rate 200] [--duration 10] [--ping-interval 5] [--batch-window SECONDS]
+"""
+import argparse
+import asyncio
+import contextlib
+import os
+import random
+import time
+
+from online_cab_booking_system.enums.enums import DriverStatus
+from online_cab_booking_system.exceptions import NoDriverFoundError
+from online_cab_booking_system.models.location import Location
+from online_cab_booking_system.services.async_booking_service import AsyncBookingService
+from online_cab_booking_system.services.cab_booking_system import BookingSystem
+
+_SOUTH, _WEST, _SPAN = 12.8, 77.4, 0.4
+_TICK = 0.1  # Seconds between rounds of pings
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _new_system(driver_count: int, rider_count: int) -> BookingSystem:
+    rng = random.Random(1)
+    system = BookingSystem()
+    for i in range(driver_count):
+        location = Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)
+        system.register_driver(f"D{i}", f"Driver {i}", {"model": "Sedan"}, location, DriverStatus.AVAILABLE)
+    for i in range(rider_count):
+        system.register_rider(f"R{i}", f"Rider {i}")
+    return system
+
+
+async def _timed(latencies, name, call):
+    start = time.perf_counter()
+    result = await call
+    latencies.setdefault(name, []).append(time.perf_counter() - start)
+    return result
+
+
+async def _send_pings(service: AsyncBookingService, system: BookingSystem, driver_count: int,
+                      ping_interval: float, duration: float, latencies):
+    """Every driver pings once per interval, spread evenly over the ticks, drifting a few metres each time."""
+    rng = random.Random(7)
+    store = system._driver_locations
+    per_tick = max(1, round(driver_count * _TICK / ping_interval))
+    next_driver = 0
+    start = time.perf_counter()
+    while time.perf_counter() - start < duration:
+        tick_start = time.perf_counter()
+        for _ in range(per_tick):
+            slot = store.slot_of(f"D{next_driver}")
+            await _timed(latencies, "location ping", service.report_location(
+                f"D{next_driver}", store.latitudes[slot] + rng.uniform(-0.0005, 0.0005),
+                store.longitudes[slot] + rng.uniform(-0.0005, 0.0005), time.time()))
+            next_driver = (next_driver + 1) % driver_count
+        await asyncio.sleep(max(0.0, _TICK - (time.perf_counter() - tick_start)))
+
+
+async def _trip(service: AsyncBookingService, rng: random.Random, rider_id: str, latencies, outcomes):
+    pickup = Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)
+    dropoff = Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)
+    try:
+        ride = await _timed(latencies, "request_ride", service.request_ride(rider_id, pickup, dropoff))
+    except NoDriverFoundError:
+        outcomes["no driver"] += 1
+        return
+    # Trips are compressed to a few seconds so drivers return to the pool during the run
+    await asyncio.sleep(rng.uniform(0.5, 1.5))
+    await _timed(latencies, "driver_arrived", service.driver_arrived_at_pickup(ride.get_id()))
+    await _timed(latencies, "start_ride", service.start_ride(ride.get_id()))
+    await asyncio.sleep(rng.uniform(1.0, 3.0))
+    await _timed(latencies, "end_ride", service.end_ride(ride.get_id()))
+    outcomes["completed"] += 1
+
+
+async def _simulate(system: BookingSystem, driver_count: int, rate: float, duration: float, ping_interval: float,
+                    batch_window):
+    latencies = {}
+    outcomes = {"completed": 0, "no driver": 0}
+    rng = random.Random(42)
+    async with AsyncBookingService(system, batch_window=batch_window) as service:
+        pings = asyncio.create_task(_send_pings(service, system, driver_count, ping_interval, duration, latencies))
+        trips = []
+        start = time.perf_counter()
+        arrival = 0.0
+        rider_index = 0
+        while arrival < duration:
+            await asyncio.sleep(max(0.0, arrival - (time.perf_counter() - start)))
+            trips.append(asyncio.create_task(_trip(service, rng, f"R{rider_index}", latencies, outcomes)))
+            rider_index += 1
+            arrival += rng.expovariate(rate)
+        await pings
+        await asyncio.gather(*trips)
+        elapsed = time.perf_counter() - start
+    return latencies, outcomes, service.ping_counts, rider_index, elapsed
+
+
+def run(driver_count: int, rate: float, duration: float, ping_interval: float, batch_window):
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        system = _new_system(driver_count, int(rate * duration * 2) + 100)
+        latencies, outcomes, ping_counts, requests, elapsed = asyncio.run(
+            _simulate(system, driver_count, rate, duration, ping_interval, batch_window))
+
+    matching = f"batch every {batch_window:g} s" if batch_window else "on arrival"
+    print(f"Drivers: {driver_count:,}  riders: {requests:,} at {rate:g}/s over {duration:g} s  "
+          f"pings: every {ping_interval:g} s per driver  matching: {matching}")
+    print(f"Trips completed: {outcomes['completed']:,}  no driver: {outcomes['no driver']:,}  "
+          f"pings applied: {ping_counts.get('accepted', 0):,}  wall time: {elapsed:.1f} s")
+    print(f"{'operation':<16} {'count':>8} {'p50 (ms)':>9} {'p99 (ms)':>9} {'max (ms)':>9}")
+    for name in ("request_ride", "driver_arrived", "start_ride", "end_ride", "location ping"):
+        values = latencies.get(name)
+        if values:
+            print(f"{name:<16} {len(values):>8,} {_percentile(values, 0.5) * 1000:>9.2f} "
+                  f"{_percentile(values, 0.99) * 1000:>9.2f} {max(values) * 1000:>9.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drivers", type=int, default=50_000)
+    parser.add_argument("--rate", type=float, default=200, help="Ride requests per second")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of simulated load")
+    parser.add_argument("--ping-interval", type=float, default=5, help="Seconds between a driver's pings")
+    parser.add_argument("--batch-window", type=float, default=None, help="Match requests in batches of this window")
+    arguments = parser.parse_args()
+    run(arguments.drivers, arguments.rate, arguments.duration, arguments.ping_interval, arguments.batch_window)
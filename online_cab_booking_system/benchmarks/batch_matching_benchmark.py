@@ -0,0 +1,106 @@
+"""
+Peak-hour ride matching: greedy request_ride() on arrival versus submit_ride_request() collected
+over a window and matched together by match_pending_requests().
+
+Reports the total pickup distance and the match latency. For the batch, latency counts the wait
+until the window closes plus the solve time.
+
+Usage: python -m online_cab_booking_system.benchmarks.batch_matching_benchmark [--drivers 50000] [--requests 1000] [--windows 5] [--window 2.0]
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from online_cab_booking_system.enums.enums import DriverStatus
+from online_cab_booking_system.exceptions import NoDriverFoundError
+from online_cab_booking_system.models.location import Location
+from online_cab_booking_system.services.cab_booking_system import BookingSystem
+
+_SOUTH, _WEST, _SPAN = 12.8, 77.4, 0.4
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _new_system(driver_count: int, rider_count: int) -> BookingSystem:
+    rng = random.Random(1)
+    system = BookingSystem()
+    for i in range(driver_count):
+        location = Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)
+        system.register_driver(f"D{i}", f"Driver {i}", {"model": "Sedan"}, location, DriverStatus.AVAILABLE)
+    for i in range(rider_count):
+        system.register_rider(f"R{i}", f"Rider {i}")
+    return system
+
+
+def _generate_requests(request_count: int, window_count: int, window: float):
+    """Requests clustered around a few hotspots (stations, stadiums), so riders compete for drivers."""
+    rng = random.Random(42)
+    hotspots = [(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN) for _ in range(8)]
+    requests = []
+    for i in range(request_count * window_count):
+        latitude, longitude = rng.choice(hotspots)
+        pickup = Location(latitude + rng.gauss(0, 0.01), longitude + rng.gauss(0, 0.01))
+        dropoff = Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)
+        arrival = (i // request_count) * window + rng.random() * window
+        requests.append((arrival, f"R{i}", pickup, dropoff))
+    requests.sort(key=lambda request: request[0])
+    return requests
+
+
+def _pickup_km(system: BookingSystem, ride) -> float:
+    return system._drivers[ride.get_driver_id()].get_current_location().get_great_circle_distance_to(
+        ride.get_pickup_location())
+
+
+def run(driver_count: int, request_count: int, window_count: int, window: float):
+    requests = _generate_requests(request_count, window_count, window)
+    results = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        system = _new_system(driver_count, len(requests))
+        latencies, pickups = [], []
+        for _, rider_id, pickup, dropoff in requests:
+            start = time.perf_counter()
+            try:
+                ride = system.request_ride(rider_id, pickup, dropoff)
+            except NoDriverFoundError:
+                continue
+            latencies.append(time.perf_counter() - start)
+            pickups.append(_pickup_km(system, ride))
+        results["greedy on arrival"] = (latencies, pickups)
+
+        system = _new_system(driver_count, len(requests))
+        latencies, pickups = [], []
+        for window_index in range(window_count):
+            window_end = (window_index + 1) * window
+            batch = [request for request in requests if window_index * window <= request[0] < window_end]
+            for _, rider_id, pickup, dropoff in batch:
+                system.submit_ride_request(rider_id, pickup, dropoff)
+            start = time.perf_counter()
+            rides, _ = system.match_pending_requests()
+            solve_seconds = time.perf_counter() - start
+            for arrival, rider_id, _, _ in batch:
+                if rider_id in rides:
+                    latencies.append(window_end - arrival + solve_seconds)
+                    pickups.append(_pickup_km(system, rides[rider_id]))
+        results[f"batch ({window:g} s window)"] = (latencies, pickups)
+
+    print(f"Drivers: {driver_count:,}  requests: {len(requests):,} in {window_count} windows of {window:g} s")
+    print(f"{'matching':<22} {'matched':>8} {'total pickup km':>16} {'mean km':>8} {'p50 latency (s)':>16} {'p99 latency (s)':>16}")
+    for name, (latencies, pickups) in results.items():
+        print(f"{name:<22} {len(pickups):>8,} {sum(pickups):>16,.1f} {sum(pickups) / len(pickups):>8.3f} "
+              f"{_percentile(latencies, 0.5):>16.4f} {_percentile(latencies, 0.99):>16.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drivers", type=int, default=50_000)
+    parser.add_argument("--requests", type=int, default=1000, help="Requests per window")
+    parser.add_argument("--windows", type=int, default=5)
+    parser.add_argument("--window", type=float, default=2.0, help="Collection window in seconds")
+    arguments = parser.parse_args()
+    run(arguments.drivers, arguments.requests, arguments.windows, arguments.window)
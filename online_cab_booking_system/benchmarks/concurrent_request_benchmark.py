@@ -0,0 +1,113 @@
+"""
+Concurrent ride requests: many threads call request_ride() on one BookingSystem at once, with
+riders crowded around a few hotspots so that they race for the same drivers.
+
+Compares per-driver claims (compare-and-set on the driver's status, retrying the next candidate)
+with every request serialized behind one global lock, for each thread count. Reports throughput,
+p99 latency, and checks that no driver was assigned to two rides.
+
+Usage: python -m online_cab_booking_system.benchmarks.concurrent_request_benchmark [--drivers 20000] [--requests 8000] [--threads 1 2 4 8]
+"""
+import argparse
+import contextlib
+import os
+import random
+import threading
+import time
+
+from online_cab_booking_system.enums.enums import DriverStatus
+from online_cab_booking_system.exceptions import NoDriverFoundError
+from online_cab_booking_system.models.location import Location
+from online_cab_booking_system.services.cab_booking_system import BookingSystem
+
+_SOUTH, _WEST, _SPAN = 12.8, 77.4, 0.4
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _new_system(driver_count: int, rider_count: int) -> BookingSystem:
+    rng = random.Random(1)
+    system = BookingSystem()
+    for i in range(driver_count):
+        location = Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)
+        system.register_driver(f"D{i}", f"Driver {i}", {"model": "Sedan"}, location, DriverStatus.AVAILABLE)
+    for i in range(rider_count):
+        system.register_rider(f"R{i}", f"Rider {i}")
+    return system
+
+
+def _generate_requests(request_count: int):
+    rng = random.Random(42)
+    hotspots = [(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN) for _ in range(8)]
+    requests = []
+    for i in range(request_count):
+        latitude, longitude = rng.choice(hotspots)
+        pickup = Location(latitude + rng.gauss(0, 0.01), longitude + rng.gauss(0, 0.01))
+        dropoff = Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)
+        requests.append((f"R{i}", pickup, dropoff))
+    return requests
+
+
+def _run_threads(system: BookingSystem, requests, thread_count: int, global_lock: bool):
+    lock = threading.Lock() if global_lock else contextlib.nullcontext()
+    barrier = threading.Barrier(thread_count + 1)
+    results = [([], []) for _ in range(thread_count)]  # Per thread: (rides, latencies)
+
+    def worker(share, rides, latencies):
+        barrier.wait()
+        for rider_id, pickup, dropoff in share:
+            start = time.perf_counter()
+            try:
+                with lock:
+                    rides.append(system.request_ride(rider_id, pickup, dropoff))
+            except NoDriverFoundError:
+                pass
+            latencies.append(time.perf_counter() - start)
+
+    threads = [threading.Thread(target=worker, args=(requests[t::thread_count],) + results[t])
+               for t in range(thread_count)]
+    for thread in threads:
+        thread.start()
+    barrier.wait()
+    start = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - start
+
+    rides = [ride for thread_rides, _ in results for ride in thread_rides]
+    latencies = [latency for _, thread_latencies in results for latency in thread_latencies]
+    drivers = [ride.get_driver_id() for ride in rides]
+    if len(set(drivers)) != len(drivers):
+        raise AssertionError("A driver was assigned to two rides.")
+    if any(system._drivers[driver_id].get_status() != DriverStatus.EN_ROUTE_TO_PICKUP for driver_id in drivers):
+        raise AssertionError("A matched driver is not en route to pickup.")
+    return len(rides), elapsed, latencies
+
+
+def run(driver_count: int, request_count: int, thread_counts):
+    requests = _generate_requests(request_count)
+    rows = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for thread_count in thread_counts:
+            for name, global_lock in (("per-driver claims", False), ("one global lock", True)):
+                system = _new_system(driver_count, request_count)
+                matched, elapsed, latencies = _run_threads(system, requests, thread_count, global_lock)
+                rows.append((thread_count, name, matched, request_count / elapsed, _percentile(latencies, 0.99)))
+
+    print(f"Drivers: {driver_count:,}  requests: {request_count:,} around 8 hotspots")
+    print(f"{'threads':>7} {'locking':<18} {'matched':>8} {'requests/s':>11} {'p99 latency (ms)':>17}")
+    for thread_count, name, matched, throughput, p99 in rows:
+        print(f"{thread_count:>7} {name:<18} {matched:>8,} {throughput:>11,.0f} {p99 * 1000:>17.2f}")
+    print("No driver was assigned to two rides.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drivers", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=8000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    arguments = parser.parse_args()
+    run(arguments.drivers, arguments.requests, arguments.threads)
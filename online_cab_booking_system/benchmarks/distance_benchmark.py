@@ -0,0 +1,46 @@
+"""
+Ranking candidate drivers: one Location.get_great_circle_distance_to call per driver versus a
+single distances_from call over contiguous latitude/longitude arrays.
+
+Usage: python -m online_cab_booking_system.benchmarks.distance_benchmark [--candidates 5000] [--repeat 200]
+"""
+import argparse
+import random
+import time
+
+from online_cab_booking_system import geo
+from online_cab_booking_system.geo import LocationArray, distances_from
+from online_cab_booking_system.models.location import Location
+
+
+def run(candidate_count: int, repeat: int):
+    rng = random.Random(42)
+    drivers = [Location(12.8 + rng.random() * 0.4, 77.4 + rng.random() * 0.4) for _ in range(candidate_count)]
+    pickup = Location(12.97, 77.59)
+    driver_array = LocationArray.from_locations(drivers)
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        per_call = [driver.get_great_circle_distance_to(pickup) for driver in drivers]
+    per_call_seconds = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        batched = distances_from(pickup, driver_array)
+    batched_seconds = (time.perf_counter() - start) / repeat
+
+    assert max(abs(a - b) for a, b in zip(per_call, batched)) < 1e-9
+    backend = "NumPy" if geo.np is not None else "pure Python (NumPy not installed)"
+    print(f"Candidates: {candidate_count:,}  distances_from backend: {backend}")
+    print(f"{'method':<34} {'per ranking (ms)':>17}")
+    print(f"{'get_great_circle_distance_to each':<34} {per_call_seconds * 1000:>17.3f}")
+    print(f"{'distances_from (one call)':<34} {batched_seconds * 1000:>17.3f}")
+    print(f"Speed-up: {per_call_seconds / batched_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--candidates", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=200)
+    arguments = parser.parse_args()
+    run(arguments.candidates, arguments.repeat)
@@ -0,0 +1,78 @@
+"""
+Driver location ingestion: one update_driver_location() call per ping versus batched
+update_driver_locations() over the struct-of-arrays store.
+
+Usage: python -m online_cab_booking_system.benchmarks.location_ingest_benchmark [--drivers 200000] [--pings 1000000] [--batch 5000]
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from online_cab_booking_system.enums.enums import DriverStatus
+from online_cab_booking_system.models.location import Location
+from online_cab_booking_system.services.cab_booking_system import BookingSystem
+
+_SOUTH, _WEST, _SPAN = 12.8, 77.4, 0.4
+
+
+def _new_system(driver_count: int, rng: random.Random) -> BookingSystem:
+    system = BookingSystem()
+    for i in range(driver_count):
+        status = DriverStatus.AVAILABLE if rng.random() < 0.7 else DriverStatus.IN_RIDE
+        location = Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)
+        system.register_driver(f"D{i}", f"Driver {i}", {"model": "Sedan"}, location, status)
+    return system
+
+
+def _generate_pings(driver_count: int, ping_count: int, rng: random.Random):
+    """Drivers drifting a few metres per ping, with about 2% of pings delivered out of order."""
+    positions = [(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN) for _ in range(driver_count)]
+    pings = []
+    for i in range(ping_count):
+        driver = rng.randrange(driver_count)
+        latitude, longitude = positions[driver]
+        latitude += rng.uniform(-0.0005, 0.0005)
+        longitude += rng.uniform(-0.0005, 0.0005)
+        positions[driver] = (latitude, longitude)
+        timestamp = i / 100_000
+        if rng.random() < 0.02:
+            timestamp -= 1.0
+        pings.append((f"D{driver}", latitude, longitude, timestamp))
+    return pings
+
+
+def run(driver_count: int, ping_count: int, batch_size: int, single_count: int):
+    rng = random.Random(42)
+    pings = _generate_pings(driver_count, ping_count, rng)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        system = _new_system(driver_count, random.Random(1))
+        start = time.perf_counter()
+        for driver_id, latitude, longitude, _ in pings[:single_count]:
+            system.update_driver_location(driver_id, Location(latitude, longitude))
+        single_seconds = time.perf_counter() - start
+
+        system = _new_system(driver_count, random.Random(1))
+        totals = {"accepted": 0, "stale": 0, "invalid": 0, "unknown": 0}
+        start = time.perf_counter()
+        for offset in range(0, ping_count, batch_size):
+            for outcome, count in system.update_driver_locations(pings[offset:offset + batch_size]).items():
+                totals[outcome] += count
+        bulk_seconds = time.perf_counter() - start
+
+    print(f"Drivers: {driver_count:,}  pings: {ping_count:,}  batch size: {batch_size:,}")
+    print(f"Accepted: {totals['accepted']:,}  dropped as out of order: {totals['stale']:,}")
+    print(f"{'path':<32} {'pings/s':>12}")
+    print(f"{'update_driver_location each':<32} {single_count / single_seconds:>12,.0f}")
+    print(f"{'update_driver_locations batches':<32} {ping_count / bulk_seconds:>12,.0f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drivers", type=int, default=200_000)
+    parser.add_argument("--pings", type=int, default=1_000_000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--single", type=int, default=100_000, help="Pings timed through the per-ping path")
+    arguments = parser.parse_args()
+    run(arguments.drivers, arguments.pings, arguments.batch, arguments.single)
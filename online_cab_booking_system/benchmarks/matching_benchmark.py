@@ -0,0 +1,75 @@
+"""
+Driver matching: the former linear scan over every driver versus the spatial index behind
+BookingSystem.request_ride.
+
+Usage: python -m online_cab_booking_system.benchmarks.matching_benchmark [--drivers 200000] [--requests 2000]
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from online_cab_booking_system.enums.enums import DriverStatus
+from online_cab_booking_system.models.location import Location
+from online_cab_booking_system.services.cab_booking_system import BookingSystem
+
+# A city about 45 km across
+_SOUTH, _WEST, _SPAN = 12.8, 77.4, 0.4
+
+
+def _random_location(rng: random.Random) -> Location:
+    return Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)
+
+
+def _linear_scan_closest(system: BookingSystem, pickup: Location) -> str:
+    """request_ride's matching before the spatial index: scan, filter by radius, sort."""
+    in_range = []
+    for driver in system._drivers.values():
+        if driver.get_status() == DriverStatus.AVAILABLE:
+            if driver.get_current_location().get_great_circle_distance_to(pickup) <= system._MATCHING_RADIUS_KM:
+                in_range.append(driver)
+    in_range.sort(key=lambda d: (d.get_current_location().get_great_circle_distance_to(pickup), d.get_id()))
+    return in_range[0].get_id()
+
+
+def run(driver_count: int, request_count: int, scan_count: int):
+    rng = random.Random(42)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        system = BookingSystem()
+        for i in range(driver_count):
+            status = DriverStatus.AVAILABLE if rng.random() < 0.7 else DriverStatus.IN_RIDE
+            system.register_driver(f"D{i}", f"Driver {i}", {"model": "Sedan"}, _random_location(rng), status)
+        for i in range(request_count):
+            system.register_rider(f"R{i}", f"Rider {i}")
+        pickups = [_random_location(rng) for _ in range(request_count)]
+
+        start = time.perf_counter()
+        for pickup in pickups[:scan_count]:
+            _linear_scan_closest(system, pickup)
+        scan_seconds = (time.perf_counter() - start) / scan_count
+
+        # Same answers before any driver is taken
+        for pickup in pickups[:scan_count]:
+            assert system._available_index.nearest(pickup, 1, system._MATCHING_RADIUS_KM)[0][1] == \
+                _linear_scan_closest(system, pickup)
+
+        start = time.perf_counter()
+        for i, pickup in enumerate(pickups):
+            system.request_ride(f"R{i}", pickup, _random_location(rng))
+        indexed_seconds = (time.perf_counter() - start) / request_count
+
+    print(f"Drivers: {driver_count:,} ({len(system._available_index):,} still available)")
+    print(f"{'matching':<28} {'per request (ms)':>17}")
+    print(f"{'linear scan + sort':<28} {scan_seconds * 1000:>17.3f}")
+    print(f"{'request_ride (grid index)':<28} {indexed_seconds * 1000:>17.3f}")
+    print(f"Speed-up: {scan_seconds / indexed_seconds:,.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drivers", type=int, default=200_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--scans", type=int, default=10, help="Requests timed with the linear scan")
+    arguments = parser.parse_args()
+    run(arguments.drivers, arguments.requests, arguments.scans)
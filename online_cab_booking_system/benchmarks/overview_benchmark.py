@@ -0,0 +1,82 @@
+"""
+Dashboard polling: get_system_overview() and one page of list_available_drivers(), against
+scanning every driver as both did before the counters were kept incrementally. Also reports the
+cost of a status change, which now maintains the counters.
+
+Usage: python -m online_cab_booking_system.benchmarks.overview_benchmark [--drivers 200000] [--page 50] [--repeat 20]
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from online_cab_booking_system.enums.enums import DriverStatus
+from online_cab_booking_system.models.location import Location
+from online_cab_booking_system.services.cab_booking_system import BookingSystem
+
+_SOUTH, _WEST, _SPAN = 12.8, 77.4, 0.4
+
+
+def _scan_overview(system: BookingSystem):
+    return {
+        "total_drivers": len(system._drivers),
+        "total_riders": len(system._riders),
+        "active_rides": len(system._active_rides),
+        "available_drivers": len([d for d in system._drivers.values() if d.get_status() == DriverStatus.AVAILABLE]),
+    }
+
+
+def _scan_available(system: BookingSystem, offset: int, limit: int):
+    available = [{"driver_id": driver.get_id(), "name": driver.get_name(), "location": driver.get_current_location()}
+                 for driver in system._drivers.values() if driver.get_status() == DriverStatus.AVAILABLE]
+    return available[offset:offset + limit]
+
+
+def _time(function, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def run(driver_count: int, page: int, repeat: int):
+    rng = random.Random(1)
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        system = BookingSystem()
+        for i in range(driver_count):
+            location = Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)
+            status = DriverStatus.AVAILABLE if rng.random() < 0.6 else rng.choice(
+                [DriverStatus.IN_RIDE, DriverStatus.OFFLINE])
+            system.register_driver(f"D{i}", f"Driver {i}", {"model": "Sedan"}, location, status)
+
+    if system.get_system_overview() != _scan_overview(system):
+        raise AssertionError("The counters disagree with a full scan.")
+    offset = system.get_system_overview()["available_drivers"] // 2
+    center = Location(_SOUTH + _SPAN / 2, _WEST + _SPAN / 2)
+    drivers = list(system._drivers.values())
+
+    rows = [
+        ("get_system_overview (full scan)", _time(lambda: _scan_overview(system), repeat)),
+        ("get_system_overview (counters)", _time(system.get_system_overview, repeat)),
+        (f"available page of {page} (full scan)", _time(lambda: _scan_available(system, offset, page), repeat)),
+        (f"available page of {page} (offset {offset:,})", _time(lambda: system.list_available_drivers(offset, page), repeat)),
+        (f"available page of {page} (first page)", _time(lambda: system.list_available_drivers(0, page), repeat)),
+        (f"nearest page of {page}", _time(lambda: system.list_available_drivers(0, page, near=center), repeat)),
+        ("status change (AVAILABLE <-> OFFLINE)", _time(lambda: [
+            driver.update_status(DriverStatus.OFFLINE if driver.get_status() == DriverStatus.AVAILABLE
+                                 else DriverStatus.AVAILABLE) for driver in drivers[:1000]], repeat) / 1000),
+    ]
+    print(f"Drivers: {driver_count:,}  available: {system.get_system_overview()['available_drivers']:,}")
+    print(f"{'operation':<40} {'per call (ms)':>14}")
+    for name, seconds in rows:
+        print(f"{name:<40} {seconds * 1000:>14.4f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drivers", type=int, default=200_000)
+    parser.add_argument("--page", type=int, default=50)
+    parser.add_argument("--repeat", type=int, default=20)
+    arguments = parser.parse_args()
+    run(arguments.drivers, arguments.page, arguments.repeat)
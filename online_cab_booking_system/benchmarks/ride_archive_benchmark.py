@@ -0,0 +1,129 @@
+"""
+Completed-ride history: RideArchive (day partitions, columnar arrays) versus keeping every
+completed Ride object in a dict and scanning it for each query. The archive is measured with
+all partitions in memory and again with all but the last day spilled to memory-mapped files.
+
+Usage: python -m online_cab_booking_system.benchmarks.ride_archive_benchmark [--rides 300000] [--days 30] [--drivers 20000] [--riders 100000]
+"""
+import argparse
+import datetime
+import random
+import tempfile
+import time
+
+from online_cab_booking_system.enums.enums import RideStatus
+from online_cab_booking_system.models.location import Location
+from online_cab_booking_system.models.ride import Ride
+from online_cab_booking_system.services.ride_archive import RideArchive
+
+_FIRST_DAY = datetime.datetime(2024, 3, 1)
+
+
+def _generate_rides(ride_count: int, day_count: int, driver_count: int, rider_count: int):
+    rng = random.Random(42)
+    span = day_count * 86400
+    rides = []
+    for i, offset in enumerate(sorted(rng.random() * span for _ in range(ride_count))):
+        ended_at = _FIRST_DAY + datetime.timedelta(seconds=offset)
+        ride = Ride(f"RIDE_{i:07d}", f"R{rng.randrange(rider_count)}", f"D{rng.randrange(driver_count)}",
+                    Location(12.8 + rng.random() * 0.4, 77.4 + rng.random() * 0.4),
+                    Location(12.8 + rng.random() * 0.4, 77.4 + rng.random() * 0.4))
+        ride.set_status(RideStatus.COMPLETED)
+        ride.set_start_time(ended_at - datetime.timedelta(minutes=rng.uniform(5, 60)))
+        ride.set_end_time(ended_at)
+        ride.set_fare(round(rng.uniform(3, 60), 2))
+        rides.append(ride)
+    return rides
+
+
+class _DictHistory:
+    """The baseline: every completed Ride kept as an object, each query a full scan."""
+
+    def __init__(self):
+        self.rides = {}
+
+    def add(self, ride: Ride, distance_km: float, duration_minutes: float):
+        self.rides[ride.get_id()] = ride
+
+    def get_ride(self, ride_id):
+        return self.rides.get(ride_id)
+
+    def rides_for_rider(self, rider_id):
+        return sorted((ride for ride in self.rides.values() if ride.get_rider_id() == rider_id), key=Ride.get_end_time)
+
+    def rides_between(self, start, end):
+        return sorted((ride for ride in self.rides.values() if start <= ride.get_end_time() < end),
+                      key=Ride.get_end_time)
+
+    def revenue_per_hour(self, start, end):
+        revenue = {}
+        for ride in self.rides.values():
+            if start <= ride.get_end_time() < end:
+                hour = ride.get_end_time().replace(minute=0, second=0, microsecond=0)
+                revenue[hour] = revenue.get(hour, 0.0) + ride.get_fare()
+        return revenue
+
+    def trips_per_driver(self):
+        counts = {}
+        for ride in self.rides.values():
+            counts[ride.get_driver_id()] = counts.get(ride.get_driver_id(), 0) + 1
+        return counts
+
+
+def _time(function, repeat: int = 1) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    return (time.perf_counter() - start) / repeat
+
+
+def _measure(history, rides, day_count: int, riders):
+    last_day = _FIRST_DAY + datetime.timedelta(days=day_count - 1)
+    everything = (_FIRST_DAY, _FIRST_DAY + datetime.timedelta(days=day_count))
+    return {
+        "get_ride": _time(lambda: [history.get_ride(ride.get_id()) for ride in rides[::1000]]) / len(rides[::1000]),
+        "rides_for_rider": _time(lambda: [history.rides_for_rider(rider_id) for rider_id in riders]) / len(riders),
+        "rides_between (1 h)": _time(lambda: history.rides_between(last_day.replace(hour=18), last_day.replace(hour=19))),
+        "revenue_per_hour": _time(lambda: history.revenue_per_hour(*everything)),
+        "trips_per_driver": _time(history.trips_per_driver),
+    }
+
+
+def run(ride_count: int, day_count: int, driver_count: int, rider_count: int):
+    rides = _generate_rides(ride_count, day_count, driver_count, rider_count)
+    riders = [f"R{i}" for i in random.Random(7).sample(range(rider_count), 20)]
+    results = {}
+
+    baseline = _DictHistory()
+    build = _time(lambda: [baseline.add(ride, 0.0, 0.0) for ride in rides])
+    results["dict of Ride objects"] = (build, _measure(baseline, rides, day_count, riders))
+
+    archive = RideArchive()
+    build = _time(lambda: [archive.add(ride, 8.0, 20.0) for ride in rides])
+    results["RideArchive"] = (build, _measure(archive, rides, day_count, riders))
+
+    with tempfile.TemporaryDirectory() as directory:
+        spilled = RideArchive(spill_directory=directory, hot_days=1)
+        build = _time(lambda: [spilled.add(ride, 8.0, 20.0) for ride in rides])
+        results["RideArchive (spilled)"] = (build, _measure(spilled, rides, day_count, riders))
+        spilled.close()
+
+    if archive.revenue_per_hour(_FIRST_DAY, _FIRST_DAY + datetime.timedelta(days=day_count)).keys() != \
+            baseline.revenue_per_hour(_FIRST_DAY, _FIRST_DAY + datetime.timedelta(days=day_count)).keys():
+        raise AssertionError("The archive and the baseline disagree on revenue per hour.")
+
+    names = list(next(iter(results.values()))[1])
+    print(f"Rides: {ride_count:,} over {day_count} days  drivers: {driver_count:,}  riders: {rider_count:,}")
+    print(f"{'history':<22} {'build (s)':>10} " + " ".join(f"{name + ' (ms)':>24}" for name in names))
+    for history, (build, timings) in results.items():
+        print(f"{history:<22} {build:>10.2f} " + " ".join(f"{timings[name] * 1000:>24.3f}" for name in names))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rides", type=int, default=300_000)
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--drivers", type=int, default=20_000)
+    parser.add_argument("--riders", type=int, default=100_000)
+    arguments = parser.parse_args()
+    run(arguments.rides, arguments.days, arguments.drivers, arguments.riders)
@@ -0,0 +1,155 @@
+"""
+Road-network matching on a synthetic city: a street grid with faster arterials, split by a river
+that only a few bridges cross. The graph is written to a road graph file and loaded from it.
+
+Reports:
+- the ALT precomputation time
+- query latency for plain Dijkstra, ALT A* and cached ALT
+- for requests near the river, the pickup travel time of drivers matched by straight-line
+  distance versus by road ETA
+
+Usage: python -m online_cab_booking_system.benchmarks.road_network_benchmark [--grid 120] [--drivers 20000] [--requests 2000] [--landmarks 8]
+"""
+import argparse
+import contextlib
+import heapq
+import math
+import os
+import random
+import tempfile
+import time
+
+from online_cab_booking_system.enums.enums import DriverStatus
+from online_cab_booking_system.exceptions import NoDriverFoundError
+from online_cab_booking_system.models.location import Location
+from online_cab_booking_system.services.cab_booking_system import BookingSystem
+from online_cab_booking_system.services.road_network import RoadNetworkOracle
+
+_SOUTH, _WEST, _SPAN = 12.8, 77.4, 0.4
+
+
+def _percentile(values, fraction):
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(fraction * len(ordered)))]
+
+
+def _write_city(path: str, size: int):
+    """A size x size street grid; every 10th street is a 50 km/h arterial, the rest 25 km/h.
+    The river runs between the two middle rows, with a bridge on every 20th column."""
+    step = _SPAN / (size - 1)
+    river = size // 2
+    with open(path, "w") as file:
+        for row in range(size):
+            for column in range(size):
+                file.write(f"v {row}_{column} {_SOUTH + row * step:.6f} {_WEST + column * step:.6f}\n")
+        for row in range(size):
+            for column in range(size):
+                here = Location(_SOUTH + row * step, _WEST + column * step)
+                if column + 1 < size:
+                    km = here.get_great_circle_distance_to(Location(_SOUTH + row * step, _WEST + (column + 1) * step))
+                    file.write(f"b {row}_{column} {row}_{column + 1} {km:.4f} {50 if row % 10 == 0 else 25}\n")
+                if row + 1 < size and (row + 1 != river or column % 20 == 0):
+                    km = here.get_great_circle_distance_to(Location(_SOUTH + (row + 1) * step, _WEST + column * step))
+                    file.write(f"b {row}_{column} {row + 1}_{column} {km:.4f} {50 if column % 10 == 0 else 25}\n")
+    return _SOUTH + (river - 0.5) * step  # Latitude of the river
+
+
+def _dijkstra(oracle: RoadNetworkOracle, source: int, target: int) -> float:
+    """The baseline: Dijkstra from source, stopping once the target is settled."""
+    offsets, targets, seconds, _ = oracle._graph.forward
+    times = {source: 0.0}
+    heap = [(0.0, source)]
+    while heap:
+        time_, node = heapq.heappop(heap)
+        if node == target:
+            return time_
+        if time_ > times[node]:
+            continue
+        for edge in range(offsets[node], offsets[node + 1]):
+            candidate = time_ + seconds[edge]
+            if candidate < times.get(targets[edge], math.inf):
+                times[targets[edge]] = candidate
+                heapq.heappush(heap, (candidate, targets[edge]))
+    return math.inf
+
+
+def _new_system(driver_count: int, rider_count: int, road_network) -> BookingSystem:
+    rng = random.Random(1)
+    system = BookingSystem(road_network=road_network)
+    for i in range(driver_count):
+        location = Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)
+        system.register_driver(f"D{i}", f"Driver {i}", {"model": "Sedan"}, location, DriverStatus.AVAILABLE)
+    for i in range(rider_count):
+        system.register_rider(f"R{i}", f"Rider {i}")
+    return system
+
+
+def run(grid: int, driver_count: int, request_count: int, landmark_count: int):
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "city.txt")
+        river_latitude = _write_city(path, grid)
+        start = time.perf_counter()
+        oracle = RoadNetworkOracle.load(path, landmark_count=landmark_count)
+        build_seconds = time.perf_counter() - start
+
+    # Query latency on trips of up to ~5 km
+    rng = random.Random(3)
+    pairs = []
+    while len(pairs) < 300:
+        origin = Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)
+        destination = Location(origin.get_latitude() + rng.uniform(-0.03, 0.03), origin.get_longitude() + rng.uniform(-0.03, 0.03))
+        pairs.append((oracle._graph.nearest_node(origin)[0], oracle._graph.nearest_node(destination)[0]))
+    start = time.perf_counter()
+    expected = [_dijkstra(oracle, source, target) for source, target in pairs]
+    dijkstra_seconds = (time.perf_counter() - start) / len(pairs)
+    start = time.perf_counter()
+    results = [oracle._search(source, target) for source, target in pairs]
+    alt_seconds = (time.perf_counter() - start) / len(pairs)
+    if any(abs(route.seconds - seconds) > 1e-6 for route, seconds in zip(results, expected)):
+        raise AssertionError("ALT and Dijkstra disagree.")
+    for source, target in pairs:
+        oracle._node_route(source, target)
+    start = time.perf_counter()
+    for source, target in pairs:
+        oracle._node_route(source, target)
+    cached_seconds = (time.perf_counter() - start) / len(pairs)
+
+    # Requests within ~1 km of the river, where straight-line matching crosses it
+    requests = [(f"R{i}", Location(river_latitude + rng.uniform(-0.01, 0.01), _WEST + rng.random() * _SPAN),
+                 Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)) for i in range(request_count)]
+    matching = {}
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for name, road_network in (("straight-line", None), ("road ETA", oracle)):
+            system = _new_system(driver_count, request_count, road_network)
+            etas, latencies = [], []
+            for rider_id, pickup, dropoff in requests:
+                start = time.perf_counter()
+                try:
+                    ride = system.request_ride(rider_id, pickup, dropoff)
+                except NoDriverFoundError:
+                    continue
+                latencies.append(time.perf_counter() - start)
+                route = oracle.route(system._drivers[ride.get_driver_id()].get_current_location(), pickup)
+                etas.append(route.seconds / 60 if route is not None else math.inf)
+            matching[name] = (etas, latencies)
+
+    print(f"Road graph: {len(oracle._graph):,} nodes, {len(oracle._graph.forward[1]):,} directed edges  "
+          f"ALT precompute with {landmark_count} landmarks: {build_seconds:.2f} s")
+    print(f"{'query':<16} {'per query (ms)':>15}")
+    for name, seconds in (("Dijkstra", dijkstra_seconds), ("ALT A*", alt_seconds), ("ALT, cached", cached_seconds)):
+        print(f"{name:<16} {seconds * 1000:>15.3f}")
+    print(f"\nDrivers: {driver_count:,}  requests near the river: {request_count:,}")
+    print(f"{'matching':<14} {'matched':>8} {'mean pickup ETA (min)':>22} {'p90 ETA (min)':>14} {'p99 latency (ms)':>17}")
+    for name, (etas, latencies) in matching.items():
+        print(f"{name:<14} {len(etas):>8,} {sum(etas) / len(etas):>22.2f} {_percentile(etas, 0.9):>14.2f} "
+              f"{_percentile(latencies, 0.99) * 1000:>17.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--grid", type=int, default=120, help="Streets per side of the grid")
+    parser.add_argument("--drivers", type=int, default=20_000)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--landmarks", type=int, default=8)
+    arguments = parser.parse_args()
+    run(arguments.grid, arguments.drivers, arguments.requests, arguments.landmarks)
@@ -0,0 +1,97 @@
+"""
+Surge pricing at peak: the cost of feeding SurgePricingEngine (one counter update per ride
+request or driver availability change), of one timer-driven recompute, and of the lookup
+end_ride does. The lookup is compared with computing the multiplier on each request from the raw
+requests in the rolling window.
+
+Usage: python -m online_cab_booking_system.benchmarks.surge_pricing_benchmark [--drivers 50000] [--requests 60000] [--lookups 20000]
+"""
+import argparse
+import collections
+import math
+import random
+import time
+
+from online_cab_booking_system.models.location import Location
+from online_cab_booking_system.services.surge_pricing import SurgePricingEngine
+
+_SOUTH, _WEST, _SPAN = 12.8, 77.4, 0.4
+_WINDOW = 300.0
+
+
+def _random_location(rng: random.Random) -> Location:
+    return Location(_SOUTH + rng.random() * _SPAN, _WEST + rng.random() * _SPAN)
+
+
+def _per_request_multiplier(requests, drivers, location: Location, now: float, cell_size: float) -> float:
+    """The baseline: count the cell's requests in the window and its drivers on every lookup."""
+    cell = (math.floor(location.get_latitude() / cell_size), math.floor(location.get_longitude() / cell_size))
+    demand = sum(1 for at, request_cell in requests if request_cell == cell and at > now - _WINDOW)
+    supply = sum(1 for driver_cell in drivers.values() if driver_cell == cell)
+    if demand < 3:
+        return 1.0
+    return max(1.0, round(min(3.0, 1 + 0.5 * (demand / max(supply, 1) - 1)), 1))
+
+
+def run(driver_count: int, request_count: int, lookup_count: int):
+    rng = random.Random(42)
+    now = [0.0]
+    engine = SurgePricingEngine(window_seconds=_WINDOW, clock=lambda: now[0])
+    drivers = [(f"D{i}", _random_location(rng)) for i in range(driver_count)]
+    requests = [_random_location(rng) for _ in range(request_count)]
+    lookups = [_random_location(rng) for _ in range(lookup_count)]
+    cell_size = engine._cell_size
+
+    start = time.perf_counter()
+    for driver_id, location in drivers:
+        engine.update_driver(driver_id, location.get_latitude(), location.get_longitude())
+    supply_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i, location in enumerate(requests):
+        now[0] = i * _WINDOW / request_count  # Spread over one window
+        engine.record_request(location)
+    demand_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    engine.recompute()
+    recompute_seconds = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for location in lookups:
+        engine.multiplier_at(location)
+    cached_seconds = time.perf_counter() - start
+
+    raw_requests = collections.deque(
+        (i * _WINDOW / request_count,
+         (math.floor(location.get_latitude() / cell_size), math.floor(location.get_longitude() / cell_size)))
+        for i, location in enumerate(requests))
+    driver_cells = {driver_id: (math.floor(location.get_latitude() / cell_size),
+                                math.floor(location.get_longitude() / cell_size)) for driver_id, location in drivers}
+    sample = lookups[:max(1, lookup_count // 100)]
+    start = time.perf_counter()
+    for location in sample:
+        _per_request_multiplier(raw_requests, driver_cells, location, now[0], cell_size)
+    scan_seconds = (time.perf_counter() - start) / len(sample) * lookup_count
+
+    surging = len(engine._multipliers)
+    print(f"Drivers: {driver_count:,}  requests in the {_WINDOW:g} s window: {request_count:,}  "
+          f"cells surging: {surging:,}  lookups: {lookup_count:,}")
+    print(f"{'operation':<34} {'total (ms)':>11} {'per call (us)':>14}")
+    for name, seconds, calls in [
+        ("update_driver (supply)", supply_seconds, driver_count),
+        ("record_request (demand)", demand_seconds, request_count),
+        ("recompute (timer)", recompute_seconds, 1),
+        ("multiplier_at (cached, end_ride)", cached_seconds, lookup_count),
+        ("per-request scan (baseline)", scan_seconds, lookup_count),
+    ]:
+        print(f"{name:<34} {seconds * 1000:>11.1f} {seconds / calls * 1e6:>14.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--drivers", type=int, default=50_000)
+    parser.add_argument("--requests", type=int, default=60_000, help="Requests in one rolling window")
+    parser.add_argument("--lookups", type=int, default=20_000, help="end_ride multiplier lookups")
+    arguments = parser.parse_args()
+    run(arguments.drivers, arguments.requests, arguments.lookups)
@@ -29,4 +29,15 @@ class InvalidRideStatusError(BookingSystemError):
 
 class DriverNotAvailableError(BookingSystemError):
     """Raised when a driver is not in the AVAILABLE status for a request."""
-    pass
\ No newline at end of file
+    pass
+
+class BatchMatchError(BookingSystemError):
+    """
+    Raised when a batch match fails part way. `rides` are the rides it created before failing (by
+    rider_id); `rider_ids` are the other requests it removed from the queue, which got no ride.
+    """
+
+    def __init__(self, message: str, rider_ids, rides=None):
+        super().__init__(message)
+        self.rider_ids = list(rider_ids)
+        self.rides = dict(rides or {})
\ No newline at end of file
@@ -0,0 +1,80 @@
+# geo.py
+"""
+Great-circle distances, one at a time or batched over contiguous latitude/longitude arrays.
+
+NumPy is optional: when it is installed, LocationArray holds float64 NumPy arrays and
+distances_from is a single vectorized computation; otherwise the same API runs on array('d')
+with a plain loop.
+"""
+import math
+from array import array
+from typing import Iterable, Sequence
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only where NumPy is missing
+    np = None
+
+# Mean Earth radius (IUGG)
+EARTH_RADIUS_KM = 6371.0088
+
+
+def haversine_km(latitude1: float, longitude1: float, latitude2: float, longitude2: float) -> float:
+    """Great-circle distance in kilometres between two points given in degrees."""
+    phi1 = math.radians(latitude1)
+    phi2 = math.radians(latitude2)
+    half_dphi = (phi2 - phi1) / 2
+    half_dlambda = math.radians(longitude2 - longitude1) / 2
+    a = math.sin(half_dphi) ** 2 + math.cos(phi1) * math.cos(phi2) * math.sin(half_dlambda) ** 2
+    return 2 * EARTH_RADIUS_KM * math.asin(min(1.0, math.sqrt(a)))
+
+
+class LocationArray:
+    """
+    Many locations as two contiguous float64 arrays (latitudes, longitudes in degrees) instead of
+    one Location object each; the input distances_from works on.
+    """
+
+    def __init__(self, latitudes: Sequence[float], longitudes: Sequence[float]):
+        if len(latitudes) != len(longitudes):
+            raise ValueError("Latitudes and longitudes must have the same length.")
+        if np is not None:
+            self.latitudes = np.ascontiguousarray(latitudes, dtype=np.float64)
+            self.longitudes = np.ascontiguousarray(longitudes, dtype=np.float64)
+        else:
+            self.latitudes = array("d", latitudes)
+            self.longitudes = array("d", longitudes)
+
+    @classmethod
+    def from_locations(cls, locations: Iterable) -> "LocationArray":
+        locations = list(locations)
+        return cls([location.get_latitude() for location in locations],
+                   [location.get_longitude() for location in locations])
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+
+def distances_from(point, locations: LocationArray):
+    """
+    Great-circle distances in kilometres from `point` (a Location) to every entry of `locations`,
+    in order: a float64 NumPy array when NumPy is available, else an array('d').
+    """
+    latitude, longitude = point.get_latitude(), point.get_longitude()
+    if np is not None:
+        phi1 = math.radians(latitude)
+        phi2 = np.radians(locations.latitudes)
+        a = (np.sin((phi2 - phi1) / 2) ** 2
+             + math.cos(phi1) * np.cos(phi2) * np.sin(np.radians(locations.longitudes - longitude) / 2) ** 2)
+        return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.minimum(a, 1.0)))
+
+    # Pure-Python fallback: the same formula, with the point's terms hoisted out of the loop
+    phi1 = math.radians(latitude)
+    cos_phi1 = math.cos(phi1)
+    radians, sin, cos, asin, sqrt = math.radians, math.sin, math.cos, math.asin, math.sqrt
+    distances = array("d", bytes(8 * len(locations)))
+    for i, (other_latitude, other_longitude) in enumerate(zip(locations.latitudes, locations.longitudes)):
+        phi2 = radians(other_latitude)
+        a = sin((phi2 - phi1) / 2) ** 2 + cos_phi1 * cos(phi2) * sin(radians(other_longitude - longitude) / 2) ** 2
+        distances[i] = 2 * EARTH_RADIUS_KM * asin(min(1.0, sqrt(a)))
+    return distances
@@ -1,7 +1,11 @@
 from online_cab_booking_system.enums.enums import DriverStatus
 from online_cab_booking_system.exceptions import InvalidInputError
 from online_cab_booking_system.models.location import Location
-from typing import Dict
+import threading
+from typing import TYPE_CHECKING, Callable, Dict, Optional
+
+if TYPE_CHECKING:
+    from online_cab_booking_system.services.driver_location_store import DriverLocationStore
 
 class Driver:
 
@@ -24,6 +28,30 @@ class Driver:
         self._vehicle_details = vehicle_details
         self._current_location = current_location
         self._status = status
+        # Serializes status and location changes (and their listener calls), so a status
+        # compare-and-set is atomic and listeners observe changes in the order they happened
+        self._lock = threading.Lock()
+        # Notified after every location or status change, e.g. to keep a spatial index current
+        self._change_listener: Optional[Callable[["Driver"], None]] = None
+        # Once attached, the location lives in the store's arrays (see attach_location_store)
+        self._location_store: Optional["DriverLocationStore"] = None
+        self._location_slot = -1
+
+    def set_change_listener(self, listener: Optional[Callable[["Driver"], None]]):
+        self._change_listener = listener
+
+    def attach_location_store(self, store: "DriverLocationStore", slot: int):
+        """
+        Makes `slot` of `store` the source of truth for this driver's location, so bulk location
+        updates written straight into the store are what get_current_location returns.
+        """
+        store.set_location(slot, self.get_current_location())
+        self._location_store = store
+        self._location_slot = slot
+        self._current_location = None
+
+    def get_location_slot(self) -> int:
+        return self._location_slot
 
     def get_id(self) -> str:
         return self._driver_id
@@ -35,6 +63,8 @@ class Driver:
         return self._vehicle_details
 
     def get_current_location(self) -> Location:
+        if self._location_store is not None:
+            return self._location_store.get_location(self._location_slot)
         return self._current_location
 
     def get_status(self) -> DriverStatus:
@@ -43,13 +73,37 @@ class Driver:
     def update_location(self, location: Location):
         if not isinstance(location, Location):
             raise InvalidInputError("New location must be a Location object.")
-        self._current_location = location
+        with self._lock:
+            if self._location_store is not None:
+                self._location_store.set_location(self._location_slot, location)
+            else:
+                self._current_location = location
+            if self._change_listener is not None:
+                self._change_listener(self)
 
     def update_status(self, status: DriverStatus):
         if not isinstance(status, DriverStatus):
             raise InvalidInputError("New Status must be a Driver Status object.")
-        self._status = status
+        with self._lock:
+            self._status = status
+            if self._change_listener is not None:
+                self._change_listener(self)
+
+    def compare_and_set_status(self, expected: DriverStatus, status: DriverStatus) -> bool:
+        """
+        Atomically changes the status to `status` if it is currently `expected`, e.g. to claim an
+        AVAILABLE driver. Returns whether it did; False means another caller got there first.
+        """
+        if not isinstance(status, DriverStatus):
+            raise InvalidInputError("New Status must be a Driver Status object.")
+        with self._lock:
+            if self._status != expected:
+                return False
+            self._status = status
+            if self._change_listener is not None:
+                self._change_listener(self)
+            return True
 
     def __repr__(self):
         return (f"Driver(ID='{self._driver_id}', Name='{self._name}', "
-                f"Status={self._status.name}, Loc={self._current_location})")
\ No newline at end of file
+                f"Status={self._status.name}, Loc={self.get_current_location()})")
\ No newline at end of file
@@ -1,6 +1,7 @@
 import math
 
 from online_cab_booking_system.exceptions import InvalidInputError
+from online_cab_booking_system.geo import haversine_km
 
 
 class Location:
@@ -26,8 +27,8 @@ class Location:
 
     def get_distance_to(self, other_location) -> float:
         """
-        Calculates the Euclidean distance between two locations.
-        For real-world systems, Haversine formula for spherical distance is used.
+        Calculates the Euclidean distance between two locations, in degrees.
+        This is not a distance on the ground; use get_great_circle_distance_to for kilometres.
         """
         if not isinstance(other_location, Location):
             raise InvalidInputError("Can only calculate distance to another Location object.")
@@ -37,6 +38,16 @@ class Location:
 
         return math.sqrt(xdiff**2 + ydiff**2)
 
+    def get_great_circle_distance_to(self, other_location) -> float:
+        """
+        Calculates the great-circle (Haversine) distance between two locations, in kilometres.
+        """
+        if not isinstance(other_location, Location):
+            raise InvalidInputError("Can only calculate distance to another Location object.")
+
+        return haversine_km(self._latitude, self._longitude,
+                            other_location.get_latitude(), other_location.get_longitude())
+
     def __repr__(self):
         return f"Location(lat={self._latitude:.4f}, lon={self._longitude:.4f})"
 
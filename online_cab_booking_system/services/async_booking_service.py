@@ -0,0 +1,171 @@
+import asyncio
+from concurrent.futures import Executor, ThreadPoolExecutor
+from typing import Callable, Dict, List, Optional, TypeVar
+
+from ..exceptions import BatchMatchError, InvalidInputError, NoDriverFoundError
+from ..models.location import Location
+from ..models.ride import Ride
+from ..services.cab_booking_system import BookingSystem
+from ..services.driver_location_store import LocationPing
+
+T = TypeVar("T")
+
+
+class AsyncBookingService:
+    """
+    asyncio front end over a BookingSystem, for serving many riders and drivers from one event
+    loop. Every call into the BookingSystem runs on a worker pool, so matching never blocks the
+    loop, and the BookingSystem's own locks and driver claims keep concurrent calls consistent.
+    The pool is threads rather than processes because all state lives in the one BookingSystem.
+
+    Backpressure:
+      - At most `max_in_flight` calls run on the pool at once; further callers wait their turn.
+      - Location pings go into a queue of at most `max_queued_pings` and are applied in batches
+        by a background task. report_location() waits while the queue is full, so drivers slow
+        down instead of the backlog growing without bound.
+
+    With `batch_window` set, request_ride() queues the request and resolves when the next batch
+    match (every `batch_window` seconds) assigns a driver; otherwise each request is matched on
+    arrival. Use as `async with AsyncBookingService(system) as service: ...`.
+    """
+
+    def __init__(self, system: BookingSystem, executor: Optional[Executor] = None, max_in_flight: int = 64,
+                 max_queued_pings: int = 50_000, ping_batch_size: int = 5_000, batch_window: Optional[float] = None):
+        if max_in_flight <= 0 or max_queued_pings <= 0 or ping_batch_size <= 0:
+            raise ValueError("Limits must be positive.")
+        if batch_window is not None and batch_window <= 0:
+            raise ValueError("The batch window must be positive.")
+        self._system = system
+        self._owns_executor = executor is None
+        self._executor = executor if executor is not None else ThreadPoolExecutor(thread_name_prefix="booking")
+        self._max_in_flight = max_in_flight
+        self._max_queued_pings = max_queued_pings
+        self._ping_batch_size = ping_batch_size
+        self._batch_window = batch_window
+
+        # Created in start(), inside the running event loop
+        self._admission: Optional[asyncio.Semaphore] = None
+        self._pings: Optional["asyncio.Queue[LocationPing]"] = None
+        self._batch_waiters: Dict[str, "asyncio.Future[Ride]"] = {}  # rider_id -> result of its queued request
+        self._tasks: List[asyncio.Task] = []
+
+        # Totals over the service's lifetime, per ping outcome ("accepted", "stale", "invalid", "unknown")
+        self.ping_counts: Dict[str, int] = {}
+
+    async def start(self):
+        self._admission = asyncio.Semaphore(self._max_in_flight)
+        self._pings = asyncio.Queue(maxsize=self._max_queued_pings)
+        self._tasks.append(asyncio.create_task(self._apply_pings()))
+        if self._batch_window is not None:
+            self._tasks.append(asyncio.create_task(self._match_batches()))
+
+    async def close(self):
+        """Applies the pings still queued, stops the background tasks and fails any waiting batch request."""
+        if self._pings is not None:
+            await self._pings.join()
+        for task in self._tasks:
+            task.cancel()
+        await asyncio.gather(*self._tasks, return_exceptions=True)
+        self._tasks.clear()
+        for future in self._batch_waiters.values():
+            if not future.done():
+                future.set_exception(NoDriverFoundError("The booking service was closed before the request was matched."))
+        self._batch_waiters.clear()
+        if self._owns_executor:
+            self._executor.shutdown(wait=True)
+
+    async def __aenter__(self) -> "AsyncBookingService":
+        await self.start()
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def _call(self, function: Callable[..., T], *args) -> T:
+        """Runs a BookingSystem call on the pool once an admission slot is free."""
+        async with self._admission:
+            return await asyncio.get_running_loop().run_in_executor(self._executor, function, *args)
+
+    # --- Riders ---
+    async def request_ride(self, rider_id: str, pickup_location: Location, dropoff_location: Location) -> Ride:
+        if self._batch_window is None:
+            return await self._call(self._system.request_ride, rider_id, pickup_location, dropoff_location)
+
+        if rider_id in self._batch_waiters:
+            # Checked before registering: replacing the waiter would orphan the first caller's future
+            raise InvalidInputError(f"Rider '{rider_id}' already has a ride request waiting to be matched.")
+        future = asyncio.get_running_loop().create_future()
+        self._batch_waiters[rider_id] = future
+        try:
+            await self._call(self._system.submit_ride_request, rider_id, pickup_location, dropoff_location)
+        except BaseException:
+            if self._batch_waiters.get(rider_id) is future:
+                del self._batch_waiters[rider_id]
+            raise
+        return await future
+
+    async def _match_batches(self):
+        while True:
+            await asyncio.sleep(self._batch_window)
+            if not self._batch_waiters:
+                continue
+            try:
+                rides, unmatched = await self._call(self._system.match_pending_requests)
+            except BatchMatchError as e:
+                # Riders matched before the failure get their rides; fail only the other requests the
+                # batch took off the queue, and keep matching later windows
+                print(e)
+                for rider_id, ride in e.rides.items():
+                    future = self._batch_waiters.pop(rider_id, None)
+                    if future is not None and not future.done():
+                        future.set_result(ride)
+                for rider_id in e.rider_ids:
+                    future = self._batch_waiters.pop(rider_id, None)
+                    if future is not None and not future.done():
+                        # A fresh exception per caller: e's traceback holds this task's live frame, which
+                        # a caller clearing its traceback (e.g. assertRaises) would close
+                        error = BatchMatchError(str(e), [rider_id])
+                        error.__cause__ = e.__cause__
+                        future.set_exception(error)
+                continue
+            except Exception as e:  # Nothing was dequeued; the requests wait for the next window
+                print(f"Batch match failed: {e}")
+                continue
+            for rider_id, ride in rides.items():
+                future = self._batch_waiters.pop(rider_id, None)
+                if future is not None and not future.done():
+                    future.set_result(ride)
+            for rider_id in unmatched:
+                future = self._batch_waiters.pop(rider_id, None)
+                if future is not None and not future.done():
+                    future.set_exception(NoDriverFoundError(f"No available driver found for rider '{rider_id}'."))
+
+    # --- Drivers ---
+    async def report_location(self, driver_id: str, latitude: float, longitude: float, timestamp: float):
+        """Queues a location ping, waiting while the queue is full. Applied with the next batch."""
+        await self._pings.put((driver_id, latitude, longitude, timestamp))
+
+    async def _apply_pings(self):
+        while True:
+            batch = [await self._pings.get()]
+            while len(batch) < self._ping_batch_size and not self._pings.empty():
+                batch.append(self._pings.get_nowait())
+            try:
+                counts = await self._call(self._system.update_driver_locations, batch)
+                for outcome, count in counts.items():
+                    self.ping_counts[outcome] = self.ping_counts.get(outcome, 0) + count
+            except Exception as e:  # Drop this batch but keep applying later ones
+                print(f"Applying {len(batch)} location pings failed: {e}")
+            finally:
+                for _ in batch:
+                    self._pings.task_done()
+
+    # --- Ride Lifecycle Management ---
+    async def driver_arrived_at_pickup(self, ride_id: str):
+        await self._call(self._system.driver_arrived_at_pickup, ride_id)
+
+    async def start_ride(self, ride_id: str):
+        await self._call(self._system.start_ride, ride_id)
+
+    async def end_ride(self, ride_id: str) -> float:
+        return await self._call(self._system.end_ride, ride_id)
@@ -0,0 +1,99 @@
+import heapq
+from typing import Dict, Hashable, List, Optional, Sequence, Tuple
+
+
+def min_cost_matching(candidates: Sequence[Sequence[Tuple[float, Hashable]]]) -> List[Optional[Hashable]]:
+    """
+    Assigns drivers to riders on a sparse candidate graph, minimizing the total cost (e.g. pickup
+    distance). candidates[i] lists rider i's (cost, driver_id) options, such as the k nearest
+    drivers from the spatial index. Returns the driver assigned to each rider, or None.
+
+    This is the Hungarian method in its successive-shortest-path form, run on the sparse graph:
+    riders are added one at a time, and each one triggers a Dijkstra search over alternating
+    paths, using node potentials so that reduced costs stay non-negative. The search stops at
+    the first free driver it reaches. A rider may take a driver away from an earlier rider, as
+    long as that rider can be re-matched more cheaply elsewhere. Most riders' nearest driver is
+    still free, so most searches stop almost at once.
+
+    The result always matches as many riders as possible. When every rider can be matched, its
+    total cost is the minimum. When drivers are short, earlier riders take priority (riders
+    that cannot be reached stay unmatched), and the total cost is the minimum for the riders
+    who were matched.
+    """
+    rider_potentials = [0.0] * len(candidates)
+    driver_potentials: Dict[Hashable, float] = {}  # Free drivers keep potential 0 throughout
+    rider_match: List[Optional[Hashable]] = [None] * len(candidates)
+    rider_match_cost = [0.0] * len(candidates)
+    driver_match: Dict[Hashable, int] = {}
+
+    for source, options in enumerate(candidates):
+        if not options:
+            continue
+        # Start the new rider at a potential that keeps its outgoing reduced costs non-negative.
+        rider_potentials[source] = max(driver_potentials.get(driver_id, 0.0) - cost for cost, driver_id in options)
+
+        rider_distance = {source: 0.0}
+        driver_distance: Dict[Hashable, float] = {}
+        driver_previous: Dict[Hashable, int] = {}  # driver -> rider it was reached from
+        finalized: List[Tuple[bool, Hashable, float]] = []  # (is_driver, node, distance)
+        done_riders = set()
+        done_drivers = set()
+        heap: List[Tuple[float, int, object]] = [(0.0, 0, source)]  # (distance, 0 = rider / 1 = driver, node)
+        end: Optional[Hashable] = None
+
+        while heap:
+            distance, is_driver, node = heapq.heappop(heap)
+            if is_driver:
+                if node in done_drivers:
+                    continue
+                done_drivers.add(node)
+                finalized.append((True, node, distance))
+                owner = driver_match.get(node)
+                if owner is None:
+                    end = node
+                    break
+                # The only residual edge out of a matched driver leads back to its rider.
+                reduced = -rider_match_cost[owner] + driver_potentials.get(node, 0.0) - rider_potentials[owner]
+                candidate = distance + max(reduced, 0.0)
+                if owner not in done_riders and candidate < rider_distance.get(owner, float("inf")):
+                    rider_distance[owner] = candidate
+                    heapq.heappush(heap, (candidate, 0, owner))
+            else:
+                if node in done_riders:
+                    continue
+                done_riders.add(node)
+                finalized.append((False, node, distance))
+                for cost, driver_id in candidates[node]:
+                    if driver_id == rider_match[node] or driver_id in done_drivers:
+                        continue
+                    reduced = cost + rider_potentials[node] - driver_potentials.get(driver_id, 0.0)
+                    candidate = distance + max(reduced, 0.0)  # Clamp float noise
+                    if candidate < driver_distance.get(driver_id, float("inf")):
+                        driver_distance[driver_id] = candidate
+                        driver_previous[driver_id] = node
+                        heapq.heappush(heap, (candidate, 1, driver_id))
+
+        if end is None:
+            continue  # No augmenting path: this rider stays unmatched
+
+        # Update potentials of every node settled before the free driver was reached.
+        end_distance = driver_distance.get(end, 0.0)
+        for is_driver, node, distance in finalized:
+            if is_driver:
+                driver_potentials[node] = driver_potentials.get(node, 0.0) + distance - end_distance
+            else:
+                rider_potentials[node] += distance - end_distance
+
+        # Flip the alternating path: every rider on it takes the driver it was reached through.
+        driver_id = end
+        while True:
+            rider = driver_previous[driver_id]
+            previous_driver = rider_match[rider]
+            rider_match[rider] = driver_id
+            rider_match_cost[rider] = next(cost for cost, option in candidates[rider] if option == driver_id)
+            driver_match[driver_id] = rider
+            if rider == source:
+                break
+            driver_id = previous_driver
+
+    return rider_match
@@ -1,5 +1,7 @@
 import datetime
-from typing import Dict, List, Optional, Any
+import itertools
+import threading
+from typing import Dict, Iterable, List, Optional, Any, Tuple
 import collections # For defaultdict
 
 # Import local modules
@@ -7,47 +9,91 @@ from ..enums.enums import DriverStatus, RideStatus
 from ..exceptions import (
     InvalidInputError, DriverNotFoundError, RiderNotFoundError,
     NoDriverFoundError, RideNotFoundError, InvalidRideStatusError,
-    DriverNotAvailableError
+    DriverNotAvailableError, BatchMatchError
 )
 from ..models.location import Location
 from ..models.driver import Driver
 from ..models.rider import Rider
 from ..models.ride import Ride
 from ..services.farecalulator import FareCalculator
+from ..services.spatial_index import DriverSpatialIndex
+from ..services.driver_location_store import DriverLocationStore, LocationPing
+from ..services.batch_matcher import min_cost_matching
+from ..services.locking import ShardedLock
+from ..services.ride_archive import RideArchive
+from ..services.surge_pricing import SurgePricingEngine
+from ..services.road_network import RoadNetworkOracle
 
 
 class BookingSystem:
     # Define a reasonable matching radius for finding drivers
     _MATCHING_RADIUS_KM = 5.0  # Drivers within 5 km of pickup location
+    _BATCH_CANDIDATES_PER_REQUEST = 8  # Nearest drivers considered per request in batch matching
+    _CLAIM_ATTEMPTS = 3  # Spatial index queries per request before giving up on contended drivers
 
-    def __init__(self):
+    def __init__(self, ride_archive: Optional[RideArchive] = None, surge_pricing: Optional[SurgePricingEngine] = None,
+                 road_network: Optional[RoadNetworkOracle] = None):
         self._drivers: Dict[str, Driver] = {}  # driver_id -> Driver object
         self._riders: Dict[str, Rider] = {}  # rider_id -> Rider object
         self._active_rides: Dict[str, Ride] = {}  # ride_id -> Ride object (for MATCHED, ARRIVED, IN_PROGRESS rides)
+        # COMPLETED rides, partitioned by day (pass a RideArchive with a spill directory to keep old days on disk)
+        self._completed_rides = ride_archive if ride_archive is not None else RideArchive()
 
         # Mappings for quick lookup
         self._driver_to_active_ride: Dict[str, str] = {}  # driver_id -> ride_id
         self._rider_to_active_ride: Dict[str, str] = {}  # rider_id -> ride_id
-
-        self._next_ride_id_counter = 1
+        # Requests waiting for the next batch match, in arrival order: rider_id -> (pickup, dropoff)
+        self._pending_requests: Dict[str, Tuple[Location, Location]] = {}
+
+        # Every driver's location as struct-of-arrays, and the AVAILABLE drivers indexed over it,
+        # kept current through each driver's change listener and the bulk ping path
+        self._driver_locations = DriverLocationStore()
+        self._available_index = DriverSpatialIndex(store=self._driver_locations)
+        # Demand (ride requests) and supply (AVAILABLE drivers) per cell; call start() on it to
+        # refresh multipliers on a timer, otherwise fares are never surged
+        self._surge_pricing = surge_pricing if surge_pricing is not None else SurgePricingEngine()
+        # With a road network, candidates are ranked by road travel time and fares use road
+        # distance; without one, both fall back to great-circle distance
+        self._road_network = road_network
+
+        # Driver counts per status and the AVAILABLE drivers in the order they became available,
+        # kept current through the change listener so the overview and listings never scan all drivers
+        self._overview_lock = threading.Lock()
+        self._status_of: Dict[str, DriverStatus] = {}  # driver_id -> status last counted
+        self._status_counts: Dict[DriverStatus, int] = {status: 0 for status in DriverStatus}
+        self._available_drivers: Dict[str, None] = {}  # Insertion-ordered set of driver_ids
+
+        # Concurrency: drivers are claimed by a compare-and-set on their status, so no lock is held
+        # across matching. A rider's requests serialize on the rider's shard and a ride's lifecycle
+        # on the ride's shard, so unrelated riders and rides proceed in parallel.
+        self._registration_lock = threading.Lock()
+        self._rider_locks = ShardedLock()
+        self._ride_locks = ShardedLock()
+        self._pending_lock = threading.Lock()  # Guards _pending_requests
+        self._batch_lock = threading.Lock()  # One batch match at a time
+
+        self._ride_ids = itertools.count(1)  # next() is atomic, so ids stay unique across threads
 
         print("Cab Booking System Initialized.")
 
     def _generate_ride_id(self) -> str:
         """Generates a unique ride ID."""
-        new_id = f"RIDE_{self._next_ride_id_counter:05d}"
-        self._next_ride_id_counter += 1
-        return new_id
+        return f"RIDE_{next(self._ride_ids):05d}"
 
     # --- Driver Management ---
     def register_driver(self, driver_id: str, name: str, vehicle_details: Dict[str, str],
                         current_location: Location, status: DriverStatus = DriverStatus.AVAILABLE):
         """Registers a new driver."""
-        if driver_id in self._drivers:
-            raise InvalidInputError(f"Driver with ID '{driver_id}' already exists.")
-
-        driver = Driver(driver_id, name, vehicle_details, current_location, status)
-        self._drivers[driver_id] = driver
+        with self._registration_lock:
+            if driver_id in self._drivers:
+                raise InvalidInputError(f"Driver with ID '{driver_id}' already exists.")
+
+            driver = Driver(driver_id, name, vehicle_details, current_location, status)
+            driver.attach_location_store(self._driver_locations, self._driver_locations.add(driver_id, current_location))
+            # Registered before it can be indexed or listed, so lookups by the listed id never miss
+            self._drivers[driver_id] = driver
+            driver.set_change_listener(self._on_driver_changed)
+            self._on_driver_changed(driver)
         print(f"Driver '{name}' ({driver_id}) registered.")
         return driver
 
@@ -60,24 +106,197 @@ class BookingSystem:
         driver.update_location(new_location)
         print(f"Driver '{driver_id}' location updated to {new_location}.")
 
+    def update_driver_locations(self, batch: Iterable[LocationPing]) -> Dict[str, int]:
+        """
+        Bulk ingestion of (driver_id, latitude, longitude, timestamp) pings, e.g. one batch per
+        few hundred milliseconds from the location gateway. Each ping is written straight into
+        the struct-of-arrays store, without a Location object or a log line; pings from unknown
+        drivers, with invalid coordinates, or older than the driver's latest ping are dropped.
+        Only AVAILABLE drivers that crossed into another grid cell touch the spatial index, and
+        the AVAILABLE drivers that moved are passed to surge pricing as one batch to keep its
+        supply counts current. Returns the number of pings accepted and dropped per reason.
+        """
+        moved, counts = self._driver_locations.apply_pings(batch)
+        available = self._available_index.refresh_slots(moved)
+        if available:
+            store = self._driver_locations
+            driver_ids, latitudes, longitudes = store.driver_ids, store.latitudes, store.longitudes
+            self._surge_pricing.move_drivers((driver_ids[slot], latitudes[slot], longitudes[slot])
+                                             for slot in available)
+        return counts
+
+    def _on_driver_changed(self, driver: Driver):
+        """Keeps the spatial index, surge supply and status counts in step with a driver's status and location."""
+        slot = driver.get_location_slot()
+        status = driver.get_status()
+        driver_id = driver.get_id()
+        with self._overview_lock:
+            previous = self._status_of.get(driver_id)
+            if status != previous:
+                if previous is not None:
+                    self._status_counts[previous] -= 1
+                self._status_counts[status] += 1
+                self._status_of[driver_id] = status
+                if status == DriverStatus.AVAILABLE:
+                    self._available_drivers[driver_id] = None
+                elif previous == DriverStatus.AVAILABLE:
+                    del self._available_drivers[driver_id]
+
+        if status == DriverStatus.AVAILABLE:
+            self._available_index.add_slot(slot)
+            self._surge_pricing.update_driver(driver.get_id(), self._driver_locations.latitudes[slot],
+                                              self._driver_locations.longitudes[slot])
+        else:
+            self._available_index.remove_slot(slot)
+            self._surge_pricing.remove_driver(driver.get_id())
+
         # --- Rider Management ---
 
     def register_rider(self, rider_id: str, name: str):
         """Registers a new rider."""
-        if rider_id in self._riders:
-            raise InvalidInputError(f"Rider with ID '{rider_id}' already exists.")
+        with self._registration_lock:
+            if rider_id in self._riders:
+                raise InvalidInputError(f"Rider with ID '{rider_id}' already exists.")
 
-        rider = Rider(rider_id, name)
-        self._riders[rider_id] = rider
+            rider = Rider(rider_id, name)
+            self._riders[rider_id] = rider
         print(f"Rider '{name}' ({rider_id}) registered.")
         return rider
 
     # --- Ride Booking ---
     def request_ride(self, rider_id: str, pickup_location: Location, dropoff_location: Location) -> Ride:
         """
-        Rider requests a ride. System finds closest available driver.
-        Returns the created Ride object.
+        Rider requests a ride. System finds closest available driver (by road travel time when a
+        road network is configured). Returns the created Ride object.
+
+        Safe to call from many threads: the closest driver is claimed with a compare-and-set on
+        its status, and if another request claimed it first, the next nearest candidate is tried.
+        """
+        with self._rider_locks.for_key(rider_id):
+            rider = self._validate_ride_request(rider_id)
+            self._surge_pricing.record_request(pickup_location)
+
+            # Try the closest available driver in range (ties broken by driver ID); if another
+            # request claims it first, widen to the next nearest candidates
+            for attempt in range(self._CLAIM_ATTEMPTS):
+                # Ranking by ETA needs several candidates even on the first attempt
+                k = 1 if attempt == 0 and self._road_network is None else self._BATCH_CANDIDATES_PER_REQUEST
+                nearest = self._match_candidates(pickup_location, k)
+                if not nearest:
+                    break
+                for _, driver_id in nearest:
+                    new_ride = self._claim_driver_for_ride(rider, self._drivers[driver_id], pickup_location,
+                                                           dropoff_location)
+                    if new_ride is not None:
+                        print(f"Ride {new_ride.get_id()} requested by {rider.get_name()}. "
+                              f"Matched with Driver {self._drivers[driver_id].get_name()}.")
+                        return new_ride
+
+            raise NoDriverFoundError(
+                f"No available drivers found within {self._MATCHING_RADIUS_KM} km of {pickup_location}.")
+
+    def submit_ride_request(self, rider_id: str, pickup_location: Location, dropoff_location: Location):
+        """
+        Queues a ride request for the next match_pending_requests() call instead of matching it
+        greedily on arrival. Validated like request_ride.
+        """
+        if not isinstance(pickup_location, Location) or not isinstance(dropoff_location, Location):
+            raise InvalidInputError("Pickup and dropoff locations must be Location objects.")
+        with self._rider_locks.for_key(rider_id):
+            self._validate_ride_request(rider_id)
+            self._surge_pricing.record_request(pickup_location)
+            with self._pending_lock:
+                self._pending_requests[rider_id] = (pickup_location, dropoff_location)
+
+    def match_pending_requests(self) -> Tuple[Dict[str, Ride], List[str]]:
         """
+        Matches every queued request at once; meant to be called once per collection window
+        (e.g. every 2 seconds at peak). Each request's nearest available drivers within the
+        matching radius form a sparse candidate graph, and drivers are assigned by a min-cost
+        matching that minimizes the total pickup distance over the batch, rather than giving each
+        rider the closest driver still free when their turn comes.
+
+        Where riders crowd around a hotspot their candidate lists overlap, so some go unmatched in
+        a round; those are retried with their next nearest drivers (the matched ones have left the
+        index) until a round matches nobody.
+
+        Returns (rides by rider_id, rider_ids with no driver in range). The queue is emptied
+        either way; unmatched riders may submit again. If matching fails part way,
+        BatchMatchError carries the rides already created and the dequeued riders left without
+        one, so each caller can be told which.
+
+        Drivers are claimed with the same compare-and-set as request_ride, so concurrent greedy
+        requests may take a driver the matching assigned; that rider is retried in the next round.
+        Requests stay queued until the batch finishes, so their riders cannot request meanwhile.
+        """
+        with self._batch_lock:
+            with self._pending_lock:
+                requests = dict(self._pending_requests)
+            rides: Dict[str, Ride] = {}  # Filled as drivers are claimed, so it survives a failure
+            try:
+                return self._match_requests(requests, rides)
+            except Exception as e:
+                raise BatchMatchError(f"Batch match of {len(requests)} requests failed: {e}",
+                                      [rider_id for rider_id in requests if rider_id not in rides], rides) from e
+            finally:
+                with self._pending_lock:
+                    for rider_id in requests:
+                        del self._pending_requests[rider_id]
+
+    def _match_requests(self, requests: Dict[str, Tuple[Location, Location]],
+                        rides: Dict[str, Ride]) -> Tuple[Dict[str, Ride], List[str]]:
+        remaining = list(requests.items())
+        while remaining:
+            candidates = [
+                self._match_candidates(pickup_location, self._BATCH_CANDIDATES_PER_REQUEST)
+                for pickup_location, _ in (request for _, request in remaining)
+            ]
+            assignment = min_cost_matching(candidates)
+
+            unmatched = []
+            for (rider_id, (pickup_location, dropoff_location)), options, driver_id in zip(remaining, candidates, assignment):
+                if driver_id is not None:
+                    ride = self._claim_driver_for_ride(self._riders[rider_id], self._drivers[driver_id],
+                                                       pickup_location, dropoff_location)
+                    if ride is not None:
+                        rides[rider_id] = ride
+                        continue
+                if options:  # Outbid this round (or the driver was claimed elsewhere), but drivers remain in range
+                    unmatched.append((rider_id, (pickup_location, dropoff_location)))
+            if len(unmatched) == len(remaining):
+                break
+            remaining = unmatched
+
+        print(f"Batch match: {len(rides)} of {len(requests)} requests matched.")
+        return rides, [rider_id for rider_id in requests if rider_id not in rides]
+
+    def _match_candidates(self, pickup_location: Location, k: int) -> List[Tuple[float, str]]:
+        """
+        Up to k (cost, driver_id) pairs for a pickup, cheapest first: the k nearest available
+        drivers within the matching radius, costed by great-circle km. With a road network the
+        cost is the road travel time in seconds instead, so a driver across a river ranks behind
+        one slightly farther away on the same bank; drivers with no road route are dropped.
+        """
+        nearest = self._available_index.nearest(pickup_location, k=k, radius_km=self._MATCHING_RADIUS_KM)
+        if self._road_network is None:
+            return nearest
+        ranked = []
+        for distance, driver_id in nearest:
+            route = self._road_network.route(self._drivers[driver_id].get_current_location(), pickup_location)
+            if route is not None:
+                ranked.append((route.seconds, distance, driver_id))
+        ranked.sort()
+        return [(seconds, driver_id) for seconds, _, driver_id in ranked]
+
+    def _trip_distance_km(self, pickup_location: Location, dropoff_location: Location) -> float:
+        """The distance a fare is charged for: by road if a road network is configured and has a route."""
+        if self._road_network is not None:
+            route = self._road_network.route(pickup_location, dropoff_location)
+            if route is not None:
+                return route.km
+        return pickup_location.get_great_circle_distance_to(dropoff_location)
+
+    def _validate_ride_request(self, rider_id: str) -> Rider:
         rider = self._riders.get(rider_id)
         if not rider:
             raise RiderNotFoundError(f"Rider with ID '{rider_id}' not found.")
@@ -85,74 +304,65 @@ class BookingSystem:
         if rider_id in self._rider_to_active_ride:
             raise InvalidInputError(
                 f"Rider '{rider_id}' already has an active ride ({self._rider_to_active_ride[rider_id]}).")
+        if rider_id in self._pending_requests:
+            raise InvalidInputError(f"Rider '{rider_id}' already has a ride request waiting to be matched.")
+        return rider
 
-        closest_driver: Optional[Driver] = None
-        min_distance = float('inf')
-
-        # Find the closest available driver (O(N) scan)
-        available_drivers_in_range: List[Driver] = []
-        for driver_id, driver in self._drivers.items():
-            if driver.get_status() == DriverStatus.AVAILABLE:
-                distance = driver.get_current_location().get_distance_to(pickup_location)
-                if distance <= self._MATCHING_RADIUS_KM:
-                    available_drivers_in_range.append(driver)
-
-        # Apply tie-breaker: sort by distance, then by driver ID for determinism
-        available_drivers_in_range.sort(
-            key=lambda d: (d.get_current_location().get_distance_to(pickup_location), d.get_id()))
-
-        if not available_drivers_in_range:
-            raise NoDriverFoundError(
-                f"No available drivers found within {self._MATCHING_RADIUS_KM} km of {pickup_location}.")
-
-        closest_driver = available_drivers_in_range[0]
+    def _claim_driver_for_ride(self, rider: Rider, driver: Driver, pickup_location: Location,
+                               dropoff_location: Location) -> Optional[Ride]:
+        """
+        Claims the driver if still AVAILABLE and assigns them to a new MATCHED ride, recorded as
+        active. Returns None if another request claimed the driver first.
+        """
+        if not driver.compare_and_set_status(DriverStatus.AVAILABLE, DriverStatus.EN_ROUTE_TO_PICKUP):
+            return None
 
-        # Assign driver and create ride
         ride_id = self._generate_ride_id()
-        new_ride = Ride(ride_id, rider_id, closest_driver.get_id(), pickup_location, dropoff_location)
+        new_ride = Ride(ride_id, rider.get_id(), driver.get_id(), pickup_location, dropoff_location)
         new_ride.set_status(RideStatus.MATCHED)
 
-        # Update driver status
-        closest_driver.update_status(DriverStatus.EN_ROUTE_TO_PICKUP)
-
         # Store ride in active rides and mappings
         self._active_rides[ride_id] = new_ride
-        self._driver_to_active_ride[closest_driver.get_id()] = ride_id
-        self._rider_to_active_ride[rider_id] = ride_id
-
-        print(f"Ride {ride_id} requested by {rider.get_name()}. Matched with Driver {closest_driver.get_name()}.")
+        self._driver_to_active_ride[driver.get_id()] = ride_id
+        self._rider_to_active_ride[rider.get_id()] = ride_id
         return new_ride
 
         # --- Ride Lifecycle Management ---
     def driver_arrived_at_pickup(self, ride_id: str):
             """Driver signals arrival at pickup location."""
-            ride = self._active_rides.get(ride_id)
-            if not ride:
-                raise RideNotFoundError(f"Ride with ID '{ride_id}' not found or already completed/cancelled.")
+            with self._ride_locks.for_key(ride_id):
+                ride = self._active_rides.get(ride_id)
+                if not ride:
+                    raise RideNotFoundError(f"Ride with ID '{ride_id}' not found or already completed/cancelled.")
 
-            if ride.get_status() != RideStatus.MATCHED:
-                raise InvalidRideStatusError(
-                    f"Ride '{ride_id}' cannot arrive from status {ride.get_status().name}. Expected {RideStatus.MATCHED.name}.")
+                if ride.get_status() != RideStatus.MATCHED:
+                    raise InvalidRideStatusError(
+                        f"Ride '{ride_id}' cannot arrive from status {ride.get_status().name}. Expected {RideStatus.MATCHED.name}.")
 
-            ride.set_status(RideStatus.ARRIVED_AT_PICKUP)
+                ride.set_status(RideStatus.ARRIVED_AT_PICKUP)
             print(f"Ride {ride_id}: Driver {ride.get_driver_id()} has arrived at pickup.")
 
     def start_ride(self, ride_id: str):
         """Driver signals the ride has started."""
-        ride = self._active_rides.get(ride_id)
-        if not ride:
-            raise RideNotFoundError(f"Ride with ID '{ride_id}' not found or already completed/cancelled.")
+        with self._ride_locks.for_key(ride_id):
+            ride = self._active_rides.get(ride_id)
+            if not ride:
+                raise RideNotFoundError(f"Ride with ID '{ride_id}' not found or already completed/cancelled.")
 
-        if ride.get_status() != RideStatus.ARRIVED_AT_PICKUP:
-            raise InvalidRideStatusError(
-                f"Ride '{ride_id}' cannot start from status {ride.get_status().name}. Expected {RideStatus.ARRIVED_AT_PICKUP.name}.")
+            if ride.get_status() != RideStatus.ARRIVED_AT_PICKUP:
+                raise InvalidRideStatusError(
+                    f"Ride '{ride_id}' cannot start from status {ride.get_status().name}. Expected {RideStatus.ARRIVED_AT_PICKUP.name}.")
 
-        ride.set_status(RideStatus.IN_PROGRESS)
-        ride.set_start_time(datetime.datetime.now())  # Record actual ride start time
+            ride.set_status(RideStatus.IN_PROGRESS)
+            ride.set_start_time(datetime.datetime.now())  # Record actual ride start time
         print(f"Ride {ride_id}: Ride started with driver {ride.get_driver_id()}.")
 
     def end_ride(self, ride_id: str):
         """Driver signals the ride has ended at the dropoff location."""
+        with self._ride_locks.for_key(ride_id):
+            return self._end_ride(ride_id)
+
+    def _end_ride(self, ride_id: str):
         ride = self._active_rides.get(ride_id)
         if not ride:
             raise RideNotFoundError(f"Ride with ID '{ride_id}' not found or already completed/cancelled.")
@@ -165,7 +375,7 @@ class BookingSystem:
         ride.set_end_time(datetime.datetime.now())  # Record actual ride end time
 
         # Calculate fare
-        distance_traveled = ride.get_pickup_location().get_distance_to(ride.get_dropoff_location())
+        distance_traveled = self._trip_distance_km(ride.get_pickup_location(), ride.get_dropoff_location())
 
         # Ensure start_time is set before calculating duration
         if not ride.get_start_time():
@@ -177,36 +387,50 @@ class BookingSystem:
 
         duration_minutes = duration_seconds / 60.0
 
-        fare = FareCalculator.calculate_fare(distance_traveled, duration_minutes)
+        # The pickup cell's cached surge multiplier: a dict lookup, recomputed only on the pricing timer
+        surge_multiplier = self._surge_pricing.multiplier_at(ride.get_pickup_location())
+        fare = FareCalculator.calculate_fare(distance_traveled, duration_minutes, surge_multiplier)
         ride.set_fare(fare)
 
-        # Update driver status and location
-        driver = self._drivers.get(ride.get_driver_id())
-        if driver:  # Should always exist, but defensive check
-            driver.update_status(DriverStatus.AVAILABLE)
-            driver.update_location(ride.get_dropoff_location())
+        # Archive the ride before it leaves the active rides, so get_ride_status always finds it
+        self._completed_rides.add(ride, distance_traveled, duration_minutes)
 
         # Clean up active ride mappings
+        driver = self._drivers.get(ride.get_driver_id())
         del self._active_rides[ride_id]
         if driver:
             del self._driver_to_active_ride[driver.get_id()]
         del self._rider_to_active_ride[ride.get_rider_id()]
 
+        # Update driver location and status. AVAILABLE comes last: from then on another request
+        # may claim the driver, and its new mapping must not be the one deleted above.
+        if driver:  # Should always exist, but defensive check
+            driver.update_location(ride.get_dropoff_location())
+            driver.update_status(DriverStatus.AVAILABLE)
+
         print(
             f"Ride {ride_id} completed. Fare: ${fare:.2f}. Driver {driver.get_name()} now AVAILABLE at {driver.get_current_location()}.")
         return fare
 
         # --- Querying/Reporting ---
     def get_ride_status(self, ride_id: str) -> Ride:
-            """Returns the current status of a ride."""
+            """Returns the current status of a ride, active or completed."""
             ride = self._active_rides.get(ride_id)
             if not ride:
                 # Check if it was a completed ride
-                # For simplicity, if not active, we assume it's not found by ID.
-                # In a real system, you'd have _completed_rides and search there too.
-                raise RideNotFoundError(f"Ride with ID '{ride_id}' not found or not active.")
+                ride = self._completed_rides.get_ride(ride_id)
+            if not ride:
+                raise RideNotFoundError(f"Ride with ID '{ride_id}' not found.")
             return ride
 
+    def get_surge_pricing(self) -> SurgePricingEngine:
+            """The surge pricing engine, e.g. to start() its refresh timer or read multipliers."""
+            return self._surge_pricing
+
+    def get_ride_history(self) -> RideArchive:
+            """The archive of completed rides, for queries by rider, driver or time and for aggregations."""
+            return self._completed_rides
+
     def get_driver_status(self, driver_id: str) -> Dict[str, Any]:
             """Returns a driver's current status and last known location."""
             driver = self._drivers.get(driver_id)
@@ -221,24 +445,47 @@ class BookingSystem:
                 "current_ride_id": self._driver_to_active_ride.get(driver_id)
             }
 
-    def list_available_drivers(self) -> List[Dict[str, Any]]:
-            """Returns a list of all drivers currently marked as AVAILABLE."""
+    def list_available_drivers(self, offset: int = 0, limit: Optional[int] = None,
+                               near: Optional[Location] = None) -> List[Dict[str, Any]]:
+            """
+            Returns one page of the drivers currently marked as AVAILABLE: `limit` drivers (all
+            by default) after skipping `offset`. Drivers are listed in the order they became
+            available, or nearest first with a "distance_km" entry if `near` is given. A page
+            costs O(offset + limit), however many drivers are available.
+            """
+            if offset < 0 or (limit is not None and limit < 0):
+                raise InvalidInputError("Offset and limit must be non-negative.")
+            if near is not None:
+                k = offset + limit if limit is not None else len(self._available_index)
+                page = [(driver_id, distance) for distance, driver_id in self._available_index.nearest(near, k=k)[offset:]]
+            else:
+                stop = offset + limit if limit is not None else None
+                with self._overview_lock:
+                    page = [(driver_id, None) for driver_id in itertools.islice(self._available_drivers, offset, stop)]
+
             available_drivers = []
-            for driver_id, driver in self._drivers.items():
-                if driver.get_status() == DriverStatus.AVAILABLE:
-                    available_drivers.append({
-                        "driver_id": driver.get_id(),
-                        "name": driver.get_name(),
-                        "location": driver.get_current_location()
-                    })
+            for driver_id, distance in page:
+                driver = self._drivers[driver_id]
+                entry = {
+                    "driver_id": driver.get_id(),
+                    "name": driver.get_name(),
+                    "location": driver.get_current_location()
+                }
+                if near is not None:
+                    entry["distance_km"] = distance
+                available_drivers.append(entry)
             return available_drivers
 
+    def get_driver_status_counts(self) -> Dict[str, int]:
+            """Number of registered drivers in each status, by status name."""
+            with self._overview_lock:
+                return {status.name: count for status, count in self._status_counts.items()}
+
     def get_system_overview(self) -> Dict[str, int]:
-            """Provides a high-level overview of the system's state."""
+            """Provides a high-level overview of the system's state, in O(1)."""
             return {
                 "total_drivers": len(self._drivers),
                 "total_riders": len(self._riders),
                 "active_rides": len(self._active_rides),
-                "available_drivers": len(
-                    [d for d in self._drivers.values() if d.get_status() == DriverStatus.AVAILABLE])
+                "available_drivers": self._status_counts[DriverStatus.AVAILABLE]
             }
\ No newline at end of file
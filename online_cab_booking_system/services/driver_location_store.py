@@ -0,0 +1,84 @@
+import math
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from online_cab_booking_system.models.location import Location
+
+# (driver_id, latitude, longitude, timestamp in seconds) as sent by the driver app
+LocationPing = Tuple[str, float, float, float]
+
+
+class DriverLocationStore:
+    """
+    Every driver's last known location as struct-of-arrays: each driver is interned once to a
+    slot, and slot i's latitude, longitude and ping timestamp live at index i of three contiguous
+    float arrays. A ping then costs two float stores instead of a new Location object, and a
+    batch of candidates can be read straight into a LocationArray.
+    """
+
+    def __init__(self):
+        self._slot_of: Dict[str, int] = {}  # driver_id -> slot
+        self.driver_ids: List[str] = []  # slot -> driver_id
+        self.latitudes = array("d")
+        self.longitudes = array("d")
+        self.timestamps = array("d")  # Latest accepted ping per slot; -inf until the first one
+
+    def __len__(self) -> int:
+        return len(self.driver_ids)
+
+    def add(self, driver_id: str, location: Location) -> int:
+        """Interns a driver at its initial location and returns its slot."""
+        slot = self._slot_of.get(driver_id)
+        if slot is None:
+            slot = len(self.driver_ids)
+            self.driver_ids.append(driver_id)
+            self.latitudes.append(location.get_latitude())
+            self.longitudes.append(location.get_longitude())
+            self.timestamps.append(-math.inf)
+            self._slot_of[driver_id] = slot
+        else:
+            self.set_location(slot, location)
+        return slot
+
+    def slot_of(self, driver_id: str) -> Optional[int]:
+        return self._slot_of.get(driver_id)
+
+    def get_location(self, slot: int) -> Location:
+        return Location(self.latitudes[slot], self.longitudes[slot])
+
+    def set_location(self, slot: int, location: Location):
+        """An authoritative move (e.g. to a ride's dropoff); the last ping timestamp is kept."""
+        self.latitudes[slot] = location.get_latitude()
+        self.longitudes[slot] = location.get_longitude()
+
+    def apply_pings(self, pings: Iterable[LocationPing]) -> Tuple[List[int], Dict[str, int]]:
+        """
+        Applies a batch of pings in one pass. Pings from unknown drivers, with out-of-range
+        coordinates, or not newer than the driver's latest accepted ping (out of order or
+        duplicated) are dropped. Returns the slots that moved and counts per outcome.
+        """
+        slot_of = self._slot_of
+        latitudes, longitudes, timestamps = self.latitudes, self.longitudes, self.timestamps
+        moved: List[int] = []
+        unknown = invalid = stale = 0
+        for driver_id, latitude, longitude, timestamp in pings:
+            slot = slot_of.get(driver_id)
+            if slot is None:
+                unknown += 1
+                continue
+            try:
+                # Chained comparisons are False for NaN, so NaN coordinates are rejected too
+                if not (-90 <= latitude <= 90 and -180 <= longitude <= 180):
+                    invalid += 1
+                    continue
+                if not timestamp > timestamps[slot]:
+                    stale += 1
+                    continue
+            except TypeError:
+                invalid += 1
+                continue
+            latitudes[slot] = latitude
+            longitudes[slot] = longitude
+            timestamps[slot] = timestamp
+            moved.append(slot)
+        return moved, {"accepted": len(moved), "stale": stale, "invalid": invalid, "unknown": unknown}
@@ -8,12 +8,14 @@ class FareCalculator:
     RATE_PER_MINUTE = 0.2  # Rate per minute
 
     @staticmethod
-    def calculate_fare(distance_km: float, duration_minutes: float) -> float:
+    def calculate_fare(distance_km: float, duration_minutes: float, surge_multiplier: float = 1.0) -> float:
         """
-        Calculates the ride fare based on distance and duration.
+        Calculates the ride fare based on distance and duration, scaled by the surge multiplier.
         """
         if distance_km < 0 or duration_minutes < 0:
             raise ValueError("Distance and duration must be non-negative.")
+        if surge_multiplier < 1:
+            raise ValueError("Surge multiplier cannot be below 1.")
 
         # Ensure minimums for calculation if values are very small but positive
         distance_km = max(0.0, distance_km)
@@ -22,6 +24,7 @@ class FareCalculator:
         fare = FareCalculator.BASE_FARE + \
                (distance_km * FareCalculator.RATE_PER_KM) + \
                (duration_minutes * FareCalculator.RATE_PER_MINUTE)
+        fare *= surge_multiplier
 
         # Round to 2 decimal places for currency
         return round(fare, 2)
\ No newline at end of file
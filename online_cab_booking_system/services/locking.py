@@ -0,0 +1,18 @@
+import threading
+from typing import Hashable, List
+
+
+class ShardedLock:
+    """
+    A fixed set of mutexes, each guarding the keys that hash to it. Operations on different keys
+    mostly take different locks and so do not serialize on one global lock, while operations on
+    the same key always meet on the same lock. Hold at most one shard of a given ShardedLock at a time.
+    """
+
+    def __init__(self, shard_count: int = 64):
+        if shard_count <= 0:
+            raise ValueError("Shard count must be positive.")
+        self._locks: List[threading.Lock] = [threading.Lock() for _ in range(shard_count)]
+
+    def for_key(self, key: Hashable) -> threading.Lock:
+        return self._locks[hash(key) % len(self._locks)]
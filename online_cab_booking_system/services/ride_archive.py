@@ -0,0 +1,283 @@
+import collections
+import datetime
+import math
+import mmap
+import os
+import threading
+from array import array
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from online_cab_booking_system.enums.enums import RideStatus
+from online_cab_booking_system.models.location import Location
+from online_cab_booking_system.models.ride import Ride
+
+try:
+    import numpy as np
+except ImportError:  # pragma: no cover - exercised only where NumPy is missing
+    np = None
+
+# Column name -> array typecode. Times are POSIX seconds; a ride without a start time stores NaN.
+_COLUMNS = {
+    "rider": "q",  # Interned rider id
+    "driver": "q",  # Interned driver id
+    "started_at": "d",
+    "ended_at": "d",
+    "fare": "d",
+    "distance_km": "d",
+    "duration_minutes": "d",
+    "pickup_latitude": "d",
+    "pickup_longitude": "d",
+    "dropoff_latitude": "d",
+    "dropoff_longitude": "d",
+}
+
+
+class _DayPartition:
+    """
+    The rides that ended on one day, one array per column. Once spilled, each column is a
+    read-only memoryview over a memory-mapped file, and the rider/driver row lists and ride ids
+    stay in memory so lookups still avoid scanning the columns.
+    """
+
+    def __init__(self, day: datetime.date):
+        self.day = day
+        self.start = datetime.datetime.combine(day, datetime.time()).timestamp()
+        self.end = datetime.datetime.combine(day + datetime.timedelta(days=1), datetime.time()).timestamp()
+        self.columns = {name: array(typecode) for name, typecode in _COLUMNS.items()}
+        self.ride_ids: List[str] = []
+        self.rows_by_rider: Dict[int, List[int]] = {}
+        self.rows_by_driver: Dict[int, List[int]] = {}
+        self._files: List[Tuple[object, mmap.mmap]] = []  # (file, map) per spilled column
+
+    def __len__(self) -> int:
+        return len(self.ride_ids)
+
+    @property
+    def spilled(self) -> bool:
+        return bool(self._files)
+
+    def append(self, ride_id: str, values: Dict[str, float]):
+        if self.spilled:  # A ride that ended late on its day: copy the partition back into memory
+            self.close()
+        row = len(self.ride_ids)
+        self.ride_ids.append(ride_id)
+        for name, column in self.columns.items():
+            column.append(values[name])
+        self.rows_by_rider.setdefault(values["rider"], []).append(row)
+        self.rows_by_driver.setdefault(values["driver"], []).append(row)
+        return row
+
+    def spill(self, directory: str):
+        """Writes every column to `<directory>/<day>/<column>.bin` and maps the files back read-only."""
+        if self.spilled or not self.ride_ids:
+            return
+        day_directory = os.path.join(directory, self.day.isoformat())
+        os.makedirs(day_directory, exist_ok=True)
+        for name, column in self.columns.items():
+            path = os.path.join(day_directory, f"{name}.bin")
+            with open(path, "wb") as file:
+                column.tofile(file)
+            file = open(path, "rb")
+            mapped = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            self._files.append((file, mapped))
+            self.columns[name] = memoryview(mapped).cast(_COLUMNS[name])
+
+    def close(self):
+        """Copies a spilled partition's columns back into memory and unmaps its files."""
+        for name, column in self.columns.items():
+            if isinstance(column, memoryview):
+                self.columns[name] = array(_COLUMNS[name], column.tobytes())
+                column.release()
+        for file, mapped in self._files:
+            mapped.close()
+            file.close()
+        self._files = []
+
+    def rows_between(self, start: float, end: float) -> Iterable[int]:
+        """Rows whose ride ended in [start, end)."""
+        if start <= self.start and self.end <= end:
+            return range(len(self.ride_ids))
+        ended_at = self.columns["ended_at"]
+        return [row for row, ended in enumerate(ended_at) if start <= ended < end]
+
+
+class RideArchive:
+    """
+    Completed rides, partitioned by the local day they ended on and stored column-wise (fares,
+    distances, durations, times and coordinates in contiguous arrays; rider and driver ids
+    interned to integers). Queries by rider or driver read only that rider's or driver's rows,
+    time ranges skip whole days outside the range, and aggregations over a day run over its
+    columns without creating a Ride object per row.
+
+    With a `spill_directory`, all but the `hot_days` most recent partitions are written to disk
+    and memory-mapped, so old history costs page cache rather than heap. Thread-safe.
+    """
+
+    def __init__(self, spill_directory: Optional[str] = None, hot_days: int = 2):
+        if hot_days < 1:
+            raise ValueError("At least one day must stay in memory.")
+        self._spill_directory = spill_directory
+        self._hot_days = hot_days
+        self._partitions: Dict[datetime.date, _DayPartition] = {}
+        self._days: List[datetime.date] = []  # Sorted partition keys
+        self._location_of_ride: Dict[str, Tuple[datetime.date, int]] = {}  # ride_id -> (day, row)
+        self._codes: Dict[str, int] = {}  # rider/driver id -> code
+        self._ids: List[str] = []  # code -> rider/driver id
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._location_of_ride)
+
+    def __contains__(self, ride_id: str) -> bool:
+        return ride_id in self._location_of_ride
+
+    def _code(self, user_id: str) -> int:
+        code = self._codes.get(user_id)
+        if code is None:
+            code = self._codes[user_id] = len(self._ids)
+            self._ids.append(user_id)
+        return code
+
+    # --- Writing ---
+    def add(self, ride: Ride, distance_km: float, duration_minutes: float):
+        """Archives a COMPLETED ride with the distance and duration its fare was charged for."""
+        if ride.get_status() != RideStatus.COMPLETED or ride.get_end_time() is None:
+            raise ValueError(f"Only completed rides can be archived, not {ride!r}.")
+        ended_at = ride.get_end_time()
+        started_at = ride.get_start_time()
+        values = {
+            "started_at": started_at.timestamp() if started_at is not None else math.nan,
+            "ended_at": ended_at.timestamp(),
+            "fare": ride.get_fare(),
+            "distance_km": distance_km,
+            "duration_minutes": duration_minutes,
+            "pickup_latitude": ride.get_pickup_location().get_latitude(),
+            "pickup_longitude": ride.get_pickup_location().get_longitude(),
+            "dropoff_latitude": ride.get_dropoff_location().get_latitude(),
+            "dropoff_longitude": ride.get_dropoff_location().get_longitude(),
+        }
+        with self._lock:
+            if ride.get_id() in self._location_of_ride:
+                raise ValueError(f"Ride '{ride.get_id()}' is already archived.")
+            values["rider"] = self._code(ride.get_rider_id())
+            values["driver"] = self._code(ride.get_driver_id())
+            day = ended_at.date()
+            partition = self._partitions.get(day)
+            if partition is None:
+                partition = self._partitions[day] = _DayPartition(day)
+                self._days.append(day)
+                self._days.sort()
+                if self._spill_directory is not None and len(self._days) > self._hot_days:
+                    self.spill(self._days[-self._hot_days])
+            self._location_of_ride[ride.get_id()] = (day, partition.append(ride.get_id(), values))
+
+    def spill(self, before: datetime.date):
+        """Moves every partition for a day before `before` to memory-mapped files."""
+        if self._spill_directory is None:
+            raise ValueError("The archive has no spill directory.")
+        with self._lock:
+            for day in self._days:
+                if day >= before:
+                    break
+                self._partitions[day].spill(self._spill_directory)
+
+    def close(self):
+        """Unmaps every spilled partition (its data is copied back into memory)."""
+        with self._lock:
+            for partition in self._partitions.values():
+                partition.close()
+
+    # --- Queries ---
+    def get_ride(self, ride_id: str) -> Optional[Ride]:
+        with self._lock:
+            location = self._location_of_ride.get(ride_id)
+            return self._ride_at(self._partitions[location[0]], location[1]) if location is not None else None
+
+    def rides_for_rider(self, rider_id: str, start: Optional[datetime.datetime] = None,
+                        end: Optional[datetime.datetime] = None) -> List[Ride]:
+        """The rider's rides that ended in [start, end), oldest first."""
+        return self._rides_for(rider_id, "rider", start, end)
+
+    def rides_for_driver(self, driver_id: str, start: Optional[datetime.datetime] = None,
+                         end: Optional[datetime.datetime] = None) -> List[Ride]:
+        """The driver's rides that ended in [start, end), oldest first."""
+        return self._rides_for(driver_id, "driver", start, end)
+
+    def rides_between(self, start: datetime.datetime, end: datetime.datetime) -> List[Ride]:
+        """Every ride that ended in [start, end), oldest first."""
+        with self._lock:
+            rides = []
+            for partition, start_ts, end_ts in self._partitions_between(start, end):
+                rides.extend(self._ride_at(partition, row) for row in partition.rows_between(start_ts, end_ts))
+            return sorted(rides, key=Ride.get_end_time)
+
+    def revenue_per_hour(self, start: datetime.datetime, end: datetime.datetime) -> Dict[datetime.datetime, float]:
+        """Total fare of the rides that ended in [start, end), by the local hour they ended in."""
+        with self._lock:
+            revenue: Dict[datetime.datetime, float] = {}
+            for partition, start_ts, end_ts in self._partitions_between(start, end):
+                ended_at, fares = partition.columns["ended_at"], partition.columns["fare"]
+                rows = partition.rows_between(start_ts, end_ts)
+                if np is not None and isinstance(rows, range):
+                    hours = ((np.frombuffer(ended_at, dtype=np.float64) - partition.start) // 3600).astype(np.int64)
+                    totals = np.bincount(hours, weights=np.frombuffer(fares, dtype=np.float64)).tolist()
+                    by_hour = {hour: total for hour, total in enumerate(totals) if total}
+                else:
+                    if not isinstance(rows, range):
+                        ended_at, fares = [ended_at[row] for row in rows], [fares[row] for row in rows]
+                    by_hour: Dict[int, float] = {}
+                    day_start = partition.start
+                    for ended, fare in zip(ended_at, fares):
+                        hour = int((ended - day_start) // 3600)
+                        by_hour[hour] = by_hour.get(hour, 0.0) + fare
+                midnight = datetime.datetime.combine(partition.day, datetime.time())
+                for hour, total in by_hour.items():
+                    key = midnight + datetime.timedelta(hours=hour)
+                    revenue[key] = revenue.get(key, 0.0) + total
+            return {hour: round(revenue[hour], 2) for hour in sorted(revenue)}
+
+    def trips_per_driver(self, start: Optional[datetime.datetime] = None,
+                         end: Optional[datetime.datetime] = None) -> Dict[str, int]:
+        """Number of rides each driver completed in [start, end)."""
+        with self._lock:
+            counts = collections.Counter()
+            for partition, start_ts, end_ts in self._partitions_between(start, end):
+                rows = partition.rows_between(start_ts, end_ts)
+                drivers = partition.columns["driver"]
+                # Counting a whole day's driver column runs in C, without touching the other columns
+                counts.update(drivers if isinstance(rows, range) else [drivers[row] for row in rows])
+            return {self._ids[code]: count for code, count in counts.items()}
+
+    def _rides_for(self, user_id: str, column: str, start: Optional[datetime.datetime],
+                   end: Optional[datetime.datetime]) -> List[Ride]:
+        with self._lock:
+            code = self._codes.get(user_id)
+            if code is None:
+                return []
+            rides = []
+            for partition, start_ts, end_ts in self._partitions_between(start, end):
+                rows = (partition.rows_by_rider if column == "rider" else partition.rows_by_driver).get(code, ())
+                ended_at = partition.columns["ended_at"]
+                rides.extend(self._ride_at(partition, row) for row in rows if start_ts <= ended_at[row] < end_ts)
+            return sorted(rides, key=Ride.get_end_time)
+
+    def _partitions_between(self, start: Optional[datetime.datetime], end: Optional[datetime.datetime]):
+        """Yields (partition, start, end as timestamps) for each day that can hold rides ending in [start, end)."""
+        start_ts = start.timestamp() if start is not None else -math.inf
+        end_ts = end.timestamp() if end is not None else math.inf
+        for day in self._days:
+            partition = self._partitions[day]
+            if partition.end > start_ts and partition.start < end_ts:
+                yield partition, start_ts, end_ts
+
+    def _ride_at(self, partition: _DayPartition, row: int) -> Ride:
+        columns = partition.columns
+        ride = Ride(partition.ride_ids[row], self._ids[columns["rider"][row]], self._ids[columns["driver"][row]],
+                    Location(columns["pickup_latitude"][row], columns["pickup_longitude"][row]),
+                    Location(columns["dropoff_latitude"][row], columns["dropoff_longitude"][row]))
+        ride.set_status(RideStatus.COMPLETED)
+        if not math.isnan(columns["started_at"][row]):
+            ride.set_start_time(datetime.datetime.fromtimestamp(columns["started_at"][row]))
+        ride.set_end_time(datetime.datetime.fromtimestamp(columns["ended_at"][row]))
+        ride.set_fare(columns["fare"][row])
+        return ride
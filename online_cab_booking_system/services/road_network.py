@@ -0,0 +1,235 @@
+import functools
+import heapq
+import math
+from array import array
+from typing import Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from online_cab_booking_system.exceptions import InvalidInputError
+from online_cab_booking_system.models.location import Location
+from online_cab_booking_system.services.driver_location_store import DriverLocationStore
+from online_cab_booking_system.services.spatial_index import DriverSpatialIndex
+
+
+class Route(NamedTuple):
+    seconds: float  # Travel time along the fastest path
+    km: float  # Length of that path
+
+
+class RoadGraph:
+    """
+    A directed road graph in compressed sparse row form: node i's outgoing edges are
+    targets[offsets[i]:offsets[i + 1]], with their travel times in seconds and lengths in km in
+    the same positions of two parallel arrays. The reverse graph, for searches toward a node, is
+    kept the same way.
+
+    load() reads a plain text file, one record per line (blank lines and # comments ignored):
+        v <node> <latitude> <longitude>
+        e <from> <to> <length_km> <speed_kmh>   one-way road
+        b <from> <to> <length_km> <speed_kmh>   two-way road
+    """
+
+    def __init__(self, latitudes: Iterable[float], longitudes: Iterable[float],
+                 edges: Iterable[Tuple[int, int, float, float]]):
+        self.latitudes = array("d", latitudes)
+        self.longitudes = array("d", longitudes)
+        if len(self.latitudes) != len(self.longitudes):
+            raise InvalidInputError("Latitudes and longitudes must have the same length.")
+        edges = list(edges)  # (from, to, km, seconds)
+        for source, target, km, seconds in edges:
+            if not (0 <= source < len(self) and 0 <= target < len(self)):
+                raise InvalidInputError(f"Edge ({source}, {target}) refers to a node that does not exist.")
+            if km < 0 or seconds < 0:
+                raise InvalidInputError(f"Edge ({source}, {target}) has a negative length or travel time.")
+        self.forward = self._compress(edges, reverse=False)
+        self.backward = self._compress(edges, reverse=True)
+
+        # Snapping a location to its nearest node reuses the drivers' grid index
+        self._node_index = DriverSpatialIndex(store=DriverLocationStore())
+        for node in range(len(self)):
+            self._node_index.upsert(str(node), Location(self.latitudes[node], self.longitudes[node]))
+
+    def __len__(self) -> int:
+        return len(self.latitudes)
+
+    def _compress(self, edges, reverse: bool) -> Tuple[array, array, array, array]:
+        """(offsets, targets, seconds, km) arrays for the graph, or for its reverse."""
+        ordered = sorted(((target, source, km, seconds) if reverse else (source, target, km, seconds))
+                         for source, target, km, seconds in edges)
+        offsets = array("l", [0] * (len(self) + 1))
+        for source, _, _, _ in ordered:
+            offsets[source + 1] += 1
+        for node in range(len(self)):
+            offsets[node + 1] += offsets[node]
+        return (offsets, array("l", [edge[1] for edge in ordered]), array("d", [edge[3] for edge in ordered]),
+                array("d", [edge[2] for edge in ordered]))
+
+    @classmethod
+    def load(cls, path: str) -> "RoadGraph":
+        node_of: Dict[str, int] = {}
+        latitudes: List[float] = []
+        longitudes: List[float] = []
+        edges: List[Tuple[int, int, float, float]] = []
+        with open(path, encoding="utf-8") as file:
+            for line_number, line in enumerate(file, 1):
+                fields = line.split("#", 1)[0].split()
+                if not fields:
+                    continue
+                try:
+                    if fields[0] == "v" and len(fields) == 4:
+                        if fields[1] in node_of:
+                            raise ValueError(f"node '{fields[1]}' is defined twice")
+                        node_of[fields[1]] = len(latitudes)
+                        latitudes.append(float(fields[2]))
+                        longitudes.append(float(fields[3]))
+                    elif fields[0] in ("e", "b") and len(fields) == 5:
+                        source, target = node_of[fields[1]], node_of[fields[2]]
+                        km, speed_kmh = float(fields[3]), float(fields[4])
+                        if speed_kmh <= 0:
+                            raise ValueError("speed must be positive")
+                        seconds = km / speed_kmh * 3600
+                        edges.append((source, target, km, seconds))
+                        if fields[0] == "b":
+                            edges.append((target, source, km, seconds))
+                    else:
+                        raise ValueError(f"unrecognized record '{line.strip()}'")
+                except KeyError as e:
+                    raise InvalidInputError(f"{path}:{line_number}: unknown node {e}") from None
+                except ValueError as e:
+                    raise InvalidInputError(f"{path}:{line_number}: {e}") from None
+        return cls(latitudes, longitudes, edges)
+
+    def nearest_node(self, location: Location) -> Tuple[int, float]:
+        """The node closest to `location` and its great-circle distance in km."""
+        nearest = self._node_index.nearest(location, k=1)
+        if not nearest:
+            raise InvalidInputError("The road graph has no nodes.")
+        distance, node = nearest[0]
+        return int(node), distance
+
+
+def _shortest_times(graph: Tuple[array, array, array, array], source: int, node_count: int) -> array:
+    """Dijkstra: travel time from `source` to every node along the given (forward or reverse) graph."""
+    offsets, targets, seconds, _ = graph
+    times = array("d", [math.inf]) * node_count
+    times[source] = 0.0
+    heap = [(0.0, source)]
+    while heap:
+        time, node = heapq.heappop(heap)
+        if time > times[node]:
+            continue
+        for edge in range(offsets[node], offsets[node + 1]):
+            candidate = time + seconds[edge]
+            target = targets[edge]
+            if candidate < times[target]:
+                times[target] = candidate
+                heapq.heappush(heap, (candidate, target))
+    return times
+
+
+class RoadNetworkOracle:
+    """
+    Shortest travel times and distances over a RoadGraph, for ranking drivers by ETA and pricing
+    by road distance. Everything runs offline and in-process.
+
+    Construction precomputes an ALT index (A*, Landmarks, Triangle inequality). Landmarks are
+    picked by farthest-point selection, and for each one the travel times from it and to it are
+    stored for every node. The triangle inequality turns these into a lower bound on the time
+    left to the target, so each A* query settles far fewer nodes than Dijkstra. Node-to-node
+    results go through an LRU cache: a pickup is queried against the same drivers' nodes
+    repeatedly.
+
+    Locations are snapped to their nearest node. The straight-line access legs at both ends are
+    added at `access_speed_kmh`.
+    """
+
+    def __init__(self, graph: RoadGraph, landmark_count: int = 8, cache_size: int = 100_000,
+                 access_speed_kmh: float = 20.0):
+        if len(graph) == 0:
+            raise InvalidInputError("The road graph has no nodes.")
+        if access_speed_kmh <= 0:
+            raise InvalidInputError("The access speed must be positive.")
+        self._graph = graph
+        self._access_speed_kmh = access_speed_kmh
+        self._landmarks: List[int] = []
+        self._from_landmark: List[array] = []  # Per landmark: time from it to each node
+        self._to_landmark: List[array] = []  # Per landmark: time from each node to it
+        self._select_landmarks(min(landmark_count, len(graph)))
+        self._node_route = functools.lru_cache(maxsize=cache_size)(self._search)
+
+    @classmethod
+    def load(cls, path: str, **kwargs) -> "RoadNetworkOracle":
+        return cls(RoadGraph.load(path), **kwargs)
+
+    def _select_landmarks(self, count: int):
+        """
+        Farthest-point selection: start at the node farthest from node 0, then keep adding the node
+        farthest (by travel time) from every landmark chosen so far. A node no landmark reaches
+        counts as infinitely far, so every disconnected part of the graph gets a landmark.
+        """
+        node_count = len(self._graph)
+        closest = _shortest_times(self._graph.forward, 0, node_count)
+        landmark = max(range(node_count), key=closest.__getitem__)
+        closest = array("d", [math.inf]) * node_count  # Time from the nearest chosen landmark
+        while len(self._landmarks) < count:
+            self._landmarks.append(landmark)
+            self._from_landmark.append(_shortest_times(self._graph.forward, landmark, node_count))
+            self._to_landmark.append(_shortest_times(self._graph.backward, landmark, node_count))
+            for node, time in enumerate(self._from_landmark[-1]):
+                if time < closest[node]:
+                    closest[node] = time
+            landmark = max(range(node_count), key=closest.__getitem__)
+            if closest[landmark] == 0:
+                break  # Every node is a landmark
+
+    def _lower_bound(self, node: int, target: int) -> float:
+        bound = 0.0
+        for from_landmark, to_landmark in zip(self._from_landmark, self._to_landmark):
+            # NaN (landmark reaches neither node) compares False and is skipped; inf proves no path exists
+            ahead = from_landmark[target] - from_landmark[node]
+            if ahead > bound:
+                bound = ahead
+            behind = to_landmark[node] - to_landmark[target]
+            if behind > bound:
+                bound = behind
+        return bound
+
+    def _search(self, source: int, target: int) -> Optional[Route]:
+        """A* from source to target, guided by the landmark bounds. None if target is unreachable."""
+        if source == target:
+            return Route(0.0, 0.0)
+        offsets, targets, seconds, kms = self._graph.forward
+        times = {source: 0.0}
+        lengths = {source: 0.0}
+        settled = set()
+        heap = [(self._lower_bound(source, target), 0.0, source)]
+        while heap:
+            _, time, node = heapq.heappop(heap)
+            if node == target:
+                return Route(time, lengths[node])
+            if node in settled:
+                continue
+            settled.add(node)
+            for edge in range(offsets[node], offsets[node + 1]):
+                neighbour = targets[edge]
+                candidate = time + seconds[edge]
+                if neighbour not in settled and candidate < times.get(neighbour, math.inf):
+                    bound = self._lower_bound(neighbour, target)
+                    if bound == math.inf:
+                        continue
+                    times[neighbour] = candidate
+                    lengths[neighbour] = lengths[node] + kms[edge]
+                    heapq.heappush(heap, (candidate + bound, candidate, neighbour))
+        return None
+
+    def route(self, origin: Location, destination: Location) -> Optional[Route]:
+        """The fastest road route between two locations, or None if none exists."""
+        source, source_access_km = self._graph.nearest_node(origin)
+        target, target_access_km = self._graph.nearest_node(destination)
+        route = self._node_route(source, target)
+        if route is None:
+            return None
+        access_km = source_access_km + target_access_km
+        return Route(route.seconds + access_km / self._access_speed_kmh * 3600, route.km + access_km)
+
+    def cache_info(self):
+        return self._node_route.cache_info()
@@ -0,0 +1,186 @@
+import math
+import threading
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+
+from online_cab_booking_system.geo import EARTH_RADIUS_KM, LocationArray, distances_from
+from online_cab_booking_system.models.location import Location
+from online_cab_booking_system.services.driver_location_store import DriverLocationStore
+
+
+class DriverSpatialIndex:
+    """
+    Uniform grid over latitude/longitude holding the drivers that can be matched.
+
+    Each indexed driver sits in the cell its location falls in. Coordinates are read from a
+    DriverLocationStore rather than copied, so a ping that stays within its cell costs the index
+    nothing, and one that crosses into another cell is an O(1) move. A k-nearest query examines
+    the pickup's cell and then rings of cells around it, nearest first, and stops as soon as the
+    next ring cannot hold anything closer than the k-th best driver found (or lies beyond the
+    search radius). With cells about the size of the typical match distance that is a handful of
+    cells and O(k + drivers in them) distance computations, independent of the fleet size.
+
+    Distances are great-circle kilometres, computed for each ring's drivers in one distances_from
+    call. Longitudes are not wrapped around the antimeridian.
+
+    The index is thread-safe: a re-entrant lock serializes its public methods, so a query never
+    iterates a cell that another thread is changing.
+    """
+
+    def __init__(self, cell_size_degrees: float = 0.01, store: Optional[DriverLocationStore] = None):
+        if cell_size_degrees <= 0:
+            raise ValueError("Cell size must be positive.")
+        self._cell_size = cell_size_degrees
+        self._store = store if store is not None else DriverLocationStore()
+        self._cells: Dict[Tuple[int, int], Set[int]] = {}  # (row, column) -> slots
+        self._cell_of_slot: Dict[int, Tuple[int, int]] = {}  # slot -> (row, column), for indexed slots
+        self._lock = threading.RLock()
+
+    def __len__(self) -> int:
+        return len(self._cell_of_slot)
+
+    def __contains__(self, driver_id: str) -> bool:
+        slot = self._store.slot_of(driver_id)
+        with self._lock:
+            return slot is not None and slot in self._cell_of_slot
+
+    def _cell_of(self, latitude: float, longitude: float) -> Tuple[int, int]:
+        return math.floor(latitude / self._cell_size), math.floor(longitude / self._cell_size)
+
+    def upsert(self, driver_id: str, location: Location):
+        """Records a driver's location in the store and adds (or moves) it in the index."""
+        with self._lock:
+            self.add_slot(self._store.add(driver_id, location))
+
+    def remove(self, driver_id: str):
+        """Removes a driver if indexed."""
+        slot = self._store.slot_of(driver_id)
+        if slot is not None:
+            self.remove_slot(slot)
+
+    def add_slot(self, slot: int):
+        """Indexes a store slot at its current coordinates, or moves it there if already indexed."""
+        with self._lock:
+            cell = self._cell_of(self._store.latitudes[slot], self._store.longitudes[slot])
+            previous = self._cell_of_slot.get(slot)
+            if previous != cell:
+                if previous is not None:
+                    self._discard_from_cell(slot, previous)
+                self._cells.setdefault(cell, set()).add(slot)
+                self._cell_of_slot[slot] = cell
+
+    def remove_slot(self, slot: int):
+        with self._lock:
+            cell = self._cell_of_slot.pop(slot, None)
+            if cell is not None:
+                self._discard_from_cell(slot, cell)
+
+    def refresh_slots(self, slots: Iterable[int]) -> List[int]:
+        """
+        Re-files the given slots after their coordinates changed in the store. Slots that are not
+        indexed are ignored, and only those whose cell changed touch the grid. Returns the given
+        slots that are indexed.
+        """
+        cell_of_slot = self._cell_of_slot
+        latitudes, longitudes = self._store.latitudes, self._store.longitudes
+        size = self._cell_size
+        floor = math.floor
+        indexed: List[int] = []
+        with self._lock:
+            for slot in slots:
+                previous = cell_of_slot.get(slot)
+                if previous is None:
+                    continue
+                indexed.append(slot)
+                cell = (floor(latitudes[slot] / size), floor(longitudes[slot] / size))
+                if cell != previous:
+                    self._discard_from_cell(slot, previous)
+                    self._cells.setdefault(cell, set()).add(slot)
+                    cell_of_slot[slot] = cell
+        return indexed
+
+    def _discard_from_cell(self, slot: int, cell: Tuple[int, int]):
+        slots = self._cells[cell]
+        slots.discard(slot)
+        if not slots:
+            del self._cells[cell]
+
+    def nearest(self, location: Location, k: int = 1, radius_km: Optional[float] = None) -> List[Tuple[float, str]]:
+        """
+        Returns up to k (distance in km, driver_id) pairs, closest first (ties by driver id),
+        keeping only drivers within `radius_km` if given.
+        """
+        with self._lock:
+            return self._nearest(location, k, radius_km)
+
+    def _nearest(self, location: Location, k: int, radius_km: Optional[float]) -> List[Tuple[float, str]]:
+        if k <= 0 or not self._cell_of_slot:
+            return []
+        center_row, center_column = self._cell_of(location.get_latitude(), location.get_longitude())
+        found: List[Tuple[float, str]] = []
+
+        ring = 0
+        while True:
+            cells = self._ring(center_row, center_column, ring)
+            if len(cells) >= len(self._cells):
+                # Sparse grid: cheaper to visit every occupied cell outside the rings already seen.
+                self._collect(location, [slots for cell, slots in self._cells.items()
+                                         if max(abs(cell[0] - center_row), abs(cell[1] - center_column)) >= ring],
+                              radius_km, found)
+                break
+            self._collect(location, [self._cells[cell] for cell in cells if cell in self._cells], radius_km, found)
+
+            # Everything not examined yet lies outside the box covered by rings 0..ring.
+            bound = self._distance_outside_box(location, center_row, center_column, ring)
+            if radius_km is not None and bound > radius_km:
+                break
+            if len(found) >= k:
+                found.sort()
+                del found[k:]
+                if bound > found[-1][0]:
+                    break
+            ring += 1
+
+        found.sort()
+        return found[:k]
+
+    def _collect(self, location: Location, cells: List[Set[int]], radius_km: Optional[float],
+                 found: List[Tuple[float, str]]):
+        slots = [slot for cell_slots in cells for slot in cell_slots]
+        if not slots:
+            return
+        store = self._store
+        latitudes, longitudes, driver_ids = store.latitudes, store.longitudes, store.driver_ids
+        candidates = LocationArray([latitudes[slot] for slot in slots], [longitudes[slot] for slot in slots])
+        for slot, distance in zip(slots, distances_from(location, candidates).tolist()):
+            if radius_km is None or distance <= radius_km:
+                found.append((distance, driver_ids[slot]))
+
+    @staticmethod
+    def _ring(center_row: int, center_column: int, ring: int) -> List[Tuple[int, int]]:
+        if ring == 0:
+            return [(center_row, center_column)]
+        cells = []
+        for column in range(center_column - ring, center_column + ring + 1):
+            cells.append((center_row - ring, column))
+            cells.append((center_row + ring, column))
+        for row in range(center_row - ring + 1, center_row + ring):
+            cells.append((row, center_column - ring))
+            cells.append((row, center_column + ring))
+        return cells
+
+    def _distance_outside_box(self, location: Location, center_row: int, center_column: int, ring: int) -> float:
+        """
+        A lower bound, in km, on the distance from `location` to any point outside rings 0..ring
+        around its cell: the distance to the nearest parallel or meridian bounding that box.
+        """
+        latitude, longitude = location.get_latitude(), location.get_longitude()
+        south = (center_row - ring) * self._cell_size
+        north = (center_row + ring + 1) * self._cell_size
+        west = (center_column - ring) * self._cell_size
+        east = (center_column + ring + 1) * self._cell_size
+        # Along a meridian, distance is proportional to the latitude difference.
+        to_parallel = math.radians(min(latitude - south, north - latitude)) * EARTH_RADIUS_KM
+        # The cross-track distance to a meridian's great circle, which any path beyond it must cross.
+        dlambda = math.radians(min(longitude - west, east - longitude, 90.0))
+        to_meridian = math.asin(min(1.0, math.cos(math.radians(latitude)) * math.sin(dlambda))) * EARTH_RADIUS_KM
+        return min(to_parallel, to_meridian)
@@ -0,0 +1,156 @@
+import collections
+import math
+import threading
+import time
+from typing import Callable, Deque, Dict, Iterable, Optional, Tuple
+
+from online_cab_booking_system.models.location import Location
+
+Cell = Tuple[int, int]
+
+
+class SurgePricingEngine:
+    """
+    Surge multipliers per grid cell, from rolling demand and current supply.
+
+    Demand is the number of ride requests made from a cell in the last `window_seconds`. They are
+    counted in `bucket_seconds` buckets, and a whole bucket drops out of the rolling totals once it
+    expires. Supply is the number of AVAILABLE drivers in the cell right now, kept current by
+    update_driver / remove_driver as driver availability changes and by move_drivers as location
+    pings arrive.
+
+    recompute() turns the counters into multipliers: 1 + sensitivity * (demand / supply - 1),
+    clamped to [1, max_multiplier] and rounded to 0.1. Cells with fewer than `min_demand`
+    requests do not surge. The resulting dict is swapped in whole, so multiplier_at() is a
+    lock-free O(1) lookup. start() recomputes every `interval` seconds on a daemon thread. Until
+    the first recompute, every multiplier is 1.0.
+    """
+
+    def __init__(self, cell_size_degrees: float = 0.02, window_seconds: float = 300.0, bucket_seconds: float = 30.0,
+                 sensitivity: float = 0.5, max_multiplier: float = 3.0, min_demand: int = 3,
+                 clock: Callable[[], float] = time.monotonic):
+        if cell_size_degrees <= 0 or window_seconds <= 0 or bucket_seconds <= 0:
+            raise ValueError("Cell size, window and bucket length must be positive.")
+        if max_multiplier < 1:
+            raise ValueError("The maximum multiplier cannot be below 1.")
+        self._cell_size = cell_size_degrees
+        self._bucket_seconds = bucket_seconds
+        self._bucket_count = max(1, math.ceil(window_seconds / bucket_seconds))
+        self._sensitivity = sensitivity
+        self._max_multiplier = max_multiplier
+        self._min_demand = min_demand
+        self._clock = clock
+
+        self._lock = threading.Lock()  # Guards the counters below
+        self._demand_buckets: Deque[Tuple[int, Dict[Cell, int]]] = collections.deque()  # (bucket number, counts), oldest first
+        self._demand: Dict[Cell, int] = {}  # Rolling totals over the buckets
+        self._supply: Dict[Cell, int] = {}
+        self._supply_cell_of: Dict[str, Cell] = {}  # driver_id -> cell, for AVAILABLE drivers
+
+        self._multipliers: Dict[Cell, float] = {}  # Only surging cells; replaced, never mutated
+        self._stop: Optional[threading.Event] = None
+
+    def _cell_of(self, latitude: float, longitude: float) -> Cell:
+        return math.floor(latitude / self._cell_size), math.floor(longitude / self._cell_size)
+
+    # --- Counters ---
+    def record_request(self, location: Location):
+        """Counts a ride request from `location`, whether or not a driver is then found."""
+        cell = self._cell_of(location.get_latitude(), location.get_longitude())
+        bucket_number = int(self._clock() // self._bucket_seconds)
+        with self._lock:
+            self._expire(bucket_number)
+            if not self._demand_buckets or self._demand_buckets[-1][0] != bucket_number:
+                self._demand_buckets.append((bucket_number, {}))
+            bucket = self._demand_buckets[-1][1]
+            bucket[cell] = bucket.get(cell, 0) + 1
+            self._demand[cell] = self._demand.get(cell, 0) + 1
+
+    def update_driver(self, driver_id: str, latitude: float, longitude: float):
+        """Counts the driver as available supply in the cell of (latitude, longitude)."""
+        cell = self._cell_of(latitude, longitude)
+        with self._lock:
+            previous = self._supply_cell_of.get(driver_id)
+            if previous == cell:
+                return
+            if previous is not None:
+                self._decrement(self._supply, previous)
+            self._supply_cell_of[driver_id] = cell
+            self._supply[cell] = self._supply.get(cell, 0) + 1
+
+    def move_drivers(self, drivers: Iterable[Tuple[str, float, float]]):
+        """
+        Bulk update_driver for (driver_id, latitude, longitude) from location pings, under one lock
+        acquisition. Only drivers already counted as supply are moved, so a ping applied just after
+        a driver was matched cannot count it as available again.
+        """
+        size = self._cell_size
+        floor = math.floor
+        supply, supply_cell_of = self._supply, self._supply_cell_of
+        with self._lock:
+            for driver_id, latitude, longitude in drivers:
+                previous = supply_cell_of.get(driver_id)
+                if previous is None:
+                    continue
+                cell = (floor(latitude / size), floor(longitude / size))
+                if cell != previous:
+                    self._decrement(supply, previous)
+                    supply_cell_of[driver_id] = cell
+                    supply[cell] = supply.get(cell, 0) + 1
+
+    def remove_driver(self, driver_id: str):
+        """Stops counting the driver as supply, e.g. once matched or offline."""
+        with self._lock:
+            previous = self._supply_cell_of.pop(driver_id, None)
+            if previous is not None:
+                self._decrement(self._supply, previous)
+
+    def _expire(self, bucket_number: int):
+        while self._demand_buckets and self._demand_buckets[0][0] <= bucket_number - self._bucket_count:
+            _, expired = self._demand_buckets.popleft()
+            for cell, count in expired.items():
+                self._decrement(self._demand, cell, count)
+
+    @staticmethod
+    def _decrement(counts: Dict[Cell, int], cell: Cell, amount: int = 1):
+        remaining = counts[cell] - amount
+        if remaining:
+            counts[cell] = remaining
+        else:
+            del counts[cell]
+
+    # --- Multipliers ---
+    def recompute(self):
+        """Recomputes every cell's multiplier from the current counters and publishes them."""
+        with self._lock:
+            self._expire(int(self._clock() // self._bucket_seconds))
+            counters = [(cell, demand, self._supply.get(cell, 0)) for cell, demand in self._demand.items()
+                        if demand >= self._min_demand]
+        multipliers = {}
+        for cell, demand, supply in counters:
+            multiplier = 1 + self._sensitivity * (demand / max(supply, 1) - 1)
+            multiplier = round(min(self._max_multiplier, multiplier), 1)
+            if multiplier > 1:
+                multipliers[cell] = multiplier
+        self._multipliers = multipliers
+
+    def multiplier_at(self, location: Location) -> float:
+        return self._multipliers.get(self._cell_of(location.get_latitude(), location.get_longitude()), 1.0)
+
+    def start(self, interval: float = 10.0):
+        """Recomputes now and then every `interval` seconds on a daemon thread, until stop()."""
+        if self._stop is not None:
+            return
+        self._stop = threading.Event()
+        self.recompute()
+
+        def refresh(stop: threading.Event):
+            while not stop.wait(interval):
+                self.recompute()
+
+        threading.Thread(target=refresh, args=(self._stop,), name="surge-pricing", daemon=True).start()
+
+    def stop(self):
+        if self._stop is not None:
+            self._stop.set()
+            self._stop = None
@@ -1,9 +1,14 @@
 # tests/test_booking_system.py
+import asyncio
 import sys
 import os
 import unittest
 import datetime
 import time  # For simulating duration for fare calculation
+import random
+import tempfile
+import threading
+from unittest import mock
 
 sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
 # Adjust imports based on how you run tests (e.g., from root or from tests dir)
@@ -13,11 +18,21 @@ from online_cab_booking_system.enums.enums import DriverStatus, RideStatus
 from online_cab_booking_system.models.location import Location
 from online_cab_booking_system.models.driver import Driver
 from online_cab_booking_system.models.rider import Rider
+from online_cab_booking_system.models.ride import Ride
 from online_cab_booking_system.services.farecalulator import FareCalculator
+from online_cab_booking_system.services.spatial_index import DriverSpatialIndex
+from online_cab_booking_system import geo
+from online_cab_booking_system.geo import LocationArray, distances_from, haversine_km
+from online_cab_booking_system.services.batch_matcher import min_cost_matching
+from online_cab_booking_system.services.async_booking_service import AsyncBookingService
+from online_cab_booking_system.services import ride_archive
+from online_cab_booking_system.services.ride_archive import RideArchive
+from online_cab_booking_system.services.surge_pricing import SurgePricingEngine
+from online_cab_booking_system.services.road_network import RoadGraph, RoadNetworkOracle
 from online_cab_booking_system.exceptions import (
     InvalidInputError, DriverNotFoundError, RiderNotFoundError,
     NoDriverFoundError, RideNotFoundError, InvalidRideStatusError,
-    DriverNotAvailableError, BookingSystemError
+    DriverNotAvailableError, BookingSystemError, BatchMatchError
 )
 
 
@@ -56,6 +71,35 @@ class TestCabBookingSystem(unittest.TestCase):
         with self.assertRaises(InvalidInputError):
             loc1.get_distance_to("not a location")
 
+    def test_great_circle_distance(self):
+        london, paris = Location(51.5074, -0.1278), Location(48.8566, 2.3522)
+        self.assertAlmostEqual(london.get_great_circle_distance_to(paris), 343.56, places=1)
+        self.assertAlmostEqual(Location(0, 0).get_great_circle_distance_to(Location(0, 1)), 111.195, places=2)
+        self.assertEqual(london.get_great_circle_distance_to(london), 0.0)
+
+        points = [paris, Location(12.9716, 77.5946), Location(-33.8688, 151.2093), london]
+        distances = distances_from(london, LocationArray.from_locations(points))
+        self.assertEqual(len(distances), 4)
+        for point, distance in zip(points, distances):
+            self.assertAlmostEqual(distance, london.get_great_circle_distance_to(point), places=6)
+
+    @unittest.skipUnless(geo.np is not None, "NumPy is not installed")
+    def test_distances_from_numpy_and_fallback_agree(self):
+        rng = random.Random(3)
+        origin = Location(12.97, 77.59)
+        points = [Location(rng.uniform(-90, 90), rng.uniform(-180, 180)) for _ in range(200)] + [origin]
+        expected = [haversine_km(12.97, 77.59, p.get_latitude(), p.get_longitude()) for p in points]
+
+        vectorized = distances_from(origin, LocationArray.from_locations(points))
+        self.assertIsInstance(vectorized, geo.np.ndarray)
+        with mock.patch.object(geo, "np", None):
+            fallback = distances_from(origin, LocationArray.from_locations(points))
+        self.assertNotIsInstance(fallback, geo.np.ndarray)
+        for distances in (vectorized, fallback):
+            self.assertEqual(len(distances), len(points))
+            for distance, expected_distance in zip(distances, expected):
+                self.assertAlmostEqual(distance, expected_distance, places=6)
+
     # --- FareCalculator Tests ---
     def test_fare_calculation(self):
         # Base fare + (10km * 1.5) + (20min * 0.2) = 2 + 15 + 4 = 21
@@ -67,6 +111,10 @@ class TestCabBookingSystem(unittest.TestCase):
             FareCalculator.calculate_fare(-10, 20)
         with self.assertRaises(ValueError):
             FareCalculator.calculate_fare(10, -20)
+        # A surge multiplies the whole fare
+        self.assertAlmostEqual(FareCalculator.calculate_fare(10, 20, surge_multiplier=1.5), 31.5)
+        with self.assertRaises(ValueError):
+            FareCalculator.calculate_fare(10, 20, surge_multiplier=0.5)
 
     # --- Driver & Rider Management Tests ---
     def test_register_driver(self):
@@ -75,6 +123,7 @@ class TestCabBookingSystem(unittest.TestCase):
         self.assertIn(driver_id, self.system._drivers)
         self.assertEqual(self.system._drivers[driver_id].get_name(), "New Driver")
         self.assertEqual(self.system._drivers[driver_id].get_status(), DriverStatus.AVAILABLE)
+        self.assertIn("Loc=Location(lat=1.0000, lon=1.0000)", repr(driver))  # Read from the location store
 
         with self.assertRaises(InvalidInputError):
             self.system.register_driver("D1", "Existing Driver", {"m": "car"}, Location(1, 1))  # Duplicate ID
@@ -196,6 +245,13 @@ class TestCabBookingSystem(unittest.TestCase):
         self.assertNotIn(ride.get_driver_id(), self.system._driver_to_active_ride)
         self.assertNotIn(ride.get_rider_id(), self.system._rider_to_active_ride)
 
+        # The completed ride stays queryable
+        archived = self.system.get_ride_status(ride.get_id())
+        self.assertEqual(archived.get_status(), RideStatus.COMPLETED)
+        self.assertEqual(archived.get_fare(), fare)
+        self.assertEqual(archived.get_end_time(), ride.get_end_time())
+        self.assertEqual([r.get_id() for r in self.system.get_ride_history().rides_for_rider("R1")], [ride.get_id()])
+
     def test_end_ride_invalid_status(self):
         pickup = Location(12.9716, 77.5946)
         dropoff = Location(12.9000, 77.6000)
@@ -262,6 +318,501 @@ class TestCabBookingSystem(unittest.TestCase):
         self.assertEqual(available_drivers_after[0]['driver_id'], 'D4')
         self.assertEqual(available_drivers_after[0]['name'], 'David')
 
+    def test_list_available_drivers_pages(self):
+        # In the order drivers became available, or nearest first
+        self.assertEqual([d["driver_id"] for d in self.system.list_available_drivers(offset=1, limit=1)], ["D2"])
+        self.assertEqual([d["driver_id"] for d in self.system.list_available_drivers(offset=2, limit=5)], ["D4"])
+        self.system._drivers["D1"].update_status(DriverStatus.OFFLINE)
+        self.system._drivers["D1"].update_status(DriverStatus.AVAILABLE)
+        self.assertEqual([d["driver_id"] for d in self.system.list_available_drivers()], ["D2", "D4", "D1"])
+        page = self.system.list_available_drivers(offset=0, limit=2, near=self.loc_east)
+        self.assertEqual([d["driver_id"] for d in page], ["D4", "D1"])
+        self.assertEqual(page[0]["distance_km"], 0.0)
+        with self.assertRaises(InvalidInputError):
+            self.system.list_available_drivers(offset=-1)
+
+    def test_system_overview_counts(self):
+        self.assertEqual(self.system.get_system_overview(),
+                         {"total_drivers": 4, "total_riders": 2, "active_rides": 0, "available_drivers": 3})
+        self.system.request_ride("R1", self.loc_center, self.loc_south)
+        self.system._drivers["D3"].update_status(DriverStatus.AVAILABLE)
+        self.system._drivers["D4"].update_location(self.loc_north)  # A move alone changes no count
+        self.assertEqual(self.system.get_system_overview()["available_drivers"], 3)
+        self.assertEqual(self.system.get_system_overview()["active_rides"], 1)
+        counts = self.system.get_driver_status_counts()
+        self.assertEqual((counts["AVAILABLE"], counts["EN_ROUTE_TO_PICKUP"], counts["OFFLINE"]), (3, 1, 0))
+
+    def test_spatial_index_follows_driver_changes(self):
+        index = self.system._available_index
+        self.assertEqual([d for d in ("D1", "D2", "D3", "D4") if d in index], ["D1", "D2", "D4"])  # D3 is OFFLINE
+        self.system._drivers["D3"].update_status(DriverStatus.AVAILABLE)
+        self.system.update_driver_location("D1", Location(20, 80))
+        self.assertEqual(index.nearest(self.loc_south), [(0.0, "D3")])
+        self.assertEqual(index.nearest(Location(20, 80))[0][1], "D1")
+
+        ride = self.system.request_ride("R1", self.loc_south, self.loc_center)
+        self.assertEqual(ride.get_driver_id(), "D3")
+        self.assertNotIn("D3", index)
+
+    def test_bulk_location_updates(self):
+        counts = self.system.update_driver_locations([
+            ("D1", 12.95, 77.60, 100.0),
+            ("D1", 12.99, 77.70, 90.0),  # Older than the previous ping: dropped
+            ("D2", 95.0, 77.57, 100.0),  # Invalid latitude
+            ("D99", 12.9, 77.6, 100.0),  # Unknown driver
+            ("D3", 12.96, 77.61, 100.0),  # OFFLINE drivers' locations are tracked too
+            ("D4", 12.9500, 77.6001, 100.0),
+        ])
+        self.assertEqual(counts, {"accepted": 3, "stale": 1, "invalid": 1, "unknown": 1})
+        self.assertEqual(self.system._drivers["D1"].get_current_location(), Location(12.95, 77.60))
+        self.assertEqual(self.system._drivers["D2"].get_current_location(), self.loc_north)
+        self.assertEqual(self.system.update_driver_locations([("D1", 12.5, 77.5, 100.0)])["stale"], 1)  # Duplicate
+
+        # The index follows the bulk moves: D4 is now the closest to this pickup, D3 only once AVAILABLE
+        self.assertEqual(self.system._available_index.nearest(Location(12.9501, 77.6002))[0][1], "D4")
+        self.system._drivers["D3"].update_status(DriverStatus.AVAILABLE)
+        self.assertEqual(self.system._available_index.nearest(Location(12.96, 77.61))[0][1], "D3")
+        self.system.update_driver_location("D1", Location(12.96, 77.61))  # The single-ping path still works
+        self.assertEqual(self.system._drivers["D1"].get_current_location(), Location(12.96, 77.61))
+
+
+class TestDriverSpatialIndex(unittest.TestCase):
+
+    def test_nearest_matches_a_full_scan(self):
+        self.check_nearest_matches_a_full_scan()
+
+    @unittest.skipUnless(geo.np is not None, "NumPy is not installed")
+    def test_nearest_matches_a_full_scan_without_numpy(self):
+        with mock.patch.object(geo, "np", None):
+            self.check_nearest_matches_a_full_scan()
+
+    def check_nearest_matches_a_full_scan(self):
+        rng = random.Random(7)
+        index = DriverSpatialIndex(cell_size_degrees=0.05)
+        locations = {}
+        for i in range(500):
+            locations[f"D{i}"] = Location(12.8 + rng.random() * 0.4, 77.4 + rng.random() * 0.4)
+            index.upsert(f"D{i}", locations[f"D{i}"])
+        for i in range(0, 500, 3):  # Move some drivers, remove others
+            locations[f"D{i}"] = Location(12.8 + rng.random() * 0.4, 77.4 + rng.random() * 0.4)
+            index.upsert(f"D{i}", locations[f"D{i}"])
+        for i in range(1, 500, 5):
+            index.remove(f"D{i}")
+            del locations[f"D{i}"]
+
+        for _ in range(50):
+            pickup = Location(12.7 + rng.random() * 0.6, 77.3 + rng.random() * 0.6)
+            radius = rng.choice([None, 2.0, 10.0])
+            expected = sorted((location.get_great_circle_distance_to(pickup), driver_id)
+                              for driver_id, location in locations.items()
+                              if radius is None or location.get_great_circle_distance_to(pickup) <= radius)[:5]
+            nearest = index.nearest(pickup, k=5, radius_km=radius)
+            self.assertEqual([driver_id for _, driver_id in nearest], [driver_id for _, driver_id in expected])
+            for (distance, _), (expected_distance, _) in zip(nearest, expected):
+                self.assertAlmostEqual(distance, expected_distance, places=9)
+        self.assertEqual(len(index), len(locations))
+
+
+class TestBatchMatching(unittest.TestCase):
+
+    def setUp(self):
+        self.system = BookingSystem()
+        # Along one parallel: D1 at x=0, D2 at x=2; R1 waits at x=1.1, R2 at x=3 (x in units of 0.01 degrees)
+        self.system.register_driver("D1", "Alice", {"model": "Sedan"}, self.at(0))
+        self.system.register_driver("D2", "Bob", {"model": "Sedan"}, self.at(2))
+        for rider_id in ("R1", "R2", "R3"):
+            self.system.register_rider(rider_id, rider_id)
+
+    @staticmethod
+    def at(x):
+        return Location(12.9, 77.5 + x * 0.01)
+
+    def test_min_cost_matching(self):
+        # Greedy in order gives rider 0 driver "b" (cost 1) and rider 1 driver "a" (cost 10)
+        self.assertEqual(min_cost_matching([[(1, "b"), (2, "a")], [(3, "b"), (10, "a")]]), ["a", "b"])
+        # A rider with no candidate, or one outbid for the only driver, stays unmatched
+        self.assertEqual(min_cost_matching([[], [(1, "a")], [(2, "a")]]), [None, "a", None])
+
+    def test_batch_beats_greedy_on_total_pickup_distance(self):
+        self.system.submit_ride_request("R1", self.at(1.1), self.at(5))
+        self.system.submit_ride_request("R2", self.at(3), self.at(5))
+        with self.assertRaises(InvalidInputError):
+            self.system.request_ride("R1", self.at(1.1), self.at(5))  # Already waiting for the batch
+        rides, unmatched = self.system.match_pending_requests()
+        # Greedy would give R1 the nearer D2 and send D1 three units to R2
+        self.assertEqual({rider_id: ride.get_driver_id() for rider_id, ride in rides.items()}, {"R1": "D1", "R2": "D2"})
+        self.assertEqual(unmatched, [])
+        self.assertEqual(self.system._drivers["D2"].get_status(), DriverStatus.EN_ROUTE_TO_PICKUP)
+        self.assertEqual(self.system.get_ride_status(rides["R2"].get_id()).get_status(), RideStatus.MATCHED)
+
+        self.system.submit_ride_request("R3", self.at(1), self.at(5))
+        self.assertEqual(self.system.match_pending_requests(), ({}, ["R3"]))
+        self.assertEqual(self.system._pending_requests, {})
+
+    def test_failed_batch_reports_the_requests_it_dequeued(self):
+        self.system.submit_ride_request("R1", self.at(1.1), self.at(5))
+        with mock.patch.object(self.system, "_match_requests", side_effect=RuntimeError("matcher down")):
+            with self.assertRaises(BatchMatchError) as raised:
+                self.system.match_pending_requests()
+        self.assertEqual(raised.exception.rider_ids, ["R1"])
+        self.assertEqual(raised.exception.rides, {})
+        self.assertIsInstance(raised.exception.__cause__, RuntimeError)
+        self.assertEqual(self.system._pending_requests, {})
+
+    def test_failed_batch_keeps_the_rides_it_already_created(self):
+        self.system.submit_ride_request("R1", self.at(1.1), self.at(5))
+        self.system.submit_ride_request("R2", self.at(3), self.at(5))
+        claim = self.system._claim_driver_for_ride
+        claims = []
+
+        def fail_second_claim(*args):
+            claims.append(args)
+            if len(claims) == 2:
+                raise RuntimeError("claim failed")
+            return claim(*args)
+
+        with mock.patch.object(self.system, "_claim_driver_for_ride", side_effect=fail_second_claim):
+            with self.assertRaises(BatchMatchError) as raised:
+                self.system.match_pending_requests()
+        (matched_rider, ride), = raised.exception.rides.items()
+        self.assertEqual(self.system._rider_to_active_ride, {matched_rider: ride.get_id()})
+        self.assertEqual(raised.exception.rider_ids, [rider_id for rider_id in ("R1", "R2") if rider_id != matched_rider])
+        self.assertEqual(self.system._pending_requests, {})
+
+
+class TestConcurrentBooking(unittest.TestCase):
+
+    def setUp(self):
+        self.system = BookingSystem()
+        self.pickup = Location(12.9716, 77.5946)
+        for i in range(20):
+            self.system.register_driver(f"D{i}", f"Driver {i}", {"model": "Sedan"},
+                                        Location(12.9716 + i * 0.0005, 77.5946))
+        for i in range(40):
+            self.system.register_rider(f"R{i}", f"Rider {i}")
+
+    def test_compare_and_set_status(self):
+        driver = self.system._drivers["D0"]
+        self.assertTrue(driver.compare_and_set_status(DriverStatus.AVAILABLE, DriverStatus.EN_ROUTE_TO_PICKUP))
+        self.assertFalse(driver.compare_and_set_status(DriverStatus.AVAILABLE, DriverStatus.EN_ROUTE_TO_PICKUP))
+        self.assertEqual(driver.get_status(), DriverStatus.EN_ROUTE_TO_PICKUP)
+        self.assertNotIn("D0", self.system._available_index)
+
+    def test_concurrent_requests_never_share_a_driver(self):
+        # 40 riders race for the same 20 drivers: each driver is claimed exactly once
+        rides, failures = [], []
+        barrier = threading.Barrier(8)
+
+        def request(rider_ids):
+            barrier.wait()
+            for rider_id in rider_ids:
+                try:
+                    rides.append(self.system.request_ride(rider_id, self.pickup, self.pickup))
+                except NoDriverFoundError:
+                    failures.append(rider_id)
+
+        threads = [threading.Thread(target=request, args=([f"R{i}" for i in range(t, 40, 8)],)) for t in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        self.assertEqual(len(rides), 20)
+        self.assertEqual(len(failures), 20)
+        self.assertEqual(sorted(ride.get_driver_id() for ride in rides), sorted(self.system._drivers))
+        self.assertEqual(len({ride.get_id() for ride in rides}), 20)
+        self.assertEqual(len(self.system._available_index), 0)
+
+
+class TestSurgePricing(unittest.TestCase):
+
+    def setUp(self):
+        self.now = 0.0
+        self.engine = SurgePricingEngine(window_seconds=300, bucket_seconds=30, clock=lambda: self.now)
+        self.hotspot = Location(12.971, 77.591)
+
+    def test_multipliers_follow_demand_per_supply(self):
+        self.engine.update_driver("D1", 12.972, 77.592)
+        self.engine.update_driver("D2", 12.972, 77.592)
+        for _ in range(6):
+            self.engine.record_request(self.hotspot)
+        self.assertEqual(self.engine.multiplier_at(self.hotspot), 1.0)  # Cached until the next recompute
+
+        self.engine.recompute()  # 6 requests per 2 drivers: 1 + 0.5 * (3 - 1)
+        self.assertEqual(self.engine.multiplier_at(self.hotspot), 2.0)
+        self.assertEqual(self.engine.multiplier_at(Location(12.5, 77.0)), 1.0)
+
+        self.engine.remove_driver("D2")
+        self.engine.recompute()  # 6 requests per driver, clamped to the maximum
+        self.assertEqual(self.engine.multiplier_at(self.hotspot), 3.0)
+
+        self.now = 301  # The requests leave the rolling window
+        self.engine.recompute()
+        self.assertEqual(self.engine.multiplier_at(self.hotspot), 1.0)
+
+    def test_end_ride_charges_the_pickup_cells_surge(self):
+        system = BookingSystem(surge_pricing=self.engine)
+        system.register_driver("D1", "Alice", {"model": "Sedan"}, self.hotspot)
+        for rider_id in ("R1", "R2", "R3"):
+            system.register_rider(rider_id, rider_id)
+        ride = system.request_ride("R1", self.hotspot, Location(12.90, 77.60))
+        for rider_id in ("R2", "R3"):
+            with self.assertRaises(NoDriverFoundError):  # Unmet requests still count as demand
+                system.request_ride(rider_id, self.hotspot, Location(12.90, 77.60))
+        self.engine.recompute()  # 3 requests, no available driver
+        system.driver_arrived_at_pickup(ride.get_id())
+        system.start_ride(ride.get_id())
+        ride.set_start_time(ride.get_start_time() - datetime.timedelta(minutes=10))
+        fare = system.end_ride(ride.get_id())
+        distance = self.hotspot.get_great_circle_distance_to(Location(12.90, 77.60))
+        self.assertAlmostEqual(fare, 2.0 * FareCalculator.calculate_fare(distance, 10), delta=0.02)
+
+    def test_bulk_pings_move_available_supply(self):
+        system = BookingSystem(surge_pricing=self.engine)
+        system.register_driver("D1", "Alice", {"model": "Sedan"}, Location(12.90, 77.60))
+        system.register_driver("D2", "Bob", {"model": "Sedan"}, self.hotspot)
+        system.register_rider("R1", "R1")
+        cell = self.engine._cell_of
+        self.assertEqual(self.engine._supply, {cell(12.90, 77.60): 1, cell(12.971, 77.591): 1})
+
+        system.request_ride("R1", self.hotspot, Location(12.90, 77.60))  # D2 is matched, no longer supply
+        system.update_driver_locations([("D1", 13.50, 78.40, 1.0), ("D2", 13.50, 78.40, 1.0)])
+        self.assertEqual(self.engine._supply, {cell(13.50, 78.40): 1})
+        self.assertEqual(self.engine._supply_cell_of, {"D1": cell(13.50, 78.40)})
+
+
+class TestRoadNetwork(unittest.TestCase):
+    # A river runs between latitudes 12.900 and 12.905, crossed only by the bridge s-n to the east
+    GRAPH = """
+        # node  latitude  longitude
+        v p 12.900 77.500
+        v b 12.900 77.510
+        v s 12.900 77.530
+        v n 12.905 77.530
+        v a 12.905 77.500
+        # Two-way roads: from, to, length in km, speed in km/h
+        b p b 1.1 30
+        b b s 2.2 30
+        b s n 0.6 30
+        b n a 3.3 30
+    """
+
+    def setUp(self):
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "roads.txt")
+        with open(self.path, "w") as file:
+            file.write(self.GRAPH)
+        self.oracle = RoadNetworkOracle.load(self.path, landmark_count=2)
+        self.pickup = Location(12.900, 77.500)
+        self.across_river = Location(12.905, 77.500)
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_routes(self):
+        route = self.oracle.route(self.pickup, self.across_river)
+        self.assertAlmostEqual(route.km, 7.2)
+        self.assertAlmostEqual(route.seconds, 7.2 / 30 * 3600)
+        self.assertEqual(self.oracle.route(self.pickup, self.pickup), (0.0, 0.0))
+        self.oracle.route(self.across_river, self.pickup)
+        self.oracle.route(self.pickup, self.across_river)
+        self.assertEqual(self.oracle.cache_info().hits, 1)
+
+        with open(self.path, "a") as file:
+            file.write("e a p 0.6 0\n")  # A ferry with no speed
+        with self.assertRaises(InvalidInputError):
+            RoadGraph.load(self.path)
+
+    def test_matching_ranks_drivers_by_road_travel_time(self):
+        for road_network, expected_driver in ((None, "A"), (self.oracle, "B")):
+            system = BookingSystem(road_network=road_network)
+            system.register_driver("A", "Across the river", {"model": "Sedan"}, self.across_river)  # 0.56 km away
+            system.register_driver("B", "Same bank", {"model": "Sedan"}, Location(12.900, 77.510))  # 1.08 km away
+            system.register_rider("R1", "Rider")
+            ride = system.request_ride("R1", self.pickup, self.across_river)
+            self.assertEqual(ride.get_driver_id(), expected_driver)
+
+        # The fare is charged for the road distance over the bridge
+        system.driver_arrived_at_pickup(ride.get_id())
+        system.start_ride(ride.get_id())
+        fare = system.end_ride(ride.get_id())
+        self.assertAlmostEqual(fare, FareCalculator.calculate_fare(7.2, 0), delta=0.01)
+
+
+class TestRideArchive(unittest.TestCase):
+
+    def setUp(self):
+        self.day1 = datetime.datetime(2024, 3, 1)
+        self.day2 = datetime.datetime(2024, 3, 2)
+
+    def fill(self, archive):
+        self.archive = archive
+        # (ride_id, rider, driver, ended at, fare)
+        for ride_id, rider_id, driver_id, ended_at, fare in [
+            ("RIDE_1", "R1", "D1", self.day1.replace(hour=9, minute=10), 10.0),
+            ("RIDE_2", "R2", "D1", self.day1.replace(hour=9, minute=50), 12.5),
+            ("RIDE_3", "R1", "D2", self.day1.replace(hour=18), 7.0),
+            ("RIDE_4", "R2", "D2", self.day2.replace(hour=8, minute=30), 20.0),
+        ]:
+            ride = Ride(ride_id, rider_id, driver_id, Location(12.97, 77.59), Location(12.90, 77.60))
+            ride.set_status(RideStatus.COMPLETED)
+            ride.set_start_time(ended_at - datetime.timedelta(minutes=15))
+            ride.set_end_time(ended_at)
+            ride.set_fare(fare)
+            archive.add(ride, 8.0, 15.0)
+
+    def assert_queries(self):
+        self.assertEqual(len(self.archive), 4)
+        ride = self.archive.get_ride("RIDE_2")
+        self.assertEqual((ride.get_rider_id(), ride.get_driver_id(), ride.get_fare()), ("R2", "D1", 12.5))
+        self.assertEqual(ride.get_end_time(), self.day1.replace(hour=9, minute=50))
+        self.assertEqual(ride.get_pickup_location(), Location(12.97, 77.59))
+        self.assertIsNone(self.archive.get_ride("RIDE_9"))
+
+        self.assertEqual([r.get_id() for r in self.archive.rides_for_rider("R1")], ["RIDE_1", "RIDE_3"])
+        self.assertEqual([r.get_id() for r in self.archive.rides_for_driver("D2", start=self.day2)], ["RIDE_4"])
+        self.assertEqual([r.get_id() for r in self.archive.rides_between(self.day1.replace(hour=9, minute=30),
+                                                                       self.day2.replace(hour=9))],
+                         ["RIDE_2", "RIDE_3", "RIDE_4"])
+        self.assertEqual(self.archive.revenue_per_hour(self.day1, self.day2 + datetime.timedelta(days=1)), {
+            self.day1.replace(hour=9): 22.5, self.day1.replace(hour=18): 7.0, self.day2.replace(hour=8): 20.0})
+        self.assertEqual(self.archive.trips_per_driver(), {"D1": 2, "D2": 2})
+        self.assertEqual(self.archive.trips_per_driver(self.day1.replace(hour=12), self.day2), {"D2": 1})
+
+    def test_queries(self):
+        self.fill(RideArchive())
+        self.assert_queries()
+        with self.assertRaises(ValueError):
+            self.archive.add(self.archive.get_ride("RIDE_1"), 8.0, 15.0)  # Already archived
+
+    def test_spilled_partitions_answer_the_same_queries(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.fill(RideArchive(spill_directory=directory, hot_days=1))  # Day 1 spills when day 2 starts
+            self.assertTrue(os.path.exists(os.path.join(directory, "2024-03-01", "fare.bin")))
+            self.assertTrue(self.archive._partitions[self.day1.date()].spilled)
+            self.assertFalse(self.archive._partitions[self.day2.date()].spilled)
+            self.assert_queries()
+            self.archive.close()
+
+    @unittest.skipUnless(ride_archive.np is not None, "NumPy is not installed")
+    def test_revenue_per_hour_numpy_and_fallback_agree(self):
+        with tempfile.TemporaryDirectory() as directory:
+            self.fill(RideArchive(spill_directory=directory, hot_days=1))
+            for start, end in [(self.day1, self.day2 + datetime.timedelta(days=1)),  # Whole days
+                               (self.day1.replace(hour=9, minute=30), self.day2.replace(hour=9))]:
+                vectorized = self.archive.revenue_per_hour(start, end)
+                with mock.patch.object(ride_archive, "np", None):
+                    self.assertEqual(self.archive.revenue_per_hour(start, end), vectorized)
+            self.assertEqual(vectorized, {self.day1.replace(hour=9): 12.5, self.day1.replace(hour=18): 7.0,
+                                          self.day2.replace(hour=8): 20.0})
+            self.archive.close()
+
+
+class TestAsyncBookingService(unittest.TestCase):
+
+    def setUp(self):
+        self.system = BookingSystem()
+        self.pickup = Location(12.9716, 77.5946)
+        self.dropoff = Location(12.9000, 77.6000)
+        self.system.register_driver("D1", "Alice", {"model": "Sedan"}, self.pickup)
+        self.system.register_driver("D2", "Bob", {"model": "Sedan"}, Location(12.9800, 77.5800))
+        for rider_id in ("R1", "R2", "R3"):
+            self.system.register_rider(rider_id, rider_id)
+
+    def test_concurrent_requests_pings_and_lifecycle(self):
+        async def scenario():
+            async with AsyncBookingService(self.system, max_in_flight=2, max_queued_pings=2) as service:
+                results = await asyncio.gather(*(service.request_ride(rider_id, self.pickup, self.dropoff)
+                                                 for rider_id in ("R1", "R2", "R3")), return_exceptions=True)
+                rides = [result for result in results if isinstance(result, Ride)]
+                self.assertEqual(sorted(ride.get_driver_id() for ride in rides), ["D1", "D2"])
+                self.assertEqual(sum(isinstance(result, NoDriverFoundError) for result in results), 1)
+
+                # More pings than the queue holds: report_location waits for the batches to drain
+                for timestamp in range(10):
+                    await service.report_location("D1", 12.9 + timestamp * 0.001, 77.6, timestamp)
+                await service.report_location("D99", 12.9, 77.6, 0)
+
+                ride = rides[0]
+                await service.driver_arrived_at_pickup(ride.get_id())
+                await service.start_ride(ride.get_id())
+                self.assertGreater(await service.end_ride(ride.get_id()), 0)
+            self.assertEqual(service.ping_counts, {"accepted": 10, "stale": 0, "invalid": 0, "unknown": 1})
+
+        asyncio.run(scenario())
+
+    def test_batch_window(self):
+        async def scenario():
+            async with AsyncBookingService(self.system, batch_window=0.01) as service:
+                ride = await service.request_ride("R1", self.pickup, self.dropoff)
+                self.assertEqual(ride.get_driver_id(), "D1")
+                with self.assertRaises(InvalidInputError):
+                    await service.request_ride("R1", self.pickup, self.dropoff)  # Already riding
+
+        asyncio.run(scenario())
+
+    def test_batch_window_rejects_a_second_request_while_one_is_queued(self):
+        async def scenario():
+            async with AsyncBookingService(self.system, batch_window=0.2) as service:
+                first = asyncio.create_task(service.request_ride("R1", self.pickup, self.dropoff))
+                await asyncio.sleep(0.05)  # Queued, not yet matched
+                with self.assertRaises(InvalidInputError):
+                    await service.request_ride("R1", self.pickup, self.dropoff)
+                ride = await asyncio.wait_for(first, timeout=5)
+                self.assertEqual(ride.get_driver_id(), "D1")
+
+                waiting = asyncio.create_task(service.request_ride("R2", self.pickup, self.dropoff))
+                await asyncio.sleep(0.05)
+                with self.assertRaises(InvalidInputError):
+                    await service.request_ride("R2", self.pickup, self.dropoff)
+            # Closing before the next window fails the queued request instead of leaving it pending
+            with self.assertRaises(NoDriverFoundError):
+                await asyncio.wait_for(waiting, timeout=5)
+
+        asyncio.run(scenario())
+
+    def test_failed_batch_fails_only_its_requests(self):
+        match_requests = self.system._match_requests
+        failures = [RuntimeError("matcher down")]
+
+        def fail_once(requests, rides):
+            if failures:
+                raise failures.pop()
+            return match_requests(requests, rides)
+
+        async def scenario():
+            with mock.patch.object(self.system, "_match_requests", side_effect=fail_once):
+                async with AsyncBookingService(self.system, batch_window=0.05) as service:
+                    with self.assertRaises(BatchMatchError):
+                        await asyncio.wait_for(service.request_ride("R1", self.pickup, self.dropoff), timeout=5)
+                    ride = await asyncio.wait_for(service.request_ride("R1", self.pickup, self.dropoff), timeout=5)
+                    self.assertEqual(ride.get_driver_id(), "D1")
+
+        asyncio.run(scenario())
+
+    def test_failed_batch_resolves_the_riders_it_matched(self):
+        claim = self.system._claim_driver_for_ride
+        claims = []
+
+        def fail_second_claim(*args):
+            claims.append(args)
+            if len(claims) == 2:
+                raise RuntimeError("claim failed")
+            return claim(*args)
+
+        async def scenario():
+            with mock.patch.object(self.system, "_claim_driver_for_ride", side_effect=fail_second_claim):
+                async with AsyncBookingService(self.system, batch_window=0.1) as service:
+                    results = await asyncio.wait_for(asyncio.gather(
+                        service.request_ride("R1", self.pickup, self.dropoff),
+                        service.request_ride("R2", self.pickup, self.dropoff), return_exceptions=True), timeout=5)
+            rides = [result for result in results if isinstance(result, Ride)]
+            self.assertEqual(len(rides), 1)
+            self.assertEqual(sum(isinstance(result, BatchMatchError) for result in results), 1)
+            self.assertEqual(self.system._rider_to_active_ride, {rides[0].get_rider_id(): rides[0].get_id()})
+
+        asyncio.run(scenario())
+
 
 if __name__ == '__main__':
     # Use argv=[] to prevent unittest from trying to parse command-line args for itself
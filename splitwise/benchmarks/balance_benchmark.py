@@ -0,0 +1,70 @@
+"""
+Balance reads over a large expense history: the incremental ledger versus a full replay of every
+expense (what each read used to cost before balances were maintained incrementally).
+
+Usage: python -m splitwise.benchmarks.balance_benchmark [--expenses 1000000] [--users 1000] [--reads 1000]
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from splitwise.enums import SplitType
+from splitwise.managers.balance_manager import BalanceManager
+from splitwise.managers.expense_manager import ExpenseManager
+from splitwise.managers.user_manager import UserManager
+
+
+def run(expense_count: int, user_count: int, reads: int):
+    rng = random.Random(42)
+    user_ids = [f"u{i}" for i in range(user_count)]
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        user_manager = UserManager()
+        for user_id in user_ids:
+            user_manager.add_user(user_id, user_id)
+        expense_manager = ExpenseManager(user_manager)
+        balance_manager = BalanceManager(user_manager, expense_manager)
+
+        start = time.perf_counter()
+        for i in range(expense_count):
+            participants = rng.sample(user_ids, rng.randint(2, 5))
+            expense_manager.add_expense(f"Expense {i}", rng.randint(1, 500), participants[0],
+                                        participants, SplitType.EQUAL)
+        ingest_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for i in range(reads):
+            balance_manager.get_net_balance(user_ids[i % user_count])
+        net_read_seconds = (time.perf_counter() - start) / reads
+
+        start = time.perf_counter()
+        for i in range(reads):
+            balance_manager.get_user_balances(user_ids[i % user_count])
+        pairwise_read_seconds = (time.perf_counter() - start) / reads
+
+        start = time.perf_counter()
+        balance_manager.get_net_balances()
+        all_net_seconds = time.perf_counter() - start
+
+        start = time.perf_counter()
+        balance_manager._recalculate_all_balances()
+        replay_seconds = time.perf_counter() - start
+
+    print(f"Expenses                      : {expense_count:,} across {user_count:,} users")
+    print(f"Ingest (add_expense + delta)  : {ingest_seconds:.2f}s ({expense_count / ingest_seconds:,.0f}/s)")
+    print(f"get_net_balance(user)         : {net_read_seconds * 1e6:.2f} us")
+    print(f"get_user_balances(user)       : {pairwise_read_seconds * 1e6:.2f} us")
+    print(f"get_net_balances() all users  : {all_net_seconds * 1e3:.2f} ms")
+    print(f"Full replay (old cost / read) : {replay_seconds * 1e3:.2f} ms")
+    print(f"Speed-up per net-balance read : {replay_seconds / net_read_seconds:,.0f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--expenses", type=int, default=1_000_000)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--reads", type=int, default=1000)
+    arguments = parser.parse_args()
+    run(arguments.expenses, arguments.users, arguments.reads)
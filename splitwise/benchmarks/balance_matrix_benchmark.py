@@ -0,0 +1,117 @@
+"""
+Pairwise balance storage for many users: nested dicts keyed by user id (the original layout, where
+a user's incoming debts are found by scanning every ower), the same with a reverse (payer -> ower)
+index, and SparseBalanceMatrix over interned user indexes. Reports build time, memory and the
+cost of one user's outgoing (row) and incoming (column) debts.
+
+Usage: python -m splitwise.benchmarks.balance_matrix_benchmark [--users 1000000] [--debts 3000000] [--queries 1000]
+"""
+import argparse
+import gc
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+
+from splitwise.managers.balance_matrix import SparseBalanceMatrix
+
+
+class _NestedDicts:
+    """{ower: {payer: amount}} plus net balances; incoming debts need a scan over every ower."""
+
+    def __init__(self):
+        self.balances = defaultdict(lambda: defaultdict(int))
+        self.net_balances = defaultdict(int)
+
+    def add(self, ower_id, payer_id, amount):
+        self.balances[ower_id][payer_id] += amount
+        self.net_balances[ower_id] -= amount
+        self.net_balances[payer_id] += amount
+
+    def row(self, ower_id):
+        return dict(self.balances.get(ower_id, {}))
+
+    def column(self, payer_id):
+        return {ower_id: payers[payer_id] for ower_id, payers in self.balances.items() if payer_id in payers}
+
+
+class _NestedDictsWithReverseIndex(_NestedDicts):
+    """The nested dicts plus {payer: {ower: amount}}, so incoming debts are O(degree) too."""
+
+    def __init__(self):
+        super().__init__()
+        self.owed_by = defaultdict(lambda: defaultdict(int))
+
+    def add(self, ower_id, payer_id, amount):
+        super().add(ower_id, payer_id, amount)
+        self.owed_by[payer_id][ower_id] += amount
+
+    def column(self, payer_id):
+        return dict(self.owed_by.get(payer_id, {}))
+
+
+def _build(factory, debts):
+    structure = factory()
+    for ower_id, payer_id, amount in debts:
+        structure.add(ower_id, payer_id, amount)
+    return structure
+
+
+def _measure(factory, debts, query_ids, column_queries):
+    gc.collect()
+    start = time.perf_counter()
+    structure = _build(factory, debts)
+    build_seconds = time.perf_counter() - start
+
+    # Queries run with the collector paused, so a full collection of the other structures'
+    # millions of objects does not land inside one of them.
+    gc.disable()
+    start = time.perf_counter()
+    for user_id in query_ids:
+        structure.row(user_id)
+    row_seconds = (time.perf_counter() - start) / len(query_ids)
+
+    start = time.perf_counter()
+    for user_id in query_ids[:column_queries]:
+        structure.column(user_id)
+    column_seconds = (time.perf_counter() - start) / column_queries
+    gc.enable()
+    del structure
+
+    # Memory is measured on a second build, as tracing allocations slows the build down severalfold.
+    gc.collect()
+    tracemalloc.start()
+    structure = _build(factory, debts)
+    memory_bytes = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return build_seconds, memory_bytes, row_seconds, column_seconds
+
+
+def run(users: int, debt_count: int, queries: int):
+    rng = random.Random(42)
+    user_ids = [f"user-{i}" for i in range(users)]
+    debts = []
+    for _ in range(debt_count):
+        ower, payer = rng.sample(range(users), 2)
+        debts.append((user_ids[ower], user_ids[payer], rng.randint(1, 100_000)))
+    query_ids = [user_ids[rng.randrange(users)] for _ in range(queries)]
+
+    print(f"Users: {users:,}  debts added: {debt_count:,}")
+    print(f"{'structure':<30} {'build (s)':>10} {'memory (MB)':>12} {'row (us)':>10} {'column (us)':>12}")
+    for name, factory, column_queries in (
+        ("nested dicts (column = scan)", _NestedDicts, min(queries, 5)),
+        ("nested dicts + reverse index", _NestedDictsWithReverseIndex, queries),
+        ("SparseBalanceMatrix", SparseBalanceMatrix, queries),
+    ):
+        build_seconds, memory_bytes, row_seconds, column_seconds = _measure(factory, debts, query_ids, column_queries)
+        print(f"{name:<30} {build_seconds:>10.2f} {memory_bytes / 1e6:>12.1f} "
+              f"{row_seconds * 1e6:>10.2f} {column_seconds * 1e6:>12.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1_000_000)
+    parser.add_argument("--debts", type=int, default=3_000_000)
+    parser.add_argument("--queries", type=int, default=1000)
+    arguments = parser.parse_args()
+    run(arguments.users, arguments.debts, arguments.queries)
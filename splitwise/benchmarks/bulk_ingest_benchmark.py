@@ -0,0 +1,70 @@
+"""
+Bank-statement style import: one add_expense() per expense versus a single add_expenses_bulk().
+
+Usage: python -m splitwise.benchmarks.bulk_ingest_benchmark [--expenses 200000] [--users 1000]
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+
+from splitwise.enums import SplitType
+from splitwise.managers.balance_manager import BalanceManager
+from splitwise.managers.expense_manager import ExpenseManager
+from splitwise.managers.user_manager import UserManager
+
+
+def _generate_expenses(count: int, user_ids):
+    rng = random.Random(42)
+    expenses = []
+    for i in range(count):
+        participants = rng.sample(user_ids, rng.randint(2, 5))
+        expenses.append({
+            "description": f"Statement line {i}",
+            "total_amount": rng.randint(100, 50_000) / 100,
+            "paid_by_user_id": participants[0],
+            "participant_user_ids": participants,
+            "split_type": SplitType.EQUAL,
+        })
+    return expenses
+
+
+def _new_managers(user_ids):
+    user_manager = UserManager()
+    for user_id in user_ids:
+        user_manager.add_user(user_id, user_id)
+    expense_manager = ExpenseManager(user_manager)
+    balance_manager = BalanceManager(user_manager, expense_manager)
+    return expense_manager, balance_manager
+
+
+def run(count: int, user_count: int):
+    user_ids = [f"u{i}" for i in range(user_count)]
+    expenses = _generate_expenses(count, user_ids)
+
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        expense_manager, per_call_balances = _new_managers(user_ids)
+        start = time.perf_counter()
+        for expense in expenses:
+            expense_manager.add_expense(**expense)
+        per_call_seconds = time.perf_counter() - start
+
+        expense_manager, bulk_balances = _new_managers(user_ids)
+        start = time.perf_counter()
+        expense_manager.add_expenses_bulk(expenses)
+        bulk_seconds = time.perf_counter() - start
+
+    assert per_call_balances.get_net_balances() == bulk_balances.get_net_balances()
+    print(f"Expenses imported      : {count:,} across {user_count:,} users")
+    print(f"add_expense() per item : {per_call_seconds:.2f}s ({count / per_call_seconds:,.0f} expenses/s)")
+    print(f"add_expenses_bulk()    : {bulk_seconds:.2f}s ({count / bulk_seconds:,.0f} expenses/s)")
+    print(f"Speed-up               : {per_call_seconds / bulk_seconds:.1f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--expenses", type=int, default=200_000)
+    parser.add_argument("--users", type=int, default=1000)
+    arguments = parser.parse_args()
+    run(arguments.expenses, arguments.users)
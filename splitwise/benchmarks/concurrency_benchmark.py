@@ -0,0 +1,84 @@
+"""
+Multi-threaded throughput of mixed add_expense and balance reads.
+
+Each worker adds one expense for every `--read-ratio` reads, cycling through get_net_balance,
+get_user_balances, get_net_balances and UserManager.get_user. Reads take no lock: balance reads
+run optimistically under the BalanceManager's SeqLock and retry only if a delta was applied
+meanwhile, and user lookups read the current copy-on-write snapshot. Writes serialize only with
+each other.
+
+Usage: python -m splitwise.benchmarks.concurrency_benchmark [--ops 50000] [--threads 1 2 4 8] [--read-ratio 4]
+"""
+import argparse
+import contextlib
+import os
+import random
+import threading
+import time
+
+from splitwise.enums import SplitType
+from splitwise.managers.balance_manager import BalanceManager
+from splitwise.managers.expense_manager import ExpenseManager
+from splitwise.managers.user_manager import UserManager
+
+
+def _worker(user_manager: UserManager, expense_manager: ExpenseManager, balance_manager: BalanceManager,
+            user_ids, index: int, ops: int, read_ratio: int, read_latencies):
+    rng = random.Random(index)
+    for i in range(ops):
+        user_id = user_ids[rng.randrange(len(user_ids))]
+        step = i % (read_ratio + 1)
+        if step == 0:
+            participants = rng.sample(user_ids, 3)
+            expense_manager.add_expense("Shared", rng.randint(1, 300), participants[0], participants, SplitType.EQUAL)
+            continue
+        start = time.perf_counter()
+        if step == 1:
+            balance_manager.get_net_balance(user_id)
+        elif step == 2:
+            balance_manager.get_user_balances(user_id)
+        elif step == 3:
+            user_manager.get_user(user_id)
+        else:
+            balance_manager.get_net_balances()
+        read_latencies.append(time.perf_counter() - start)
+
+
+def run(total_ops: int, thread_counts, read_ratio: int, user_count: int = 200):
+    user_ids = [f"u{i}" for i in range(user_count)]
+    print(f"{'threads':>8} {'ops':>10} {'seconds':>9} {'ops/s':>12} {'read p99 (us)':>14} {'read p99.9 (us)':>16}")
+    for threads in thread_counts:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            user_manager = UserManager()
+            for user_id in user_ids:
+                user_manager.add_user(user_id, user_id)
+            expense_manager = ExpenseManager(user_manager)
+            balance_manager = BalanceManager(user_manager, expense_manager)
+
+            per_thread = total_ops // threads
+            latencies = [[] for _ in range(threads)]
+            workers = [threading.Thread(target=_worker, args=(user_manager, expense_manager, balance_manager,
+                                                              user_ids, index, per_thread, read_ratio,
+                                                              latencies[index]))
+                       for index in range(threads)]
+            start = time.perf_counter()
+            for worker in workers:
+                worker.start()
+            for worker in workers:
+                worker.join()
+            elapsed = time.perf_counter() - start
+
+        reads = sorted(latency for thread_latencies in latencies for latency in thread_latencies)
+        p99 = reads[int(len(reads) * 0.99)] * 1e6 if reads else 0.0
+        p999 = reads[int(len(reads) * 0.999)] * 1e6 if reads else 0.0
+        ops = per_thread * threads
+        print(f"{threads:>8} {ops:>10,} {elapsed:>9.2f} {ops / elapsed:>12,.0f} {p99:>14.1f} {p999:>16.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--ops", type=int, default=50_000)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--read-ratio", type=int, default=4)
+    arguments = parser.parse_args()
+    run(arguments.ops, arguments.threads, arguments.read_ratio)
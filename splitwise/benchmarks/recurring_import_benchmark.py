@@ -0,0 +1,78 @@
+"""
+Recurring-bill import: add_expenses_bulk() with one item per occurrence versus a single
+add_recurring_expenses(), which validates the split once and shares the splits of equal totals.
+
+Usage: python -m splitwise.benchmarks.recurring_import_benchmark [--occurrences 100000] [--participants 8]
+"""
+import argparse
+import contextlib
+import os
+import random
+import time
+import tracemalloc
+from datetime import datetime, timedelta
+
+from splitwise.enums import SplitType
+from splitwise.managers.balance_manager import BalanceManager
+from splitwise.managers.expense_manager import ExpenseManager
+from splitwise.managers.user_manager import UserManager
+
+
+def _new_managers(user_ids):
+    user_manager = UserManager()
+    for user_id in user_ids:
+        user_manager.add_user(user_id, user_id)
+    expense_manager = ExpenseManager(user_manager)
+    balance_manager = BalanceManager(user_manager, expense_manager)
+    return expense_manager, balance_manager
+
+
+def _measure(import_function):
+    tracemalloc.start()
+    start = time.perf_counter()
+    import_function()
+    seconds = time.perf_counter() - start
+    memory = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return seconds, memory / 2**20
+
+
+def run(occurrence_count: int, participant_count: int):
+    user_ids = [f"u{i}" for i in range(participant_count)]
+    rng = random.Random(42)
+    start_date = datetime(2020, 1, 1)
+    # A handful of distinct amounts, like a bill whose price changes a few times a year
+    amounts = [rng.randint(5_000, 20_000) / 100 for _ in range(12)]
+    occurrences = [(start_date + timedelta(hours=i), rng.choice(amounts)) for i in range(occurrence_count)]
+    shares = {user_id: rng.randint(1, 4) for user_id in user_ids}
+
+    rows = []
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        for split_type, split_data in ((SplitType.EQUAL, None), (SplitType.SHARES, shares)):
+            expense_manager, bulk_balances = _new_managers(user_ids)
+            bulk_seconds, bulk_memory = _measure(lambda: expense_manager.add_expenses_bulk([
+                {"description": "Bill", "total_amount": amount, "paid_by_user_id": user_ids[0],
+                 "participant_user_ids": user_ids, "split_type": split_type, "split_data": split_data,
+                 "created_at": created_at}
+                for created_at, amount in occurrences
+            ]))
+
+            expense_manager, recurring_balances = _new_managers(user_ids)
+            recurring_seconds, recurring_memory = _measure(lambda: expense_manager.add_recurring_expenses(
+                "Bill", occurrences, user_ids[0], user_ids, split_type, split_data))
+
+            assert bulk_balances.get_net_balances() == recurring_balances.get_net_balances()
+            rows.append((split_type.value, bulk_seconds, bulk_memory, recurring_seconds, recurring_memory))
+
+    print(f"Occurrences: {occurrence_count:,}  participants: {participant_count}")
+    print(f"{'split':<8} {'bulk (s)':>9} {'bulk (MB)':>10} {'recurring (s)':>14} {'recurring (MB)':>15}")
+    for split_type, bulk_seconds, bulk_memory, recurring_seconds, recurring_memory in rows:
+        print(f"{split_type:<8} {bulk_seconds:>9.2f} {bulk_memory:>10.1f} {recurring_seconds:>14.2f} {recurring_memory:>15.1f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--occurrences", type=int, default=100_000)
+    parser.add_argument("--participants", type=int, default=8)
+    arguments = parser.parse_args()
+    run(arguments.occurrences, arguments.participants)
@@ -0,0 +1,61 @@
+"""
+Debt simplification on large ledgers: transfer counts and run time of simplify_debts against the
+old single two-pointer pass, for one 10k-user ledger and for the same users in small groups.
+
+Usage: python -m splitwise.benchmarks.settlement_benchmark [--users 10000] [--group-size 10]
+"""
+import argparse
+import random
+import time
+from typing import Dict
+
+from splitwise.settlement.debt_simplifier import (
+    _settle_zero_sum_group,
+    simplify_debts,
+    simplify_group_debts,
+)
+
+
+def _random_balances(rng: random.Random, user_ids) -> Dict[str, int]:
+    # Whole-unit amounts, as real ledgers are dominated by round numbers and repeated prices.
+    balances = {user_id: rng.randint(-200, 200) * 100 for user_id in user_ids}
+    balances[user_ids[0]] -= sum(balances.values())
+    return balances
+
+
+def _timed(function, *args):
+    start = time.perf_counter()
+    result = function(*args)
+    return result, time.perf_counter() - start
+
+
+def run(user_count: int, group_size: int):
+    rng = random.Random(42)
+    user_ids = [f"u{i}" for i in range(user_count)]
+    balances = _random_balances(rng, user_ids)
+    non_zero = [(user_id, balance) for user_id, balance in balances.items() if balance]
+
+    print(f"{'ledger':<28} {'transfers':>10} {'seconds':>9}")
+    transfers, seconds = _timed(_settle_zero_sum_group, non_zero)
+    print(f"{'one ledger, two-pointer':<28} {len(transfers):>10,} {seconds:>9.3f}")
+    transfers, seconds = _timed(simplify_debts, balances)
+    print(f"{'one ledger, simplify_debts':<28} {len(transfers):>10,} {seconds:>9.3f}")
+
+    groups = {f"g{start}": _random_balances(rng, user_ids[start:start + group_size])
+              for start in range(0, user_count, group_size)}
+    start = time.perf_counter()
+    baseline = sum(len(_settle_zero_sum_group([(u, b) for u, b in group.items() if b]))
+                   for group in groups.values())
+    seconds = time.perf_counter() - start
+    print(f"{f'groups of {group_size}, two-pointer':<28} {baseline:>10,} {seconds:>9.3f}")
+    per_group, seconds = _timed(simplify_group_debts, groups)
+    exact = sum(len(transfers) for transfers in per_group.values())
+    print(f"{f'groups of {group_size}, exact':<28} {exact:>10,} {seconds:>9.3f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=10_000)
+    parser.add_argument("--group-size", type=int, default=10)
+    arguments = parser.parse_args()
+    run(arguments.users, arguments.group_size)
@@ -0,0 +1,82 @@
+"""
+Measures PersistentSplitwise startup: snapshot load + journal tail replay versus replaying the
+whole journal, plus a point-in-time balance query over the journal. Expenses are added one
+add_expense call (one journal event) at a time, as in normal use.
+
+Usage: python -m splitwise.benchmarks.startup_benchmark [--users 1000] [--expenses 100000] [--tail 5000]
+"""
+import argparse
+import contextlib
+import os
+import random
+import tempfile
+import time
+from datetime import datetime, timedelta
+
+from splitwise.enums import SplitType
+from splitwise.persistent_splitwise import PersistentSplitwise
+
+
+def _add_expenses(splitwise: PersistentSplitwise, users: int, count: int, seed: int):
+    rng = random.Random(seed)
+    start = datetime(2024, 1, 1)
+    for i in range(count):
+        participants = [f"u{p}" for p in rng.sample(range(users), 4)]
+        splitwise.add_expense(f"Expense {i}", rng.randint(100, 50_000) / 100, participants[0], participants,
+                              SplitType.EQUAL, created_at=start + timedelta(minutes=i))
+
+
+def _timed_open(data_dir: str):
+    start = time.perf_counter()
+    splitwise = PersistentSplitwise(data_dir, snapshot_every=10 ** 9, fsync=False)
+    return splitwise, time.perf_counter() - start
+
+
+def run(users: int, expenses: int, tail: int):
+    with tempfile.TemporaryDirectory() as data_dir:
+        snapshot_path = os.path.join(data_dir, PersistentSplitwise.SNAPSHOT_FILE_NAME)
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            splitwise, _ = _timed_open(data_dir)
+            for i in range(users):
+                splitwise.add_user(f"u{i}", f"User {i}")
+            _add_expenses(splitwise, users, expenses, seed=1)
+            start = time.perf_counter()
+            splitwise.snapshot()
+            snapshot_seconds = time.perf_counter() - start
+            _add_expenses(splitwise, users, tail, seed=2)
+            expected = splitwise.balance_manager.get_net_balances()
+
+            start = time.perf_counter()
+            splitwise.get_net_balances_as_of(datetime(2024, 1, 1) + timedelta(minutes=expenses // 2))
+            as_of_seconds = time.perf_counter() - start
+            splitwise.close()
+            del splitwise
+
+            restored, snapshot_startup_seconds = _timed_open(data_dir)
+            assert restored.balance_manager.get_net_balances() == expected
+            restored.close()
+            del restored
+
+            os.replace(snapshot_path, snapshot_path + ".bak")
+            replayed, replay_startup_seconds = _timed_open(data_dir)
+            assert replayed.balance_manager.get_net_balances() == expected
+            replayed.close()
+            os.replace(snapshot_path + ".bak", snapshot_path)
+
+        journal_bytes = os.path.getsize(os.path.join(data_dir, PersistentSplitwise.JOURNAL_FILE_NAME))
+        snapshot_bytes = os.path.getsize(snapshot_path)
+
+    print(f"Expenses in snapshot    : {expenses:,} ({snapshot_bytes / 1e6:.1f} MB, written in {snapshot_seconds:.2f}s)")
+    print(f"Journal tail            : {tail:,} expenses ({journal_bytes / 1e6:.1f} MB journal in total)")
+    print(f"Startup, snapshot + tail: {snapshot_startup_seconds:.2f}s")
+    print(f"Startup, full replay    : {replay_startup_seconds:.2f}s")
+    print(f"Balances as of a date   : {as_of_seconds:.2f}s")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--users", type=int, default=1000)
+    parser.add_argument("--expenses", type=int, default=100_000)
+    parser.add_argument("--tail", type=int, default=5000)
+    arguments = parser.parse_args()
+    run(arguments.users, arguments.expenses, arguments.tail)
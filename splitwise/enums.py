@@ -4,3 +4,6 @@ class SplitType(Enum):
     EQUAL = "EQUAL"
     EXACT = "EXACT"
     PERCENT = "PERCENT"
+    SHARES = "SHARES"
+    ADJUSTMENT = "ADJUSTMENT"
+    ITEMIZED = "ITEMIZED"
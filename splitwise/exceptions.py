@@ -24,5 +24,25 @@ class InvalidAmountException(SplitwiseError): # <--- NEW (Good to have for negat
     """Raised when an amount is invalid (e.g., non-positive)."""
     pass
 
+class GroupNotFoundException(SplitwiseError):
+    """Raised when a specified group ID does not exist."""
+    pass
+
+class DuplicateGroupException(SplitwiseError):
+    """Raised when trying to add a group with an ID that already exists."""
+    pass
+
+class UnbalancedLedgerError(SplitwiseError):
+    """Raised when net balances passed for settlement do not sum to zero."""
+    pass
+
+class PersistenceError(SplitwiseError):
+    """Raised when the on-disk event journal or snapshot cannot be read or replayed."""
+    pass
+
+class InvalidTimestampError(SplitwiseError):
+    """Raised when an expense's creation time is missing or not a datetime."""
+    pass
+
 
 # Add any other specific exceptions as we identify needs
\ No newline at end of file
@@ -0,0 +1,54 @@
+# splitwise/locking.py
+
+import threading
+import time
+from typing import Callable, TypeVar
+
+T = TypeVar("T")
+
+
+class SeqLock:
+    """
+    A sequence lock: writers serialize on a mutex, readers run optimistically and never block.
+
+    The version is odd while a write is in progress. A reader notes the version, runs its read
+    function and keeps the result only if no write started or finished in the meantime; otherwise
+    it yields the GIL (letting the writer finish) and retries. After `max_optimistic_attempts`
+    failed attempts (a sustained write stream) it takes the mutex, so a reader cannot spin forever.
+
+    Read functions must not mutate anything and must return copies, never live views, because they
+    may run concurrently with a writer and their result is discarded in that case.
+
+    Writers use the lock itself as a context manager: `with seq_lock: ...`.
+    """
+
+    def __init__(self, max_optimistic_attempts: int = 8):
+        self._mutex = threading.Lock()
+        self._version = 0
+        self._max_optimistic_attempts = max_optimistic_attempts
+
+    def __enter__(self):
+        self._mutex.acquire()
+        self._version += 1
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self._version += 1
+        self._mutex.release()
+
+    def read(self, read_function: Callable[[], T]) -> T:
+        for _ in range(self._max_optimistic_attempts):
+            version = self._version
+            if not version & 1:
+                try:
+                    result = read_function()
+                except (RuntimeError, IndexError, KeyError):
+                    # A concurrent write can make a read trip over a structure being changed.
+                    if self._version == version:
+                        raise
+                    continue
+                if self._version == version:
+                    return result
+            time.sleep(0)
+        with self._mutex:
+            return read_function()
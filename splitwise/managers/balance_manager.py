@@ -1,164 +1,224 @@
 # splitwise/balance_manager.py
 
-from typing import Dict, List, Tuple, Optional
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Tuple, Optional
 from collections import defaultdict
 
 from splitwise.managers.user_manager import UserManager
 from splitwise.managers.expense_manager import ExpenseManager
+from splitwise.managers.balance_matrix import SparseBalanceMatrix
+from splitwise.managers.balance_notifier import BalanceDeltas, BalanceNotifier, BalanceSubscription
+from splitwise.models.expense import Expense
+from splitwise.models.transfer import Transfer
+from splitwise.settlement.debt_simplifier import simplify_debts
 from splitwise.exceptions import UserNotFoundException
-import threading
-
-# Define a small epsilon for floating point comparisons in balances
-EPSILON_BALANCE = 0.001  # Balances typically shown to two decimal places (cents)
+from splitwise.money import format_minor_units
+from splitwise.locking import SeqLock
 
 
 class BalanceManager:
     """
     Manages the calculation and display of balances between users.
     It can show individual user balances or a full summary.
+    All balances are integers in minor units (cents), so they add up exactly.
+
+    Applying a delta takes the SeqLock's write side. Reads never block: multi-key reads run
+    optimistically and retry if a delta was applied meanwhile, so they always see whole batches
+    (net balances that sum to zero). Single-user net balance reads need no lock at all.
+
+    Instead of polling, clients can subscribe to net-balance deltas (subscribe / stream), which
+    are derived from the same per-batch deltas, so pushing them costs no recomputation.
     """
 
-    def __init__(self, user_manager: UserManager, expense_manager: ExpenseManager):
+    def __init__(self, user_manager: UserManager, expense_manager: ExpenseManager,
+                 ledger: Optional[Tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, int]]]] = None):
+        """
+        `ledger` optionally starts from a saved (debts, group_net_balances) pair, as returned by
+        get_ledger(), that already accounts for every expense stored in expense_manager; those
+        expenses are then not replayed.
+        """
         self._user_manager = user_manager
         self._expense_manager = expense_manager
-        self._lock = threading.Lock()
-        # Balances will be stored as: {payer_user_id: {ower_user_id: amount_owed}}
-        self._balances: Dict[str, Dict[str, float]] = defaultdict(lambda: defaultdict(float))
+        self._lock = SeqLock()
+        # What each ower owes each payer, with row (ower) and column (payer) indexes and net balances
+        self._balances = SparseBalanceMatrix()
+        # Net balance per user within each group: {group_id: {user_id: net_balance}}
+        self._group_net_balances: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        self._notifier = BalanceNotifier()
+        self._publish_deltas = True  # Off while _recalculate_all_balances replays the ledger
+
+        if ledger is not None:
+            debts, group_net_balances = ledger
+            self._balances.add_many({(ower_id, payer_id): amount
+                                     for ower_id, payers in debts.items() for payer_id, amount in payers.items()})
+            for group_id, balances in group_net_balances.items():
+                self._group_net_balances[group_id].update(balances)
+
+        # The ledger is maintained incrementally: every added expense is applied as a delta.
+        self._expense_manager.add_expense_listener(self._apply_expenses, replay_existing=ledger is None)
         print("BalanceManager initialized.")
 
-    def _recalculate_all_balances(self):
+    def _apply_expenses(self, expenses: List[Expense]):
         """
-        Recalculates all balances from scratch by iterating through all expenses.
-        This method is critical and must be protected as it modifies _balances.
+        Applies newly added expenses to the ledger in O(total participants).
+        Called by ExpenseManager (with its lock held) for every add_expense / add_expenses_bulk call.
+        The deltas are aggregated first, so a bulk import takes the lock once and touches each
+        (ower, payer) pair once.
         """
-        with self._lock:  # Acquire lock for this critical modification
-            self._balances.clear()
-            # It's crucial that get_all_expenses() (and other methods of ExpenseManager)
-            # are also thread-safe, which we have ensured.
-            all_expenses = self._expense_manager.get_all_expenses()
-
-            for expense in all_expenses:
-                paid_by_id = expense.paid_by.user_id
+        pair_deltas: Dict[Tuple[str, str], int] = defaultdict(int)
+        group_deltas: Dict[Tuple[str, str], int] = defaultdict(int)
+        for expense in expenses:
+            paid_by_id = expense.paid_by.user_id
+            group_id = expense.group_id
+
+            participant_shares: Dict[str, int] = {}
+            for split in expense.splits:
+                participant_shares[split.user.user_id] = split.amount_cents
+
+            for participant_id, share_amount in participant_shares.items():
+                if participant_id == paid_by_id:
+                    continue
+                pair_deltas[participant_id, paid_by_id] += share_amount
+                if group_id is not None:
+                    group_deltas[group_id, participant_id] -= share_amount
+                    group_deltas[group_id, paid_by_id] += share_amount
 
-                participant_shares: Dict[str, float] = {}
-                for split in expense.splits:
-                    participant_shares[split.user.user_id] = split.amount
-
-                for participant_id, share_amount in participant_shares.items():
-                    if participant_id == paid_by_id:
-                        continue
+        with self._lock:
+            self._balances.add_many(pair_deltas)
+            for (group_id, user_id), amount in group_deltas.items():
+                self._group_net_balances[group_id][user_id] += amount
+
+        if self._publish_deltas and self._notifier.has_subscribers():
+            net_deltas: BalanceDeltas = defaultdict(int)
+            for (ower_id, payer_id), amount in pair_deltas.items():
+                net_deltas[ower_id] -= amount
+                net_deltas[payer_id] += amount
+            # Still under the expense lock, so subscribers receive batches in ledger order
+            self._notifier.publish(net_deltas)
 
-                    self._balances[participant_id][paid_by_id] += share_amount
+    def _recalculate_all_balances(self):
+        """
+        Rebuilds the ledger from scratch by replaying every expense.
+        Reads never need this; it is kept as a consistency check / repair tool.
+        """
+        # Detaching first means no delta can land between the reset and the replay; re-registering
+        # replays every stored expense atomically, including any added while detached.
+        self._expense_manager.remove_expense_listener(self._apply_expenses)
+        previous = self.get_net_balances()
+        with self._lock:
+            self._balances.clear()
+            self._group_net_balances.clear()
+        # Subscribers only hear about what the rebuild actually changed (normally nothing)
+        self._publish_deltas = False
+        try:
+            self._expense_manager.add_expense_listener(self._apply_expenses, replay_existing=True)
+        finally:
+            self._publish_deltas = True
+        current = self.get_net_balances()
+        self._notifier.publish({user_id: current.get(user_id, 0) - previous.get(user_id, 0)
+                                for user_id in previous.keys() | current.keys()})
+
+    def subscribe(self, callback: Callable[[BalanceDeltas], None], user_ids: Optional[Iterable[str]] = None,
+                  window: float = 0.1) -> BalanceSubscription:
+        """
+        Calls `callback` with {user_id: change in net balance} whenever expenses change balances,
+        optionally only for `user_ids`. Changes within `window` seconds are coalesced into one call.
+        Callbacks run on a notifier thread, outside every lock. Close the returned subscription
+        (or use it as a context manager) to stop.
+        """
+        return self._notifier.subscribe(callback, user_ids, window)
 
-    def get_net_balances(self) -> Dict[str, float]:
+    def stream(self, user_ids: Optional[Iterable[str]] = None, window: float = 0.1) -> AsyncIterator[BalanceDeltas]:
         """
-        Calculates the net balance for each user (positive if owed, negative if owes).
-        Ensures balances are recalculated before returning for consistency.
+        The same deltas as subscribe(), as an async iterator:
+        `async for deltas in balance_manager.stream(["u1"]): ...`
         """
-        # Recalculation itself is locked. This method also acts as a read, so it should be protected.
-        self._recalculate_all_balances()  # This will acquire its own lock.
+        return self._notifier.stream(user_ids, window)
 
-        net_balances: Dict[str, float] = defaultdict(float)
+    def get_net_balance(self, user_id: str) -> int:
+        """
+        Returns one user's net balance in minor units (positive if owed, negative if owes) in O(1).
+        Lock-free: an index lookup plus an array read, each atomic; the value is only replaced, never half-written.
+        """
+        return self._balances.net_balance(user_id)
 
-        # Acquire lock to ensure consistent read of _balances after recalculation
-        with self._lock:
-            for user in self._user_manager.get_all_users():  # UserManager's get_all_users is thread-safe
-                net_balances[user.user_id] = 0.0
+    def get_net_balances(self) -> Dict[str, int]:
+        """
+        Returns the net balance of every user with an outstanding balance
+        in minor units (positive if owed, negative if owes).
+        """
+        return self._lock.read(self._balances.net_balances)
 
-            for ower_id, debts_to_others in self._balances.items():
-                for payer_id, amount_owed in debts_to_others.items():
-                    net_balances[ower_id] -= amount_owed
-                    net_balances[payer_id] += amount_owed
+    def get_group_net_balances(self, group_id: str) -> Dict[str, int]:
+        """Returns the non-zero net balances (in minor units) from a single group's expenses."""
+        return self._lock.read(
+            lambda: {user_id: balance for user_id, balance in self._group_net_balances.get(group_id, {}).items()
+                     if balance})
 
-            for user_id in list(net_balances.keys()):
-                if abs(net_balances[user_id]) < EPSILON_BALANCE:
-                    del net_balances[user_id]
+    def get_user_balances(self, user_id: str) -> Tuple[Dict[str, int], Dict[str, int]]:
+        """
+        Returns (owes, owed_by) for a user: what they owe each payer, and what each ower owes them.
+        Runs in O(number of users they share debts with), via the matrix's row and column indexes.
+        """
+        return self._lock.read(lambda: (self._balances.row(user_id), self._balances.column(user_id)))
 
-            return net_balances
+    def get_ledger(self) -> Tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, int]]]:
+        """
+        Returns a copy of the whole ledger as (debts, group_net_balances): what each ower owes each
+        payer, and every group's net balances. Only non-zero amounts are included.
+        """
+        def read() -> Tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, int]]]:
+            debts: Dict[str, Dict[str, int]] = {}
+            for ower_id, payer_id, amount in self._balances.entries():
+                debts.setdefault(ower_id, {})[payer_id] = amount
+            group_net_balances = {group_id: {user_id: balance for user_id, balance in balances.items() if balance}
+                                  for group_id, balances in self._group_net_balances.items()}
+            return debts, {group_id: balances for group_id, balances in group_net_balances.items() if balances}
+        return self._lock.read(read)
+
+    def simplify_debts(self, group_id: Optional[str] = None) -> List[Transfer]:
+        """
+        Returns the (minimal for small ledgers) list of transfers that settles every balance,
+        or only the balances from one group's expenses if group_id is given.
+        """
+        if group_id is not None:
+            return simplify_debts(self.get_group_net_balances(group_id))
+        return simplify_debts(self.get_net_balances())
 
     def show_balances(self, user_id: Optional[str] = None):
         """
         Displays the current balances in the system.
-        Ensures balances are recalculated before display for consistency.
         """
-        # Recalculation itself is locked. This method also acts as a read, so it should be protected.
-        self._recalculate_all_balances()  # This will acquire its own lock.
-
-        # Acquire lock to ensure consistent read of _balances after recalculation
-        with self._lock:
-            if user_id:
-                try:
-                    user = self._user_manager.get_user(user_id)  # UserManager's get_user is thread-safe
-                except UserNotFoundException as e:
-                    print(e)
-                    return
-
-                has_balances = False
-
-                # Debts where 'user' is the ower
-                for to_id, amount in self._balances.get(user_id, {}).items():
-                    if amount > EPSILON_BALANCE:
-                        to_user = self._user_manager.get_user(to_id)
-                        print(f"{user.name} owes {to_user.name}: {amount:.2f}")
-                        has_balances = True
-
-                # Debts where 'user' is the payer (others owe this user)
-                for ower_id, debts_to_others in self._balances.items():
-                    if ower_id != user_id and user_id in debts_to_others:
-                        amount = debts_to_others[user_id]
-                        if amount > EPSILON_BALANCE:
-                            from_user = self._user_manager.get_user(ower_id)
-                            print(f"{from_user.name} owes {user.name}: {amount:.2f}")
-                            has_balances = True
-
-                if not has_balances:
-                    print(f"No balances involving {user.name}.")
-            else:
-                print("\n--- All Outstanding Balances (Simplified) ---")
-                net_balances = self.get_net_balances()  # This internally calls _recalculate_all_balances and locks
-
-                if not net_balances:
-                    print("No outstanding balances.")
-                    return
-
-                owers = {uid: balance for uid, balance in net_balances.items() if balance < -EPSILON_BALANCE}
-                owed = {uid: balance for uid, balance in net_balances.items() if balance > EPSILON_BALANCE}
-
-                sorted_owers = sorted(owers.items(), key=lambda item: item[1])
-                sorted_owed = sorted(owed.items(), key=lambda item: item[1], reverse=True)
-
-                if not sorted_owers or not sorted_owed:
-                    print(
-                        "No clear simplified transactions needed at this moment (all settled or only one type of balance remains).")
-                    return
-
-                i, j = 0, 0
-                transactions_made = False
-                temp_owers = list(sorted_owers)  # Create mutable copies for internal logic
-                temp_owed = list(sorted_owed)
-
-                while i < len(temp_owers) and j < len(temp_owed):
-                    ower_id, ower_amount = temp_owers[i]
-                    owed_id, owed_amount = temp_owed[j]
-
-                    actual_ower_amount = abs(ower_amount)
-
-                    transfer_amount = min(actual_ower_amount, owed_amount)
-
-                    # UserManager.get_user is already thread-safe
-                    ower_name = self._user_manager.get_user(ower_id).name
-                    owed_name = self._user_manager.get_user(owed_id).name
-
-                    print(f"{ower_name} pays {owed_name}: {transfer_amount:.2f}")
-                    transactions_made = True
-
-                    temp_owers[i] = (ower_id, ower_amount + transfer_amount)
-                    temp_owed[j] = (owed_id, owed_amount - transfer_amount)
-
-                    if abs(temp_owers[i][1]) < EPSILON_BALANCE:
-                        i += 1
-                    if abs(temp_owed[j][1]) < EPSILON_BALANCE:
-                        j += 1
-
-                if not transactions_made:
-                    print("No outstanding simplified balances.")
+        if user_id:
+            try:
+                user = self._user_manager.get_user(user_id)  # UserManager's get_user is thread-safe
+            except UserNotFoundException as e:
+                print(e)
+                return
+
+            owes, owed_by = self.get_user_balances(user_id)
+
+            # Debts where 'user' is the ower
+            for to_id, amount in owes.items():
+                to_user = self._user_manager.get_user(to_id)
+                print(f"{user.name} owes {to_user.name}: {format_minor_units(amount)}")
+
+            # Debts where 'user' is the payer (others owe this user)
+            for ower_id, amount in owed_by.items():
+                from_user = self._user_manager.get_user(ower_id)
+                print(f"{from_user.name} owes {user.name}: {format_minor_units(amount)}")
+
+            if not owes and not owed_by:
+                print(f"No balances involving {user.name}.")
+        else:
+            print("\n--- All Outstanding Balances (Simplified) ---")
+            transfers = self.simplify_debts()
+
+            if not transfers:
+                print("No outstanding balances.")
+                return
+
+            # One UserManager round-trip for all names instead of two per transfer
+            names = {user.user_id: user.name for user in self._user_manager.get_all_users()}
+            for transfer in transfers:
+                print(f"{names[transfer.from_user_id]} pays {names[transfer.to_user_id]}: "
+                      f"{format_minor_units(transfer.amount_cents)}")
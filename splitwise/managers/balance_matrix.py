@@ -0,0 +1,225 @@
+# splitwise/balance_matrix.py
+
+import bisect
+from array import array
+from typing import Dict, Iterator, List, Tuple
+
+
+class _SegmentedAdjacency:
+    """
+    One direction of the matrix: for every user index, a sorted segment of (neighbour, amount)
+    pairs stored in two flat arrays (4 + 8 bytes per entry) instead of a dict per user.
+
+    A rewritten segment is appended at the end and the old one becomes garbage; once garbage
+    outweighs live entries every segment is copied into fresh arrays.
+    """
+
+    def __init__(self):
+        self._starts = array("q")
+        self._lengths = array("i")
+        self._neighbours = array("i")
+        self._amounts = array("q")
+        self._live = 0
+
+    def add_user(self):
+        self._starts.append(0)
+        self._lengths.append(0)
+
+    def get(self, index: int, neighbour: int) -> int:
+        start = self._starts[index]
+        end = start + self._lengths[index]
+        position = bisect.bisect_left(self._neighbours, neighbour, start, end)
+        if position < end and self._neighbours[position] == neighbour:
+            return self._amounts[position]
+        return 0
+
+    def items(self, index: int) -> Dict[int, int]:
+        length = self._lengths[index]
+        if not length:
+            return {}
+        start = self._starts[index]
+        return dict(zip(self._neighbours[start:start + length], self._amounts[start:start + length]))
+
+    def rewrite(self, index: int, items: Dict[int, int]):
+        """Replaces a user's segment with `items`, which must not contain zero amounts."""
+        self._live -= self._lengths[index]
+        neighbours = sorted(items)
+        self._starts[index] = len(self._neighbours)
+        self._lengths[index] = len(neighbours)
+        self._neighbours.fromlist(neighbours)
+        self._amounts.fromlist([items[neighbour] for neighbour in neighbours])
+        self._live += len(neighbours)
+        if len(self._neighbours) > 2 * self._live + 1024:
+            self._compact()
+
+    def _compact(self):
+        neighbours, amounts = array("i"), array("q")
+        for index in range(len(self._starts)):
+            start = self._starts[index]
+            end = start + self._lengths[index]
+            self._starts[index] = len(neighbours)
+            neighbours.extend(self._neighbours[start:end])
+            amounts.extend(self._amounts[start:end])
+        self._neighbours, self._amounts = neighbours, amounts
+
+    def clear(self):
+        for index in range(len(self._starts)):
+            self._starts[index] = 0
+            self._lengths[index] = 0
+        self._neighbours, self._amounts = array("i"), array("q")
+        self._live = 0
+
+
+class SparseBalanceMatrix:
+    """
+    Pairwise debts (ower -> payer, in minor units) as a sparse matrix over interned user indexes.
+
+    Every user id is interned once to a dense integer index. The matrix is kept twice, by row
+    (ower -> payers) and by column (payer -> owers), so both what a user owes and what is owed to
+    them are O(degree) lookups. Both copies live in flat arrays (see _SegmentedAdjacency), and net
+    balances in one array of signed 64-bit integers, so memory is about 24 bytes per debt and
+    40 bytes per user plus the interning dict, rather than two dicts per user.
+
+    Updates first go to small pending dicts (the rows and columns they touch), which reads merge
+    in; once enough are pending they are folded into the arrays in one pass, so a user's segment
+    is rewritten once per batch rather than once per update. Entries that return to zero are dropped.
+    Not thread-safe on its own; BalanceManager guards it with its lock.
+    """
+
+    _MIN_PENDING_ENTRIES = 16384
+
+    def __init__(self):
+        self._index_of: Dict[str, int] = {}  # user_id -> index
+        self._user_ids: List[str] = []  # index -> user_id
+        self._rows = _SegmentedAdjacency()  # ower index -> {payer index: amount}
+        self._columns = _SegmentedAdjacency()  # payer index -> {ower index: amount}
+        self._pending_rows: Dict[int, Dict[int, int]] = {}  # ower index -> {payer index: delta}
+        self._pending_columns: Dict[int, Dict[int, int]] = {}  # payer index -> {ower index: delta}
+        self._pending_count = 0
+        self._net_balances = array("q")  # index -> net balance (positive if owed, negative if owes)
+        self._entry_count = 0
+
+    def __len__(self) -> int:
+        """The number of non-zero (ower, payer) entries."""
+        return self._entry_count
+
+    def _intern(self, user_id: str) -> int:
+        index = self._index_of.get(user_id)
+        if index is None:
+            index = len(self._user_ids)
+            self._user_ids.append(user_id)
+            self._rows.add_user()
+            self._columns.add_user()
+            self._net_balances.append(0)
+            # Published last, so a lock-free net balance read never sees an index the array lacks.
+            self._index_of[user_id] = index
+        return index
+
+    def add(self, ower_id: str, payer_id: str, amount: int):
+        """Adds `amount` to what ower_id owes payer_id (and to both net balances)."""
+        self._add_pending(ower_id, payer_id, amount)
+        if self._pending_count >= max(self._MIN_PENDING_ENTRIES, self._entry_count // 8):
+            self._fold_pending()
+
+    def add_many(self, deltas: Dict[Tuple[str, str], int]):
+        """Applies {(ower_id, payer_id): amount} at once, folding into the arrays at most once."""
+        for (ower_id, payer_id), amount in deltas.items():
+            self._add_pending(ower_id, payer_id, amount)
+        if self._pending_count >= max(self._MIN_PENDING_ENTRIES, self._entry_count // 8):
+            self._fold_pending()
+
+    def _add_pending(self, ower_id: str, payer_id: str, amount: int):
+        ower = self._intern(ower_id)
+        payer = self._intern(payer_id)
+
+        pending_row = self._pending_rows.get(ower)
+        if pending_row is None:
+            pending_row = self._pending_rows[ower] = {}
+        pending = pending_row.get(payer)
+        if pending is None:
+            pending = 0
+            self._pending_count += 1
+        previous = self._rows.get(ower, payer) + pending
+        pending_row[payer] = pending + amount
+        pending_column = self._pending_columns.get(payer)
+        if pending_column is None:
+            pending_column = self._pending_columns[payer] = {}
+        pending_column[ower] = pending + amount
+
+        updated = previous + amount
+        if previous and not updated:
+            self._entry_count -= 1
+        elif updated and not previous:
+            self._entry_count += 1
+        self._net_balances[ower] -= amount
+        self._net_balances[payer] += amount
+
+    def _fold_pending(self):
+        for adjacency, pending in ((self._rows, self._pending_rows), (self._columns, self._pending_columns)):
+            for index, deltas in pending.items():
+                items = adjacency.items(index)
+                if items:
+                    for neighbour, delta in deltas.items():
+                        amount = items.get(neighbour, 0) + delta
+                        if amount:
+                            items[neighbour] = amount
+                        else:
+                            items.pop(neighbour, None)
+                else:
+                    items = {neighbour: delta for neighbour, delta in deltas.items() if delta}
+                adjacency.rewrite(index, items)
+        self._pending_rows = {}
+        self._pending_columns = {}
+        self._pending_count = 0
+
+    def _merged(self, adjacency: _SegmentedAdjacency, pending: Dict[int, Dict[int, int]], index: int) -> Dict[str, int]:
+        items = adjacency.items(index)
+        deltas = pending.get(index)
+        if deltas:
+            for neighbour, delta in deltas.items():
+                items[neighbour] = items.get(neighbour, 0) + delta
+        user_ids = self._user_ids
+        return {user_ids[neighbour]: amount for neighbour, amount in items.items() if amount}
+
+    def get(self, ower_id: str, payer_id: str) -> int:
+        ower = self._index_of.get(ower_id)
+        payer = self._index_of.get(payer_id)
+        if ower is None or payer is None:
+            return 0
+        return self._rows.get(ower, payer) + self._pending_rows.get(ower, {}).get(payer, 0)
+
+    def row(self, ower_id: str) -> Dict[str, int]:
+        """What ower_id owes each payer, in O(number of payers)."""
+        index = self._index_of.get(ower_id)
+        return self._merged(self._rows, self._pending_rows, index) if index is not None else {}
+
+    def column(self, payer_id: str) -> Dict[str, int]:
+        """What each ower owes payer_id, in O(number of owers)."""
+        index = self._index_of.get(payer_id)
+        return self._merged(self._columns, self._pending_columns, index) if index is not None else {}
+
+    def net_balance(self, user_id: str) -> int:
+        index = self._index_of.get(user_id)
+        return self._net_balances[index] if index is not None else 0
+
+    def net_balances(self) -> Dict[str, int]:
+        """Every non-zero net balance, keyed by user id."""
+        user_ids = self._user_ids
+        return {user_ids[index]: balance for index, balance in enumerate(self._net_balances) if balance}
+
+    def entries(self) -> Iterator[Tuple[str, str, int]]:
+        """Yields (ower_id, payer_id, amount) for every non-zero entry, row by row."""
+        for ower, ower_id in enumerate(self._user_ids):
+            for payer_id, amount in self._merged(self._rows, self._pending_rows, ower).items():
+                yield ower_id, payer_id, amount
+
+    def clear(self):
+        """Drops every entry. Interned user indexes are kept, as users are never removed."""
+        self._rows.clear()
+        self._columns.clear()
+        self._pending_rows = {}
+        self._pending_columns = {}
+        self._pending_count = 0
+        for index in range(len(self._net_balances)):
+            self._net_balances[index] = 0
+        self._entry_count = 0
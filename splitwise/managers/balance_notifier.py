@@ -0,0 +1,177 @@
+# splitwise/balance_notifier.py
+
+import asyncio
+import heapq
+import itertools
+import threading
+import time
+from typing import AsyncIterator, Callable, Dict, Iterable, List, Optional, Tuple
+
+BalanceDeltas = Dict[str, int]  # {user_id: change in net balance, in minor units}
+
+
+class BalanceSubscription:
+    """
+    A registered callback for net-balance changes. Deltas published within `window` seconds of
+    the first pending one are merged (changes that cancel out are dropped) and delivered as one
+    dict. Returned by BalanceNotifier.subscribe; close() stops delivery.
+    """
+
+    def __init__(self, notifier: "BalanceNotifier", callback: Callable[[BalanceDeltas], None],
+                 user_ids: Optional[Iterable[str]], window: float):
+        self._notifier = notifier
+        self._callback = callback
+        self._user_ids = frozenset(user_ids) if user_ids is not None else None
+        self._window = window
+        self._pending: BalanceDeltas = {}  # Guarded by the notifier's condition
+        # Tie-breaker of the deadline-heap entry armed for the current pending deltas; entries left
+        # behind when the pending deltas cancelled out and a later publish re-armed are stale.
+        self._deadline_entry: Optional[int] = None
+        self.closed = False
+
+    def close(self):
+        self._notifier._unsubscribe(self)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.close()
+
+
+class BalanceNotifier:
+    """
+    Pushes per-user net-balance deltas to subscribers, so clients need not poll the ledger.
+
+    publish() is called by BalanceManager with the expense lock held, so it only merges the deltas
+    into each subscription's pending dict. A single dispatcher thread delivers them once their
+    coalescing window has elapsed, outside every lock, so callbacks may read the managers (but a
+    slow callback delays the others). The thread is started with the first subscription and exits
+    when the last one is closed.
+    """
+
+    def __init__(self):
+        self._condition = threading.Condition()
+        self._subscriptions: Tuple[BalanceSubscription, ...] = ()  # Replaced, never mutated
+        self._deadlines: List[Tuple[float, int, BalanceSubscription]] = []  # Heap of (due, tie-breaker, subscription)
+        self._sequence = itertools.count()
+        self._dispatcher: Optional[threading.Thread] = None
+
+    def has_subscribers(self) -> bool:
+        return bool(self._subscriptions)
+
+    def subscribe(self, callback: Callable[[BalanceDeltas], None], user_ids: Optional[Iterable[str]] = None,
+                  window: float = 0.1) -> BalanceSubscription:
+        """
+        Calls `callback` (on the dispatcher thread) with the coalesced deltas of every burst of
+        changes, restricted to `user_ids` if given. window=0 delivers every published batch on its own.
+        """
+        if window < 0:
+            raise ValueError("The coalescing window cannot be negative.")
+        subscription = BalanceSubscription(self, callback, user_ids, window)
+        with self._condition:
+            self._subscriptions = self._subscriptions + (subscription,)
+            if self._dispatcher is None:
+                self._dispatcher = threading.Thread(target=self._dispatch, name="balance-notifier", daemon=True)
+                self._dispatcher.start()
+        return subscription
+
+    async def stream(self, user_ids: Optional[Iterable[str]] = None, window: float = 0.1) -> AsyncIterator[BalanceDeltas]:
+        """
+        Async iterator over coalesced deltas, e.g. `async for deltas in notifier.stream(["u1"]): ...`.
+        Deltas that arrive while the consumer is busy are merged into the next item, so a slow
+        consumer never builds a backlog. The subscription is closed when the iteration ends.
+        """
+        loop = asyncio.get_running_loop()
+        ready = asyncio.Event()
+        lock = threading.Lock()
+        pending: BalanceDeltas = {}
+
+        def on_deltas(deltas: BalanceDeltas):
+            with lock:
+                was_empty = not pending
+                _merge(pending, deltas)
+            if was_empty:
+                try:
+                    loop.call_soon_threadsafe(ready.set)
+                except RuntimeError:  # The event loop is closed
+                    pass
+
+        with self.subscribe(on_deltas, user_ids, window):
+            while True:
+                await ready.wait()
+                ready.clear()
+                with lock:
+                    deltas = pending.copy()
+                    pending.clear()
+                if deltas:
+                    yield deltas
+
+    def publish(self, deltas: BalanceDeltas):
+        """Queues a batch of net-balance deltas for every interested subscriber."""
+        subscriptions = self._subscriptions
+        if not subscriptions:
+            return
+        with self._condition:
+            now = time.monotonic()
+            for subscription in subscriptions:
+                if subscription.closed:
+                    continue
+                if subscription._user_ids is None:
+                    relevant = deltas
+                else:
+                    relevant = {user_id: delta for user_id, delta in deltas.items() if user_id in subscription._user_ids}
+                if not relevant:
+                    continue
+                if not subscription._pending:
+                    subscription._deadline_entry = next(self._sequence)
+                    heapq.heappush(self._deadlines, (now + subscription._window, subscription._deadline_entry, subscription))
+                _merge(subscription._pending, relevant)
+            self._condition.notify()
+
+    def _unsubscribe(self, subscription: BalanceSubscription):
+        with self._condition:
+            if subscription.closed:
+                return
+            subscription.closed = True
+            subscription._pending = {}
+            self._subscriptions = tuple(s for s in self._subscriptions if s is not subscription)
+            self._condition.notify()
+
+    def _dispatch(self):
+        while True:
+            with self._condition:
+                due: List[Tuple[BalanceSubscription, BalanceDeltas]] = []
+                while not due:
+                    if not self._subscriptions:
+                        self._dispatcher = None
+                        self._deadlines.clear()
+                        return
+                    now = time.monotonic()
+                    while self._deadlines and self._deadlines[0][0] <= now:
+                        _, entry, subscription = heapq.heappop(self._deadlines)
+                        if entry != subscription._deadline_entry:
+                            continue
+                        subscription._deadline_entry = None
+                        if subscription._pending:
+                            due.append((subscription, subscription._pending))
+                            subscription._pending = {}
+                    if not due:
+                        self._condition.wait(self._deadlines[0][0] - now if self._deadlines else None)
+            for subscription, deltas in due:
+                if subscription.closed:
+                    continue
+                try:
+                    subscription._callback(deltas)
+                except Exception as e:  # One failing subscriber must not stop delivery to the others
+                    print(f"Balance subscriber {subscription._callback!r} failed: {e}")
+
+
+def _merge(pending: BalanceDeltas, deltas: BalanceDeltas):
+    """Adds `deltas` into `pending`, dropping users whose changes cancel out."""
+    for user_id, delta in deltas.items():
+        total = pending.get(user_id, 0) + delta
+        if total:
+            pending[user_id] = total
+        else:
+            pending.pop(user_id, None)
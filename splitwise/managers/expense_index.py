@@ -0,0 +1,51 @@
+# splitwise/expense_index.py
+
+import bisect
+from datetime import datetime
+from typing import List, Optional, Tuple
+
+from splitwise.models.expense import Expense
+
+
+class ExpenseTimeIndex:
+    """
+    Expenses kept ordered by creation time, so a time window is two binary searches plus a slice.
+    Keys are (created_at, sequence) so expenses created at the same instant keep insertion order.
+    Not thread-safe on its own; ExpenseManager guards it with its lock.
+    """
+
+    def __init__(self):
+        self._keys: List[Tuple[datetime, int]] = []
+        self._expenses: List[Expense] = []
+
+    def __len__(self) -> int:
+        return len(self._expenses)
+
+    def add(self, expense: Expense, sequence: int):
+        key = (expense.created_at, sequence)
+        if not self._keys or key >= self._keys[-1]:
+            # Expenses almost always arrive in time order: a plain append.
+            self._keys.append(key)
+            self._expenses.append(expense)
+        else:
+            position = bisect.bisect_right(self._keys, key)
+            self._keys.insert(position, key)
+            self._expenses.insert(position, expense)
+
+    def add_many(self, entries: List[Tuple[Expense, int]]):
+        """Adds (expense, sequence) entries at once; a batch newer than everything indexed is one extend."""
+        keys = [(expense.created_at, sequence) for expense, sequence in entries]
+        if keys == sorted(keys) and (not self._keys or keys[0] >= self._keys[-1]):
+            self._keys.extend(keys)
+            self._expenses.extend(expense for expense, _ in entries)
+            return
+        merged = sorted(zip(self._keys + keys, self._expenses + [expense for expense, _ in entries]),
+                        key=lambda pair: pair[0])
+        self._keys = [key for key, _ in merged]
+        self._expenses = [expense for _, expense in merged]
+
+    def range(self, since: Optional[datetime] = None, until: Optional[datetime] = None) -> List[Expense]:
+        """Returns the expenses created in [since, until), oldest first. Either bound may be open."""
+        start = 0 if since is None else bisect.bisect_left(self._keys, (since, -1))
+        end = len(self._keys) if until is None else bisect.bisect_left(self._keys, (until, -1))
+        return self._expenses[start:end]
@@ -1,48 +1,94 @@
 # splitwise/expense_manager.py
 
+import itertools
 import uuid # To generate unique expense IDs
-from typing import Dict, List, Any, Optional
+from datetime import datetime
+from typing import Callable, Dict, Iterable, List, Any, Optional, Tuple, TypeVar
 
 from splitwise.models.Split import Split
 from splitwise.enums import SplitType
 from splitwise.models.expense import Expense
 from splitwise.models.user import User
+from splitwise.models.group import Group
 from splitwise.managers.user_manager import UserManager
+from splitwise.managers.group_manager import GroupManager
+from splitwise.managers.expense_index import ExpenseTimeIndex
+from splitwise.money import format_minor_units, to_minor_units
 from splitwise.split_methods.base_split import SplitStrategy
 from splitwise.split_methods.equal_split import EqualSplitStrategy
 from splitwise.split_methods.exact_split import ExactSplitStrategy
 from splitwise.split_methods.percent_split import PercentSplitStrategy
+from splitwise.split_methods.shares_split import SharesSplitStrategy
+from splitwise.split_methods.adjustment_split import AdjustmentSplitStrategy
+from splitwise.split_methods.itemized_split import ItemizedSplitStrategy
 from splitwise.exceptions import (
+    SplitwiseError,
     UserNotFoundException,
     InvalidSplitError,
     ExpenseNotFoundException,
-    InvalidAmountException
+    InvalidAmountException,
+    GroupNotFoundException,
+    InvalidTimestampError
 )
-import threading
+from splitwise.locking import SeqLock
+
+T = TypeVar("T")
+
+
+def _check_created_at(created_at: Any):
+    """
+    Expense times are naive local datetimes (as datetime.now() returns), so every stored expense
+    can be ordered against every other in the time indexes.
+    """
+    if not isinstance(created_at, datetime):
+        raise InvalidTimestampError(f"Creation time must be a datetime, not {created_at!r}.")
+    if created_at.tzinfo is not None:
+        raise InvalidTimestampError(f"Creation time must be a naive local datetime, not {created_at!r}.")
 
 class ExpenseManager:
     """
     Manages the creation, storage, and retrieval of expenses.
     It orchestrates the use of different split strategies.
+
+    Expenses are stored partitioned by group (None for expenses outside any group), with secondary
+    indexes by payer and by participant. Every partition and index is ordered by creation time, so
+    per-group and per-user questions over a time window are range scans, not full scans.
+
+    Expenses are validated and split before the lock is taken; the write lock only covers storing
+    and indexing them. Reads never block: they run optimistically against the SeqLock and retry
+    if a write overlapped them.
     """
-    def __init__(self, user_manager: UserManager):
+    def __init__(self, user_manager: UserManager, group_manager: Optional[GroupManager] = None):
         self._user_manager = user_manager
+        self._group_manager = group_manager
         self._expenses: Dict[str, Expense] = {} # Stores expenses: {expense_id: Expense_object}
+        self._group_index: Dict[Optional[str], ExpenseTimeIndex] = {} # {group_id: expenses of that group}
+        self._payer_index: Dict[str, ExpenseTimeIndex] = {} # {user_id: expenses they paid}
+        self._participant_index: Dict[str, ExpenseTimeIndex] = {} # {user_id: expenses they share in}
+        self._sequence = itertools.count() # Tie-breaker for expenses created at the same instant
         self._split_strategies: Dict[SplitType, SplitStrategy] = {} # Stores strategy instances
+        self._expense_listeners: List[Callable[[List[Expense]], None]] = [] # Notified of every added expense
 
         self._initialize_split_strategies()
-        self._lock = threading.Lock()
+        self._lock = SeqLock()
         print("ExpenseManager initialized.")
 
     def _initialize_split_strategies(self):
         """
         Initializes and registers the concrete split strategies.
         """
-        self._split_strategies[SplitType.EQUAL] = EqualSplitStrategy()
-        self._split_strategies[SplitType.EXACT] = ExactSplitStrategy()
-        self._split_strategies[SplitType.PERCENT] = PercentSplitStrategy()
+        for strategy in (EqualSplitStrategy(), ExactSplitStrategy(), PercentSplitStrategy(),
+                         SharesSplitStrategy(), AdjustmentSplitStrategy(), ItemizedSplitStrategy()):
+            self.register_split_strategy(strategy)
         print("Split strategies initialized.")
 
+    def register_split_strategy(self, strategy: SplitStrategy):
+        """
+        Registers (or replaces) the strategy used for its split type. Strategies must be stateless,
+        as they are called concurrently and outside the lock.
+        """
+        self._split_strategies[strategy.split_type] = strategy
+
     def add_expense(
         self,
         description: str,
@@ -50,80 +96,353 @@ class ExpenseManager:
         paid_by_user_id: str,
         participant_user_ids: List[str],
         split_type: SplitType,
-        split_data: Optional[Dict[str, Any]] = None
+        split_data: Optional[Dict[str, Any]] = None,
+        group_id: Optional[str] = None,
+        created_at: Optional[datetime] = None
     ) -> Expense:
         """
-        Adds a new expense to the system.
-        (Thread-safe due to lock)
+        Adds a new expense to the system, optionally within a group (every participant must be a
+        member) and with an explicit creation time (e.g. when importing history; defaults to now).
+        (Thread-safe: validated without the lock, stored under the write lock)
         """
-        with self._lock: # Acquire lock for the entire expense addition process
-            if total_amount <= 0:
-                raise InvalidAmountException("Total amount for an expense must be positive.")
-            if not participant_user_ids:
-                raise InvalidSplitError("Expense must have at least one participant.")
-            # Important: user_manager.get_user should already be thread-safe due to UserManager's own lock
-            if paid_by_user_id not in participant_user_ids:
-                raise InvalidSplitError(f"User '{paid_by_user_id}' who paid must also be a participant in the expense.")
+        # Validate and get User objects (a lock-free UserManager snapshot read)
+        users = self._user_manager.get_users([paid_by_user_id, *participant_user_ids])
+        expense = self._build_expense(
+            uuid.uuid4().hex, description, total_amount, paid_by_user_id, participant_user_ids,
+            split_type, split_data, group_id, created_at, users, {}, log_split=True
+        )
+        with self._lock:
+            self._store_expenses([expense])
+        print(f"Expense '{description}' ({expense.expense_id}) added. Total: {format_minor_units(expense.total_amount_cents)}, Paid by: {expense.paid_by.name}")
+        return expense
 
-            # 1. Validate and get User objects (UserManager is thread-safe)
+    def add_expenses_bulk(self, expenses: Iterable[Dict[str, Any]]) -> List[Expense]:
+        """
+        Adds many expenses at once, all or nothing. Each item is a dict of add_expense's keyword
+        arguments (description, total_amount, paid_by_user_id, participant_user_ids, split_type and
+        optionally split_data, group_id, created_at).
+
+        Every item is validated and split before anything is stored, resolving all users (and
+        groups) with one lookup each. The lock is then taken once for the whole batch, and
+        listeners (e.g. the balance ledger) receive the batch as a single delta. Nothing is printed
+        per expense. If any item is invalid, its error is raised with the item's position and no
+        expense is added.
+        """
+        items = list(expenses)
+        user_ids = set()
+        for item in items:
+            user_ids.add(item.get("paid_by_user_id"))
+            user_ids.update(item.get("participant_user_ids") or ())
+        users = self._user_manager.get_users(user_ids)
+        groups: Dict[str, Group] = {}
+
+        # One uuid per batch; the item position keeps the ids unique.
+        batch_id = uuid.uuid4().hex
+        built: List[Expense] = []
+        for position, item in enumerate(items):
             try:
-                paid_by_user = self._user_manager.get_user(paid_by_user_id)
-                participants_users: List[User] = [
-                    self._user_manager.get_user(uid) for uid in participant_user_ids
-                ]
-            except UserNotFoundException as e:
-                raise e
-
-            seen_participants = set()
-            unique_participants = []
-            for user in participants_users:
-                if user.user_id not in seen_participants:
-                    unique_participants.append(user)
-                    seen_participants.add(user.user_id)
-            participants_users = unique_participants
-
-            # 2. Get the appropriate split strategy
-            strategy = self._split_strategies.get(split_type)
-            if not strategy:
-                raise ValueError(f"Unsupported split type: {split_type.value}")
-
-            # 3. Validate and get splits using the chosen strategy (SplitStrategy instances are stateless, thus thread-safe)
-            calculated_splits: List[Split] = strategy.validate_and_get_splits(
-                total_amount=total_amount,
-                paid_by=paid_by_user,
-                participants=participants_users,
-                split_data=split_data if split_data is not None else {}
-            )
+                built.append(self._build_expense(
+                    f"{batch_id}-{position}", item.get("description", ""), item.get("total_amount", 0),
+                    item.get("paid_by_user_id"), item.get("participant_user_ids"), item.get("split_type"),
+                    item.get("split_data"), item.get("group_id"), item.get("created_at"), users, groups
+                ))
+            except (SplitwiseError, ValueError) as e:
+                raise type(e)(f"Expense #{position}: {e}") from e
+
+        with self._lock:
+            self._store_expenses(built)
+        print(f"Bulk import: {len(built)} expenses added.")
+        return built
+
+    def add_recurring_expenses(
+        self,
+        description: str,
+        occurrences: Iterable[Tuple[datetime, float]],
+        paid_by_user_id: str,
+        participant_user_ids: List[str],
+        split_type: SplitType,
+        split_data: Optional[Dict[str, Any]] = None,
+        group_id: Optional[str] = None
+    ) -> List[Expense]:
+        """
+        Adds one expense per (created_at, total_amount) occurrence of a recurring bill (e.g. rent
+        imported from a year of statements), all sharing the payer, participants and split, all or
+        nothing.
+
+        Users, group membership and split data are validated once for the whole series, and the
+        strategy splits it with validate_and_get_splits_many, so occurrences with the same total
+        share their Split objects. The lock is taken once and listeners receive the series as a
+        single batch.
+        """
+        occurrences = list(occurrences)
+        users = self._user_manager.get_users([paid_by_user_id, *participant_user_ids])
+        paid_by_user, participants_users = self._resolve_participants(
+            paid_by_user_id, participant_user_ids, group_id, users, {}
+        )
+        strategy = self._get_split_strategy(split_type)
+
+        for position, (created_at, total_amount) in enumerate(occurrences):
+            try:
+                # Each occurrence keeps its own timestamp; there is no "now" default to fall back on
+                _check_created_at(created_at)
+            except InvalidTimestampError as e:
+                raise InvalidTimestampError(f"Expense #{position}: {e}") from e
+            if to_minor_units(total_amount) <= 0:
+                raise InvalidAmountException(f"Expense #{position}: Total amount for an expense must be positive.")
+        splits_per_occurrence = strategy.validate_and_get_splits_many(
+            total_amounts=[total_amount for _, total_amount in occurrences],
+            paid_by=paid_by_user,
+            participants=participants_users,
+            split_data=split_data if split_data is not None else {}
+        )
 
-            # 4. Create and store the Expense object
-            expense_id = str(uuid.uuid4())
-            expense = Expense(
-                expense_id=expense_id,
+        batch_id = uuid.uuid4().hex
+        built = [
+            Expense(
+                expense_id=f"{batch_id}-{position}",
                 description=description,
-                total_amount=total_amount,
+                total_amount_cents=to_minor_units(total_amount),
                 paid_by=paid_by_user,
-                splits=calculated_splits,
-                split_type=split_type
+                splits=splits,
+                split_type=split_type,
+                group_id=group_id,
+                created_at=created_at
             )
-            self._expenses[expense_id] = expense
-            print(f"Expense '{description}' ({expense_id}) added. Total: {total_amount}, Paid by: {paid_by_user.name}")
-            return expense
+            for position, ((created_at, total_amount), splits) in enumerate(zip(occurrences, splits_per_occurrence))
+        ]
+        with self._lock:
+            self._store_expenses(built)
+        print(f"Recurring expense '{description}': {len(built)} occurrences added. Paid by: {paid_by_user.name}")
+        return built
+
+    def restore_expenses(self, expenses: List[Expense]):
+        """
+        Stores already validated and split expenses as they are, e.g. when recovering from a
+        snapshot or journal. Listeners are notified as for any other added batch.
+        """
+        with self._lock:
+            self._store_expenses(expenses)
+
+    def read_consistent(self, reader: Callable[[List[Expense]], T]) -> T:
+        """
+        Calls `reader` with every stored expense while holding the write lock, so nothing (not even
+        a listener update such as the balance ledger) changes while it runs. Used for snapshots;
+        the same restrictions as for listeners apply.
+        """
+        with self._lock:
+            return reader(list(self._expenses.values()))
+
+    def _build_expense(
+        self,
+        expense_id: str,
+        description: str,
+        total_amount: float,
+        paid_by_user_id: str,
+        participant_user_ids: List[str],
+        split_type: SplitType,
+        split_data: Optional[Dict[str, Any]],
+        group_id: Optional[str],
+        created_at: Optional[datetime],
+        users: Dict[str, User],
+        groups: Dict[str, Group],
+        log_split: bool = False
+    ) -> Expense:
+        """
+        Validates one expense against already resolved users and builds it (without storing it).
+        `groups` caches the groups looked up so far.
+        """
+        # 1. Validate the creation time, the users and the amount
+        if created_at is not None:
+            _check_created_at(created_at)
+        if paid_by_user_id not in users:
+            raise UserNotFoundException(f"User with ID '{paid_by_user_id}' not found.")
+        total_amount_cents = to_minor_units(total_amount)
+        if total_amount_cents <= 0:
+            raise InvalidAmountException("Total amount for an expense must be positive.")
+        paid_by_user, participants_users = self._resolve_participants(
+            paid_by_user_id, participant_user_ids, group_id, users, groups
+        )
+
+        # 2. Get the appropriate split strategy
+        strategy = self._get_split_strategy(split_type)
+
+        # 3. Validate and get splits using the chosen strategy (SplitStrategy instances are stateless, thus thread-safe)
+        split = strategy.validate_and_get_splits if log_split else strategy.calculate_splits
+        calculated_splits: List[Split] = split(
+            total_amount=total_amount,
+            paid_by=paid_by_user,
+            participants=participants_users,
+            split_data=split_data if split_data is not None else {}
+        )
+
+        # 4. Create the Expense object
+        return Expense(
+            expense_id=expense_id,
+            description=description,
+            total_amount_cents=total_amount_cents,
+            paid_by=paid_by_user,
+            splits=calculated_splits,
+            split_type=split_type,
+            group_id=group_id,
+            created_at=created_at if created_at is not None else datetime.now()
+        )
+
+    def _resolve_participants(
+        self,
+        paid_by_user_id: str,
+        participant_user_ids: List[str],
+        group_id: Optional[str],
+        users: Dict[str, User],
+        groups: Dict[str, Group]
+    ) -> Tuple[User, List[User]]:
+        """
+        Validates the payer and the (deduplicated) participants against already resolved users,
+        and their membership of the group if any. Returns the payer and the participants.
+        """
+        paid_by_user = users.get(paid_by_user_id)
+        if paid_by_user is None:
+            raise UserNotFoundException(f"User with ID '{paid_by_user_id}' not found.")
+        if not participant_user_ids:
+            raise InvalidSplitError("Expense must have at least one participant.")
+
+        participants_users: List[User] = []
+        seen_participants = set()
+        for uid in participant_user_ids:
+            if uid in seen_participants:
+                continue
+            user = users.get(uid)
+            if user is None:
+                raise UserNotFoundException(f"User with ID '{uid}' not found.")
+            participants_users.append(user)
+            seen_participants.add(uid)
+        if paid_by_user_id not in seen_participants:
+            raise InvalidSplitError(f"User '{paid_by_user_id}' who paid must also be a participant in the expense.")
+
+        if group_id is not None:
+            group = groups.get(group_id)
+            if group is None:
+                if self._group_manager is None:
+                    raise GroupNotFoundException(f"Group with ID '{group_id}' not found.")
+                group = groups[group_id] = self._group_manager.get_group(group_id)
+            for user in participants_users:
+                if user.user_id not in group.member_ids:
+                    raise InvalidSplitError(f"User '{user.user_id}' is not a member of group '{group_id}'.")
+        return paid_by_user, participants_users
+
+    def _get_split_strategy(self, split_type: SplitType) -> SplitStrategy:
+        strategy = self._split_strategies.get(split_type)
+        if not strategy:
+            raise ValueError(f"Unsupported split type: {split_type}")
+        return strategy
+
+    def _store_expenses(self, expenses: List[Expense]):
+        """
+        Indexes built expenses, then stores them and notifies listeners. Caller holds the lock.
+        Storing comes after indexing, so an expense is never visible by id but missing from the indexes.
+        """
+        if len(expenses) == 1:
+            self._index_expense(expenses[0])
+        else:
+            self._index_expenses(expenses)
+        for expense in expenses:
+            self._expenses[expense.expense_id] = expense
+        # Listeners run under the lock so they observe expenses exactly once, in insertion order
+        for listener in self._expense_listeners:
+            listener(expenses)
+
+    def _index_expense(self, expense: Expense):
+        """Adds a stored expense to its group partition and the payer / participant indexes."""
+        sequence = next(self._sequence)
+        for indexes, key in ((self._group_index, expense.group_id), (self._payer_index, expense.paid_by.user_id)):
+            index = indexes.get(key)
+            if index is None:
+                index = indexes[key] = ExpenseTimeIndex()
+            index.add(expense, sequence)
+        for split in expense.splits:
+            index = self._participant_index.get(split.user.user_id)
+            if index is None:
+                index = self._participant_index[split.user.user_id] = ExpenseTimeIndex()
+            index.add(expense, sequence)
+
+    def _index_expenses(self, expenses: List[Expense]):
+        """Indexes a batch, handing each index all of its new entries at once."""
+        by_group: Dict[Optional[str], List] = {}
+        by_payer: Dict[str, List] = {}
+        by_participant: Dict[str, List] = {}
+        for expense in expenses:
+            entry = (expense, next(self._sequence))
+            by_group.setdefault(expense.group_id, []).append(entry)
+            by_payer.setdefault(expense.paid_by.user_id, []).append(entry)
+            for split in expense.splits:
+                by_participant.setdefault(split.user.user_id, []).append(entry)
+
+        for indexes, batches in ((self._group_index, by_group), (self._payer_index, by_payer),
+                                 (self._participant_index, by_participant)):
+            for key, entries in batches.items():
+                index = indexes.get(key)
+                if index is None:
+                    index = indexes[key] = ExpenseTimeIndex()
+                index.add_many(entries)
+
+    def add_expense_listener(self, listener: Callable[[List[Expense]], None], replay_existing: bool = False):
+        """
+        Registers a callback invoked with the list of expenses added by every add_expense (one
+        expense) or add_expenses_bulk (the whole batch) call from now on.
+        With replay_existing=True it is first invoked once with every stored expense, atomically with
+        the registration, so the listener sees each expense exactly once.
+        Listeners are called while the expense lock is held and must not call back into this manager.
+        """
+        with self._lock:
+            if replay_existing and self._expenses:
+                listener(list(self._expenses.values()))
+            self._expense_listeners.append(listener)
+
+    def remove_expense_listener(self, listener: Callable[[List[Expense]], None]):
+        with self._lock:
+            if listener in self._expense_listeners:
+                self._expense_listeners.remove(listener)
 
     def get_expense(self, expense_id: str) -> Expense:
         """
         Retrieves an expense by its ID.
-        (Read-only, acquiring lock for consistent snapshot)
+        (Lock-free: a single dict lookup is atomic)
         """
-        with self._lock: # Acquire lock for consistent read
-            expense = self._expenses.get(expense_id)
-            if expense is None:
-                raise ExpenseNotFoundException(f"Expense with ID '{expense_id}' not found.")
-            return expense
+        expense = self._expenses.get(expense_id)
+        if expense is None:
+            raise ExpenseNotFoundException(f"Expense with ID '{expense_id}' not found.")
+        return expense
 
     def get_all_expenses(self) -> List[Expense]:
         """
         Retrieves a list of all recorded expenses.
-        (Read-only, acquiring lock for consistent snapshot)
+        (Read-only, optimistic and lock-free)
+        """
+        return self._lock.read(lambda: list(self._expenses.values()))
+
+    def get_group_expenses(self, group_id: Optional[str], since: Optional[datetime] = None,
+                           until: Optional[datetime] = None) -> List[Expense]:
         """
-        with self._lock: # Acquire lock for consistent read
-            return list(self._expenses.values())
+        Retrieves a group's expenses created in [since, until), oldest first.
+        group_id=None returns the expenses that belong to no group.
+        """
+        return self._read_index(self._group_index, group_id, since, until)
+
+    def get_user_expenses(self, user_id: str, since: Optional[datetime] = None,
+                          until: Optional[datetime] = None) -> List[Expense]:
+        """
+        Retrieves the expenses involving a user (the payer is always a participant) created in
+        [since, until), oldest first. e.g. get_user_expenses("u1", since=now - timedelta(days=30))
+        """
+        return self._read_index(self._participant_index, user_id, since, until)
+
+    def get_expenses_paid_by(self, user_id: str, since: Optional[datetime] = None,
+                             until: Optional[datetime] = None) -> List[Expense]:
+        """Retrieves the expenses paid by a user created in [since, until), oldest first."""
+        return self._read_index(self._payer_index, user_id, since, until)
+
+    def _read_index(self, indexes: Dict[Any, ExpenseTimeIndex], key: Any, since: Optional[datetime],
+                    until: Optional[datetime]) -> List[Expense]:
+        def read() -> List[Expense]:
+            index = indexes.get(key)
+            return index.range(since, until) if index is not None else []
+        return self._lock.read(read)
@@ -0,0 +1,55 @@
+# splitwise/group_manager.py
+import threading
+from typing import Dict, Iterable, List
+
+from splitwise.models.group import Group
+from splitwise.managers.user_manager import UserManager
+from splitwise.exceptions import DuplicateGroupException, GroupNotFoundException
+
+
+class GroupManager:
+    """
+    Manages the creation, retrieval, and membership of groups.
+    Like UserManager, the group map and each group's member set are copy-on-write, so reads are lock-free.
+    """
+    def __init__(self, user_manager: UserManager):
+        self._user_manager = user_manager
+        # Stores groups: {group_id: Group_object}; never mutated once published
+        self._groups: Dict[str, Group] = {}
+        self._lock = threading.Lock()  # Serializes writers only
+        print("GroupManager initialized.")
+
+    def add_group(self, group_id: str, name: str, member_user_ids: Iterable[str] = ()) -> Group:
+        """
+        Adds a new group with the given members; every member must be a registered user.
+        (Thread-safe due to lock)
+        """
+        member_ids = frozenset(member_user_ids)
+        for user_id in member_ids:
+            self._user_manager.get_user(user_id)  # Raises UserNotFoundException
+
+        with self._lock:
+            if group_id in self._groups:
+                raise DuplicateGroupException(f"Group with ID '{group_id}' already exists.")
+            group = Group(group_id=group_id, name=name, member_ids=member_ids)
+            groups = dict(self._groups)
+            groups[group_id] = group
+            self._groups = groups  # Publish the new snapshot
+            print(f"Group added: {name} ({group_id}) with {len(member_ids)} members")
+            return group
+
+    def add_member(self, group_id: str, user_id: str):
+        self._user_manager.get_user(user_id)  # Raises UserNotFoundException
+        with self._lock:
+            group = self.get_group(group_id)
+            group.member_ids = group.member_ids | {user_id}  # A new set, swapped in atomically
+            print(f"User '{user_id}' added to group '{group_id}'.")
+
+    def get_group(self, group_id: str) -> Group:
+        group = self._groups.get(group_id)
+        if group is None:
+            raise GroupNotFoundException(f"Group with ID '{group_id}' not found.")
+        return group
+
+    def get_all_groups(self) -> List[Group]:
+        return list(self._groups.values())
@@ -1,6 +1,6 @@
 # splitwise/user_manager.py
 import threading
-from typing import Dict, List
+from typing import Dict, Iterable, List
 from splitwise.models.user import User
 from splitwise.exceptions import UserNotFoundException, DuplicateUserException
 
@@ -8,11 +8,15 @@ from splitwise.exceptions import UserNotFoundException, DuplicateUserException
 class UserManager:
     """
     Manages the creation, retrieval, and storage of User objects.
+
+    The user map is copy-on-write: writers build a new dict under the lock and publish it with a
+    single reference assignment, so readers work on an immutable snapshot and never take the lock.
+    Users are added rarely and looked up constantly, which makes the O(users) copy per add cheap.
     """
     def __init__(self):
-        # Stores users: {user_id: User_object}
+        # Stores users: {user_id: User_object}; never mutated once published
         self._users: Dict[str, User] = {}
-        self._lock = threading.Lock()
+        self._lock = threading.Lock()  # Serializes writers only
         print("UserManager initialized.")
 
     def add_user(self, user_id: str, name: str) -> User:
@@ -24,25 +28,33 @@ class UserManager:
             if user_id in self._users:
                 raise DuplicateUserException(f"User with ID '{user_id}' already exists.")
             user = User(user_id=user_id, name=name)
-            self._users[user_id] = user
+            users = dict(self._users)
+            users[user_id] = user
+            self._users = users  # Publish the new snapshot
             print(f"User added: {name} ({user_id})")
             return user
 
     def get_user(self, user_id: str) -> User:
         """
         Retrieves a user by their ID.
-        (Read-only, but adding lock for consistency with write operations on _users)
+        (Lock-free read of the current snapshot)
         """
-        with self._lock:  # Acquire lock for consistent read
-            user = self._users.get(user_id)
-            if user is None:
-                raise UserNotFoundException(f"User with ID '{user_id}' not found.")
-            return user
+        user = self._users.get(user_id)
+        if user is None:
+            raise UserNotFoundException(f"User with ID '{user_id}' not found.")
+        return user
+
+    def get_users(self, user_ids: Iterable[str]) -> Dict[str, User]:
+        """
+        Resolves many user IDs against one snapshot. Unknown IDs are left out of the
+        result; callers decide how to report them.
+        """
+        users = self._users
+        return {user_id: users[user_id] for user_id in set(user_ids) if user_id in users}
 
     def get_all_users(self) -> List[User]:
         """
         Retrieves a list of all registered users.
-        (Read-only, acquiring lock for consistent snapshot)
+        (Lock-free read of the current snapshot)
         """
-        with self._lock:  # Acquire lock for consistent read
-            return list(self._users.values())
+        return list(self._users.values())
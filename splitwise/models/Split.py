@@ -1,12 +1,20 @@
 from dataclasses import dataclass, field
 from splitwise.models.user import User
+from splitwise.money import to_major_units
 
 
-@dataclass
+@dataclass(frozen=True)
 class Split:
-    """Represents a single participant's share in an expense."""
+    """
+    Represents a single participant's share in an expense.
+    Immutable, so expenses with identical shares (e.g. a recurring bill) can share Split objects.
+    """
     user: User
-    amount: float
+    amount_cents: int  # The share in minor units
+
+    @property
+    def amount(self) -> float:
+        return to_major_units(self.amount_cents)
 
 
 
@@ -1,8 +1,10 @@
 from dataclasses import dataclass, field
+from datetime import datetime
 from splitwise.models.user import User
-from typing import List
+from typing import List, Optional
 from splitwise.models.Split import Split
 from splitwise.enums import SplitType
+from splitwise.money import to_major_units
 
 
 @dataclass
@@ -10,8 +12,14 @@ class Expense:
     """Represents an expense record."""
     expense_id: str
     description: str
-    total_amount: float
+    total_amount_cents: int  # The total in minor units; always the sum of the splits
     paid_by: User  # The user who paid the total amount
     splits: List[Split] # How the total amount is divided among participants
     split_type: SplitType # The method used for splitting this expense
-    # Note: 'participants' are implicitly derived from 'splits' list for simplicity
\ No newline at end of file
+    group_id: Optional[str] = None # The group the expense belongs to, if any
+    created_at: datetime = field(default_factory=datetime.now)
+    # Note: 'participants' are implicitly derived from 'splits' list for simplicity
+
+    @property
+    def total_amount(self) -> float:
+        return to_major_units(self.total_amount_cents)
@@ -0,0 +1,10 @@
+from dataclasses import dataclass, field
+from typing import FrozenSet
+
+
+@dataclass
+class Group:
+    """Represents a group of users sharing expenses (e.g. a trip or a flat)."""
+    group_id: str
+    name: str
+    member_ids: FrozenSet[str] = field(default_factory=frozenset)  # Replaced, never mutated, on changes
@@ -0,0 +1,15 @@
+from dataclasses import dataclass
+
+from splitwise.money import to_major_units
+
+
+@dataclass(frozen=True)
+class Transfer:
+    """A single settlement payment: from_user_id pays to_user_id."""
+    from_user_id: str
+    to_user_id: str
+    amount_cents: int
+
+    @property
+    def amount(self) -> float:
+        return to_major_units(self.amount_cents)
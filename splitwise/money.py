@@ -0,0 +1,82 @@
+# splitwise/money.py
+
+from decimal import Decimal, ROUND_HALF_UP
+from typing import List, Sequence, Union
+
+# Amounts are stored as integers in minor units (cents), so sums and comparisons are exact.
+MINOR_UNITS_PER_MAJOR = 100
+
+Amount = Union[int, float, str, Decimal]
+
+
+def to_decimal(value: Amount) -> Decimal:
+    """Converts an amount to Decimal via its shortest repr, so 0.1 becomes Decimal('0.1')."""
+    if isinstance(value, Decimal):
+        return value
+    return Decimal(str(value))
+
+
+def to_minor_units(amount: Amount) -> int:
+    """Converts an amount in major units (e.g. 12.345) to minor units, rounding half up (1235)."""
+    if type(amount) is int:
+        return amount * MINOR_UNITS_PER_MAJOR
+    if type(amount) is float:
+        # Fast path for amounts already in whole minor units, e.g. 12.34: if the rounded result maps
+        # back to the same float, its shortest repr has at most two decimals and rounding is exact.
+        minor_units = round(amount * MINOR_UNITS_PER_MAJOR)
+        if minor_units / MINOR_UNITS_PER_MAJOR == amount:
+            return minor_units
+    scaled = to_decimal(amount) * MINOR_UNITS_PER_MAJOR
+    return int(scaled.quantize(Decimal(1), rounding=ROUND_HALF_UP))
+
+
+def to_major_units(minor_units: int) -> float:
+    return minor_units / MINOR_UNITS_PER_MAJOR
+
+
+def format_minor_units(minor_units: int) -> str:
+    """Formats minor units with two decimals, e.g. -1234 -> '-12.34'."""
+    sign = "-" if minor_units < 0 else ""
+    major, minor = divmod(abs(minor_units), MINOR_UNITS_PER_MAJOR)
+    return f"{sign}{major}.{minor:02d}"
+
+
+def distribute_minor_units(total: int, weights: Sequence[Amount]) -> List[int]:
+    """
+    Splits `total` minor units proportionally to non-negative `weights` using the largest-remainder
+    method: everyone gets the floor of their exact quota, and the leftover units go one each to the
+    largest fractional remainders (ties to the earlier weight). The result always sums to `total`.
+    """
+    return distribute_by_integer_weights(total, to_integer_weights(weights))
+
+
+def to_integer_weights(weights: Sequence[Amount]) -> List[int]:
+    """Scales decimal weights by a common power of ten to integers with the same proportions."""
+    decimal_weights = [to_decimal(weight) for weight in weights]
+    decimals = max((-weight.as_tuple().exponent for weight in decimal_weights), default=0)
+    scale = Decimal(10) ** max(decimals, 0)
+    return [int(weight * scale) for weight in decimal_weights]
+
+
+def distribute_by_integer_weights(total: int, int_weights: Sequence[int]) -> List[int]:
+    """
+    distribute_minor_units for weights already scaled to integers, so every quota is computed
+    exactly; splitting many totals by the same weights scales them only once.
+    """
+    weight_sum = sum(int_weights)
+    if weight_sum <= 0:
+        if total == 0:
+            return [0] * len(int_weights)
+        raise ValueError("Weights must contain at least one positive value.")
+
+    shares: List[int] = []
+    remainders: List[int] = []
+    for weight in int_weights:
+        share, remainder = divmod(total * weight, weight_sum)
+        shares.append(share)
+        remainders.append(remainder)
+
+    leftover = total - sum(shares)
+    for index in sorted(range(len(shares)), key=lambda i: -remainders[i])[:leftover]:
+        shares[index] += 1
+    return shares
@@ -0,0 +1,289 @@
+# splitwise/persistent_splitwise.py
+
+import contextlib
+import os
+import threading
+from collections import defaultdict
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from splitwise.enums import SplitType
+from splitwise.exceptions import PersistenceError, SplitwiseError
+from splitwise.managers.balance_manager import BalanceManager
+from splitwise.managers.expense_manager import ExpenseManager
+from splitwise.managers.group_manager import GroupManager
+from splitwise.managers.user_manager import UserManager
+from splitwise.models.Split import Split
+from splitwise.models.expense import Expense
+from splitwise.models.group import Group
+from splitwise.models.user import User
+from splitwise.storage.event_journal import EventJournal
+from splitwise.storage.snapshot_store import SnapshotStore
+
+
+def _expense_to_record(expense: Expense) -> list:
+    # [expense_id, description, total_cents, paid_by_id, split_type, group_id, created_at, [[user_id, cents], ...]]
+    return [expense.expense_id, expense.description, expense.total_amount_cents, expense.paid_by.user_id,
+            expense.split_type.value, expense.group_id, expense.created_at.isoformat(),
+            [[split.user.user_id, split.amount_cents] for split in expense.splits]]
+
+
+def _expense_from_record(record: list, users: Dict[str, User]) -> Expense:
+    expense_id, description, total_cents, paid_by_id, split_type, group_id, created_at, splits = record
+    return Expense(
+        expense_id=expense_id,
+        description=description,
+        total_amount_cents=total_cents,
+        paid_by=users[paid_by_id],
+        splits=[Split(users[user_id], amount_cents) for user_id, amount_cents in splits],
+        split_type=SplitType(split_type),
+        group_id=group_id,
+        created_at=datetime.fromisoformat(created_at)
+    )
+
+
+class PersistentSplitwise:
+    """
+    The splitwise managers backed by an event journal and periodic snapshots.
+
+    Every added user, group, group member and expense is appended to an append-only journal
+    (group committed). Expenses are journaled by an ExpenseManager listener, so expenses may be
+    added through expense_manager directly; users and groups must be added through this class.
+    Every `snapshot_every` events the whole state, including the balance matrix, is written to a
+    snapshot; when the threshold is crossed by expenses added through expense_manager directly,
+    the snapshot is written on a background thread. Startup loads the snapshot and replays only
+    the journal events after it.
+
+    The journal keeps the full history, so balances as of any past date are answered from it.
+    """
+
+    JOURNAL_FILE_NAME = "splitwise.journal"
+    SNAPSHOT_FILE_NAME = "splitwise.snapshot"
+
+    def __init__(self, data_dir: str, snapshot_every: int = 10_000, group_commit_size: int = 128,
+                 group_commit_interval: float = 0.05, fsync: bool = True):
+        if snapshot_every < 1:
+            raise ValueError("snapshot_every must be at least 1.")
+
+        os.makedirs(data_dir, exist_ok=True)
+        self._journal_path = os.path.join(data_dir, self.JOURNAL_FILE_NAME)
+        self._snapshots = SnapshotStore(os.path.join(data_dir, self.SNAPSHOT_FILE_NAME))
+        self._snapshot_every = snapshot_every
+        self._snapshot_lock = threading.Lock()
+        # Orders journal appends: held while a user or group event is applied and journaled, and by
+        # the expense listener, so an expense is never journaled before the users it refers to.
+        self._journal_lock = threading.Lock()
+        self._snapshot_thread: Optional[threading.Thread] = None
+
+        self.user_manager = UserManager()
+        self.group_manager = GroupManager(self.user_manager)
+        self.expense_manager = ExpenseManager(self.user_manager, self.group_manager)
+
+        last_sequence, replayed = self._recover()
+        self._snapshot_sequence = last_sequence - replayed
+        self._journal = EventJournal(self._journal_path, last_sequence=last_sequence,
+                                     group_commit_size=group_commit_size,
+                                     group_commit_interval=group_commit_interval, fsync=fsync)
+        self.expense_manager.add_expense_listener(self._journal_expenses)
+        print(f"Recovered splitwise from '{data_dir}' (sequence {last_sequence}, {replayed} journal events replayed).")
+
+    def _recover(self) -> Tuple[int, int]:
+        """
+        Loads the latest snapshot, then replays the journal after it. Creates balance_manager.
+        Returns (last_sequence, events_replayed).
+        """
+        last_sequence, offset = 0, 0
+        snapshot = self._snapshots.load()
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            ledger = None
+            if snapshot is not None:
+                last_sequence, offset = snapshot["sequence"], snapshot["offset"]
+                ledger = self._restore_snapshot(snapshot)
+            self.balance_manager = BalanceManager(self.user_manager, self.expense_manager, ledger=ledger)
+
+            replayed = 0
+            # Consecutive expense events (one per add_expense call) are restored as one batch,
+            # so the indexes and the ledger take each run of them in a single update.
+            pending_records: List[list] = []
+            for sequence, event_type, data in EventJournal.read_events(self._journal_path, start=offset,
+                                                                       repair=True):
+                try:
+                    if event_type == "expenses_added":
+                        pending_records.extend(data)
+                    else:
+                        self._restore_expense_records(pending_records)
+                        pending_records = []
+                        self._apply_event(event_type, data)
+                except (SplitwiseError, KeyError, ValueError) as e:
+                    raise PersistenceError(f"Failed to replay '{event_type}' at sequence {sequence}: {e}")
+                last_sequence = sequence
+                replayed += 1
+            try:
+                self._restore_expense_records(pending_records)
+            except (SplitwiseError, KeyError, ValueError) as e:
+                raise PersistenceError(f"Failed to replay expenses up to sequence {last_sequence}: {e}")
+        return last_sequence, replayed
+
+    def _restore_snapshot(self, snapshot: Dict[str, Any]) -> Tuple[Dict[str, Dict[str, int]], Dict[str, Dict[str, int]]]:
+        """Restores users, groups and expenses from a snapshot and returns its ledger."""
+        try:
+            for user_id, name in snapshot["users"]:
+                self.user_manager.add_user(user_id, name)
+            for group_id, name, member_ids in snapshot["groups"]:
+                self.group_manager.add_group(group_id, name, member_ids)
+            users = self.user_manager.get_users(user_id for user_id, _ in snapshot["users"])
+            self.expense_manager.restore_expenses(
+                [_expense_from_record(record, users) for record in snapshot["expenses"]])
+
+            debts: Dict[str, Dict[str, int]] = defaultdict(dict)
+            for ower_id, payer_id, amount in snapshot["debts"]:
+                debts[ower_id][payer_id] = amount
+            group_net_balances: Dict[str, Dict[str, int]] = defaultdict(dict)
+            for group_id, user_id, balance in snapshot["group_balances"]:
+                group_net_balances[group_id][user_id] = balance
+        except (SplitwiseError, KeyError, ValueError, TypeError) as e:
+            raise PersistenceError(f"Failed to restore splitwise snapshot: {e}")
+        return debts, group_net_balances
+
+    def _apply_event(self, event_type: str, data: Any):
+        if event_type == "user_added":
+            self.user_manager.add_user(*data)
+        elif event_type == "group_added":
+            self.group_manager.add_group(*data)
+        elif event_type == "member_added":
+            self.group_manager.add_member(*data)
+        else:
+            raise PersistenceError(f"Unknown event type '{event_type}' in the event journal.")
+
+    def _restore_expense_records(self, records: List[list]):
+        if records:
+            users = self.user_manager.get_users(user_id for record in records for user_id, _ in record[7])
+            self.expense_manager.restore_expenses([_expense_from_record(record, users) for record in records])
+
+    def _journal_expenses(self, expenses: List[Expense]):
+        # Called by ExpenseManager under its lock, so journal order matches the order expenses are stored in.
+        records = [_expense_to_record(expense) for expense in expenses]
+        with self._journal_lock:
+            self._journal.append("expenses_added", records)
+            # snapshot() cannot capture the state under the expense lock, so a due snapshot is
+            # taken on its own thread; this also covers expenses not added through this class.
+            if self._snapshot_due() and (self._snapshot_thread is None or not self._snapshot_thread.is_alive()):
+                self._snapshot_thread = threading.Thread(target=self._maybe_snapshot, name="splitwise-snapshot",
+                                                         daemon=True)
+                self._snapshot_thread.start()
+
+    def _snapshot_due(self) -> bool:
+        return self._journal.last_sequence - self._snapshot_sequence >= self._snapshot_every
+
+    def _maybe_snapshot(self):
+        if self._snapshot_due():
+            with self._snapshot_lock:
+                # Re-checked under the lock: a concurrent caller may have just taken the snapshot
+                if self._snapshot_due():
+                    self._snapshot_locked()
+
+    def add_user(self, user_id: str, name: str) -> User:
+        with self._journal_lock:
+            user = self.user_manager.add_user(user_id, name)
+            self._journal.append("user_added", [user_id, name])
+        self._maybe_snapshot()
+        return user
+
+    def add_group(self, group_id: str, name: str, member_user_ids: Iterable[str] = ()) -> Group:
+        with self._journal_lock:
+            group = self.group_manager.add_group(group_id, name, member_user_ids)
+            self._journal.append("group_added", [group_id, name, sorted(group.member_ids)])
+        self._maybe_snapshot()
+        return group
+
+    def add_group_member(self, group_id: str, user_id: str):
+        with self._journal_lock:
+            self.group_manager.add_member(group_id, user_id)
+            self._journal.append("member_added", [group_id, user_id])
+        self._maybe_snapshot()
+
+    def add_expense(self, *args, **kwargs) -> Expense:
+        """ExpenseManager.add_expense, followed by a snapshot when one is due."""
+        expense = self.expense_manager.add_expense(*args, **kwargs)
+        self._maybe_snapshot()
+        return expense
+
+    def add_expenses_bulk(self, expenses: Iterable[Dict[str, Any]]) -> List[Expense]:
+        """ExpenseManager.add_expenses_bulk (journaled as one event), followed by a snapshot when one is due."""
+        added = self.expense_manager.add_expenses_bulk(expenses)
+        self._maybe_snapshot()
+        return added
+
+    def snapshot(self):
+        """
+        Writes a snapshot of the current state. The state is captured under the expense lock
+        (a consistent cut of expenses, ledger and journal position) and serialised after it is released.
+        """
+        with self._snapshot_lock:
+            self._snapshot_locked()
+
+    def _snapshot_locked(self):
+        def capture(expenses: List[Expense]):
+            with self._journal_lock:
+                sequence, offset = self._journal.flushed_position()
+                users = self.user_manager.get_all_users()
+                groups = [(group.group_id, group.name, group.member_ids) for group in self.group_manager.get_all_groups()]
+            return sequence, offset, users, groups, expenses, self.balance_manager.get_ledger()
+
+        sequence, offset, users, groups, expenses, (debts, group_net_balances) = \
+            self.expense_manager.read_consistent(capture)
+        if sequence == self._snapshot_sequence:
+            return
+        self._snapshots.save({
+            "sequence": sequence,
+            "offset": offset,
+            "users": [[user.user_id, user.name] for user in users],
+            "groups": [[group_id, name, sorted(member_ids)] for group_id, name, member_ids in groups],
+            "expenses": [_expense_to_record(expense) for expense in expenses],
+            "debts": [[ower_id, payer_id, amount]
+                      for ower_id, payers in debts.items() for payer_id, amount in payers.items()],
+            "group_balances": [[group_id, user_id, balance]
+                               for group_id, balances in group_net_balances.items()
+                               for user_id, balance in balances.items()],
+        })
+        self._snapshot_sequence = sequence
+
+    def get_balances_as_of(self, as_of: datetime, group_id: Optional[str] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Returns what each ower owed each payer (in minor units) counting only expenses created
+        before `as_of`, optionally only those of one group. Folded from the journal in one
+        sequential pass; the live ledger is not touched.
+        """
+        _, end = self._journal.flushed_position()
+        debts: Dict[str, Dict[str, int]] = defaultdict(lambda: defaultdict(int))
+        for _, event_type, data in EventJournal.read_events(self._journal_path, end=end):
+            if event_type != "expenses_added":
+                continue
+            for _, _, _, paid_by_id, _, expense_group_id, created_at, splits in data:
+                if group_id is not None and expense_group_id != group_id:
+                    continue
+                if datetime.fromisoformat(created_at) >= as_of:
+                    continue
+                for user_id, amount in splits:
+                    if user_id != paid_by_id:
+                        debts[user_id][paid_by_id] += amount
+        return {ower_id: dict(payers) for ower_id, payers in debts.items()}
+
+    def get_net_balances_as_of(self, as_of: datetime, group_id: Optional[str] = None) -> Dict[str, int]:
+        """Returns every non-zero net balance (positive if owed, negative if owes) as of `as_of`."""
+        net_balances: Dict[str, int] = defaultdict(int)
+        for ower_id, payers in self.get_balances_as_of(as_of, group_id).items():
+            for payer_id, amount in payers.items():
+                net_balances[ower_id] -= amount
+                net_balances[payer_id] += amount
+        return {user_id: balance for user_id, balance in net_balances.items() if balance}
+
+    def flush(self):
+        """Forces every journaled event to disk without waiting for the group commit."""
+        self._journal.flush()
+
+    def close(self):
+        self.expense_manager.remove_expense_listener(self._journal_expenses)
+        if self._snapshot_thread is not None:
+            self._snapshot_thread.join()
+        self._journal.close()
@@ -0,0 +1,169 @@
+# splitwise/settlement/debt_simplifier.py
+
+import heapq
+from typing import Dict, List, Tuple
+
+from splitwise.exceptions import UnbalancedLedgerError
+from splitwise.models.transfer import Transfer
+
+# Up to this many non-zero balances the exact solver is used; it costs O(2^n * n).
+EXACT_SOLVER_LIMIT = 14
+
+
+def simplify_debts(net_balances: Dict[str, int], exact_limit: int = EXACT_SOLVER_LIMIT) -> List[Transfer]:
+    """
+    Returns a list of transfers that settles every net balance (in minor units; positive if owed,
+    negative if owes). The balances must sum to zero.
+
+    Settling n non-zero balances never needs more than n - 1 transfers, and every group of users
+    whose balances sum to zero on their own saves one. For up to `exact_limit` users the exact
+    solver finds the partition into the largest number of such zero-sum groups (the minimum number
+    of transfers). Larger ledgers match exactly opposite balances first, then settle the rest with a
+    heap-based greedy (largest debtor pays largest creditor), which is near-optimal in practice.
+    """
+    if sum(net_balances.values()) != 0:
+        raise UnbalancedLedgerError(f"Net balances sum to {sum(net_balances.values())}, not zero.")
+
+    balances = [(user_id, balance) for user_id, balance in net_balances.items() if balance]
+    if len(balances) <= exact_limit:
+        return _simplify_exact(balances)
+
+    transfers, remaining = _match_opposite_pairs(balances)
+    transfers.extend(_simplify_greedy(remaining))
+    return transfers
+
+
+def simplify_group_debts(group_balances: Dict[str, Dict[str, int]],
+                         exact_limit: int = EXACT_SOLVER_LIMIT) -> Dict[str, List[Transfer]]:
+    """
+    Per-group mode: settles each group's net balances independently, so no transfer crosses a group.
+    Each group's balances must sum to zero.
+    """
+    return {group_id: simplify_debts(balances, exact_limit)
+            for group_id, balances in group_balances.items()}
+
+
+def _settle_zero_sum_group(balances: List[Tuple[str, int]]) -> List[Transfer]:
+    """
+    Settles balances that sum to zero with a two-pointer pass over the debtors (most owed first) and
+    creditors (most owed to first). Every transfer clears at least one side, so k users need at
+    most k - 1 transfers.
+    """
+    owers = sorted((item for item in balances if item[1] < 0), key=lambda item: item[1])
+    owed = sorted((item for item in balances if item[1] > 0), key=lambda item: item[1], reverse=True)
+
+    transfers: List[Transfer] = []
+    i, j = 0, 0
+    ower_left = -owers[0][1] if owers else 0
+    owed_left = owed[0][1] if owed else 0
+    while i < len(owers) and j < len(owed):
+        amount = min(ower_left, owed_left)
+        transfers.append(Transfer(owers[i][0], owed[j][0], amount))
+        ower_left -= amount
+        owed_left -= amount
+        if ower_left == 0:
+            i += 1
+            if i < len(owers):
+                ower_left = -owers[i][1]
+        if owed_left == 0:
+            j += 1
+            if j < len(owed):
+                owed_left = owed[j][1]
+    return transfers
+
+
+def _simplify_exact(balances: List[Tuple[str, int]]) -> List[Transfer]:
+    """
+    Minimum-transfer settlement by dynamic programming over subsets.
+
+    best[mask] is the largest number of disjoint zero-sum groups the users in `mask` can be
+    ordered into: adding users one at a time, a group closes whenever the running sum hits zero.
+    Walking the table back from the full set recovers that order, and each group is then settled
+    on its own with size - 1 transfers.
+    """
+    count = len(balances)
+    if count == 0:
+        return []
+
+    full = (1 << count) - 1
+    sums = [0] * (full + 1)
+    best = [0] * (full + 1)
+    for mask in range(1, full + 1):
+        lowest = mask & -mask
+        sums[mask] = sums[mask ^ lowest] + balances[lowest.bit_length() - 1][1]
+        best_without = 0
+        remaining = mask
+        while remaining:
+            bit = remaining & -remaining
+            if best[mask ^ bit] > best_without:
+                best_without = best[mask ^ bit]
+            remaining ^= bit
+        best[mask] = best_without + (1 if sums[mask] == 0 else 0)
+
+    # Recover the order (last user first) by always removing a user whose removal keeps the optimum.
+    order: List[int] = []
+    mask = full
+    while mask:
+        target = best[mask] - (1 if sums[mask] == 0 else 0)
+        remaining = mask
+        while remaining:
+            bit = remaining & -remaining
+            if best[mask ^ bit] == target:
+                break
+            remaining ^= bit
+        order.append(bit.bit_length() - 1)
+        mask ^= bit
+    order.reverse()
+
+    transfers: List[Transfer] = []
+    group: List[Tuple[str, int]] = []
+    running = 0
+    for index in order:
+        group.append(balances[index])
+        running += balances[index][1]
+        if running == 0:
+            transfers.extend(_settle_zero_sum_group(group))
+            group = []
+    return transfers
+
+
+def _match_opposite_pairs(balances: List[Tuple[str, int]]) -> Tuple[List[Transfer], List[Tuple[str, int]]]:
+    """Pairs each debtor with a creditor owed exactly the same amount: one transfer settles both."""
+    creditors_by_amount: Dict[int, List[str]] = {}
+    for user_id, balance in balances:
+        if balance > 0:
+            creditors_by_amount.setdefault(balance, []).append(user_id)
+
+    transfers: List[Transfer] = []
+    matched = set()
+    for user_id, balance in balances:
+        if balance < 0:
+            creditors = creditors_by_amount.get(-balance)
+            if creditors:
+                creditor_id = creditors.pop()
+                transfers.append(Transfer(user_id, creditor_id, -balance))
+                matched.add(user_id)
+                matched.add(creditor_id)
+    remaining = [item for item in balances if item[0] not in matched]
+    return transfers, remaining
+
+
+def _simplify_greedy(balances: List[Tuple[str, int]]) -> List[Transfer]:
+    """Repeatedly lets the largest debtor pay the largest creditor; O(n log n), at most n - 1 transfers."""
+    # Max-heaps via negated amounts; the user id breaks ties deterministically.
+    debtors = [(balance, user_id) for user_id, balance in balances if balance < 0]
+    creditors = [(-balance, user_id) for user_id, balance in balances if balance > 0]
+    heapq.heapify(debtors)
+    heapq.heapify(creditors)
+
+    transfers: List[Transfer] = []
+    while debtors and creditors:
+        debt, debtor_id = heapq.heappop(debtors)
+        credit, creditor_id = heapq.heappop(creditors)
+        amount = min(-debt, -credit)
+        transfers.append(Transfer(debtor_id, creditor_id, amount))
+        if -debt > amount:
+            heapq.heappush(debtors, (debt + amount, debtor_id))
+        if -credit > amount:
+            heapq.heappush(creditors, (credit + amount, creditor_id))
+    return transfers
@@ -0,0 +1,91 @@
+# splitwise/split_methods/adjustment_split.py
+
+from typing import Callable, Dict, List, Any
+from splitwise.models.Split import Split
+from splitwise.enums import SplitType
+from splitwise.models.user import User
+from splitwise.exceptions import InvalidSplitError
+from splitwise.split_methods.base_split import SplitStrategy
+from splitwise.money import format_minor_units, to_minor_units
+
+class AdjustmentSplitStrategy(SplitStrategy):
+    """
+    Implements the Adjustment split method for expenses.
+    Each participant's adjustment (e.g. +5.00 for an extra drink, -2.00 for skipping dessert) is
+    taken out first, the rest is divided equally, and every participant pays their equal part plus
+    their own adjustment.
+    """
+    def __init__(self):
+        super().__init__(SplitType.ADJUSTMENT)
+        print("Initialized AdjustmentSplitStrategy.")
+
+    def validate_and_get_splits(
+        self,
+        total_amount: float,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, float] # Expected: {user_id: adjustment, ...}; missing users adjust by 0
+    ) -> List[Split]:
+        """
+        Validates the input and calculates splits for an Adjustment expense.
+
+        Args:
+            total_amount (float): The total amount of the expense.
+            paid_by (User): The user who paid for the expense.
+            participants (List[User]): The list of users involved in this expense.
+            split_data (Dict[str, float]): A dictionary where keys are user_ids and values are their
+                                           adjustments (positive or negative); participants not
+                                           listed have no adjustment.
+
+        Returns:
+            List[Split]: A list of Split objects, each detailing a user's adjusted share.
+
+        Raises:
+            InvalidSplitError: If a user in split_data is not a participant, or the adjustments
+                               would leave someone with a negative share.
+        """
+        splits = self.calculate_splits(total_amount, paid_by, participants, split_data)
+        print(f"AdjustmentSplit: Total {total_amount} with adjustments: {split_data}.")
+        return splits
+
+    def calculate_splits(
+        self,
+        total_amount: float,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, float] # Expected: {user_id: adjustment, ...}
+    ) -> List[Split]:
+        """Same as validate_and_get_splits, without logging; used on bulk paths."""
+        return self._prepare_splitter(paid_by, participants, split_data)(total_amount)
+
+    def _prepare_splitter(
+        self,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, float]
+    ) -> Callable[[float], List[Split]]:
+        """Validates the adjustments once; the returned function splits each total."""
+        if not participants:
+            raise InvalidSplitError("Adjustment split requires at least one participant in the expense.")
+
+        # 1. Validate all user_ids in split_data are actual participants
+        participant_ids = {user.user_id for user in participants}
+        for user_id in split_data.keys():
+            if user_id not in participant_ids:
+                raise InvalidSplitError(f"User '{user_id}' in split_data is not a declared participant.")
+        adjustments = [to_minor_units(split_data.get(user.user_id, 0)) for user in participants]
+        total_adjustment = sum(adjustments)
+
+        def split(total_amount: float) -> List[Split]:
+            # 2. Divide what is left after the adjustments equally (leftover cents to the first participants)
+            base_share, remainder = divmod(to_minor_units(total_amount) - total_adjustment, len(participants))
+            splits = []
+            for index, (user, adjustment) in enumerate(zip(participants, adjustments)):
+                share = base_share + (1 if index < remainder else 0) + adjustment
+                if share < 0:
+                    raise InvalidSplitError(
+                        f"Adjustments leave user '{user.user_id}' with a negative share ({format_minor_units(share)})."
+                    )
+                splits.append(Split(user=user, amount_cents=share))
+            return splits
+        return split
@@ -1,13 +1,14 @@
 # splitwise/split_methods/base_split.py
 
 import abc
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any, Sequence
 
 from splitwise.models.Split import Split
 from splitwise.enums import SplitType
 from splitwise.models.expense import Expense
 from splitwise.models.user import User # Import necessary models
 from splitwise.exceptions import InvalidSplitError # Import custom exception
+from splitwise.money import to_minor_units
 
 class SplitStrategy(abc.ABC):
     """
@@ -40,9 +41,82 @@ class SplitStrategy(abc.ABC):
                                          e.g., for EXACT: {user_id: amount}, for PERCENT: {user_id: percentage}
 
         Returns:
-            List[Split]: A list of Split objects, each detailing a user's share.
+            List[Split]: A list of Split objects, each detailing a user's share in minor units.
+                         The shares always add up to the total amount in minor units.
 
         Raises:
             InvalidSplitError: If the split data is invalid (e.g., amounts don't sum up, invalid percentages).
         """
-        pass
\ No newline at end of file
+        pass
+
+    @abc.abstractmethod
+    def calculate_splits(
+        self,
+        total_amount: float,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, Any]
+    ) -> List[Split]:
+        """
+        Same contract as validate_and_get_splits, but never logs. validate_and_get_splits delegates
+        here; bulk ingestion calls it directly so per-expense output does not dominate the cost.
+        """
+        pass
+
+    def validate_and_get_splits_many(
+        self,
+        total_amounts: Sequence[float],
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, Any]
+    ) -> List[List[Split]]:
+        """
+        Validates the split data once and calculates the splits of many expenses that share the
+        payer, participants and split data but may differ in total (e.g. a monthly bill imported
+        for a year). Returns one list of Split objects per total, in order.
+
+        Raises:
+            InvalidSplitError: If the split data is invalid, or invalid for one of the totals.
+        """
+        splits = self.calculate_splits_many(total_amounts, paid_by, participants, split_data)
+        print(f"{self._split_type.value} split: {len(splits)} expenses among {len(participants)} participants.")
+        return splits
+
+    def calculate_splits_many(
+        self,
+        total_amounts: Sequence[float],
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, Any]
+    ) -> List[List[Split]]:
+        """
+        Same contract as validate_and_get_splits_many, without logging. Each distinct total is
+        split once; expenses with the same total share its (immutable) Split objects. An error
+        for one of the totals names its position.
+        """
+        splitter = self._prepare_splitter(paid_by, participants, split_data)
+        splits_by_total: Dict[int, List[Split]] = {}
+        result: List[List[Split]] = []
+        for position, total_amount in enumerate(total_amounts):
+            total_cents = to_minor_units(total_amount)
+            splits = splits_by_total.get(total_cents)
+            if splits is None:
+                try:
+                    splits = splits_by_total[total_cents] = splitter(total_amount)
+                except InvalidSplitError as e:
+                    raise InvalidSplitError(f"Expense #{position}: {e}") from e
+            result.append(list(splits))
+        return result
+
+    def _prepare_splitter(
+        self,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, Any]
+    ) -> Callable[[float], List[Split]]:
+        """
+        Returns a function from a total amount to its splits. Strategies whose split data can be
+        validated independently of the total override this to validate it once, up front;
+        by default every total goes through calculate_splits.
+        """
+        return lambda total_amount: self.calculate_splits(total_amount, paid_by, participants, split_data)
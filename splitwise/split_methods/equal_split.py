@@ -7,6 +7,7 @@ from splitwise.models.expense import Expense
 from splitwise.models.user import User
 from splitwise.exceptions import InvalidSplitError
 from splitwise.split_methods.base_split import SplitStrategy
+from splitwise.money import to_minor_units
 
 class EqualSplitStrategy(SplitStrategy):
     """
@@ -39,24 +40,27 @@ class EqualSplitStrategy(SplitStrategy):
         Raises:
             InvalidSplitError: If there are no participants.
         """
+        splits = self.calculate_splits(total_amount, paid_by, participants, split_data)
+        print(f"EqualSplit: Total {total_amount} divided among {len(participants)} participants.")
+        return splits
+
+    def calculate_splits(
+        self,
+        total_amount: float,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, Any] # This parameter is ignored for Equal split
+    ) -> List[Split]:
+        """Same as validate_and_get_splits, without logging; used on bulk paths."""
         if not participants:
             raise InvalidSplitError("Equal split requires at least one participant.")
 
         num_participants = len(participants)
-        # Calculate amount per person. Use round to handle floating point for display.
-        # However, for internal calculations, keep float precision.
-        # The sum of rounded amounts might not exactly equal total_amount.
-        # We need to distribute the remainder if it exists.
-        base_share = total_amount / num_participants
+        # Work in minor units. With equal weights the largest-remainder method reduces to giving
+        # the leftover cents one each to the first participants (e.g. 10.00 / 3 -> 3.34, 3.33, 3.33).
+        base_share, remainder = divmod(to_minor_units(total_amount), num_participants)
         splits = []
-        for user in participants:
-            splits.append(Split(user=user, amount=base_share))
-
-        # Handle floating point precision distribution for equal split if needed
-        # (e.g., if total_amount = 10.0, num_participants = 3, base_share = 3.3333...)
-        # This simple approach might leave tiny remainders. For more robust systems,
-        # a dedicated remainder distribution logic would be needed.
-        # For this problem, basic division is sufficient.
+        for index, user in enumerate(participants):
+            splits.append(Split(user=user, amount_cents=base_share + (1 if index < remainder else 0)))
 
-        print(f"EqualSplit: Total {total_amount} divided among {num_participants} participants.")
-        return splits
\ No newline at end of file
+        return splits
@@ -6,9 +6,7 @@ from splitwise.enums import SplitType
 from splitwise.models.user import User
 from splitwise.exceptions import InvalidSplitError
 from splitwise.split_methods.base_split import SplitStrategy
-
-# Define a small epsilon for floating point comparisons
-EPSILON = 0.0001 # Can be adjusted based on required precision (e.g., 0.01 for cents)
+from splitwise.money import distribute_minor_units, to_decimal, to_minor_units
 
 class ExactSplitStrategy(SplitStrategy):
     """
@@ -41,6 +39,18 @@ class ExactSplitStrategy(SplitStrategy):
         Raises:
             InvalidSplitError: If amounts don't sum up to total, or if participants are missing/extra.
         """
+        splits = self.calculate_splits(total_amount, paid_by, participants, split_data)
+        print(f"ExactSplit: Total {total_amount} with exact amounts: {split_data}.")
+        return splits
+
+    def calculate_splits(
+        self,
+        total_amount: float,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, float] # Expected: {user_id: exact_amount, ...}
+    ) -> List[Split]:
+        """Same as validate_and_get_splits, without logging; used on bulk paths."""
         if not split_data:
             raise InvalidSplitError("Exact split requires split_data specifying amounts per participant.")
         if not participants:
@@ -53,21 +63,26 @@ class ExactSplitStrategy(SplitStrategy):
                 raise InvalidSplitError(f"User '{user_id}' in split_data is not a declared participant.")
             if split_data[user_id] < 0:
                 raise InvalidSplitError(f"Exact amount for user '{user_id}' cannot be negative.")
+        for user_id in participant_ids:
+            if user_id not in split_data:
+                raise InvalidSplitError(f"Participant '{user_id}' is missing from split_data.")
 
-        # 2. Validate sum of exact amounts equals total_amount
-        sum_of_exact_amounts = sum(split_data.values())
+        # 2. Validate sum of exact amounts equals total_amount, compared in minor units
+        total_cents = to_minor_units(total_amount)
+        sum_of_exact_amounts = sum(to_decimal(amount) for amount in split_data.values())
 
-        if abs(sum_of_exact_amounts - total_amount) > EPSILON:
+        if to_minor_units(sum_of_exact_amounts) != total_cents:
             raise InvalidSplitError(
                 f"Sum of exact amounts ({sum_of_exact_amounts}) does not match total amount ({total_amount})."
             )
 
-        # 3. Create Split objects
+        # 3. Create Split objects. Sub-cent amounts are rounded by largest remainder so the
+        # shares still add up to the total exactly.
         splits = []
         # Create a mapping for quick user lookup
         user_map = {user.user_id: user for user in participants}
-        for user_id, amount in split_data.items():
-            splits.append(Split(user=user_map[user_id], amount=amount))
+        shares = distribute_minor_units(total_cents, list(split_data.values()))
+        for user_id, share in zip(split_data.keys(), shares):
+            splits.append(Split(user=user_map[user_id], amount_cents=share))
 
-        print(f"ExactSplit: Total {total_amount} with exact amounts: {split_data}.")
-        return splits
\ No newline at end of file
+        return splits
@@ -0,0 +1,113 @@
+# splitwise/split_methods/itemized_split.py
+
+from math import lcm
+from typing import Callable, Dict, List, Any
+from splitwise.models.Split import Split
+from splitwise.enums import SplitType
+from splitwise.models.user import User
+from splitwise.exceptions import InvalidSplitError
+from splitwise.split_methods.base_split import SplitStrategy
+from splitwise.money import distribute_by_integer_weights, format_minor_units, to_minor_units
+
+class ItemizedSplitStrategy(SplitStrategy):
+    """
+    Implements the Itemized (receipt) split method for expenses.
+    Every item is shared equally by the participants who had it. Whatever the total adds on top of
+    the items (tax, tip, service charge) is shared in proportion to each participant's item subtotal.
+    """
+    def __init__(self):
+        super().__init__(SplitType.ITEMIZED)
+        print("Initialized ItemizedSplitStrategy.")
+
+    def validate_and_get_splits(
+        self,
+        total_amount: float,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, Any] # Expected: {"items": [{"amount": 12.5, "user_ids": ["u1", "u2"]}, ...]}
+    ) -> List[Split]:
+        """
+        Validates the input and calculates splits for an Itemized expense.
+
+        Args:
+            total_amount (float): The total amount of the expense, including tax and tip.
+            paid_by (User): The user who paid for the expense.
+            participants (List[User]): The list of users involved in this expense.
+            split_data (Dict[str, Any]): {"items": [...]}, each item a dict with its "amount" and
+                                         the "user_ids" sharing it.
+
+        Returns:
+            List[Split]: A list of Split objects, each detailing a user's items plus their part of the extras.
+
+        Raises:
+            InvalidSplitError: If an item is malformed or shared by a non-participant, a participant
+                               has no items, or the items add up to more than the total.
+        """
+        splits = self.calculate_splits(total_amount, paid_by, participants, split_data)
+        print(f"ItemizedSplit: Total {total_amount} over {len(split_data.get('items') or [])} items.")
+        return splits
+
+    def calculate_splits(
+        self,
+        total_amount: float,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, Any]
+    ) -> List[Split]:
+        """Same as validate_and_get_splits, without logging; used on bulk paths."""
+        return self._prepare_splitter(paid_by, participants, split_data)(total_amount)
+
+    def _prepare_splitter(
+        self,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, Any]
+    ) -> Callable[[float], List[Split]]:
+        """Validates the items once; the returned function splits each total."""
+        items = split_data.get("items") if split_data else None
+        if not items:
+            raise InvalidSplitError("Itemized split requires split_data with a non-empty 'items' list.")
+        if not participants:
+            raise InvalidSplitError("Itemized split requires at least one participant in the expense.")
+
+        # 1. Validate the items
+        participant_ids = {user.user_id for user in participants}
+        item_cents: List[int] = []
+        item_users: List[List[str]] = []
+        for position, item in enumerate(items):
+            amount_cents = to_minor_units(item.get("amount", 0))
+            user_ids = list(dict.fromkeys(item.get("user_ids") or ()))
+            if amount_cents <= 0:
+                raise InvalidSplitError(f"Item #{position} must have a positive amount.")
+            if not user_ids:
+                raise InvalidSplitError(f"Item #{position} must be shared by at least one participant.")
+            for user_id in user_ids:
+                if user_id not in participant_ids:
+                    raise InvalidSplitError(f"User '{user_id}' on item #{position} is not a declared participant.")
+            item_cents.append(amount_cents)
+            item_users.append(user_ids)
+
+        # 2. Each participant's item subtotal, scaled by the lcm of the item group sizes so that
+        # equal shares of every item stay whole numbers and the weights are exact.
+        scale = lcm(*(len(user_ids) for user_ids in item_users))
+        weights = {user_id: 0 for user_id in participant_ids}
+        for amount_cents, user_ids in zip(item_cents, item_users):
+            for user_id in user_ids:
+                weights[user_id] += amount_cents * (scale // len(user_ids))
+        for user in participants:
+            if not weights[user.user_id]:
+                raise InvalidSplitError(f"Participant '{user.user_id}' has no items on the receipt.")
+        items_total = sum(item_cents)
+        participant_weights = [weights[user.user_id] for user in participants]
+
+        def split(total_amount: float) -> List[Split]:
+            total_cents = to_minor_units(total_amount)
+            if items_total > total_cents:
+                raise InvalidSplitError(
+                    f"Items add up to {format_minor_units(items_total)}, more than the total amount ({total_amount})."
+                )
+            # 3. Distributing the whole total by subtotal gives everyone their items plus a
+            # proportional part of the extras, rounded by largest remainder.
+            shares = distribute_by_integer_weights(total_cents, participant_weights)
+            return [Split(user=user, amount_cents=share) for user, share in zip(participants, shares)]
+        return split
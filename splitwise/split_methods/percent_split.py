@@ -1,14 +1,15 @@
 # splitwise/split_methods/percent_split.py
 
-from typing import Dict, List, Any
+from typing import Callable, Dict, List, Any
 from splitwise.models.Split import Split
 from splitwise.enums import SplitType
 from splitwise.models.user import User
 from splitwise.exceptions import InvalidSplitError
 from splitwise.split_methods.base_split import SplitStrategy
+from splitwise.money import distribute_by_integer_weights, to_decimal, to_integer_weights, to_minor_units
 
-# Define a small epsilon for floating point comparisons
-EPSILON = 0.0001 # Can be adjusted based on required precision
+# Tolerance on the percentage total, so e.g. three shares of 100 / 3 are accepted
+EPSILON = to_decimal("0.0001")
 
 class PercentSplitStrategy(SplitStrategy):
     """
@@ -41,6 +42,27 @@ class PercentSplitStrategy(SplitStrategy):
         Raises:
             InvalidSplitError: If percentages don't sum up to 100, or if participants are missing/extra.
         """
+        splits = self.calculate_splits(total_amount, paid_by, participants, split_data)
+        print(f"PercentSplit: Total {total_amount} with percentages: {split_data}.")
+        return splits
+
+    def calculate_splits(
+        self,
+        total_amount: float,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, float] # Expected: {user_id: percentage, ...}
+    ) -> List[Split]:
+        """Same as validate_and_get_splits, without logging; used on bulk paths."""
+        return self._prepare_splitter(paid_by, participants, split_data)(total_amount)
+
+    def _prepare_splitter(
+        self,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, float]
+    ) -> Callable[[float], List[Split]]:
+        """Validates the percentages once; the returned function only distributes each total."""
         if not split_data:
             raise InvalidSplitError("Percent split requires split_data specifying percentages per participant.")
         if not participants:
@@ -53,21 +75,24 @@ class PercentSplitStrategy(SplitStrategy):
                 raise InvalidSplitError(f"User '{user_id}' in split_data is not a declared participant.")
             if split_data[user_id] < 0:
                 raise InvalidSplitError(f"Percentage for user '{user_id}' cannot be negative.")
+        for user_id in participant_ids:
+            if user_id not in split_data:
+                raise InvalidSplitError(f"Participant '{user_id}' is missing from split_data.")
 
         # 2. Validate sum of percentages equals 100
-        sum_of_percentages = sum(split_data.values())
+        sum_of_percentages = sum(to_decimal(percentage) for percentage in split_data.values())
 
-        if abs(sum_of_percentages - 100.0) > EPSILON:
+        if abs(sum_of_percentages - 100) > EPSILON:
             raise InvalidSplitError(
                 f"Sum of percentages ({sum_of_percentages}) does not equal 100%."
             )
 
-        # 3. Create Split objects
-        splits = []
+        # 3. Create Split objects, distributing the total in minor units by largest remainder
         user_map = {user.user_id: user for user in participants} # For quick user lookup
-        for user_id, percentage in split_data.items():
-            amount = total_amount * (percentage / 100.0)
-            splits.append(Split(user=user_map[user_id], amount=amount))
+        users = [user_map[user_id] for user_id in split_data.keys()]
+        weights = to_integer_weights(list(split_data.values()))
 
-        print(f"PercentSplit: Total {total_amount} with percentages: {split_data}.")
-        return splits
\ No newline at end of file
+        def split(total_amount: float) -> List[Split]:
+            shares = distribute_by_integer_weights(to_minor_units(total_amount), weights)
+            return [Split(user=user, amount_cents=share) for user, share in zip(users, shares)]
+        return split
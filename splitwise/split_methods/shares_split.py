@@ -0,0 +1,92 @@
+# splitwise/split_methods/shares_split.py
+
+from typing import Callable, Dict, List, Any
+from splitwise.models.Split import Split
+from splitwise.enums import SplitType
+from splitwise.models.user import User
+from splitwise.exceptions import InvalidSplitError
+from splitwise.split_methods.base_split import SplitStrategy
+from splitwise.money import distribute_by_integer_weights, to_integer_weights, to_minor_units
+
+class SharesSplitStrategy(SplitStrategy):
+    """
+    Implements the Shares split method for expenses.
+    Each participant pays in proportion to their number of shares (e.g. 2 shares pay twice as much as 1).
+    """
+    def __init__(self):
+        super().__init__(SplitType.SHARES)
+        print("Initialized SharesSplitStrategy.")
+
+    def validate_and_get_splits(
+        self,
+        total_amount: float,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, float] # Expected: {user_id: shares, ...}
+    ) -> List[Split]:
+        """
+        Validates the input and calculates splits for a Shares expense.
+
+        Args:
+            total_amount (float): The total amount of the expense.
+            paid_by (User): The user who paid for the expense.
+            participants (List[User]): The list of users involved in this expense.
+            split_data (Dict[str, float]): A dictionary where keys are user_ids and values are their
+                                           (possibly fractional) number of shares.
+
+        Returns:
+            List[Split]: A list of Split objects, each detailing a user's share-weighted amount.
+
+        Raises:
+            InvalidSplitError: If shares are negative or all zero, or if participants are missing/extra.
+        """
+        splits = self.calculate_splits(total_amount, paid_by, participants, split_data)
+        print(f"SharesSplit: Total {total_amount} with shares: {split_data}.")
+        return splits
+
+    def calculate_splits(
+        self,
+        total_amount: float,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, float] # Expected: {user_id: shares, ...}
+    ) -> List[Split]:
+        """Same as validate_and_get_splits, without logging; used on bulk paths."""
+        return self._prepare_splitter(paid_by, participants, split_data)(total_amount)
+
+    def _prepare_splitter(
+        self,
+        paid_by: User,
+        participants: List[User],
+        split_data: Dict[str, float]
+    ) -> Callable[[float], List[Split]]:
+        """Validates the shares once; the returned function only distributes each total."""
+        if not split_data:
+            raise InvalidSplitError("Shares split requires split_data specifying shares per participant.")
+        if not participants:
+            raise InvalidSplitError("Shares split requires at least one participant in the expense.")
+
+        # 1. Validate all user_ids in split_data are actual participants
+        participant_ids = {user.user_id for user in participants}
+        for user_id in split_data.keys():
+            if user_id not in participant_ids:
+                raise InvalidSplitError(f"User '{user_id}' in split_data is not a declared participant.")
+            if split_data[user_id] < 0:
+                raise InvalidSplitError(f"Shares for user '{user_id}' cannot be negative.")
+        for user_id in participant_ids:
+            if user_id not in split_data:
+                raise InvalidSplitError(f"Participant '{user_id}' is missing from split_data.")
+
+        # 2. Validate there is something to split by
+        weights = to_integer_weights(list(split_data.values()))
+        if sum(weights) <= 0:
+            raise InvalidSplitError("Shares split requires at least one participant with a positive number of shares.")
+
+        # 3. Create Split objects, distributing the total in minor units by largest remainder
+        user_map = {user.user_id: user for user in participants} # For quick user lookup
+        users = [user_map[user_id] for user_id in split_data.keys()]
+
+        def split(total_amount: float) -> List[Split]:
+            shares = distribute_by_integer_weights(to_minor_units(total_amount), weights)
+            return [Split(user=user, amount_cents=share) for user, share in zip(users, shares)]
+        return split
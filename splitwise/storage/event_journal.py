@@ -0,0 +1,142 @@
+# splitwise/storage/event_journal.py
+
+import json
+import os
+import struct
+import threading
+import time
+import zlib
+from typing import Any, Iterator, List, Optional, Tuple
+
+from splitwise.exceptions import PersistenceError
+
+
+class EventJournal:
+    """
+    Append-only journal of splitwise events (users, groups and expenses added).
+
+    Each record is framed as <payload_length, sequence, crc32> followed by a JSON payload of
+    [event_type, data]. Records are buffered and written together (group commit) once
+    `group_commit_size` are pending or `group_commit_interval` seconds have passed since the oldest
+    pending one, so many events share one write + fsync. A timer armed with the first pending
+    event enforces the interval even if no further event arrives. Call flush() for a hard
+    durability point.
+
+    The journal is never truncated: snapshots only record how far into it they reach, and the full
+    history stays available for point-in-time queries.
+    """
+
+    _HEADER = struct.Struct("<IQI")
+
+    def __init__(self, path: str, last_sequence: int = 0, group_commit_size: int = 128,
+                 group_commit_interval: float = 0.05, fsync: bool = True):
+        if group_commit_size < 1:
+            raise ValueError("group_commit_size must be at least 1.")
+        if group_commit_interval < 0:
+            raise ValueError("group_commit_interval must be non-negative.")
+
+        self._path = path
+        self._last_sequence = last_sequence
+        self._group_commit_size = group_commit_size
+        self._group_commit_interval = group_commit_interval
+        self._fsync = fsync
+
+        self._pending: List[bytes] = []
+        self._oldest_pending_at: Optional[float] = None
+        self._flush_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._file = open(path, "ab")
+
+    @property
+    def last_sequence(self) -> int:
+        return self._last_sequence
+
+    def append(self, event_type: str, data: Any) -> int:
+        """Queues an event and returns its sequence number."""
+        payload = json.dumps([event_type, data], separators=(",", ":")).encode("utf-8")
+        with self._lock:
+            self._last_sequence += 1
+            self._pending.append(self._HEADER.pack(len(payload), self._last_sequence, zlib.crc32(payload)) + payload)
+            if self._oldest_pending_at is None:
+                self._oldest_pending_at = time.monotonic()
+
+            if (len(self._pending) >= self._group_commit_size or
+                    time.monotonic() - self._oldest_pending_at >= self._group_commit_interval):
+                self._flush_locked()
+            elif self._flush_timer is None:
+                # A timer left over from an earlier flush only fires early, never late
+                self._flush_timer = threading.Timer(self._group_commit_interval, self._flush_on_timer)
+                self._flush_timer.daemon = True
+                self._flush_timer.start()
+            return self._last_sequence
+
+    def _flush_on_timer(self):
+        with self._lock:
+            self._flush_timer = None
+            if not self._file.closed:
+                self._flush_locked()
+
+    def flush(self):
+        """Writes and fsyncs every pending event."""
+        with self._lock:
+            self._flush_locked()
+
+    def flushed_position(self) -> Tuple[int, int]:
+        """Flushes, then returns (last_sequence, byte offset just past it) for snapshots and readers."""
+        with self._lock:
+            self._flush_locked()
+            return self._last_sequence, self._file.tell()
+
+    def _flush_locked(self):
+        if not self._pending:
+            return
+        self._file.write(b"".join(self._pending))
+        self._file.flush()
+        if self._fsync:
+            os.fsync(self._file.fileno())
+        self._pending.clear()
+        self._oldest_pending_at = None
+
+    def close(self):
+        with self._lock:
+            self._flush_locked()
+            if self._flush_timer is not None:
+                self._flush_timer.cancel()
+                self._flush_timer = None
+            self._file.close()
+
+    @classmethod
+    def read_events(cls, path: str, start: int = 0, end: Optional[int] = None,
+                    repair: bool = False) -> Iterator[Tuple[int, str, Any]]:
+        """
+        Yields (sequence, event_type, data) for every intact record between byte offsets `start`
+        and `end` (the end of the file by default). A torn or corrupt tail (e.g. from a crash
+        mid-write) ends the read; with repair=True (recovery only, nothing may be appending) it is
+        also cut off the file.
+        """
+        if not os.path.exists(path):
+            return
+        if start > os.path.getsize(path):
+            raise PersistenceError(f"Event journal '{path}' is shorter than its snapshot position {start}.")
+
+        valid_length = start
+        with open(path, "rb") as journal_file:
+            journal_file.seek(start)
+            while end is None or valid_length < end:
+                header = journal_file.read(cls._HEADER.size)
+                if len(header) < cls._HEADER.size:
+                    break
+                length, sequence, checksum = cls._HEADER.unpack(header)
+                payload = journal_file.read(length)
+                if len(payload) < length or zlib.crc32(payload) != checksum:
+                    break
+                try:
+                    event_type, data = json.loads(payload.decode("utf-8"))
+                except ValueError as e:
+                    raise PersistenceError(f"Unreadable event journal record at sequence {sequence}: {e}")
+                valid_length += cls._HEADER.size + length
+                yield sequence, event_type, data
+
+        if repair and valid_length < os.path.getsize(path):
+            with open(path, "r+b") as journal_file:
+                journal_file.truncate(valid_length)
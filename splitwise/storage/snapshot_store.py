@@ -0,0 +1,47 @@
+# splitwise/storage/snapshot_store.py
+
+import json
+import os
+from typing import Any, Dict, Optional
+
+from splitwise.exceptions import PersistenceError
+
+
+class SnapshotStore:
+    """
+    Reads and writes the latest snapshot of the whole splitwise state as one JSON document:
+    users, groups, expenses (with their computed splits) and the balance matrix, tagged with the
+    journal sequence and byte offset it covers. Loading it restores the ledger directly instead of
+    replaying every expense.
+    """
+
+    _FORMAT = "splitwise-snapshot"
+    _VERSION = 1
+
+    def __init__(self, path: str):
+        self._path = path
+
+    def save(self, state: Dict[str, Any]):
+        """Atomically replaces the snapshot with `state` (a JSON-serialisable dict)."""
+        temp_path = self._path + ".tmp"
+        # dumps() runs the C encoder; dump() to a file would fall back to the pure-Python one.
+        data = json.dumps({"format": self._FORMAT, "version": self._VERSION, **state}, separators=(",", ":"))
+        with open(temp_path, "w", encoding="utf-8") as snapshot_file:
+            snapshot_file.write(data)
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temp_path, self._path)
+
+    def load(self) -> Optional[Dict[str, Any]]:
+        """Returns the snapshot's state, or None if no snapshot exists yet."""
+        if not os.path.exists(self._path):
+            return None
+
+        try:
+            with open(self._path, "r", encoding="utf-8") as snapshot_file:
+                state = json.load(snapshot_file)
+        except (ValueError, UnicodeDecodeError) as e:
+            raise PersistenceError(f"Corrupt splitwise snapshot '{self._path}': {e}")
+        if state.get("format") != self._FORMAT or state.get("version") != self._VERSION:
+            raise PersistenceError(f"'{self._path}' is not a version {self._VERSION} splitwise snapshot.")
+        return state
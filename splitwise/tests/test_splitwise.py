@@ -2,7 +2,14 @@ import unittest
 import sys
 import os
 from unittest.mock import patch, MagicMock
+from contextlib import redirect_stdout
 import io
+import asyncio
+import queue
+import tempfile
+import threading
+import time
+from datetime import datetime, timedelta, timezone
 from collections import defaultdict  # Used internally by BalanceManager
 
 # Add parent directory (splitwise_app) to sys.path to allow imports from splitwise package
@@ -13,6 +20,8 @@ sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..',
 from splitwise.managers.user_manager import UserManager
 from splitwise.managers.expense_manager import ExpenseManager
 from splitwise.managers.balance_manager import BalanceManager
+from splitwise.managers.group_manager import GroupManager
+from splitwise.managers.balance_matrix import SparseBalanceMatrix
 from splitwise.models.Split import Split
 from splitwise.enums import SplitType
 from splitwise.models.expense import Expense
@@ -20,13 +29,26 @@ from splitwise.models.user import User
 from splitwise.split_methods.equal_split import EqualSplitStrategy
 from splitwise.split_methods.exact_split import ExactSplitStrategy
 from splitwise.split_methods.percent_split import PercentSplitStrategy
+from splitwise.split_methods.shares_split import SharesSplitStrategy
+from splitwise.split_methods.adjustment_split import AdjustmentSplitStrategy
+from splitwise.split_methods.itemized_split import ItemizedSplitStrategy
+from splitwise.money import distribute_minor_units, format_minor_units, to_minor_units
+from splitwise.settlement.debt_simplifier import simplify_debts, simplify_group_debts
+from splitwise.persistent_splitwise import PersistentSplitwise
+from splitwise.storage.event_journal import EventJournal
+from splitwise.storage.snapshot_store import SnapshotStore
 from splitwise.exceptions import (
     SplitwiseError,
     UserNotFoundException,
     InvalidSplitError,
     DuplicateUserException,
     ExpenseNotFoundException,
-    InvalidAmountException
+    InvalidAmountException,
+    UnbalancedLedgerError,
+    GroupNotFoundException,
+    DuplicateGroupException,
+    PersistenceError,
+    InvalidTimestampError
 )
 
 # Helper for floating point comparisons
@@ -261,6 +283,130 @@ class TestPercentSplitStrategy(unittest.TestCase):
             )
 
 
+class TestSharesAdjustmentItemizedStrategies(unittest.TestCase):
+    def setUp(self):
+        self.user1 = User("u1", "Alice")
+        self.user2 = User("u2", "Bob")
+        self.user3 = User("u3", "Charlie")
+        self.users = [self.user1, self.user2, self.user3]
+
+    def amounts(self, splits):
+        return {s.user.user_id: s.amount_cents for s in splits}
+
+    def test_shares_split(self):
+        strategy = SharesSplitStrategy()
+        splits = strategy.validate_and_get_splits(100.0, self.user1, self.users, {"u1": 2, "u2": 1, "u3": 1})
+        self.assertEqual(self.amounts(splits), {"u1": 5000, "u2": 2500, "u3": 2500})
+        splits = strategy.validate_and_get_splits(10.0, self.user1, self.users, {"u1": 1, "u2": 1, "u3": 1})
+        self.assertEqual(sum(s.amount_cents for s in splits), 1000)
+        with self.assertRaises(InvalidSplitError):
+            strategy.validate_and_get_splits(10.0, self.user1, self.users, {"u1": 1, "u2": 1})  # u3 missing
+        with self.assertRaises(InvalidSplitError):
+            strategy.validate_and_get_splits(10.0, self.user1, self.users, {"u1": 0, "u2": 0, "u3": 0})
+
+    def test_adjustment_split(self):
+        strategy = AdjustmentSplitStrategy()
+        # 90 - 6 (u1's extra drinks) + 3 (u3 skipped dessert) = 87 shared equally
+        splits = strategy.validate_and_get_splits(90.0, self.user1, self.users, {"u1": 6, "u3": -3})
+        self.assertEqual(self.amounts(splits), {"u1": 3500, "u2": 2900, "u3": 2600})
+        with self.assertRaises(InvalidSplitError):
+            strategy.validate_and_get_splits(10.0, self.user1, self.users, {"u1": 20})  # Others would pay < 0
+        with self.assertRaises(InvalidSplitError):
+            strategy.validate_and_get_splits(10.0, self.user1, self.users, {"u9": 1})
+
+    def test_itemized_split_shares_extras_by_subtotal(self):
+        strategy = ItemizedSplitStrategy()
+        items = {"items": [
+            {"amount": 30, "user_ids": ["u1"]},
+            {"amount": 10, "user_ids": ["u2"]},
+            {"amount": 20, "user_ids": ["u1", "u2", "u3"]},  # Shared starter
+        ]}
+        # Subtotals 36.67 / 16.67 / 6.67 of 60; the 12 of tax and tip follows the same proportions
+        splits = strategy.validate_and_get_splits(72.0, self.user1, self.users, items)
+        self.assertEqual(self.amounts(splits), {"u1": 4400, "u2": 2000, "u3": 800})
+        with self.assertRaises(InvalidSplitError):
+            strategy.validate_and_get_splits(50.0, self.user1, self.users, items)  # Items exceed the total
+        with self.assertRaises(InvalidSplitError):
+            strategy.validate_and_get_splits(72.0, self.user1, self.users, {"items": items["items"][:2]})  # u3 has nothing
+
+    def test_many_totals_share_splits(self):
+        strategy = SharesSplitStrategy()
+        all_splits = strategy.validate_and_get_splits_many(
+            [30.0, 30.0, 45.0], self.user1, self.users, {"u1": 1, "u2": 1, "u3": 1})
+        self.assertEqual([sum(s.amount_cents for s in splits) for splits in all_splits], [3000, 3000, 4500])
+        self.assertIs(all_splits[0][0], all_splits[1][0])  # Same total, same (frozen) Split objects
+        self.assertIsNot(all_splits[0], all_splits[1])
+        self.assertEqual(all_splits[1], strategy.calculate_splits(30.0, self.user1, self.users, {"u1": 1, "u2": 1, "u3": 1}))
+        with self.assertRaisesRegex(InvalidSplitError, "Expense #1"):
+            ItemizedSplitStrategy().validate_and_get_splits_many(
+                [20.0, 5.0], self.user1, [self.user1], {"items": [{"amount": 10, "user_ids": ["u1"]}]})
+
+
+# --- Test Cases for integer money ---
+class TestMoney(unittest.TestCase):
+    def test_to_minor_units_rounds_half_up(self):
+        self.assertEqual(to_minor_units(12.345), 1235)
+        self.assertEqual(to_minor_units(0.1), 10)
+        self.assertEqual(to_minor_units(100), 10000)
+        self.assertEqual(format_minor_units(-1205), "-12.05")
+
+    def test_distribute_largest_remainder(self):
+        self.assertEqual(distribute_minor_units(1000, [1, 1, 1]), [334, 333, 333])
+        # Quotas 33.33 / 33.33 / 33.34 of 1.00 -> the leftover cent goes to the largest remainder
+        self.assertEqual(distribute_minor_units(100, [33.33, 33.33, 33.34]), [33, 33, 34])
+        self.assertEqual(distribute_minor_units(0, [0, 0]), [0, 0])
+
+    def test_splits_always_sum_to_total(self):
+        users = [User(f"u{i}", f"User {i}") for i in range(7)]
+        splits = EqualSplitStrategy().validate_and_get_splits(100.0, users[0], users, {})
+        self.assertEqual(sum(split.amount_cents for split in splits), 10000)
+        self.assertEqual([split.amount_cents for split in splits], [1429] * 4 + [1428] * 3)
+
+        percentages = {user.user_id: 100 / 7 for user in users}
+        splits = PercentSplitStrategy().validate_and_get_splits(10.0, users[0], users, percentages)
+        self.assertEqual(sum(split.amount_cents for split in splits), 1000)
+
+        splits = ExactSplitStrategy().validate_and_get_splits(
+            10.0, users[0], users[:2], {"u0": 3.335, "u1": 6.665})
+        # Both quotas are x.5 cents; the tie goes to the first entry
+        self.assertEqual([split.amount_cents for split in splits], [334, 666])
+
+
+# --- Test Cases for debt simplification ---
+class TestDebtSimplifier(unittest.TestCase):
+    def assertSettles(self, balances, transfers):
+        remaining = dict(balances)
+        for transfer in transfers:
+            self.assertGreater(transfer.amount_cents, 0)
+            remaining[transfer.from_user_id] += transfer.amount_cents
+            remaining[transfer.to_user_id] -= transfer.amount_cents
+        self.assertTrue(all(balance == 0 for balance in remaining.values()))
+
+    def test_exact_solver_uses_zero_sum_subgroups(self):
+        # {b, e} and {a, c, d} settle independently: 3 transfers, where a plain greedy pass needs 4
+        balances = {"a": -600, "b": -400, "c": 300, "d": 300, "e": 400}
+        transfers = simplify_debts(balances)
+        self.assertSettles(balances, transfers)
+        self.assertEqual(len(transfers), 3)
+
+    def test_greedy_for_large_ledgers(self):
+        balances = {f"u{i}": (i % 7 - 3) * 100 for i in range(70)}
+        balances["u0"] -= sum(balances.values())
+        transfers = simplify_debts(balances, exact_limit=0)
+        self.assertSettles(balances, transfers)
+        self.assertLess(len(transfers), len([b for b in balances.values() if b]))
+
+    def test_per_group_mode(self):
+        groups = {"trip": {"a": -500, "b": 500}, "flat": {"a": 200, "c": -200}}
+        transfers = simplify_group_debts(groups)
+        self.assertEqual([(t.from_user_id, t.to_user_id, t.amount_cents) for t in transfers["trip"]], [("a", "b", 500)])
+        self.assertEqual([(t.from_user_id, t.to_user_id, t.amount_cents) for t in transfers["flat"]], [("c", "a", 200)])
+
+    def test_unbalanced_ledger(self):
+        with self.assertRaises(UnbalancedLedgerError):
+            simplify_debts({"a": -100, "b": 50})
+
+
 # --- Test Cases for ExpenseManager ---
 class TestExpenseManager(unittest.TestCase):
 
@@ -634,12 +780,470 @@ class TestBalanceManager(unittest.TestCase):
         # Directly check if _balances internal state is being cleared
         self.balance_manager._recalculate_all_balances()  # This is called by get_net_balances or show_balances
 
-        # After recalculating all balances, the internal _balances dictionary should be consistent
-        # with the current expenses. Its existence implies it was cleared and rebuilt.
-        self.assertIn("u2", self.balance_manager._balances)  # u2 owes u1
-        self.assertIn("u7", self.balance_manager._balances)  # u7 owes u6
-        self.assertAlmostEqual(self.balance_manager._balances["u2"]["u1"], 5.0)
-        self.assertAlmostEqual(self.balance_manager._balances["u7"]["u6"], 10.0)
+        # After recalculating all balances, the internal balance matrix should be consistent
+        # with the current expenses: cleared and rebuilt, with nothing counted twice.
+        self.assertEqual(len(self.balance_manager._balances), 2)
+        # The ledger is kept in minor units (cents)
+        self.assertEqual(self.balance_manager._balances.row("u2"), {"u1": 500})  # u2 owes u1
+        self.assertEqual(self.balance_manager._balances.column("u6"), {"u7": 1000})  # u7 owes u6
+
+
+    def test_balances_are_maintained_incrementally(self):
+        self.add_expense("E1", 30, "u1", ["u1", "u2", "u3"], SplitType.EQUAL)
+        self.add_expense("E2", 10, "u2", ["u1", "u2"], SplitType.EQUAL)
+
+        # Reads must come from the ledger, not from replaying the expense history
+        with patch.object(self.expense_manager, "get_all_expenses", side_effect=AssertionError("replayed")):
+            self.assertEqual(self.balance_manager.get_net_balance("u1"), 1500)
+            self.assertEqual(self.balance_manager.get_net_balance("u2"), -500)
+            self.assertEqual(self.balance_manager.get_net_balance("u3"), -1000)
+            self.assertEqual(self.balance_manager.get_net_balance("u4"), 0)
+            self.assertNotIn("u4", self.balance_manager.get_net_balances())
+
+            owes, owed_by = self.balance_manager.get_user_balances("u1")
+            self.assertEqual(owes["u2"], 500)
+            self.assertEqual(owed_by["u2"], 1000)
+            self.assertEqual(owed_by["u3"], 1000)
+
+    def test_balance_manager_picks_up_existing_expenses(self):
+        self.add_expense("E1", 10, "u1", ["u1", "u2"], SplitType.EQUAL)
+        late_balance_manager = BalanceManager(self.user_manager, self.expense_manager)
+        self.add_expense("E2", 20, "u1", ["u1", "u2"], SplitType.EQUAL)
+
+        self.assertEqual(late_balance_manager.get_net_balance("u1"), 1500)
+        self.assertEqual(late_balance_manager.get_net_balances(), self.balance_manager.get_net_balances())
+
+        # A rebuild from the expense history agrees with the incrementally maintained ledger
+        late_balance_manager._recalculate_all_balances()
+        self.assertEqual(late_balance_manager.get_net_balance("u2"), -1500)
+        self.add_expense("E3", 4, "u2", ["u1", "u2"], SplitType.EQUAL)
+        self.assertEqual(late_balance_manager.get_net_balance("u2"), -1300)
+
+
+class TestBalanceSubscriptions(unittest.TestCase):
+
+    def setUp(self):
+        self.user_manager = UserManager()
+        for user_id, name in [("u1", "Alice"), ("u2", "Bob"), ("u3", "Charlie")]:
+            self.user_manager.add_user(user_id, name)
+        self.expense_manager = ExpenseManager(self.user_manager)
+        self.balance_manager = BalanceManager(self.user_manager, self.expense_manager)
+
+    def add(self, paid_by, participants, amount=30):
+        self.expense_manager.add_expense("Dinner", amount, paid_by, participants, SplitType.EQUAL)
+
+    def test_callbacks_receive_net_deltas(self):
+        received = queue.Queue()
+        with self.balance_manager.subscribe(received.put, window=0):
+            self.add("u1", ["u1", "u2", "u3"])
+            self.assertEqual(received.get(timeout=5), {"u1": 2000, "u2": -1000, "u3": -1000})
+        self.add("u1", ["u1", "u2"])  # Closed: nothing more is delivered
+        with self.assertRaises(queue.Empty):
+            received.get(timeout=0.2)
+
+    def test_bursts_are_coalesced_and_filtered(self):
+        received = queue.Queue()
+        with self.balance_manager.subscribe(received.put, user_ids=["u2", "u3"], window=0.3):
+            self.add("u1", ["u1", "u2"], 20)
+            self.add("u2", ["u1", "u2"], 20)  # Cancels out u2's first change
+            self.add("u1", ["u1", "u3"], 20)
+            self.assertEqual(received.get(timeout=5), {"u3": -1000})
+            self.assertTrue(received.empty())
+
+    def test_window_restarts_after_pending_deltas_cancel_out(self):
+        received = queue.Queue()
+        with self.balance_manager.subscribe(received.put, user_ids=["u2"], window=0.4):
+            self.add("u1", ["u1", "u2"], 20)
+            self.add("u2", ["u1", "u2"], 20)  # Nothing pending any more
+            time.sleep(0.2)
+            rearmed_at = time.monotonic()
+            self.add("u1", ["u1", "u2"], 20)
+            self.assertEqual(received.get(timeout=5), {"u2": -1000})
+            # Delivered on the new deadline, not the one armed before the cancellation
+            self.assertGreaterEqual(time.monotonic() - rearmed_at, 0.35)
+
+    def test_async_stream(self):
+        async def consume():
+            stream = self.balance_manager.stream(["u1"], window=0)
+            first = asyncio.ensure_future(stream.__anext__())
+            await asyncio.sleep(0.05)  # Let the stream subscribe
+            self.add("u2", ["u1", "u2"], 10)
+            deltas = await asyncio.wait_for(first, timeout=5)
+            await stream.aclose()
+            return deltas
+        self.assertEqual(asyncio.run(consume()), {"u1": -500})
+        self.assertFalse(self.balance_manager._notifier.has_subscribers())
+
+
+class TestSparseBalanceMatrix(unittest.TestCase):
+
+    def setUp(self):
+        self.matrix = SparseBalanceMatrix()
+
+    def test_row_column_and_net_queries(self):
+        self.matrix.add("u2", "u1", 500)
+        self.matrix.add("u3", "u1", 300)
+        self.matrix.add("u1", "u3", 200)
+
+        self.assertEqual(self.matrix.row("u1"), {"u3": 200})
+        self.assertEqual(self.matrix.column("u1"), {"u2": 500, "u3": 300})
+        self.assertEqual(self.matrix.get("u3", "u1"), 300)
+        self.assertEqual(self.matrix.get("u1", "nobody"), 0)
+        self.assertEqual(self.matrix.net_balances(), {"u1": 600, "u2": -500, "u3": -100})
+        self.assertEqual(sorted(self.matrix.entries()), [("u1", "u3", 200), ("u2", "u1", 500), ("u3", "u1", 300)])
+        self.assertEqual(len(self.matrix), 3)
+
+    def test_entries_that_return_to_zero_are_dropped(self):
+        self.matrix.add("u2", "u1", 500)
+        self.matrix.add("u2", "u1", -500)
+
+        self.assertEqual(len(self.matrix), 0)
+        self.assertEqual(self.matrix.row("u2"), {})
+        self.assertEqual(self.matrix.column("u1"), {})
+        self.assertEqual(self.matrix.net_balance("u1"), 0)
+        self.assertEqual(self.matrix.net_balances(), {})
+
+    def test_folding_pending_updates_keeps_queries_exact(self):
+        expected = defaultdict(int)
+        with patch.object(SparseBalanceMatrix, "_MIN_PENDING_ENTRIES", 3):  # Fold (and compact) often
+            for i in range(400):
+                ower, payer = f"u{i % 7}", f"u{(i * 3 + 1) % 5}"
+                if ower == payer:
+                    continue
+                amount = -expected[ower, payer] if i % 11 == 0 else i % 13 + 1
+                self.matrix.add(ower, payer, amount)
+                expected[ower, payer] += amount
+
+        for user_id in (f"u{i}" for i in range(7)):
+            self.assertEqual(self.matrix.row(user_id),
+                             {payer: amount for (ower, payer), amount in expected.items() if ower == user_id and amount})
+            self.assertEqual(self.matrix.column(user_id),
+                             {ower: amount for (ower, payer), amount in expected.items() if payer == user_id and amount})
+        self.assertEqual(len(self.matrix), sum(1 for amount in expected.values() if amount))
+
+    def test_clear_keeps_interned_users(self):
+        self.matrix.add("u2", "u1", 500)
+        self.matrix.clear()
+        self.assertEqual(list(self.matrix.entries()), [])
+        self.matrix.add("u1", "u2", 100)
+        self.assertEqual(self.matrix.row("u1"), {"u2": 100})
+        self.assertEqual(self.matrix.net_balance("u2"), 100)
+
+
+# --- Test Cases for groups and expense indexes ---
+class TestGroupExpenses(unittest.TestCase):
+
+    def setUp(self):
+        self.user_manager = UserManager()
+        for user_id, name in [("u1", "Alice"), ("u2", "Bob"), ("u3", "Charlie")]:
+            self.user_manager.add_user(user_id, name)
+        self.group_manager = GroupManager(self.user_manager)
+        self.group_manager.add_group("trip", "Trip", ["u1", "u2"])
+        self.expense_manager = ExpenseManager(self.user_manager, self.group_manager)
+        self.balance_manager = BalanceManager(self.user_manager, self.expense_manager)
+        self.now = datetime(2024, 6, 30, 12, 0)
+
+    def add(self, description, paid_by, participants, days_ago, group_id=None):
+        return self.expense_manager.add_expense(
+            description, 10, paid_by, participants, SplitType.EQUAL,
+            group_id=group_id, created_at=self.now - timedelta(days=days_ago))
+
+    def test_group_membership_is_enforced(self):
+        with self.assertRaises(DuplicateGroupException):
+            self.group_manager.add_group("trip", "Another trip")
+        with self.assertRaises(GroupNotFoundException):
+            self.add("Taxi", "u1", ["u1", "u2"], 0, group_id="nope")
+        with self.assertRaises(InvalidSplitError):
+            self.add("Taxi", "u1", ["u1", "u3"], 0, group_id="trip")
+        self.group_manager.add_member("trip", "u3")
+        self.add("Taxi", "u1", ["u1", "u3"], 0, group_id="trip")
+        self.assertEqual(len(self.expense_manager.get_group_expenses("trip")), 1)
+
+    def test_time_range_scans(self):
+        old = self.add("Old", "u1", ["u1", "u2"], 45, group_id="trip")
+        recent = self.add("Recent", "u2", ["u1", "u2"], 3, group_id="trip")
+        outside_group = self.add("Lunch", "u3", ["u1", "u3"], 10)
+        backfilled = self.add("Backfilled", "u1", ["u1", "u2"], 20, group_id="trip")  # Inserted out of order
+
+        last_30_days = self.now - timedelta(days=30)
+        self.assertEqual(self.expense_manager.get_user_expenses("u1", since=last_30_days),
+                         [backfilled, outside_group, recent])
+        self.assertEqual(self.expense_manager.get_user_expenses("u2", until=last_30_days), [old])
+        self.assertEqual(self.expense_manager.get_expenses_paid_by("u1"), [old, backfilled])
+        self.assertEqual(self.expense_manager.get_group_expenses("trip", since=last_30_days), [backfilled, recent])
+        self.assertEqual(self.expense_manager.get_group_expenses(None), [outside_group])
+        self.assertEqual(self.expense_manager.get_user_expenses("nobody"), [])
+
+    def test_group_balances(self):
+        self.add("Hotel", "u1", ["u1", "u2"], 1, group_id="trip")
+        self.add("Lunch", "u3", ["u2", "u3"], 1)
+        self.assertEqual(self.balance_manager.get_group_net_balances("trip"), {"u1": 500, "u2": -500})
+        transfers = self.balance_manager.simplify_debts(group_id="trip")
+        self.assertEqual([(t.from_user_id, t.to_user_id, t.amount_cents) for t in transfers], [("u2", "u1", 500)])
+        self.assertEqual(self.balance_manager.get_net_balance("u2"), -1000)
+
+
+    def test_add_expenses_bulk(self):
+        self.group_manager.add_group("flat", "Flat", ["u2", "u3"])
+        ledger_updates = []
+        self.expense_manager.add_expense_listener(ledger_updates.append)
+        expenses = self.expense_manager.add_expenses_bulk([
+            {"description": "Rent", "total_amount": 900, "paid_by_user_id": "u2",
+             "participant_user_ids": ["u2", "u3"], "split_type": SplitType.EQUAL, "group_id": "flat",
+             "created_at": self.now - timedelta(days=1)},
+            {"description": "Taxi", "total_amount": 30, "paid_by_user_id": "u1",
+             "participant_user_ids": ["u1", "u2", "u3"], "split_type": SplitType.EXACT,
+             "split_data": {"u1": 10, "u2": 5, "u3": 15}, "created_at": self.now},
+        ])
+        self.assertEqual(len(expenses), 2)
+        self.assertEqual(len(ledger_updates), 1)  # The whole batch arrives as one delta
+        self.assertEqual(self.balance_manager.get_net_balance("u3"), -46500)
+        self.assertEqual(self.balance_manager.get_group_net_balances("flat"), {"u2": 45000, "u3": -45000})
+        self.assertEqual(self.expense_manager.get_expense(expenses[1].expense_id).created_at, self.now)
+        self.assertEqual(self.expense_manager.get_user_expenses("u3", since=self.now), [expenses[1]])
+
+    def test_add_expenses_bulk_is_all_or_nothing(self):
+        valid = {"description": "Taxi", "total_amount": 30, "paid_by_user_id": "u1",
+                 "participant_user_ids": ["u1", "u2"], "split_type": SplitType.EQUAL}
+        with self.assertRaisesRegex(UserNotFoundException, "Expense #1"):
+            self.expense_manager.add_expenses_bulk([valid, dict(valid, participant_user_ids=["u1", "u9"])])
+        with self.assertRaisesRegex(InvalidAmountException, "Expense #0"):
+            self.expense_manager.add_expenses_bulk([dict(valid, total_amount=0), valid])
+        self.assertEqual(self.expense_manager.get_all_expenses(), [])
+        self.assertEqual(self.balance_manager.get_net_balances(), {})
+
+    def test_bad_timestamps_leave_the_store_unchanged(self):
+        self.add("Lunch", "u1", ["u1", "u2"], 1)
+        balances = self.balance_manager.get_net_balances()
+        ledger_updates = []
+        self.expense_manager.add_expense_listener(ledger_updates.append)
+        for created_at in ["2024-01-01", datetime.now(timezone.utc)]:  # Not a datetime; aware among naive
+            with self.assertRaises(InvalidTimestampError):
+                self.expense_manager.add_expense("Taxi", 30, "u1", ["u1", "u2"], SplitType.EQUAL,
+                                                 created_at=created_at)
+            with self.assertRaisesRegex(InvalidTimestampError, "Expense #1"):
+                self.expense_manager.add_expenses_bulk([
+                    {"description": "Taxi", "total_amount": 30, "paid_by_user_id": "u1",
+                     "participant_user_ids": ["u1", "u2"], "split_type": SplitType.EQUAL},
+                    {"description": "Taxi", "total_amount": 30, "paid_by_user_id": "u1",
+                     "participant_user_ids": ["u1", "u2"], "split_type": SplitType.EQUAL, "created_at": created_at},
+                ])
+        self.assertEqual(len(self.expense_manager.get_all_expenses()), 1)
+        self.assertEqual(len(self.expense_manager.get_user_expenses("u1")), 1)
+        self.assertEqual(self.balance_manager.get_net_balances(), balances)
+        self.assertEqual(ledger_updates, [])
+
+    def test_add_recurring_expenses(self):
+        ledger_updates = []
+        self.expense_manager.add_expense_listener(ledger_updates.append)
+        months = [self.now - timedelta(days=30 * i) for i in range(3)]
+        expenses = self.expense_manager.add_recurring_expenses(
+            "Rent", [(months[2], 900), (months[1], 900), (months[0], 960)], "u1", ["u1", "u2"],
+            SplitType.SHARES, split_data={"u1": 2, "u2": 1}, group_id="trip")
+        self.assertEqual(len(ledger_updates), 1)
+        self.assertEqual([e.created_at for e in expenses], [months[2], months[1], months[0]])
+        self.assertEqual(self.balance_manager.get_group_net_balances("trip"), {"u1": 92000, "u2": -92000})
+        self.assertEqual(self.expense_manager.get_group_expenses("trip", since=months[1]), expenses[1:])
+
+        with self.assertRaisesRegex(InvalidAmountException, "Expense #1"):
+            self.expense_manager.add_recurring_expenses(
+                "Rent", [(self.now, 900), (self.now, 0)], "u1", ["u1", "u2"], SplitType.EQUAL)
+        with self.assertRaises(InvalidSplitError):
+            self.expense_manager.add_recurring_expenses(
+                "Rent", [(self.now, 900)], "u1", ["u1", "u3"], SplitType.EQUAL, group_id="trip")
+        with self.assertRaisesRegex(InvalidTimestampError, "Expense #1"):
+            self.expense_manager.add_recurring_expenses(
+                "Rent", [(self.now, 900), (None, 900)], "u1", ["u1", "u2"], SplitType.EQUAL)
+        self.assertEqual(len(self.expense_manager.get_all_expenses()), 3)
+        self.assertEqual(self.expense_manager.get_group_expenses("trip", since=months[1]), expenses[1:])
+
+
+# --- Test Cases for concurrent access ---
+class TestConcurrentAccess(unittest.TestCase):
+
+    def setUp(self):
+        self.user_manager = UserManager()
+        for i in range(6):
+            self.user_manager.add_user(f"u{i}", f"User {i}")
+        self.expense_manager = ExpenseManager(self.user_manager)
+        self.balance_manager = BalanceManager(self.user_manager, self.expense_manager)
+
+    def test_user_reads_do_not_take_the_lock(self):
+        with self.user_manager._lock:  # A writer in progress does not block readers
+            self.assertEqual(self.user_manager.get_user("u1").name, "User 1")
+            self.assertEqual(len(self.user_manager.get_users(["u1", "u2", "nobody"])), 2)
+
+    def test_readers_see_consistent_ledger_during_writes(self):
+        errors = []
+
+        def writer(offset):
+            for i in range(200):
+                participants = [f"u{(offset + i) % 6}", f"u{(offset + i + 1) % 6}", f"u{(offset + i + 3) % 6}"]
+                self.expense_manager.add_expense("Shared", 10 + i % 7, participants[0], participants, SplitType.EQUAL)
+
+        def reader():
+            for _ in range(300):
+                balances = self.balance_manager.get_net_balances()
+                if sum(balances.values()) != 0:
+                    errors.append(balances)
+                self.balance_manager.get_user_balances("u0")
+                self.expense_manager.get_user_expenses("u1")
+
+        threads = [threading.Thread(target=writer, args=(n,)) for n in range(3)]
+        threads += [threading.Thread(target=reader) for _ in range(3)]
+        with redirect_stdout(io.StringIO()):
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+
+        self.assertEqual(errors, [])
+        self.assertEqual(len(self.expense_manager.get_all_expenses()), 600)
+        rebuilt = dict(self.balance_manager.get_net_balances())
+        self.balance_manager._recalculate_all_balances()
+        self.assertEqual(self.balance_manager.get_net_balances(), rebuilt)
+
+
+class TestPersistentSplitwise(unittest.TestCase):
+
+    def setUp(self):
+        self.temp_dir = tempfile.TemporaryDirectory()
+        self.data_dir = self.temp_dir.name
+        self._stdout = sys.stdout
+        sys.stdout = io.StringIO()
+
+    def tearDown(self):
+        sys.stdout = self._stdout
+        self.temp_dir.cleanup()
+
+    def _open(self, **kwargs) -> PersistentSplitwise:
+        return PersistentSplitwise(self.data_dir, fsync=False, **kwargs)
+
+    def _populate(self, splitwise: PersistentSplitwise):
+        splitwise.add_user("u1", "Alice")
+        splitwise.add_user("u2", "Bob")
+        splitwise.add_user("u3", "Charlie")
+        splitwise.add_group("trip", "Trip", ["u1", "u2"])
+        splitwise.add_group_member("trip", "u3")
+        splitwise.add_expense("Dinner", 30.0, "u1", ["u1", "u2", "u3"], SplitType.EQUAL,
+                              group_id="trip", created_at=datetime(2024, 1, 10))
+        splitwise.expense_manager.add_expense("Taxi", 10.0, "u2", ["u2", "u3"], SplitType.EXACT,
+                                              {"u2": 4.0, "u3": 6.0}, created_at=datetime(2024, 2, 10))
+
+    def test_state_survives_restart_via_journal_replay(self):
+        splitwise = self._open()
+        self._populate(splitwise)
+        expected = splitwise.balance_manager.get_ledger()
+        splitwise.close()
+
+        restored = self._open()
+        self.assertEqual(restored.user_manager.get_user("u3").name, "Charlie")
+        self.assertEqual(restored.group_manager.get_group("trip").member_ids, frozenset({"u1", "u2", "u3"}))
+        self.assertEqual(len(restored.expense_manager.get_all_expenses()), 2)
+        self.assertEqual(restored.balance_manager.get_ledger(), expected)
+        self.assertEqual(restored.balance_manager.get_net_balances(), {"u1": 2000, "u2": -400, "u3": -1600})
+        self.assertEqual(restored.balance_manager.get_group_net_balances("trip"), {"u1": 2000, "u2": -1000, "u3": -1000})
+        restored.close()
+
+    def test_snapshot_then_journal_tail(self):
+        splitwise = self._open(snapshot_every=6)
+        self._populate(splitwise)  # Six events: snapshot after the Dinner expense, Taxi stays in the tail
+        splitwise.close()
+
+        snapshot = SnapshotStore(os.path.join(self.data_dir, PersistentSplitwise.SNAPSHOT_FILE_NAME)).load()
+        self.assertEqual(snapshot["sequence"], 6)
+        self.assertEqual(len(snapshot["expenses"]), 1)
+
+        restored = self._open(snapshot_every=6)
+        self.assertEqual(restored.balance_manager.get_net_balances(), {"u1": 2000, "u2": -400, "u3": -1600})
+        self.assertEqual(restored.expense_manager.get_expense(
+            restored.expense_manager.get_expenses_paid_by("u2")[0].expense_id).splits[1].amount_cents, 600)
+        restored.add_expense("Coffee", 5.0, "u3", ["u1", "u3"], SplitType.EQUAL)
+        restored.close()
+
+        self.assertEqual(self._open().balance_manager.get_net_balances(), {"u1": 1750, "u2": -400, "u3": -1350})
+
+    def test_expenses_added_directly_count_towards_the_snapshot(self):
+        splitwise = self._open(snapshot_every=3)
+        splitwise.add_user("u1", "Alice")
+        splitwise.add_user("u2", "Bob")
+        splitwise.expense_manager.add_expense("Taxi", 10.0, "u1", ["u1", "u2"], SplitType.EQUAL)
+        splitwise.close()  # Waits for the background snapshot
+
+        snapshot = SnapshotStore(os.path.join(self.data_dir, PersistentSplitwise.SNAPSHOT_FILE_NAME)).load()
+        self.assertEqual(snapshot["sequence"], 3)
+        self.assertEqual(len(snapshot["expenses"]), 1)
+
+    def test_lone_event_is_flushed_after_the_group_commit_interval(self):
+        journal_path = os.path.join(self.data_dir, "timer.journal")
+        journal = EventJournal(journal_path, group_commit_interval=0.2, fsync=False)
+        journal.append("user_added", ["u1", "Alice"])
+        self.assertEqual(os.path.getsize(journal_path), 0)
+
+        deadline = time.monotonic() + 5
+        while os.path.getsize(journal_path) == 0 and time.monotonic() < deadline:
+            time.sleep(0.01)
+        self.assertEqual([event_type for _, event_type, _ in EventJournal.read_events(journal_path)], ["user_added"])
+        journal.close()
+
+    def test_balances_as_of(self):
+        splitwise = self._open()
+        self._populate(splitwise)
+        self.assertEqual(splitwise.get_net_balances_as_of(datetime(2024, 1, 1)), {})
+        self.assertEqual(splitwise.get_balances_as_of(datetime(2024, 2, 1)), {"u2": {"u1": 1000}, "u3": {"u1": 1000}})
+        self.assertEqual(splitwise.get_net_balances_as_of(datetime(2024, 3, 1)), {"u1": 2000, "u2": -400, "u3": -1600})
+        self.assertEqual(splitwise.get_net_balances_as_of(datetime(2024, 3, 1), group_id="trip"),
+                         {"u1": 2000, "u2": -1000, "u3": -1000})
+        splitwise.close()
+
+    def test_bulk_import_is_journaled_as_one_event(self):
+        splitwise = self._open()
+        splitwise.add_user("u1", "Alice")
+        splitwise.add_user("u2", "Bob")
+        splitwise.add_expenses_bulk([
+            {"description": f"Item {i}", "total_amount": 2.0, "paid_by_user_id": "u1",
+             "participant_user_ids": ["u1", "u2"], "split_type": SplitType.EQUAL} for i in range(5)
+        ])
+        splitwise.close()
+
+        journal_path = os.path.join(self.data_dir, PersistentSplitwise.JOURNAL_FILE_NAME)
+        events = [event_type for _, event_type, _ in EventJournal.read_events(journal_path)]
+        self.assertEqual(events, ["user_added", "user_added", "expenses_added"])
+        self.assertEqual(self._open().balance_manager.get_net_balance("u1"), 500)
+
+    def test_failed_writes_are_not_journaled(self):
+        splitwise = self._open()
+        splitwise.add_user("u1", "Alice")
+        with self.assertRaises(DuplicateUserException):
+            splitwise.add_user("u1", "Alice again")
+        with self.assertRaises(UserNotFoundException):
+            splitwise.add_expense("Lunch", 10.0, "u1", ["u1", "ghost"], SplitType.EQUAL)
+        splitwise.close()
+
+        journal_path = os.path.join(self.data_dir, PersistentSplitwise.JOURNAL_FILE_NAME)
+        self.assertEqual([event_type for _, event_type, _ in EventJournal.read_events(journal_path)], ["user_added"])
+
+    def test_torn_journal_tail_is_ignored(self):
+        splitwise = self._open()
+        splitwise.add_user("u1", "Alice")
+        splitwise.add_user("u2", "Bob")
+        splitwise.close()
+        journal_path = os.path.join(self.data_dir, PersistentSplitwise.JOURNAL_FILE_NAME)
+        with open(journal_path, "r+b") as journal_file:
+            journal_file.truncate(os.path.getsize(journal_path) - 3)
+
+        restored = self._open()
+        self.assertEqual([user.user_id for user in restored.user_manager.get_all_users()], ["u1"])
+        restored.add_user("u2", "Bob")
+        restored.close()
+        self.assertEqual(len(self._open().user_manager.get_all_users()), 2)
+
+    def test_unknown_event_fails_recovery(self):
+        journal = EventJournal(os.path.join(self.data_dir, PersistentSplitwise.JOURNAL_FILE_NAME), fsync=False)
+        journal.append("user_deleted", ["u1"])
+        journal.close()
+        with self.assertRaises(PersistenceError):
+            self._open()
 
 
 # --- Main Test Runner ---